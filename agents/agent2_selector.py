@@ -2,19 +2,79 @@
 Agent 2: Le Sélecteur (Service Broker)
 
 Rôle: Sélection sémantique de services via RAG (Retrieval Augmented Generation)
-Technologie: ChromaDB + sentence-transformers
+Technologie: ChromaDB + sentence-transformers + index lexical BM25 (recherche hybride)
+             + index compressé float16 / IVF-PQ optionnel (très grands catalogues)
+             + shards par catégorie avec routage par sous-intention (optionnel)
+             + index des zones de couverture (gazetteer hors ligne, KD-tree)
+             + index des contraintes numériques (faisabilité cpu / ram / latence...)
 """
 import os
+import re
 import sys
+import threading
+import time
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from typing import List, Dict, Any, Optional
+import numpy as np
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from chromadb.utils import embedding_functions
 
 from schemas.intent import Intent
 from config import settings
+from retrieval import (
+    BM25Index,
+    CompressedIndex,
+    ConstraintIndex,
+    CoverageIndex,
+    Gazetteer,
+    ShardIndex,
+    artifact_path,
+    collection_space,
+    compute_distances,
+    distance_to_score,
+    get_embedding_function,
+    parse_requirements,
+    reciprocal_rank_fusion,
+    solve_assignment,
+    RetrievalCache,
+    RetrievalDispatcher,
+    HNSW_TUNING_KEY,
+    check_fingerprint,
+    collection_hnsw_params,
+    export_snapshot,
+    generation_name,
+    generation_number,
+    load_snapshot,
+    model_fingerprint,
+    parse_variants,
+    read_collection_alias,
+    remove_artifacts,
+    strip_variants,
+    write_collection_alias,
+)
+
+
+# Clé des métadonnées de collection portant la version du catalogue
+CATALOG_VERSION_KEY = "catalog_version"
+
+# Collection du catalogue par défaut (sans tenant)
+DEFAULT_COLLECTION = "openslice_services"
+
+
+def tenant_collection_name(tenant: Optional[str] = None) -> str:
+    """
+    Nom de la collection ChromaDB du catalogue d'un tenant OpenSlice
+
+    Les index dérivés (BM25, compressé, shards) suivent le nom de la collection.
+    Sans tenant, la collection par défaut est utilisée.
+    """
+    if not tenant:
+        return DEFAULT_COLLECTION
+    slug = re.sub(r"[^a-z0-9_-]+", "-", tenant.strip().lower()).strip("-_")
+    if not slug:
+        raise ValueError(f"Nom de tenant invalide: '{tenant}'")
+    return f"{DEFAULT_COLLECTION}_{slug}"
 
 
 class ServiceSelectorAgent:
@@ -24,15 +84,27 @@ class ServiceSelectorAgent:
     
     Architecture:
     - Base de données vectorielle: ChromaDB
-    - Modèle d'embeddings: sentence-transformers (all-MiniLM-L6-v2)
-    - Recherche par similarité cosinus
+    - Modèle d'embeddings: sentence-transformers (all-MiniLM-L6-v2),
+      backend PyTorch ou ONNX Runtime int8 (settings.embedding_backend)
+    - Recherche par similarité vectorielle
+    - Recherche lexicale BM25 fusionnée par RRF (si l'index lexical existe)
+    - Index vectoriel compressé à la place de HNSW (settings.vector_backend="compressed")
+    - Shards par catégorie, 1 à 2 shards parcourus par sous-intention (settings.category_sharding)
+    - Couverture géographique : services couvrant la localisation favorisés ou seuls
+      retenus (settings.location_filter)
+    - Faisabilité : services incapables de satisfaire les exigences chiffrées écartés
+      avant classement (settings.constraint_filter)
     """
     
     def __init__(
         self,
         persist_directory: Optional[str] = None,
         embedding_model: Optional[str] = None,
-        collection_name: str = "openslice_services"
+        collection_name: str = DEFAULT_COLLECTION,
+        embedding_backend: Optional[str] = None,
+        embedding_function=None,
+        client=None,
+        create_if_missing: bool = True
     ):
         """
         Initialise l'agent de sélection de services
@@ -40,66 +112,898 @@ class ServiceSelectorAgent:
         Args:
             persist_directory: Répertoire de persistance ChromaDB
             embedding_model: Nom du modèle d'embeddings
-            collection_name: Nom de la collection ChromaDB
+            collection_name: Nom logique de la collection (voir tenant_collection_name) ; la
+                             collection ChromaDB servie est celle publiée par son alias
+            embedding_backend: "sentence-transformers" ou "onnx-int8" (défaut: settings)
+            embedding_function: Fonction d'embeddings déjà chargée (partagée entre tenants)
+            client: Client ChromaDB déjà ouvert sur persist_directory (partagé entre tenants)
+            create_if_missing: Créer la collection (vide) si elle n'existe pas ; False pour
+                               servir un catalogue déjà ingéré (tenant inconnu = erreur)
+
+        Raises:
+            ValueError: Collection absente avec create_if_missing=False
         """
         self.persist_directory = persist_directory or settings.chroma_persist_dir
         self.embedding_model_name = embedding_model or settings.embedding_model
+        self.embedding_backend = embedding_backend or settings.embedding_backend
         self.collection_name = collection_name
         
         # Créer le répertoire si nécessaire
         os.makedirs(self.persist_directory, exist_ok=True)
         
         # Initialiser le modèle d'embeddings (une seule fois, via ChromaDB)
-        print(f"Chargement du modèle d'embeddings: {self.embedding_model_name}")
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=self.embedding_model_name
-        )
+        if embedding_function is None:
+            print(f"Chargement du modèle d'embeddings: {self.embedding_model_name} (backend: {self.embedding_backend})")
+            embedding_function = get_embedding_function(
+                model_name=self.embedding_model_name,
+                backend=self.embedding_backend
+            )
+        self.embedding_function = embedding_function
         
         # Initialiser ChromaDB
-        self.client = chromadb.PersistentClient(
+        self.client = client or chromadb.PersistentClient(
             path=self.persist_directory,
             settings=ChromaSettings(anonymized_telemetry=False)
         )
         
+        # Collection physique publiée par l'alias (ré-indexation bleu/vert), sinon le nom logique
+        self.physical_collection = (
+            read_collection_alias(self.persist_directory, self.collection_name) or self.collection_name
+        )
+
         # Obtenir ou créer la collection
-        try:
-            self.collection = self.client.get_collection(
-                name=self.collection_name,
-                embedding_function=self.embedding_function
+        if self.physical_collection in self._collection_names():
+            self.collection = self._open_collection(self.physical_collection)
+            print(f" Collection '{self.physical_collection}' chargée ({self.collection.count()} services)")
+            indexed_backend = (self.collection.metadata or {}).get("embedding_backend", "sentence-transformers")
+            if indexed_backend != self.embedding_backend:
+                print(f"  Collection indexée avec le backend '{indexed_backend}' "
+                      f"(backend actuel: '{self.embedding_backend}'), ré-ingérez avec --clear")
+        elif not create_if_missing:
+            raise ValueError(
+                f"Catalogue '{self.collection_name}' introuvable: ingérez-le d'abord "
+                "(python scripts/ingest_catalog.py [--tenant <tenant>])"
             )
-            print(f" Collection '{self.collection_name}' chargée ({self.collection.count()} services)")
-        except Exception:
+        else:
             self.collection = self.client.create_collection(
-                name=self.collection_name,
-                embedding_function=self.embedding_function,
-                metadata={"description": "OpenSlice Service Catalog"}
+                name=self.physical_collection,
+                embedding_function=None,
+                metadata=self._collection_metadata("OpenSlice Service Catalog")
             )
-            print(f" Collection '{self.collection_name}' créée (vide)")
-    
-    def _query_chromadb(self, query: str, top_k: int, min_score: float) -> List[Dict[str, Any]]:
-        """Exécute une recherche dans ChromaDB et retourne les résultats formatés."""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=top_k,
-            include=["metadatas", "documents", "distances"]
+            print(f" Collection '{self.physical_collection}' créée (vide)")
+
+        # Version du catalogue des index dérivés chargés
+        self._indexes_version = self.catalog_version
+
+        # Index lexical BM25 (construit par scripts/ingest_catalog.py)
+        self.lexical_index: Optional[BM25Index] = None
+        if settings.hybrid_search:
+            self.reload_lexical_index()
+
+        # Index vectoriel compressé (construit par scripts/ingest_catalog.py)
+        self.compressed_index: Optional[CompressedIndex] = None
+        if settings.vector_backend == "compressed":
+            self.reload_compressed_index()
+
+        # Shards par catégorie (construits par scripts/ingest_catalog.py)
+        self.shard_index: Optional[ShardIndex] = None
+        if settings.category_sharding:
+            self.reload_shard_index()
+
+        # Zones de couverture des services (construites par scripts/ingest_catalog.py)
+        self.gazetteer = Gazetteer.default(settings.gazetteer_path or None)
+        self.coverage_index: Optional[CoverageIndex] = None
+        if settings.location_filter != "off":
+            self.reload_coverage_index()
+
+        # Intervalles numériques des services (construits par scripts/ingest_catalog.py)
+        self.constraint_index: Optional[ConstraintIndex] = None
+        if settings.constraint_filter:
+            self.reload_constraint_index()
+
+        # Latences par composant de la dernière recherche, par thread (agent partagé)
+        self._local = threading.local()
+
+        # Rechargement des index dérivés sérialisé entre les appels concurrents
+        self._sync_lock = threading.RLock()
+
+        # Cache des résultats, invalidé par la version du catalogue
+        self.cache: Optional[RetrievalCache] = None
+        if settings.retrieval_cache:
+            self.cache = RetrievalCache(max_entries=settings.retrieval_cache_max_entries)
+            self.cache.set_version(self.catalog_version)
+
+        # Micro-batching des requêtes entre appels concurrents (agent partagé)
+        self.dispatcher: Optional[RetrievalDispatcher] = None
+        if settings.retrieval_batching:
+            self.dispatcher = RetrievalDispatcher(
+                self._retrieve_batch,
+                window_ms=settings.retrieval_batch_window_ms,
+                max_batch_size=settings.retrieval_batch_max_queries,
+                timeout=settings.retrieval_batch_timeout or None,
+                timings=lambda: self.last_timings
+            )
+
+    def _collection_metadata(
+        self,
+        description: str,
+        catalog_version: int = 0,
+        hnsw_params: Optional[Dict[str, Any]] = None,
+        tuning: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Métadonnées enregistrées à la création de la collection"""
+        metadata = {
+            "description": description,
+            "embedding_model": self.embedding_model_name,
+            "embedding_backend": self.embedding_backend,
+            CATALOG_VERSION_KEY: catalog_version
+        }
+        if hnsw_params:
+            metadata.update(hnsw_params)
+        if tuning:
+            metadata[HNSW_TUNING_KEY] = tuning
+        return metadata
+
+    def _open_collection(self, name: str):
+        """
+        Ouvre une collection existante sans fonction d'embeddings ChromaDB
+
+        L'agent encode lui-même les requêtes et l'ingestion fournit les embeddings :
+        ChromaDB n'encode jamais de texte, et ne compare donc pas self.embedding_function
+        à la fonction enregistrée à la création de la collection (conflit de nom entre
+        backends, service d'embeddings partagé...). Le modèle d'indexation est suivi par
+        les métadonnées "embedding_model" / "embedding_backend".
+        """
+        return self.client.get_collection(name=name, embedding_function=None)
+
+    def _collection_names(self) -> List[str]:
+        """Noms des collections ChromaDB du client (toutes versions de ChromaDB)"""
+        return [getattr(c, "name", c) for c in self.client.list_collections()]
+
+    def stage_collection(
+        self,
+        description: str = "OpenSlice Service Catalog",
+        hnsw_params: Optional[Dict[str, Any]] = None,
+        tuning: Optional[str] = None
+    ):
+        """
+        Crée une nouvelle génération (vide) de la collection et y dirige l'agent
+
+        Ré-indexation bleu/vert : la génération ("openslice_services.g7") est alimentée
+        et ses index dérivés construits pendant que les autres agents continuent de
+        servir la génération publiée ; publish_collection() bascule ensuite l'alias.
+        La version du catalogue continue d'augmenter et la génération est indexée avec
+        le modèle d'embeddings de l'agent. Les paramètres HNSW réglés par
+        scripts/tune_index.py sont conservés sauf si hnsw_params est fourni.
+
+        Args:
+            description: Description enregistrée dans les métadonnées de la collection
+            hnsw_params: Paramètres "hnsw:*" de la nouvelle collection
+            tuning: Résultat de réglage (JSON) enregistré sous HNSW_TUNING_KEY
+        """
+        next_version = self.catalog_version + 1
+        if hnsw_params is None:
+            hnsw_params = collection_hnsw_params(self.collection)
+            tuning = (self.collection.metadata or {}).get(HNSW_TUNING_KEY)
+        generations = [generation_number(self.collection_name, name) for name in self._collection_names()]
+        generation = max([g for g in generations if g is not None] + [0]) + 1
+        self.physical_collection = generation_name(self.collection_name, generation)
+        self.collection = self.client.create_collection(
+            name=self.physical_collection,
+            embedding_function=None,
+            metadata=self._collection_metadata(description, next_version, hnsw_params, tuning)
         )
-        services = []
-        if results and results['ids'] and len(results['ids'][0]) > 0:
-            for i in range(len(results['ids'][0])):
-                distance = results['distances'][0][i]
-                score = 1 / (1 + distance)
-                if score < min_score:
+        return self.collection
+
+    def publish_collection(self) -> bool:
+        """
+        Bascule atomiquement l'alias vers la collection de l'agent (génération préparée)
+
+        Les agents en cours d'exécution suivent l'alias à leur requête suivante. La
+        génération précédemment publiée est conservée (requêtes en cours, retour
+        arrière) ; les plus anciennes et les générations jamais publiées sont
+        supprimées avec leurs artefacts.
+
+        Returns:
+            bool: False si l'alias désignait déjà cette collection
+        """
+        previous = read_collection_alias(self.persist_directory, self.collection_name) or self.collection_name
+        if previous == self.physical_collection:
+            return False
+        write_collection_alias(self.persist_directory, self.collection_name, self.physical_collection)
+
+        for name in self._collection_names():
+            if name in (previous, self.physical_collection):
+                continue
+            if generation_number(self.collection_name, name) is None:
+                continue  # autre collection (tenant, collection éphémère...)
+            try:
+                self.client.delete_collection(name=name)
+            except Exception:
+                pass  # déjà supprimée par un autre processus
+            remove_artifacts(self.persist_directory, name)
+        return True
+
+    def discard_staged_collection(self) -> bool:
+        """
+        Supprime la génération préparée par stage_collection() et revient à la collection publiée
+
+        À appeler quand une ré-indexation échoue avant publish_collection() : la
+        génération incomplète et ses artefacts ne restent pas sur le disque.
+
+        Returns:
+            bool: False si l'agent servait déjà la collection publiée
+        """
+        published = read_collection_alias(self.persist_directory, self.collection_name) or self.collection_name
+        staged = self.physical_collection
+        if staged == published:
+            return False
+        try:
+            self.client.delete_collection(name=staged)
+        except Exception:
+            pass  # jamais créée ou déjà supprimée
+        remove_artifacts(self.persist_directory, staged)
+        self.physical_collection = published
+        self.collection = self.client.get_or_create_collection(
+            name=published,
+            embedding_function=None,
+            metadata=self._collection_metadata("OpenSlice Service Catalog")
+        )
+        self._indexes_version = None  # index dérivés de la génération abandonnée : rechargés au prochain appel
+        return True
+
+    def follow_collection_alias(self) -> bool:
+        """
+        Suit l'alias publié par une ré-indexation bleu/vert
+
+        Si l'alias désigne une autre génération, l'agent la charge, avec le modèle
+        d'embeddings qui l'a indexée s'il a changé (montée de version du modèle). Les
+        index dérivés sont rechargés par _sync_catalog_version().
+
+        Returns:
+            bool: True si l'agent a changé de collection
+        """
+        target = read_collection_alias(self.persist_directory, self.collection_name)
+        if not target or target == self.physical_collection:
+            return False
+        try:
+            collection = self._open_collection(target)
+            metadata = collection.metadata or {}
+            model = metadata.get("embedding_model", self.embedding_model_name)
+            backend = metadata.get("embedding_backend", self.embedding_backend)
+            if (model, backend) != (self.embedding_model_name, self.embedding_backend):
+                print(f"    Génération '{target}' indexée avec {model} (backend: {backend}): chargement du modèle")
+                embedding_function = get_embedding_function(model_name=model, backend=backend)
+                self.embedding_function = embedding_function
+                self.embedding_model_name, self.embedding_backend = model, backend
+        except Exception as e:
+            print(f"    Bascule vers '{target}' impossible, collection '{self.physical_collection}' conservée: {e}")
+            return False
+        self.collection = collection
+        self.physical_collection = target
+        print(f"    Collection '{target}' publiée: bascule de l'agent")
+        return True
+
+    def rebuild_collection(self, hnsw_params: Dict[str, Any], tuning: Optional[str] = None) -> int:
+        """
+        Reconstruit la collection avec de nouveaux paramètres HNSW
+
+        Les embeddings existants sont réinsérés tels quels (aucun ré-encodage), page par
+        page ; les paramètres "hnsw:*" ne pouvant pas être modifiés après création, une
+        nouvelle génération est préparée (stage_collection), à publier par l'appelant
+        après reconstruction des index dérivés.
+
+        Args:
+            hnsw_params: Paramètres "hnsw:space", "hnsw:M", "hnsw:construction_ef", "hnsw:search_ef"
+            tuning: Résultat de réglage (JSON) enregistré sous HNSW_TUNING_KEY
+
+        Returns:
+            int: Nombre de services réinsérés
+        """
+        source = self.collection
+        description = (source.metadata or {}).get("description", "OpenSlice Service Catalog")
+        self.stage_collection(description, hnsw_params=hnsw_params, tuning=tuning)
+
+        page_size = self.client.get_max_batch_size()
+        offset = 0
+        while True:
+            page = source.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+            if not page["ids"]:
+                return offset
+            self.collection.add(
+                ids=page["ids"],
+                embeddings=[list(e) for e in page["embeddings"]],
+                documents=page["documents"],
+                metadatas=page["metadatas"]
+            )
+            offset += len(page["ids"])
+
+    def export_snapshot(self, path: str) -> Dict[str, Any]:
+        """
+        Exporte la collection dans une archive portable (voir retrieval/snapshot.py)
+
+        L'archive porte l'empreinte du modèle d'embeddings de l'agent, la version du
+        catalogue et les paramètres HNSW de la collection.
+
+        Returns:
+            Dict: Manifeste de l'archive
+        """
+        metadata = self.collection.metadata or {}
+        return export_snapshot(
+            self.collection,
+            path,
+            fingerprint=model_fingerprint(self.embedding_function, self.embedding_model_name, self.embedding_backend),
+            extra={
+                CATALOG_VERSION_KEY: self.catalog_version,
+                "description": metadata.get("description", "OpenSlice Service Catalog"),
+                "hnsw": collection_hnsw_params(self.collection),
+                HNSW_TUNING_KEY: metadata.get(HNSW_TUNING_KEY),
+            }
+        )
+
+    def import_snapshot(self, path: str, check_model: bool = True) -> Dict[str, Any]:
+        """
+        Prépare une nouvelle génération de la collection avec le contenu d'une archive
+        export_snapshot()
+
+        Les embeddings sont insérés tels quels (aucun ré-encodage, aucun accès à
+        OpenSlice). Comme après une ingestion, l'appelant reconstruit les index dérivés,
+        incrémente la version (bump_catalog_version(minimum=manifest["catalog_version"]))
+        puis publie la génération (publish_collection).
+
+        Args:
+            path: Chemin de l'archive
+            check_model: Refuser l'import si le modèle local diffère de celui de l'export
+
+        Returns:
+            Dict: Manifeste de l'archive
+
+        Raises:
+            ValueError: Modèle d'embeddings incompatible ou archive invalide
+        """
+        snapshot = load_snapshot(path)
+        manifest = snapshot["manifest"]
+        if check_model:
+            mismatch = check_fingerprint(
+                manifest["fingerprint"],
+                model_fingerprint(self.embedding_function, self.embedding_model_name, self.embedding_backend)
+            )
+            if mismatch:
+                raise ValueError(f"Modèle d'embeddings incompatible avec l'instantané ({mismatch})")
+
+        self.stage_collection(
+            manifest.get("description", "OpenSlice Service Catalog"),
+            hnsw_params=manifest.get("hnsw") or None,
+            tuning=manifest.get(HNSW_TUNING_KEY)
+        )
+        ids = snapshot["ids"]
+        max_batch = self.client.get_max_batch_size()
+        for start in range(0, len(ids), max_batch):
+            end = start + max_batch
+            self.collection.add(
+                ids=ids[start:end],
+                embeddings=snapshot["embeddings"][start:end],
+                documents=snapshot["documents"][start:end],
+                metadatas=snapshot["metadatas"][start:end]
+            )
+        return manifest
+
+    @property
+    def lexical_index_path(self) -> str:
+        """Chemin de l'index lexical BM25 associé à la collection"""
+        return artifact_path(self.persist_directory, self.physical_collection, "bm25.npz")
+
+    def reload_lexical_index(self) -> Optional[BM25Index]:
+        """(Re)charge l'index lexical BM25 depuis le disque s'il existe"""
+        path = self.lexical_index_path
+        if os.path.exists(path):
+            self.lexical_index = BM25Index.load(path)
+            print(f" Index lexical BM25 chargé ({len(self.lexical_index)} documents)")
+        else:
+            self.lexical_index = None
+        return self.lexical_index
+
+    @property
+    def compressed_index_path(self) -> str:
+        """Chemin de l'index vectoriel compressé associé à la collection"""
+        return artifact_path(self.persist_directory, self.physical_collection, "compressed.npz")
+
+    def reload_compressed_index(self) -> Optional[CompressedIndex]:
+        """(Re)charge l'index vectoriel compressé depuis le disque s'il existe"""
+        path = self.compressed_index_path
+        if os.path.exists(path):
+            self.compressed_index = CompressedIndex.load(
+                path,
+                nprobe=settings.compressed_nprobe,
+                rerank=settings.compressed_rerank
+            )
+            report = self.compressed_index.memory_report()
+            print(f" Index compressé chargé ({report['mode']}, {report['count']} services, "
+                  f"{report['resident_total_bytes'] / (1024 * 1024):.1f} Mo résidents)")
+        else:
+            self.compressed_index = None
+            print("  Index compressé absent, recherche HNSW ChromaDB utilisée "
+                  "(exécutez scripts/ingest_catalog.py)")
+        return self.compressed_index
+
+    @property
+    def shard_index_path(self) -> str:
+        """Chemin des shards par catégorie associés à la collection"""
+        return artifact_path(self.persist_directory, self.physical_collection, "shards.npz")
+
+    def reload_shard_index(self) -> Optional[ShardIndex]:
+        """(Re)charge les shards par catégorie depuis le disque s'ils existent"""
+        path = self.shard_index_path
+        if os.path.exists(path):
+            self.shard_index = ShardIndex.load(path, routes=settings.shard_routes)
+            print(f" Shards par catégorie chargés ({len(self.shard_index.names)} shards, {len(self.shard_index)} services)")
+        else:
+            self.shard_index = None
+        return self.shard_index
+
+    @property
+    def coverage_index_path(self) -> str:
+        """Chemin de l'index des zones de couverture associé à la collection"""
+        return artifact_path(self.persist_directory, self.physical_collection, "geo.npz")
+
+    def reload_coverage_index(self) -> Optional[CoverageIndex]:
+        """(Re)charge l'index des zones de couverture depuis le disque s'il existe"""
+        path = self.coverage_index_path
+        if os.path.exists(path):
+            self.coverage_index = CoverageIndex.load(path)
+            stats = self.coverage_index.stats()
+            print(f" Index de couverture chargé ({stats['covered']}/{stats['services']} services localisés, "
+                  f"{stats['areas']} zones)")
+        else:
+            self.coverage_index = None
+        return self.coverage_index
+
+    @property
+    def constraint_index_path(self) -> str:
+        """Chemin de l'index des contraintes numériques associé à la collection"""
+        return artifact_path(self.persist_directory, self.physical_collection, "constraints.npz")
+
+    def reload_constraint_index(self) -> Optional[ConstraintIndex]:
+        """(Re)charge l'index des contraintes numériques depuis le disque s'il existe"""
+        path = self.constraint_index_path
+        if os.path.exists(path):
+            self.constraint_index = ConstraintIndex.load(path)
+            print(f" Index des contraintes chargé ({len(self.constraint_index)} services, "
+                  f"attributs: {', '.join(self.constraint_index.columns) or 'aucun'})")
+        else:
+            self.constraint_index = None
+        return self.constraint_index
+
+    def _indexed_ids(self) -> List[str]:
+        """Identifiants du catalogue couverts par les index de pré-filtrage"""
+        index = self.constraint_index if self.constraint_index is not None else self.coverage_index
+        return index.ids if index is not None else []
+
+    def _excluded_services(
+        self,
+        filters: Optional[List[Optional[Dict[str, Any]]]],
+        coverage: List[Optional[Dict[str, float]]]
+    ) -> List[Optional[set]]:
+        """
+        Services écartés avant la recherche pour chaque requête
+
+        - zone de couverture hors de portée de la localisation (settings.location_filter="filter")
+        - exigences chiffrées impossibles à satisfaire (filters[i]["constraints"])
+        """
+        excluded = []
+        for query_filters, match in zip(filters or [None] * len(coverage), coverage):
+            skip = set()
+            if match is not None and settings.location_filter == "filter":
+                skip |= self.coverage_index.covered_ids - match.keys()
+            constraints = (query_filters or {}).get("constraints")
+            if constraints and self.constraint_index is not None and settings.constraint_filter:
+                skip |= self.constraint_index.infeasible(constraints)
+            excluded.append(skip or None)
+        return excluded
+
+    def _coverage_matches(self, filters: Optional[List[Optional[Dict[str, Any]]]], count: int) -> List[Optional[Dict[str, float]]]:
+        """
+        Services couvrant la localisation de chaque requête (filters[i]["location"])
+
+        En mode "filter", si aucune zone n'est à moins de settings.location_radius_km,
+        les services de la zone la plus proche sont retenus (les services localisés ne
+        sont jamais tous écartés). En mode "boost", seuls les services réellement
+        proches sont favorisés.
+
+        Returns:
+            Par requête : {service_id: distance_km} ou None (pas de localisation,
+            lieu inconnu du gazetteer ou index de couverture absent)
+        """
+        if self.coverage_index is None or settings.location_filter == "off" or not filters:
+            return [None] * count
+        resolved: Dict[Any, Optional[Dict[str, float]]] = {}
+        matches = []
+        for query_filters in filters:
+            location = (query_filters or {}).get("location")
+            if location not in resolved:
+                place = self.gazetteer.lookup(location)
+                resolved[location] = self.coverage_index.match(
+                    place,
+                    settings.location_radius_km,
+                    nearest=settings.location_filter == "filter"
+                ) if place else None
+            matches.append(resolved[location])
+        return matches
+
+    def _vector_search(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int,
+        filters: Optional[List[Optional[Dict[str, Any]]]] = None,
+        excluded: Optional[List[Optional[set]]] = None
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Recherche vectorielle au format des résultats de collection.query()
+
+        Avec l'index compressé ou les shards par catégorie, les distances viennent de
+        l'index et documents / métadonnées sont lus par un seul get() pour tout le lot.
+        Les shards sont routés par le domaine de la sous-intention (filters[i]["domain"]).
+
+        excluded[i] liste les services écartés pour la requête i (couverture, faisabilité) :
+        ChromaDB ne parcourt que les services restants (paramètre ids), les index
+        NumPy sont interrogés avec un top_k élargi d'autant.
+        """
+        excluded = excluded or [None] * len(query_embeddings)
+        margin = max((len(e) for e in excluded if e), default=0)
+        if self.compressed_index is not None:
+            hits = self.compressed_index.search_batch(query_embeddings, top_k=top_k + margin)
+        elif self.shard_index is not None:
+            domains = [(f or {}).get("domain") for f in filters] if filters else None
+            hits = self.shard_index.search_batch(query_embeddings, top_k=top_k + margin, domains=domains)
+        elif not margin:
+            return self.collection.query(
+                query_embeddings=query_embeddings.tolist(),
+                n_results=top_k,
+                include=["metadatas", "documents", "distances"]
+            )
+        else:
+            return self._restricted_query(query_embeddings, top_k, excluded)
+
+        hits = [
+            [(service_id, distance) for service_id, distance in row if not skip or service_id not in skip][:top_k]
+            for row, skip in zip(hits, excluded)
+        ]
+        unique_ids = sorted({service_id for row in hits for service_id, _ in row})
+        fetched = self.collection.get(ids=unique_ids, include=["documents", "metadatas"]) if unique_ids else None
+        rows = {}
+        if fetched:
+            for j, service_id in enumerate(fetched["ids"]):
+                rows[service_id] = (fetched["documents"][j], fetched["metadatas"][j] if fetched["metadatas"] else {})
+        results = {"ids": [], "distances": [], "documents": [], "metadatas": []}
+        for row in hits:
+            row = [(service_id, distance) for service_id, distance in row if service_id in rows]
+            results["ids"].append([service_id for service_id, _ in row])
+            results["distances"].append([distance for _, distance in row])
+            results["documents"].append([rows[service_id][0] for service_id, _ in row])
+            results["metadatas"].append([rows[service_id][1] for service_id, _ in row])
+        return results
+
+    def _restricted_query(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int,
+        excluded: List[Optional[set]]
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Requêtes ChromaDB limitées aux services non exclus (un appel par ensemble d'exclusions)
+
+        Les exclusions peu nombreuses sont retirées côté client après une recherche de
+        top_k + len(skip) voisins ; la liste des ids autorisés (coût O(catalogue)) n'est
+        passée à ChromaDB que si skip dépasse settings.exclusion_ids_ratio du catalogue.
+        """
+        results = {key: [[] for _ in range(len(query_embeddings))] for key in ("ids", "distances", "documents", "metadatas")}
+        groups: Dict[frozenset, List[int]] = {}
+        for q, skip in enumerate(excluded):
+            groups.setdefault(frozenset(skip or ()), []).append(q)
+        catalog_size = len(self._indexed_ids()) or self.collection.count()
+        for skip, rows in groups.items():
+            allowed = None
+            n_results = top_k + len(skip)
+            if skip and len(skip) >= settings.exclusion_ids_ratio * catalog_size:
+                allowed = [service_id for service_id in self._indexed_ids() if service_id not in skip]
+                if not allowed:
                     continue
-                service = {
-                    "id": results['ids'][0][i],
-                    "score": round(score, 3),
-                    "description": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i] if results['metadatas'] else {}
+                n_results = min(top_k, len(allowed))
+            part = self.collection.query(
+                query_embeddings=query_embeddings[rows].tolist(),
+                n_results=max(1, min(n_results, catalog_size)),
+                ids=allowed,
+                include=["metadatas", "documents", "distances"]
+            )
+            for j, q in enumerate(rows):
+                if not part["ids"]:
+                    continue
+                kept = [i for i, service_id in enumerate(part["ids"][j]) if service_id not in skip][:top_k]
+                for key in results:
+                    results[key][q] = [part[key][j][i] for i in kept] if part[key] else []
+        return results
+
+    def _make_service(self, service_id: str, score: float, document: str, metadata: Optional[Dict]) -> Dict[str, Any]:
+        """
+        Construit le dictionnaire service retourné par l'agent.
+
+        Les quasi-doublons regroupés à l'ingestion sont résumés dans "variants"
+        (id, nom, version, localisation) au lieu d'être des candidats distincts.
+        """
+        service = {
+            "id": service_id,
+            "score": round(score, 3),
+            "description": document,
+            "metadata": strip_variants(metadata)
+        }
+        if metadata:
+            service["name"] = metadata.get('name', 'Unknown Service')
+        variants = parse_variants(metadata)
+        if variants:
+            service["variants"] = [
+                {
+                    "id": variant.get("id"),
+                    "name": (variant.get("metadata") or {}).get("name"),
+                    "version": (variant.get("metadata") or {}).get("version"),
+                    "location": (variant.get("metadata") or {}).get("location"),
                 }
-                if results['metadatas'] and results['metadatas'][0][i]:
-                    service["name"] = results['metadatas'][0][i].get('name', 'Unknown Service')
-                services.append(service)
-        return services
+                for variant in variants
+            ]
+        return service
+
+    def _search_batch(
+        self,
+        queries: List[str],
+        top_k: int,
+        min_score: float,
+        filters: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Recherche hybride (vectorielle + BM25) pour un lot de requêtes.
+
+        - Les requêtes sont encodées en un seul appel au modèle d'embeddings
+        - ChromaDB (ou l'index compressé) et l'index BM25 sont interrogés une fois pour tout le lot
+        - Les deux classements sont fusionnés par RRF (Reciprocal Rank Fusion)
+
+        Le champ "score" reste la similarité vectorielle 1/(1+distance), y compris pour
+        les candidats trouvés uniquement par BM25. min_score s'applique à ce score pour
+        tous les candidats ; avec settings.lexical_min_score > 0, un candidat dont le
+        score BM25 atteint ce seuil est gardé même sous min_score (correspondance forte).
+
+        filters[i] porte les indications de la sous-intention de la requête i (domaine,
+        localisation, exigences chiffrées). Selon settings.location_filter, les services
+        dont la zone de couverture ne dessert pas la localisation sont exclus avant la
+        recherche ("filter") ou les services qui la desservent sont favorisés ("boost") ;
+        les services dont les intervalles numériques ne peuvent satisfaire les exigences
+        sont exclus. Un service dont la couverture ou l'attribut est inconnu n'est
+        jamais exclu.
+
+        Les latences par composant sont disponibles dans self.last_timings (par thread ;
+        avec settings.retrieval_batching, select_services les reprend du dispatcher).
+        """
+        timings = {}
+        # Index lu une fois : un rechargement concurrent ne change pas l'index en cours de recherche
+        lexical_index = self.lexical_index
+        start = time.perf_counter()
+        coverage = self._coverage_matches(filters, len(queries))
+        excluded = self._excluded_services(filters, coverage)
+        boost = settings.location_filter == "boost"
+        if any(match is not None for match in coverage) or any(excluded):
+            timings["prefilter_ms"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        query_embeddings = np.asarray(self.embedding_function(queries), dtype=np.float32)
+        results = self._vector_search(query_embeddings, top_k, filters, excluded)
+        timings["vector_ms"] = (time.perf_counter() - start) * 1000
+
+        # Résultats vectoriels indexés par id, pour chaque requête
+        vector_hits = []
+        for q in range(len(queries)):
+            hits = {}
+            if results and results['ids'] and q < len(results['ids']):
+                for i, service_id in enumerate(results['ids'][q]):
+                    hits[service_id] = (
+                        results['distances'][q][i],
+                        results['documents'][q][i],
+                        results['metadatas'][q][i] if results['metadatas'] else {}
+                    )
+            vector_hits.append(hits)
+
+        if lexical_index is None:
+            self.last_timings = timings
+            candidates_per_query = []
+            for hits, match in zip(vector_hits, coverage):
+                candidates = []
+                for service_id, (distance, document, metadata) in hits.items():
+                    score = distance_to_score(distance)
+                    if score < min_score:
+                        continue
+                    service = self._make_service(service_id, score, document, metadata)
+                    if match and service_id in match:
+                        service["coverage_km"] = match[service_id]
+                    candidates.append(service)
+                if boost and match:
+                    # Le bonus ne change que l'ordre : "score" reste la similarité vectorielle
+                    candidates.sort(key=lambda service: -(
+                        service["score"] + (settings.location_boost if service["id"] in match else 0.0)
+                    ))
+                candidates_per_query.append(candidates)
+            return candidates_per_query
+
+        start = time.perf_counter()
+        margin = max((len(e) for e in excluded if e), default=0)
+        lexical_results = [
+            [(service_id, score) for service_id, score in lexical if not skip or service_id not in skip][:top_k]
+            for lexical, skip in zip(lexical_index.search_batch(queries, top_k=top_k + margin), excluded)
+        ]
+        timings["lexical_ms"] = (time.perf_counter() - start) * 1000
+
+        # En mode "boost", les services couvrant la localisation forment un troisième
+        # classement fusionné par RRF (limité aux candidats vectoriels / lexicaux)
+        start = time.perf_counter()
+        fused_rankings = []
+        for hits, lexical, match in zip(vector_hits, lexical_results, coverage):
+            rankings = [list(hits.keys()), [service_id for service_id, _ in lexical]]
+            if boost and match:
+                found = set(rankings[0]) | set(rankings[1])
+                rankings.append([service_id for service_id in sorted(match, key=match.get) if service_id in found])
+            fused_rankings.append(reciprocal_rank_fusion(rankings, k=settings.rrf_k)[:top_k])
+
+        # Candidats trouvés uniquement par BM25 : un seul get() pour tout le lot,
+        # puis distance calculée localement avec les embeddings des requêtes
+        missing = sorted({
+            service_id
+            for ranking, hits in zip(fused_rankings, vector_hits)
+            for service_id, _ in ranking
+            if service_id not in hits
+        })
+        extra = {}
+        if missing:
+            fetched = self.collection.get(ids=missing, include=["documents", "metadatas", "embeddings"])
+            if len(fetched['ids']) > 0:
+                space = collection_space(self.collection)
+                distances = compute_distances(query_embeddings, np.asarray(fetched['embeddings']), space)
+                for j, service_id in enumerate(fetched['ids']):
+                    metadata = fetched['metadatas'][j] if fetched['metadatas'] else {}
+                    extra[service_id] = (fetched['documents'][j], metadata, distances[:, j])
+
+        candidates_per_query = []
+        for q, (ranking, hits, lexical, match) in enumerate(zip(fused_rankings, vector_hits, lexical_results, coverage)):
+            lexical_scores = dict(lexical)
+            candidates = []
+            for service_id, rrf_score in ranking:
+                if service_id in hits:
+                    distance, document, metadata = hits[service_id]
+                elif service_id in extra:
+                    document, metadata, distances = extra[service_id]
+                    distance = float(distances[q])
+                else:
+                    continue  # index lexical en avance sur la collection
+                score = distance_to_score(distance)
+                if score < min_score and not (
+                    settings.lexical_min_score > 0
+                    and lexical_scores.get(service_id, 0.0) >= settings.lexical_min_score
+                ):
+                    continue
+                service = self._make_service(service_id, score, document, metadata)
+                service["rrf_score"] = round(rrf_score, 5)
+                if match and service_id in match:
+                    service["coverage_km"] = match[service_id]
+                candidates.append(service)
+            candidates_per_query.append(candidates)
+        timings["fusion_ms"] = (time.perf_counter() - start) * 1000
+
+        self.last_timings = timings
+        return candidates_per_query
+
+    def _retrieve_batch(
+        self,
+        queries: List[str],
+        top_k: int,
+        min_score: float,
+        filters: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Recherche pour un lot de requêtes, servie depuis le cache quand c'est possible.
+
+        La version du catalogue est relue une fois par lot : si une ingestion l'a changée,
+        le cache est vidé et l'index lexical rechargé avant toute recherche. Seules les
+        requêtes absentes du cache sont envoyées à _search_batch, en un seul lot.
+        """
+        version = self._sync_catalog_version()
+        if self.cache is None:
+            return self._search_batch(queries, top_k=top_k, min_score=min_score, filters=filters)
+
+        filters = filters or [None] * len(queries)
+        results: List[Optional[List[Dict[str, Any]]]] = [
+            self.cache.get(version, query, top_k, min_score, query_filters)
+            for query, query_filters in zip(queries, filters)
+        ]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if not misses:
+            self.last_timings = {}
+            return results
+
+        computed = self._search_batch(
+            [queries[i] for i in misses],
+            top_k=top_k,
+            min_score=min_score,
+            filters=[filters[i] for i in misses]
+        )
+        for i, candidates in zip(misses, computed):
+            self.cache.put(version, queries[i], top_k, min_score, candidates, filters[i])
+            results[i] = candidates
+        return results
+
+    @property
+    def last_timings(self) -> Dict[str, float]:
+        """Latences par composant (ms) de la dernière recherche faite par le thread courant"""
+        return getattr(self._local, "timings", {})
+
+    @last_timings.setter
+    def last_timings(self, timings: Dict[str, float]):
+        self._local.timings = timings
+
+    # ========================================================================
+    # VERSION DU CATALOGUE
+    # ========================================================================
+
+    @property
+    def catalog_version(self) -> int:
+        """Version du catalogue (compteur incrémenté à chaque ingestion)"""
+        return int((self.collection.metadata or {}).get(CATALOG_VERSION_KEY, 0))
+
+    def _sync_catalog_version(self) -> int:
+        """
+        Relit la collection pour observer la version publiée par la dernière ingestion.
+
+        L'alias de la collection est suivi (ré-indexation bleu/vert). Un changement de
+        version vide le cache et recharge les index dérivés (lexical, compressé,
+        shards, couverture, contraintes).
+        """
+        with self._sync_lock:
+            if not self.follow_collection_alias():
+                try:
+                    self.collection = self._open_collection(self.physical_collection)
+                except Exception:
+                    pass  # collection supprimée entre-temps : on garde la précédente
+            version = self.catalog_version
+            if self.cache is not None:
+                self.cache.set_version(version)
+            if version != self._indexes_version:
+                self._indexes_version = version
+                print(f"    Catalogue mis à jour (version {version}): cache invalidé")
+                if settings.hybrid_search:
+                    self.reload_lexical_index()
+                if settings.vector_backend == "compressed":
+                    self.reload_compressed_index()
+                if settings.category_sharding:
+                    self.reload_shard_index()
+                if settings.location_filter != "off":
+                    self.reload_coverage_index()
+                if settings.constraint_filter:
+                    self.reload_constraint_index()
+            return version
+
+    def bump_catalog_version(self, minimum: int = 0) -> int:
+        """
+        Incrémente la version du catalogue dans les métadonnées de la collection.
+
+        Appelé par scripts/ingest_catalog.py après chaque ingestion : les agents
+        (tous processus confondus) abandonnent alors leurs résultats en cache.
+
+        Args:
+            minimum: Version minimale à atteindre (ex: version d'un instantané importé)
+        """
+        # Les paramètres hnsw:* ne peuvent pas être modifiés après création
+        metadata = {k: v for k, v in (self.collection.metadata or {}).items() if not k.startswith("hnsw:")}
+        metadata[CATALOG_VERSION_KEY] = max(int(metadata.get(CATALOG_VERSION_KEY, 0)) + 1, minimum)
+        self.collection.modify(metadata=metadata)
+        return metadata[CATALOG_VERSION_KEY]
+
+    def _query_chromadb(self, query: str, top_k: int, min_score: float) -> List[Dict[str, Any]]:
+        """Exécute une recherche (hybride si disponible) pour une seule requête."""
+        return self._retrieve_batch([query], top_k=top_k, min_score=min_score)[0]
 
     def _sub_intent_to_query(self, sub_intent, intent: Intent) -> str:
         """
@@ -135,6 +1039,72 @@ class ServiceSelectorAgent:
                     parts.append(f"low latency {value}")
         return " ".join(parts)
 
+    def _query_filters(self, sub_intent, intent: Intent) -> Dict[str, Any]:
+        """
+        Indications de la sous-intention transmises à la recherche
+
+        - domain : routage des shards par catégorie
+        - location : localisation de la sous-intention, sinon celle de l'intention
+          (filtre / bonus de couverture géographique)
+        - constraints : exigences chiffrées normalisées (QoS globale puis exigences de
+          la sous-intention), ex: {"cpu": 8.0, "latency_ms": 5.0}
+        """
+        return {
+            "domain": sub_intent.domain,
+            "location": sub_intent.requirements.get("location") or intent.location,
+            "constraints": parse_requirements(intent.qos, sub_intent.requirements)
+        }
+
+    def _assign_candidates(
+        self,
+        candidates_per_query: List[List[Dict[str, Any]]],
+        top_k: int
+    ) -> tuple:
+        """
+        Affecte au plus un candidat distinct à chaque sous-intention en maximisant le score total.
+
+        La matrice sous-intentions x candidats est construite sur les top_k premiers candidats
+        de chaque sous-intention. Si une sous-intention qui a des candidats reste sans
+        affectation (matrice infaisable), la fenêtre est doublée sur le pool déjà récupéré,
+        sans nouvelle requête, jusqu'à épuisement du pool.
+
+        Returns:
+            (selected, window): candidat retenu par sous-intention (ou None) et taille
+            de la fenêtre de candidats finalement utilisée
+        """
+        pool = max((len(candidates) for candidates in candidates_per_query), default=0)
+        window = min(top_k, pool)
+        while True:
+            columns: Dict[str, int] = {}
+            for candidates in candidates_per_query:
+                for candidate in candidates[:window]:
+                    columns.setdefault(candidate["id"], len(columns))
+
+            # Score RRF en recherche hybride, similarité vectorielle sinon
+            scores = np.full((len(candidates_per_query), len(columns)), -np.inf)
+            for row, candidates in enumerate(candidates_per_query):
+                for candidate in candidates[:window]:
+                    scores[row, columns[candidate["id"]]] = candidate.get("rrf_score", candidate["score"])
+
+            row_to_col = solve_assignment(scores)
+            infeasible = any(
+                col < 0 and candidates
+                for col, candidates in zip(row_to_col, candidates_per_query)
+            )
+            if not infeasible or window >= pool:
+                break
+            window = min(window * 2, pool)
+
+        column_ids = list(columns)
+        selected = []
+        for col, candidates in zip(row_to_col, candidates_per_query):
+            if col < 0:
+                selected.append(None)
+                continue
+            service_id = column_ids[col]
+            selected.append(next(c for c in candidates[:window] if c["id"] == service_id))
+        return selected, window
+
     def select_services(
         self,
         intent: Intent,
@@ -145,13 +1115,17 @@ class ServiceSelectorAgent:
         Sélectionne le meilleur service pour chaque sous-intention.
 
         Logique :
-        - Récupère top_k candidats par sous-intention (pour avoir des alternatives)
-        - Retourne 1 service par sous-intention (le meilleur non-doublon)
+        - Récupère en une requête un pool de top_k * selection_pool_factor candidats
+          par sous-intention
+        - Résout l'affectation sous-intentions x candidats qui maximise le score total,
+          chaque service n'étant affecté qu'à une seule sous-intention
+        - Élargit la fenêtre de candidats au-delà de top_k uniquement si l'affectation
+          est infaisable (sans ré-interroger ChromaDB)
         - Inclut les candidats alternatifs dans 'alternatives' pour Agent 4 (validateur)
 
         Args:
             intent: Intention structurée avec sous-intentions
-            top_k: Taille du pool de candidats par sous-intention (défaut: 3)
+            top_k: Fenêtre initiale de candidats par sous-intention (défaut: 3)
                    → 3 est optimal : fallback en cas de doublon, sans surcharger
             min_score: Score de similarité minimum (0-1)
 
@@ -178,24 +1152,36 @@ class ServiceSelectorAgent:
             return []
 
         services = []
-        seen_ids = set()  # éviter les doublons entre sous-intentions
 
+        # Une seule recherche (vectorielle + lexicale) pour toutes les sous-intentions
+        queries, filters = [], []
         for sub_intent in intent.sub_intents:
             query = self._sub_intent_to_query(sub_intent, intent)
             print(f"    [{sub_intent.domain}] Requête: {query[:120]}...")
+            queries.append(query)
+            filters.append(self._query_filters(sub_intent, intent))
+        pool_k = top_k * max(1, settings.selection_pool_factor)
+        if self.dispatcher:
+            # Recherche faite sur le thread du dispatcher : ses latences reviennent avec le lot
+            candidates_per_query = self.dispatcher.submit(queries, top_k=pool_k, min_score=min_score, filters=filters)
+            self.last_timings = self.dispatcher.last_timings
+        else:
+            candidates_per_query = self._retrieve_batch(queries, top_k=pool_k, min_score=min_score, filters=filters) if queries else []
+        if self.last_timings:
+            print("    Latence: " + " | ".join(f"{name[:-3]} {ms:.1f} ms" for name, ms in self.last_timings.items()))
 
-            candidates = self._query_chromadb(query, top_k=top_k, min_score=min_score)
+        # Affectation optimale (un service distinct par sous-intention)
+        assignment, window = self._assign_candidates(candidates_per_query, top_k)
+        if window > top_k:
+            print(f"    Affectation infaisable avec top_k={top_k}: fenêtre élargie à {window} candidats")
+        assigned_ids = {candidate["id"] for candidate in assignment if candidate}
 
-            # Sélectionner le meilleur candidat non déjà assigné à une autre sous-intention
-            selected = None
-            alternatives = []
-            for candidate in candidates:
-                if candidate["id"] not in seen_ids:
-                    if selected is None:
-                        selected = candidate
-                        seen_ids.add(candidate["id"])
-                    else:
-                        alternatives.append(candidate)  # garder pour Agent 4
+        for sub_intent, candidates, selected in zip(intent.sub_intents, candidates_per_query, assignment):
+            # Candidats non affectés de la fenêtre : remplacements possibles pour Agent 4
+            alternatives = [
+                candidate for candidate in candidates[:window]
+                if candidate["id"] not in assigned_ids
+            ]
 
             if selected:
                 selected["domain"] = sub_intent.domain
@@ -227,11 +1213,87 @@ class ServiceSelectorAgent:
         """Retourne des statistiques sur la collection de services"""
         return {
             "name": self.collection_name,
+            "collection": self.physical_collection,
             "count": self.collection.count(),
             "embedding_model": self.embedding_model_name,
-            "persist_directory": self.persist_directory
+            "embedding_backend": self.embedding_backend,
+            "persist_directory": self.persist_directory,
+            "lexical_index": len(self.lexical_index) if self.lexical_index is not None else None,
+            "catalog_version": self.catalog_version,
+            "hnsw": collection_hnsw_params(self.collection),
+            "compressed_index": self.compressed_index.memory_report() if self.compressed_index else None,
+            "shards": self.shard_index.stats() if self.shard_index else None,
+            "coverage": self.coverage_index.stats() if self.coverage_index else None,
+            "constraints": self.constraint_index.stats() if self.constraint_index else None,
+            "cache": self.cache.stats() if self.cache else None,
+            "batching": self.dispatcher.stats() if self.dispatcher else None,
+            "memory_bytes": self.memory_footprint(),
+            "hnsw_memory_bytes": self.hnsw_footprint()
         }
 
+    def memory_footprint(self) -> int:
+        """
+        Estimation de la mémoire résidente des index chargés par l'agent (octets)
+
+        Somme des index dérivés (BM25, couverture, contraintes, index compressé,
+        centroïdes des shards). L'index HNSW n'en fait pas partie : il est chargé par le
+        client ChromaDB, qui le garde après la libération de l'agent (voir hnsw_footprint).
+        """
+        total = 0
+        if self.lexical_index is not None:
+            total += sum(a.nbytes for a in (
+                self.lexical_index.offsets,
+                self.lexical_index.postings_doc,
+                self.lexical_index.postings_weight,
+                self.lexical_index.postings_tf,
+                self.lexical_index.doc_lengths
+            ) if a is not None)
+        if self.coverage_index is not None:
+            total += self.coverage_index.bboxes.nbytes + self.coverage_index.points.nbytes + self.coverage_index.tree.nbytes
+        if self.constraint_index is not None:
+            total += sum(a.nbytes for column in self.constraint_index.columns.values() for a in column.values())
+        if self.compressed_index is not None:
+            total += self.compressed_index.memory_report()["resident_total_bytes"]
+        elif self.shard_index is not None:
+            total += self.shard_index.centroids.nbytes
+        return int(total)
+
+    def hnsw_footprint(self) -> int:
+        """
+        Estimation de l'index HNSW de la collection dans le client ChromaDB (octets)
+
+        Vecteurs float32 + liens du graphe. Indicatif : cette mémoire appartient au
+        client ChromaDB (partagé entre tenants) et n'est pas libérée avec l'agent.
+        """
+        count = self.collection.count()
+        if not count:
+            return 0
+        dim = len(self.collection.get(limit=1, include=["embeddings"])["embeddings"][0])
+        m = int(collection_hnsw_params(self.collection)["hnsw:M"])
+        return int(count * (dim * 4 + m * 2 * 4))
+
+    def close(self):
+        """
+        Arrête le thread du dispatcher (les requêtes en file sont servies)
+
+        Les index restent attachés à l'agent : ils sont libérés quand les dernières
+        requêtes en cours ne le référencent plus.
+        """
+        dispatcher, self.dispatcher = self.dispatcher, None
+        if dispatcher:
+            dispatcher.close()
+
+
+def get_shared_selector(tenant: Optional[str] = None) -> ServiceSelectorAgent:
+    """
+    Retourne l'agent de sélection partagé du processus pour un tenant
+
+    Les agents sont gérés par le pool de tenants (modèle d'embeddings chargé une
+    fois, index résidents limités par une LRU, voir agents/selector_pool.py).
+    """
+    from agents.selector_pool import get_selector_pool
+    return get_selector_pool().get(tenant)
+
 
 # Fonction utilitaire pour tests
 def test_agent():
@@ -19,7 +19,7 @@ class ServiceValidatorAgent:
 
     def __init__(self):
         """Initialise l'agent avec le client MCP"""
-        self.mcp_client = MCPClient(mode="local")
+        self.mcp_client = MCPClient()
 
     def validate(self, service_order: ServiceOrder) -> Tuple[bool, List[str]]:
         """
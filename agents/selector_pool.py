@@ -0,0 +1,277 @@
+"""
+Pool d'agents de sélection par tenant (catalogues multi-tenants)
+
+Rôle: Servir les catalogues de plusieurs tenants OpenSlice depuis un même processus.
+      Chaque tenant a sa collection ChromaDB (tenant_collection_name) et ses index
+      dérivés ; les agents correspondants sont chargés à la demande et gardés en
+      mémoire dans une LRU bornée (nombre d'agents et budget mémoire).
+
+- Seuls les tenants déjà ingérés sont servis : un tenant inconnu est une erreur, le
+  pool ne crée jamais de collection (scripts/ingest_catalog.py --tenant)
+- Le budget mémoire porte sur les index dérivés chargés par les agents ; l'index HNSW
+  d'une collection est chargé par le client ChromaDB partagé, qui le garde après
+  l'éviction du tenant (mémoire indicative, "hnsw_memory_bytes")
+
+- Le modèle d'embeddings et le client ChromaDB sont partagés par tous les tenants
+- Les tenants "chauds" (settings.tenant_warmup) sont préchargés et jamais évincés
+- Un tenant demandé par plusieurs requêtes simultanées n'est chargé qu'une fois
+- Métriques par tenant : hits / misses, chargements, évictions, temps de chargement
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, Optional
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from agents.agent2_selector import ServiceSelectorAgent, tenant_collection_name
+from config import settings
+from retrieval import Histogram, get_embedding_function
+
+
+class _TenantMetrics:
+    """Compteurs et histogramme de temps de chargement d'un tenant"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_ms = Histogram([10, 50, 100, 250, 500, 1000, 2500, 5000, 10000])
+
+
+class SelectorPool:
+    """
+    LRU d'agents de sélection résidents, un par tenant
+
+    Utilisation:
+        pool = SelectorPool(max_resident=8, memory_budget_mb=2048)
+        pool.warm(["tenant-a"], pin=True)
+        agent = pool.get("tenant-b")
+        pool.stats()
+    """
+
+    def __init__(
+        self,
+        max_resident: int = 8,
+        memory_budget_mb: float = 0,
+        persist_directory: Optional[str] = None
+    ):
+        """
+        Args:
+            max_resident: Nombre maximal d'agents résidents
+            memory_budget_mb: Budget mémoire des index dérivés résidents, hors HNSW (0 = illimité)
+            persist_directory: Répertoire ChromaDB (défaut: settings.chroma_persist_dir)
+        """
+        self.max_resident = max(1, max_resident)
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.persist_directory = persist_directory or settings.chroma_persist_dir
+
+        self._resident: "OrderedDict[str, ServiceSelectorAgent]" = OrderedDict()
+        self._footprint: Dict[str, int] = {}
+        self._hnsw_footprint: Dict[str, int] = {}
+        self._loading: Dict[str, Future] = {}
+        self._pinned: set = set()
+        self._metrics: Dict[str, _TenantMetrics] = {}
+        self._lock = threading.Lock()
+
+        self._embedding_function = None
+        self._client = None
+        self._shared_lock = threading.Lock()
+
+    @staticmethod
+    def _key(tenant: Optional[str]) -> str:
+        return tenant or ""
+
+    def _shared_resources(self):
+        """Modèle d'embeddings et client ChromaDB communs à tous les tenants"""
+        with self._shared_lock:
+            if self._embedding_function is None:
+                print(f"Chargement du modèle d'embeddings: {settings.embedding_model} (backend: {settings.embedding_backend})")
+                self._embedding_function = get_embedding_function()
+                self._client = chromadb.PersistentClient(
+                    path=self.persist_directory,
+                    settings=ChromaSettings(anonymized_telemetry=False)
+                )
+            return self._embedding_function, self._client
+
+    def _load(self, tenant: str) -> ServiceSelectorAgent:
+        embedding_function, client = self._shared_resources()
+        return ServiceSelectorAgent(
+            persist_directory=self.persist_directory,
+            collection_name=tenant_collection_name(tenant),
+            embedding_function=embedding_function,
+            client=client,
+            create_if_missing=False
+        )
+
+    # ========================================================================
+    # ACCÈS
+    # ========================================================================
+
+    def get(self, tenant: Optional[str] = None) -> ServiceSelectorAgent:
+        """
+        Retourne l'agent du tenant, chargé à la demande
+
+        Args:
+            tenant: Identifiant du tenant (None = catalogue par défaut)
+
+        Raises:
+            ValueError: Tenant invalide ou dont le catalogue n'a pas été ingéré
+        """
+        key = self._key(tenant)
+        with self._lock:
+            metrics = self._metrics.setdefault(key, _TenantMetrics())
+            agent = self._resident.get(key)
+            if agent is not None:
+                self._resident.move_to_end(key)
+                metrics.hits += 1
+                return agent
+            metrics.misses += 1
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[key] = future
+        if not owner:
+            return future.result()  # chargement en cours par un autre appelant
+
+        start = time.perf_counter()
+        try:
+            agent = self._load(key)
+            footprint = agent.memory_footprint()
+            hnsw_footprint = agent.hnsw_footprint()
+        except Exception as e:
+            with self._lock:
+                self._loading.pop(key, None)
+                if not metrics.loads:
+                    self._metrics.pop(key, None)  # tenant jamais chargé (nom inconnu) : pas de métriques
+            future.set_exception(e)
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._resident[key] = agent
+            self._footprint[key] = footprint
+            self._hnsw_footprint[key] = hnsw_footprint
+            self._loading.pop(key, None)
+            metrics.loads += 1
+            metrics.load_ms.observe(elapsed_ms)
+            evicted = self._evict_locked(keep=key)
+        print(f" Tenant '{key or 'default'}' chargé en {elapsed_ms:.0f} ms ({footprint / (1024 * 1024):.1f} Mo "
+              f"d'index dérivés, HNSW ~{hnsw_footprint / (1024 * 1024):.1f} Mo hors budget)")
+        for evicted_key, evicted_agent in evicted:
+            print(f" Tenant '{evicted_key or 'default'}' évincé de la mémoire")
+            evicted_agent.close()
+        future.set_result(agent)
+        return agent
+
+    def _evict_locked(self, keep: str) -> list:
+        """Évince les tenants les moins récemment utilisés (non épinglés) au-delà des limites"""
+        evicted = []
+
+        def over_limits() -> bool:
+            if len(self._resident) > self.max_resident:
+                return True
+            return bool(self.memory_budget_bytes) and sum(self._footprint.values()) > self.memory_budget_bytes
+
+        while over_limits():
+            victim = next((k for k in self._resident if k != keep and k not in self._pinned), None)
+            if victim is None:
+                break  # seuls des tenants épinglés (ou le tenant demandé) restent
+            evicted.append((victim, self._resident.pop(victim)))
+            self._footprint.pop(victim, None)
+            self._hnsw_footprint.pop(victim, None)
+            self._metrics[victim].evictions += 1
+        return evicted
+
+    def warm(self, tenants: Iterable[Optional[str]], pin: bool = True):
+        """
+        Précharge des tenants (indications de préchauffage)
+
+        Args:
+            tenants: Tenants à charger
+            pin: Garder ces tenants résidents (jamais évincés)
+        """
+        for tenant in tenants:
+            key = self._key(tenant)
+            if pin:
+                with self._lock:
+                    self._pinned.add(key)
+            try:
+                self.get(key)
+            except Exception as e:
+                print(f"  Préchauffage du tenant '{key or 'default'}' impossible: {e}")
+
+    def evict(self, tenant: Optional[str] = None) -> bool:
+        """Décharge un tenant (même épinglé) ; retourne False s'il n'était pas résident"""
+        key = self._key(tenant)
+        with self._lock:
+            agent = self._resident.pop(key, None)
+            self._footprint.pop(key, None)
+            self._hnsw_footprint.pop(key, None)
+            self._pinned.discard(key)
+            if agent is not None:
+                self._metrics[key].evictions += 1
+        if agent is None:
+            return False
+        agent.close()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Tenants résidents, mémoire estimée et métriques par tenant"""
+        with self._lock:
+            tenants = {}
+            for key, metrics in self._metrics.items():
+                requests = metrics.hits + metrics.misses
+                tenants[key or "default"] = {
+                    "resident": key in self._resident,
+                    "pinned": key in self._pinned,
+                    "memory_bytes": self._footprint.get(key),
+                    "hnsw_memory_bytes": self._hnsw_footprint.get(key),
+                    "hits": metrics.hits,
+                    "misses": metrics.misses,
+                    "hit_rate": round(metrics.hits / requests, 3) if requests else 0.0,
+                    "loads": metrics.loads,
+                    "evictions": metrics.evictions,
+                    "load_ms": metrics.load_ms.snapshot()
+                }
+            return {
+                "resident": len(self._resident),
+                "max_resident": self.max_resident,
+                "memory_bytes": sum(self._footprint.values()),
+                "memory_budget_bytes": self.memory_budget_bytes or None,
+                "tenants": tenants
+            }
+
+    def close(self):
+        """Décharge tous les tenants"""
+        with self._lock:
+            agents = list(self._resident.values())
+            self._resident.clear()
+            self._footprint.clear()
+            self._hnsw_footprint.clear()
+        for agent in agents:
+            agent.close()
+
+
+# Pool partagé du processus (créé au premier appel, tenants chauds préchargés)
+_pool: Optional[SelectorPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_selector_pool() -> SelectorPool:
+    """Retourne le pool de tenants du processus"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SelectorPool(
+                max_resident=settings.tenant_max_resident,
+                memory_budget_mb=settings.tenant_memory_budget_mb
+            )
+            hot = [t.strip() for t in settings.tenant_warmup.split(",") if t.strip()]
+            if hot:
+                _pool.warm(hot, pin=True)
+        return _pool
@@ -438,6 +438,7 @@ def init_state():
         "show_rejected_message": False,  # Afficher le message après rejet
         "trigger_run": False,  # Flag pour déclencher le pipeline
         "saved_query": "",  # Sauvegarde de la requête
+        "saved_tenant": "",  # Tenant OpenSlice de la requête ("" = catalogue par défaut)
         "raw_json_outputs": {  # JSON bruts des agents
             "agent1_intent": None,
             "agent2_services": None,
@@ -531,7 +532,7 @@ def update_display(placeholders: dict):
 # Exécution du pipeline - Phase 1 (jusqu'à validation)
 # ============================================================
 
-def run_pipeline_phase1(user_query: str, placeholders: dict):
+def run_pipeline_phase1(user_query: str, placeholders: dict, tenant: str = None):
     """Exécute le pipeline jusqu'à la validation (sans soumettre)"""
     from orchestrator import create_workflow, AgentState
     
@@ -550,6 +551,7 @@ def run_pipeline_phase1(user_query: str, placeholders: dict):
         
         initial_state = AgentState(
             user_query=user_query,
+            tenant=tenant or None,
             intent=None, intent_errors=[],
             selected_services=[], selection_errors=[],
             service_order=None, translation_errors=[],
@@ -770,6 +772,13 @@ with tab_pipeline:
             disabled=st.session_state.is_running or st.session_state.awaiting_confirmation
         )
         
+        tenant = st.text_input(
+            "Tenant OpenSlice",
+            value=st.session_state.saved_tenant,
+            placeholder="Catalogue par défaut",
+            disabled=st.session_state.is_running or st.session_state.awaiting_confirmation
+        )
+        
         col_btn1, col_btn2 = st.columns(2)
         with col_btn1:
             run_btn = st.button(
@@ -782,11 +791,12 @@ with tab_pipeline:
             if run_btn and user_query.strip():
                 st.session_state.trigger_run = True
                 st.session_state.saved_query = user_query
+                st.session_state.saved_tenant = tenant.strip()
                 st.session_state.show_rejected_message = False
         with col_btn2:
             reset_btn = st.button("Reset", use_container_width=True)
             if reset_btn:
-                for k in ["agents_state", "is_running", "pipeline_result", "awaiting_confirmation", "user_decision", "final_result", "show_rejected_message", "trigger_run", "saved_query", "raw_json_outputs"]:
+                for k in ["agents_state", "is_running", "pipeline_result", "awaiting_confirmation", "user_decision", "final_result", "show_rejected_message", "trigger_run", "saved_query", "saved_tenant", "raw_json_outputs"]:
                     if k in st.session_state:
                         del st.session_state[k]
                 st.rerun()
@@ -838,7 +848,9 @@ with tab_pipeline:
             st.session_state.user_decision = None
             st.session_state.final_result = None
             
-            success = run_pipeline_phase1(st.session_state.saved_query, placeholders)
+            success = run_pipeline_phase1(
+                st.session_state.saved_query, placeholders, tenant=st.session_state.saved_tenant
+            )
             
             st.session_state.is_running = False
             
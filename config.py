@@ -22,10 +22,90 @@ class Settings(BaseSettings):
     openslice_password: str = "admin"
     openslice_client_id: str = "osapiWebClientId"
     openslice_mock_mode: bool = False  # Mode mock pour tester sans OpenSlice
+    openslice_token_refresh_margin: float = 60.0  # Secondes avant expiration où le token est renouvelé
+    openslice_token_cache: str = ""  # Cache du token partagé entre processus (fichier, vide = aucun)
+    openslice_max_connections: int = 20  # Connexions simultanées du pool HTTP partagé
+    openslice_max_keepalive: int = 10  # Connexions inactives conservées (keep-alive)
+    openslice_keepalive_expiry: float = 30.0  # Durée de vie d'une connexion inactive (secondes)
+    openslice_http2: bool = False  # HTTP/2 vers OpenSlice (nécessite httpx[http2])
+    
+    # Serveur MCP partagé par machine (scripts/mcp_server.py)
+    mcp_mode: str = "auto"  # local (serveur embarqué), remote (serveur partagé) ou auto (remote s'il tourne)
+    mcp_socket_path: str = "/tmp/ibn-mcp.sock"  # Socket Unix du serveur MCP partagé
+    mcp_max_in_flight: int = 32  # Requêtes traitées simultanément par le serveur
+    mcp_request_timeout: float = 360.0  # Délai maximal d'une requête distante (secondes)
     
     # ChromaDB Configuration
     chroma_persist_dir: str = "./data/chroma_db"
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_backend: str = "sentence-transformers"  # ou "onnx-int8" (CPU, ONNX Runtime)
+    onnx_model_dir: str = "./data/onnx/all-MiniLM-L6-v2-int8"  # Produit par scripts/export_onnx_model.py
+    embedding_num_threads: int = 0  # Threads ONNX Runtime (0 = automatique)
+    embedding_service: bool = True  # Utilise le service d'embeddings local s'il tourne
+    embedding_socket_path: str = "/tmp/ibn-embeddings.sock"  # Socket Unix du service d'embeddings
+    
+    # Recherche hybride (vectorielle + BM25, fusion RRF)
+    hybrid_search: bool = True  # Utilise l'index lexical BM25 s'il a été construit
+    rrf_k: int = 60  # Constante de la Reciprocal Rank Fusion
+    lexical_min_score: float = 0.0  # Score BM25 qui garde un candidat sous min_score (0 = min_score pour tous)
+    selection_pool_factor: int = 3  # Pool récupéré = top_k * facteur (élargi si affectation infaisable)
+    
+    # Index vectoriel compressé (très grands catalogues, remplace la recherche HNSW)
+    vector_backend: str = "chroma"  # ou "compressed" (index float16 / IVF-PQ construit à l'ingestion)
+    compressed_index_mode: str = "ivfpq"  # "float16" ou "ivfpq"
+    compressed_nlist: int = 0  # Listes IVF (0 = 4 * sqrt(nombre de services))
+    compressed_pq_m: int = 48  # Sous-espaces PQ = octets par vecteur (doit diviser la dimension)
+    compressed_nprobe: int = 8  # Listes IVF parcourues par requête
+    compressed_rerank: int = 100  # Candidats re-classés avec les distances exactes
+    
+    # Shards par catégorie (recherche limitée aux 1-2 catégories pertinentes)
+    category_sharding: bool = False  # Utilise les shards construits à l'ingestion
+    shard_routes: int = 2  # Nombre maximal de shards parcourus par sous-intention
+    
+    # Couverture géographique (gazetteer hors ligne + index des zones construit à l'ingestion)
+    location_filter: str = "off"  # "off", "boost" (services couvrant la localisation favorisés) ou "filter" (autres zones exclues)
+    location_radius_km: float = 50.0  # Distance maximale entre la localisation et une zone de couverture
+    location_boost: float = 0.1  # Bonus de classement des services couvrants (recherche vectorielle seule, hors "score")
+    gazetteer_path: str = ""  # Lieux supplémentaires (JSON) ajoutés au gazetteer intégré
+    
+    # Contraintes numériques (cpu, ram, latence... extraites à l'ingestion)
+    constraint_filter: bool = True  # Écarte avant classement les services ne pouvant satisfaire les exigences chiffrées
+    exclusion_ids_ratio: float = 0.5  # Part du catalogue exclue au-delà de laquelle la requête passe la liste des ids autorisés
+    
+    # Catalogues multi-tenants (agents de sélection résidents par tenant)
+    tenant_max_resident: int = 8  # Nombre maximal de tenants gardés en mémoire (LRU)
+    tenant_memory_budget_mb: float = 0  # Budget mémoire des index résidents (0 = illimité)
+    tenant_warmup: str = ""  # Tenants chauds préchargés et jamais évincés (séparés par des virgules)
+    
+    # Ingestion du catalogue (pagination TMF633, pipeline d'encodage borné)
+    catalog_page_size: int = 200  # ServiceSpecifications demandées par page (0 = une seule requête)
+    catalog_hydration: bool = True  # Complète les specs "allégées" de la liste via l'endpoint de détail
+    hydration_concurrency: int = 16  # Requêtes de détail simultanées par hôte
+    hydration_retries: int = 3  # Nouvelles tentatives par spec (erreurs réseau, 429, 5xx)
+    ingest_batch_size: int = 64  # Services encodés et écrits par lot
+    ingest_queue_batches: int = 4  # Lots en attente entre récupération et encodage (mémoire bornée)
+    ingest_workers: int = 1  # Threads d'encodage / écriture
+    ingest_processes: int = 0  # Processus d'encodage, un modèle par processus (0 = encodage dans le processus)
+    ingest_threads_per_process: int = 0  # Threads du modèle par processus (0 = cœurs / processus)
+    
+    # Listener des notifications du catalogue (scripts/catalog_listener.py)
+    catalog_listener_secret: str = ""  # Jeton exigé dans les notifications (vide = généré à l'abonnement au hub)
+    
+    # Quasi-doublons du catalogue (versions, clones par région) regroupés à l'ingestion
+    dedup_near_duplicates: bool = False  # Un représentant indexé par groupe, variantes en métadonnées (opt-in)
+    dedup_threshold: float = 0.97  # Similarité cosinus minimale entre quasi-doublons
+    dedup_group_by: str = "category,location,constraints"  # Métadonnées qui doivent être identiques
+    dedup_neighbors: int = 20  # Voisins relus par service modifié lors du regroupement incrémental (--sync)
+    
+    # Cache des résultats de recherche (invalidé à chaque ingestion)
+    retrieval_cache: bool = True
+    retrieval_cache_max_entries: int = 10000
+    
+    # Micro-batching des recherches entre pipelines concurrents
+    retrieval_batching: bool = False
+    retrieval_batch_window_ms: float = 2.0  # Fenêtre d'accumulation d'un lot
+    retrieval_batch_max_queries: int = 64  # Taille de lot qui déclenche l'envoi immédiat
+    retrieval_batch_timeout: float = 30.0  # Attente maximale d'un appelant (secondes, 0 = illimitée)
     
     # Application Configuration
     log_level: str = "INFO"
@@ -36,13 +36,14 @@ def print_subsection(title: str):
     print(f"{'-'*80}")
 
 
-def run_complete_pipeline(user_query: str, verbose: bool = False) -> dict:
+def run_complete_pipeline(user_query: str, verbose: bool = False, tenant: str = None) -> dict:
     """
     Exécute le pipeline COMPLET avec orchestrateur LangGraph
     
     Args:
         user_query: Requête utilisateur en langage naturel
         verbose: Afficher les détails
+        tenant: Tenant OpenSlice dont le catalogue est utilisé (None = catalogue par défaut)
         
     Returns:
         Résultats du pipeline
@@ -51,6 +52,8 @@ def run_complete_pipeline(user_query: str, verbose: bool = False) -> dict:
     
     print(f"\nRequête utilisateur:")
     print(f"   {user_query[:100]}{'...' if len(user_query) > 100 else ''}")
+    if tenant:
+        print(f"   Tenant: {tenant}")
     
     # ==========================================
     # Créer le workflow
@@ -68,6 +71,7 @@ def run_complete_pipeline(user_query: str, verbose: bool = False) -> dict:
     # ==========================================
     initial_state = AgentState(
         user_query=user_query,
+        tenant=tenant,
         intent=None,
         intent_errors=[],
         selected_services=[],
@@ -244,7 +248,7 @@ def run_complete_pipeline(user_query: str, verbose: bool = False) -> dict:
     return result
 
 
-def interactive_mode():
+def interactive_mode(tenant: str = None):
     """Mode interactif pour tester le pipeline"""
     print_section("MODE INTERACTIF - ORCHESTRATEUR LANGGRAPH")
     print("\nTapez 'quit' ou 'exit' pour quitter\n")
@@ -260,7 +264,7 @@ def interactive_mode():
             if not user_input:
                 continue
             
-            run_complete_pipeline(user_input, verbose=False)
+            run_complete_pipeline(user_input, verbose=False, tenant=tenant)
             
         except KeyboardInterrupt:
             print("\n\nAu revoir!")
@@ -354,6 +358,12 @@ def main():
         action="store_true",
         help="Exécuter les tests complets de l'application"
     )
+    parser.add_argument(
+        "--tenant",
+        type=str,
+        default=None,
+        help="Tenant OpenSlice dont le catalogue est utilisé (défaut: catalogue par défaut)"
+    )
     
     args = parser.parse_args()
     
@@ -371,15 +381,15 @@ and a virtual reality simulation engine. Each application requires 4 vCPUs and
 The clients are connected through a 5G network located in the Nice area 
 and tolerate a maximum latency of 5 ms."""
         
-        run_complete_pipeline(example_query, verbose=args.verbose)
+        run_complete_pipeline(example_query, verbose=args.verbose, tenant=args.tenant)
     
     # Mode interactif
     elif args.interactive:
-        interactive_mode()
+        interactive_mode(tenant=args.tenant)
     
     # Mode requête unique
     elif args.query:
-        run_complete_pipeline(args.query, verbose=args.verbose)
+        run_complete_pipeline(args.query, verbose=args.verbose, tenant=args.tenant)
     
     # Afficher l'aide si aucun argument
     else:
@@ -388,6 +398,7 @@ and tolerate a maximum latency of 5 ms."""
         print('   python main.py --example')
         print('   python main.py --query "I need a low-latency 5G service"')
         print('   python main.py --interactive')
+        print('   python main.py --query "I need a low-latency 5G service" --tenant operator-a')
         print('   python main.py --test')
         print('   python main.py --example --verbose')
 
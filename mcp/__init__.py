@@ -8,7 +8,12 @@ Ce module encapsule toutes les ressources et outils MCP disponibles pour les age
 Le protocole MCP assure une communication standardisée entre les agents et les services externes.
 """
 
-from .openslice_client import OpenSliceClient
+from .openslice_client import AsyncOpenSliceClient, OpenSliceClient
 from .openslice_mcp_server import OpenSliceMCPServer
+from .http_pool import shared_async_client, shared_client, transport_stats
+from .token_manager import OpenSliceAuth, TokenManager, get_token_manager
+from .remote_transport import MCPRemoteServer, RemoteMCPConnection, RemoteMCPError
 
-__all__ = ["OpenSliceClient", "OpenSliceMCPServer"]
+__all__ = ["OpenSliceClient", "AsyncOpenSliceClient", "OpenSliceMCPServer", "OpenSliceAuth", "TokenManager", "get_token_manager",
+           "shared_client", "shared_async_client", "transport_stats",
+           "MCPRemoteServer", "RemoteMCPConnection", "RemoteMCPError"]
@@ -0,0 +1,261 @@
+"""
+Transport HTTP partagé vers OpenSlice (pool de connexions du processus)
+
+Rôle : Faire partager à tous les clients OpenSlice d'un processus (OpenSliceClient,
+       TokenManager, scripts) un seul pool de connexions keep-alive, au lieu d'ouvrir
+       un pool (et de nouvelles connexions TCP / TLS) par client ou par appel.
+
+- Limites du pool réglables (OPENSLICE_MAX_CONNECTIONS, OPENSLICE_MAX_KEEPALIVE,
+  OPENSLICE_KEEPALIVE_EXPIRY), HTTP/2 optionnel (OPENSLICE_HTTP2, paquet h2)
+- Fermer un client ne ferme pas le transport partagé (fermé à la sortie du processus)
+- Clients asynchrones : un pool partagé par boucle asyncio (shared_async_client)
+- Statistiques du pool : requêtes, connexions ouvertes, taux de réutilisation
+- Nouveau pool après un fork (les connexions ne sont pas partagées entre processus)
+"""
+import asyncio
+import atexit
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config import settings
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _PoolCounters:
+    """Configuration du pool et compteurs de réutilisation communs aux transports partagés"""
+
+    def _setup(self, max_connections, max_keepalive, keepalive_expiry, http2):
+        http2 = settings.openslice_http2 if http2 is None else http2
+        if http2 and not _http2_available():
+            print("HTTP/2 demandé mais le paquet 'h2' est absent (pip install httpx[http2]) -- HTTP/1.1 utilisé")
+            http2 = False
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.openslice_max_connections,
+            max_keepalive_connections=max_keepalive or settings.openslice_max_keepalive,
+            keepalive_expiry=settings.openslice_keepalive_expiry if keepalive_expiry is None else keepalive_expiry
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def _count(self, event_name: str):
+        with self._lock:
+            if event_name == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            elif event_name is None:
+                self.requests += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Statistiques du pool
+
+        Returns:
+            Dict: requests, new_connections, reused, reuse_rate, open_connections,
+                  idle_connections, max_connections, max_keepalive, http2
+        """
+        connections = list(self._transport._pool.connections)
+        with self._lock:
+            requests, new_connections = self.requests, self.new_connections
+        reused = max(0, requests - new_connections)
+        return {
+            "requests": requests,
+            "new_connections": new_connections,
+            "reused": reused,
+            "reuse_rate": round(reused / requests, 3) if requests else 0.0,
+            "open_connections": sum(not connection.is_closed() for connection in connections),
+            "idle_connections": sum(connection.is_idle() for connection in connections),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "http2": self.http2,
+        }
+
+
+class SharedTransport(_PoolCounters, httpx.BaseTransport):
+    """
+    Transport httpx partagé, avec compteurs de réutilisation des connexions
+
+    Les nouvelles connexions sont comptées via l'extension "trace" de httpcore
+    (événement connection.connect_tcp.complete) ; une requête qui n'ouvre pas de
+    connexion a réutilisé une connexion du pool.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        retries: int = 1
+    ):
+        """
+        Args:
+            max_connections: Connexions simultanées (défaut: settings.openslice_max_connections)
+            max_keepalive: Connexions inactives conservées (défaut: settings.openslice_max_keepalive)
+            keepalive_expiry: Durée de vie d'une connexion inactive (défaut: settings.openslice_keepalive_expiry)
+            http2: Active HTTP/2 si le paquet h2 est installé (défaut: settings.openslice_http2)
+            retries: Nouvelles tentatives de connexion (erreurs de connexion uniquement)
+        """
+        self._setup(max_connections, max_keepalive, keepalive_expiry, http2)
+        self._transport = httpx.HTTPTransport(limits=self.limits, http2=self.http2, retries=retries)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        previous = request.extensions.get("trace")
+
+        def trace(event_name: str, info: Dict[str, Any]):
+            self._count(event_name)
+            if previous is not None:
+                previous(event_name, info)
+
+        request.extensions["trace"] = trace
+        self._count(None)
+        return self._transport.handle_request(request)
+
+    def close(self):
+        """Sans effet : le transport partagé survit aux clients qui l'utilisent"""
+
+    def shutdown(self):
+        """Ferme toutes les connexions du pool"""
+        self._transport.close()
+
+
+class SharedAsyncTransport(_PoolCounters, httpx.AsyncBaseTransport):
+    """
+    Équivalent asynchrone de SharedTransport (un pool par boucle asyncio)
+
+    Les connexions asynchrones appartiennent à la boucle qui les a ouvertes : chaque
+    boucle a son propre pool, partagé par tous les clients asynchrones de la boucle.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        retries: int = 1
+    ):
+        self._setup(max_connections, max_keepalive, keepalive_expiry, http2)
+        self._transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2, retries=retries)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        previous = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            self._count(event_name)
+            if previous is not None:
+                await previous(event_name, info)
+
+        request.extensions["trace"] = trace
+        self._count(None)
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        """Sans effet : le transport partagé survit aux clients qui l'utilisent"""
+
+    async def shutdown(self):
+        """Ferme toutes les connexions du pool"""
+        await self._transport.aclose()
+
+
+_shared: Optional[SharedTransport] = None
+_shared_pid: Optional[int] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport() -> SharedTransport:
+    """Transport partagé du processus (créé au premier appel, recréé après un fork)"""
+    global _shared, _shared_pid
+    with _shared_lock:
+        if _shared is None or _shared_pid != os.getpid():
+            _shared = SharedTransport()
+            _shared_pid = os.getpid()
+        return _shared
+
+
+def shared_client(timeout: float = 60.0, auth: Optional[httpx.Auth] = None, **kwargs) -> httpx.Client:
+    """
+    Client httpx branché sur le transport partagé
+
+    Le client est léger (headers, timeout, authentification) : le créer par appel ou
+    par objet ne coûte pas de connexion, et le fermer laisse le pool ouvert.
+
+    Args:
+        timeout: Timeout par défaut des requêtes (secondes)
+        auth: Authentification httpx (ex: OpenSliceAuth)
+        **kwargs: Autres arguments de httpx.Client (headers...)
+    """
+    return httpx.Client(transport=get_shared_transport(), timeout=timeout, auth=auth, **kwargs)
+
+
+# Pools asynchrones, un par boucle asyncio (libérés avec la boucle)
+_async_shared: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SharedAsyncTransport]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_async_transport() -> SharedAsyncTransport:
+    """Transport asynchrone partagé de la boucle asyncio courante"""
+    loop = asyncio.get_running_loop()
+    with _shared_lock:
+        transport = _async_shared.get(loop)
+        if transport is None:
+            transport = SharedAsyncTransport()
+            _async_shared[loop] = transport
+        return transport
+
+
+def shared_async_client(timeout: float = 60.0, auth: Optional[httpx.Auth] = None, **kwargs) -> httpx.AsyncClient:
+    """
+    Client httpx.AsyncClient branché sur le pool partagé de la boucle courante
+
+    À appeler depuis une coroutine (la boucle courante détermine le pool).
+    """
+    return httpx.AsyncClient(transport=get_shared_async_transport(), timeout=timeout, auth=auth, **kwargs)
+
+
+def transport_stats() -> Dict[str, Any]:
+    """
+    Statistiques du transport partagé (voir SharedTransport.stats)
+
+    Depuis une coroutine, les statistiques du pool asynchrone de la boucle courante
+    sont ajoutées sous la clé "async".
+    """
+    stats = get_shared_transport().stats()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return stats
+    transport = _async_shared.get(loop)
+    if transport is not None:
+        stats["async"] = transport.stats()
+    return stats
+
+
+def close_shared_transport():
+    """Ferme le pool partagé (appelé à la sortie du processus)"""
+    global _shared
+    with _shared_lock:
+        if _shared is not None and _shared_pid == os.getpid():
+            _shared.shutdown()
+        _shared = None
+
+
+async def aclose_shared_async_transport():
+    """Ferme le pool asynchrone de la boucle courante (avant l'arrêt de la boucle)"""
+    with _shared_lock:
+        transport = _async_shared.pop(asyncio.get_running_loop(), None)
+    if transport is not None:
+        await transport.shutdown()
+
+
+atexit.register(close_shared_transport)
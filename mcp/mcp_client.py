@@ -6,6 +6,13 @@ Ce client permet aux agents de :
 - Lire des ressources MCP (catalog, inventory, etc.)
 - Communiquer via le serveur MCP
 
+Modes:
+- local  : serveur MCP embarqué dans le processus (OpenSliceMCPServer)
+- remote : serveur MCP partagé par machine (scripts/mcp_server.py), JSON-RPC sur une
+           connexion persistante, appels concurrents (voir mcp/remote_transport.py)
+- auto   : remote si le serveur partagé répond (dans le même mode mock / réel), local
+           sinon (défaut: settings.mcp_mode)
+
 Utilisation:
     from mcp.mcp_client import MCPClient
     
@@ -16,12 +23,20 @@ Utilisation:
     
     # Lire une ressource
     catalog = client.read_resource("catalog://services")
+    
+    # Depuis une coroutine : appels concurrents
+    catalog, inventory = await asyncio.gather(
+        client.call_tool_async("get_service_catalog"),
+        client.call_tool_async("get_service_inventory"),
+    )
 """
 import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from config import settings
 from .openslice_mcp_server import OpenSliceMCPServer
+from .remote_transport import RemoteMCPConnection, get_remote_connection, get_server_info
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -33,23 +48,48 @@ class MCPClient:
     Client MCP pour communiquer avec le serveur MCP
     
     Mode local : Communication directe avec OpenSliceMCPServer (pas de serveur externe)
+    Mode remote : JSON-RPC vers le serveur MCP partagé (socket Unix ou sous-processus stdio)
     """
     
-    def __init__(self, mode: str = "local"):
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        socket_path: Optional[str] = None,
+        command: Optional[List[str]] = None
+    ):
         """
         Initialise le client MCP
         
         Args:
-            mode: "local" (direct) - défaut: local
+            mode: "local", "remote" ou "auto" - défaut: settings.mcp_mode
+            socket_path: Socket Unix du serveur partagé (défaut: settings.mcp_socket_path)
+            command: Serveur lancé en sous-processus et joint par stdio (mode remote),
+                     ex: [sys.executable, "scripts/mcp_server.py", "--stdio"]
         """
+        mode = mode or settings.mcp_mode
+        if mode == "auto":
+            # Le serveur partagé n'est utilisé que s'il tourne dans le même mode (mock ou réel)
+            info = None if command else get_server_info(socket_path)
+            shared = info is not None and info.get("mock_mode") == settings.openslice_mock_mode
+            mode = "remote" if command or shared else "local"
         self.mode = mode
+        self.mcp_server: Optional[OpenSliceMCPServer] = None
+        self.connection: Optional[RemoteMCPConnection] = None
         
         if mode == "local":
             # Mode local : communication directe avec le serveur MCP
             self.mcp_server = OpenSliceMCPServer()
             logger.info("   Client MCP initialisé (mode LOCAL - communication directe)")
+        elif mode == "remote":
+            # Mode remote : connexion persistante partagée par les clients du processus
+            # (un sous-processus propre à ce client en stdio)
+            if command:
+                self.connection = RemoteMCPConnection(command=command)
+            else:
+                self.connection = get_remote_connection(socket_path)
+            logger.info(f"   Client MCP initialisé (mode REMOTE - {self.connection.target})")
         else:
-            raise NotImplementedError("Mode 'remote' nécessite une implémentation HTTP")
+            raise ValueError(f"Mode MCP inconnu: '{mode}' (local, remote ou auto)")
     
     # ========================================================================
     # OUTILS MCP - Interface publique
@@ -156,6 +196,15 @@ class MCPClient:
         logger.info("   Lecture ressource MCP: inventory://services")
         return self.read_resource("inventory://services")
     
+    def read_http_pool_stats(self) -> Dict[str, Any]:
+        """
+        Ressource MCP: Statistiques du pool HTTP partagé vers OpenSlice
+        
+        Returns:
+            Dict avec requêtes, connexions ouvertes et taux de réutilisation
+        """
+        return self.read_resource("metrics://http-pool")
+    
     # ========================================================================
     # INTERFACE GÉNÉRIQUE
     # ========================================================================
@@ -174,12 +223,14 @@ class MCPClient:
         try:
             if self.mode == "local":
                 result = self.mcp_server.call_tool(tool_name, **kwargs)
-                status = result.get("status", "unknown")
-                if status == "success":
-                    logger.debug(f"   Outil '{tool_name}' : succès")
-                else:
-                    logger.warning(f"   Outil '{tool_name}' : {result.get('message', 'erreur inconnue')}")
-                return result
+            else:
+                result = self.connection.request("tools/call", {"name": tool_name, "arguments": kwargs})
+            status = result.get("status", "unknown")
+            if status == "success":
+                logger.debug(f"   Outil '{tool_name}' : succès")
+            else:
+                logger.warning(f"   Outil '{tool_name}' : {result.get('message', 'erreur inconnue')}")
+            return result
         except Exception as e:
             logger.error(f"   Erreur lors de l'appel de '{tool_name}': {e}")
             return {
@@ -200,11 +251,68 @@ class MCPClient:
         try:
             if self.mode == "local":
                 result = self.mcp_server.get_resource(resource_uri)
-                if "error" not in result:
-                    logger.debug(f"   Ressource '{resource_uri}' : succès")
-                else:
-                    logger.warning(f"   Ressource '{resource_uri}' : {result.get('error', 'erreur inconnue')}")
-                return result
+            else:
+                result = self.connection.request("resources/read", {"uri": resource_uri})
+            if "error" not in result:
+                logger.debug(f"   Ressource '{resource_uri}' : succès")
+            else:
+                logger.warning(f"   Ressource '{resource_uri}' : {result.get('error', 'erreur inconnue')}")
+            return result
+        except Exception as e:
+            logger.error(f"   Erreur lors de la lecture de '{resource_uri}': {e}")
+            return {
+                "error": str(e)
+            }
+    
+    async def call_tool_async(self, tool_name: str, **kwargs) -> Dict[str, Any]:
+        """
+        Appelle un outil MCP depuis une coroutine (appels concurrents possibles)
+        
+        Args:
+            tool_name: Nom de l'outil
+            **kwargs: Arguments de l'outil
+            
+        Returns:
+            Résultat de l'outil au format Dict
+        """
+        try:
+            if self.mode == "local":
+                result = await self.mcp_server.call_tool_async(tool_name, **kwargs)
+            else:
+                result = await self.connection.arequest("tools/call", {"name": tool_name, "arguments": kwargs})
+            status = result.get("status", "unknown")
+            if status == "success":
+                logger.debug(f"   Outil '{tool_name}' : succès")
+            else:
+                logger.warning(f"   Outil '{tool_name}' : {result.get('message', 'erreur inconnue')}")
+            return result
+        except Exception as e:
+            logger.error(f"   Erreur lors de l'appel de '{tool_name}': {e}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+    
+    async def read_resource_async(self, resource_uri: str) -> Dict[str, Any]:
+        """
+        Lit une ressource MCP depuis une coroutine
+        
+        Args:
+            resource_uri: URI de la ressource (ex: "catalog://services")
+            
+        Returns:
+            Contenu de la ressource au format Dict
+        """
+        try:
+            if self.mode == "local":
+                result = await self.mcp_server.read_resource_async(resource_uri)
+            else:
+                result = await self.connection.arequest("resources/read", {"uri": resource_uri})
+            if "error" not in result:
+                logger.debug(f"   Ressource '{resource_uri}' : succès")
+            else:
+                logger.warning(f"   Ressource '{resource_uri}' : {result.get('error', 'erreur inconnue')}")
+            return result
         except Exception as e:
             logger.error(f"   Erreur lors de la lecture de '{resource_uri}': {e}")
             return {
@@ -214,18 +322,32 @@ class MCPClient:
     def get_available_tools(self) -> Dict[str, Any]:
         """Retourne la liste des outils MCP disponibles"""
         logger.info("   Récupération des outils MCP disponibles")
+        if self.mode == "remote":
+            return self.connection.request("tools/list")
         return self.mcp_server.get_tools_info()
     
     def get_available_resources(self) -> Dict[str, str]:
         """Retourne la liste des ressources MCP disponibles"""
         logger.info("   Récupération des ressources MCP disponibles")
+        if self.mode == "remote":
+            return self.connection.request("resources/list")
         return self.mcp_server.get_resources_info()
     
     def close(self):
-        """Ferme la connexion MCP"""
+        """Ferme la connexion MCP (la connexion partagée vers le socket reste ouverte)"""
         if self.mode == "local":
             self.mcp_server.close()
+        elif self.connection.command:
+            self.connection.close()
+        logger.info("   Client MCP fermé")
+    
+    async def aclose(self):
+        """Ferme la connexion MCP depuis une coroutine (client asynchrone compris)"""
+        if self.mode == "local":
+            await self.mcp_server.aclose()
             logger.info("   Client MCP fermé")
+        else:
+            self.close()
 
 
 # ============================================================================
@@ -2,14 +2,243 @@
 Client HTTP pour OpenSlice
 
 Role : Encapsule les appels HTTP vers l'API REST OpenSlice (TMF633, TMF641, TMF638)
-       et l'authentification Keycloak.
+       et l'authentification Keycloak (token partage par le processus, renouvele
+       avant expiration et sur 401 : voir token_manager.py). Les connexions passent
+       par le pool HTTP partage du processus (http_pool.py).
 """
+import asyncio
 import os
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Iterable, Iterator, List
+from urllib.parse import urlsplit
 from datetime import datetime
 import httpx
 from config import settings
+from .http_pool import shared_async_client, shared_client, transport_stats
+from .token_manager import OpenSliceAuth, get_token_manager
+
+
+# Champs TMF633 utiles a l'indexation (projection "fields" des requetes paginees)
+CATALOG_FIELDS = (
+    "id,name,description,category,version,lifecycleStatus,serviceType,"
+    "serviceSpecCharacteristic,tags,lastUpdate"
+)
+
+
+def iter_tmf_pages(
+    http_client: httpx.Client,
+    url: str,
+    headers: Dict[str, str],
+    page_size: int = 200,
+    fields: Optional[str] = None,
+    list_key: Optional[str] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Parcourt une ressource TMF page par page (parametres offset / limit / fields).
+
+    Seule la page courante est gardee en memoire. Si le serveur ignore la
+    pagination (page plus grande que limit, ou meme page renvoyee deux fois),
+    la reponse est consideree comme complete.
+
+    Args:
+        http_client: Client httpx (connexions reutilisees entre les pages)
+        url: URL de la ressource (ex: .../serviceSpecification)
+        headers: Headers HTTP (token JWT)
+        page_size: Nombre d'elements demandes par page (0 = une seule requete)
+        fields: Projection TMF ("id,name,...") pour alleger les reponses
+        list_key: Cle de la liste si la reponse est encapsulee dans un dict
+    """
+    offset = 0
+    previous_first = None
+    while True:
+        params: Dict[str, Any] = {}
+        if page_size:
+            params.update(offset=offset, limit=page_size)
+        if fields:
+            params["fields"] = fields
+        response = http_client.get(url, headers=headers, params=params)
+        response.raise_for_status()
+
+        page = response.json()
+        if isinstance(page, dict) and list_key and list_key in page:
+            page = page[list_key]
+        if not page:
+            return
+
+        first = page[0].get("id") if isinstance(page[0], dict) else None
+        if offset and first is not None and first == previous_first:
+            return  # offset ignore par le serveur : page deja recue
+        yield page
+        if not page_size or len(page) != page_size:
+            return  # derniere page, ou pagination ignoree (reponse complete)
+        previous_first = first
+        offset += len(page)
+
+
+async def aiter_tmf_pages(
+    http_client: httpx.AsyncClient,
+    url: str,
+    headers: Dict[str, str],
+    page_size: int = 200,
+    fields: Optional[str] = None,
+    list_key: Optional[str] = None
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Equivalent asynchrone de iter_tmf_pages (memes parametres, meme arret)."""
+    offset = 0
+    previous_first = None
+    while True:
+        params: Dict[str, Any] = {}
+        if page_size:
+            params.update(offset=offset, limit=page_size)
+        if fields:
+            params["fields"] = fields
+        response = await http_client.get(url, headers=headers, params=params)
+        response.raise_for_status()
+
+        page = response.json()
+        if isinstance(page, dict) and list_key and list_key in page:
+            page = page[list_key]
+        if not page:
+            return
+
+        first = page[0].get("id") if isinstance(page[0], dict) else None
+        if offset and first is not None and first == previous_first:
+            return  # offset ignore par le serveur : page deja recue
+        yield page
+        if not page_size or len(page) != page_size:
+            return  # derniere page, ou pagination ignoree (reponse complete)
+        previous_first = first
+        offset += len(page)
+
+
+# Evenements TMF633 du catalogue suivis par scripts/catalog_listener.py
+CATALOG_EVENT_TYPES = (
+    "ServiceSpecificationCreateEvent",
+    "ServiceSpecificationChangeEvent",
+    "ServiceSpecificationAttributeValueChangeEvent",
+    "ServiceSpecificationStateChangeEvent",
+    "ServiceSpecificationDeleteEvent",
+)
+
+# Catalogue renvoye en mode mock (services similaires a ceux de ingest_catalog.py --mock)
+MOCK_CATALOG = (
+    {"id": "mock-xr-service-001", "name": "XR Application Bundle", "description": "Extended Reality service bundle"},
+    {"id": "mock-video-streaming-002", "name": "4K Video Streaming Service", "description": "High-definition video streaming"},
+    {"id": "mock-iot-platform-003", "name": "IoT Platform Service", "description": "Industrial IoT platform"},
+    {"id": "mock-edge-compute-004", "name": "Edge Computing Service", "description": "Low-latency edge computing"},
+    {"id": "mock-5g-slice-005", "name": "5G Network Slice - eMBB", "description": "Enhanced Mobile Broadband 5G"},
+)
+
+
+def _mock_order(service_order: Dict[str, Any]) -> Dict[str, Any]:
+    """Ordre simule (mode mock) : ID genere, statut ACKNOWLEDGED"""
+    order_id = f"mock-order-{uuid.uuid4().hex[:8]}"
+    print(f"[MOCK] Soumission simulée de l'ordre")
+    print(f"[MOCK] Ordre créé -- ID: {order_id} | Statut: ACKNOWLEDGED")
+    return {
+        "id": order_id,
+        "state": "ACKNOWLEDGED",
+        "externalId": service_order.get("externalId", "unknown"),
+        "orderDate": datetime.now().isoformat(),
+        "serviceOrderItem": service_order.get("serviceOrderItem", []),
+        "@type": "ServiceOrder"
+    }
+
+
+# Statuts HTTP transitoires : la requete est relancee (apres Retry-After si fourni)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int, backoff: float) -> float:
+    """Delai avant la prochaine tentative : Retry-After du serveur, sinon backoff exponentiel"""
+    if response is not None:
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", "")))
+        except ValueError:
+            pass
+    return backoff * (2 ** attempt)
+
+
+async def fetch_tmf_item(
+    http_client: httpx.AsyncClient,
+    url: str,
+    retries: int = 3,
+    backoff: float = 0.5
+) -> Optional[Dict[str, Any]]:
+    """
+    Recupere une ressource TMF (GET) avec reprises sur erreurs transitoires.
+
+    Les erreurs reseau et les statuts RETRYABLE_STATUS sont relances au plus
+    `retries` fois ; une ressource absente (404) renvoie None.
+
+    Args:
+        http_client: Client httpx asynchrone (headers d'authentification inclus)
+        url: URL de la ressource
+        retries: Nombre maximal de nouvelles tentatives
+        backoff: Delai initial (s) du backoff exponentiel
+    """
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = await http_client.get(url)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code == 404:
+                return None
+            if response.status_code not in RETRYABLE_STATUS or attempt == retries:
+                response.raise_for_status()
+                return response.json()
+        await asyncio.sleep(_retry_delay(response, attempt, backoff))
+    return None
+
+
+async def hydrate_tmf_items(
+    http_client: httpx.AsyncClient,
+    base_url: str,
+    items: Iterable[Dict[str, Any]],
+    concurrency: int = 16,
+    retries: int = 3,
+    backoff: float = 0.5
+) -> List[Dict[str, Any]]:
+    """
+    Complete des elements TMF "allege" (reponse de liste) avec leur ressource detaillee.
+
+    Les details sont recuperes en parallele, au plus `concurrency` requetes en cours
+    par hote (href de l'element, sinon base_url/{id}). Les champs du detail
+    completent ceux de la liste ; un element sans id ou introuvable (404) est garde
+    tel quel. L'ordre des elements est conserve.
+
+    Args:
+        http_client: Client httpx asynchrone (connexions reutilisees, token inclus)
+        base_url: URL de la ressource (ex: .../serviceSpecification)
+        items: Elements renvoyes par la liste
+        concurrency: Requetes simultanees maximales par hote
+        retries: Nouvelles tentatives par element (voir fetch_tmf_item)
+        backoff: Delai initial (s) du backoff exponentiel
+    """
+    semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def hydrate(item: Dict[str, Any]) -> Dict[str, Any]:
+        item_id = item.get("id")
+        if not item_id:
+            return item
+        href = item.get("href") or ""
+        url = href if href.startswith(("http://", "https://")) else f"{base_url.rstrip('/')}/{item_id}"
+        host = urlsplit(url).netloc
+        semaphore = semaphores.setdefault(host, asyncio.Semaphore(max(1, concurrency)))
+        async with semaphore:
+            detail = await fetch_tmf_item(http_client, url, retries=retries, backoff=backoff)
+        return {**item, **detail} if isinstance(detail, dict) else item
+
+    tasks = [asyncio.ensure_future(hydrate(item)) for item in items]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
 
 
 class OpenSliceClient:
@@ -40,34 +269,31 @@ class OpenSliceClient:
         # Stockage des ordres simulés (mock mode)
         self._mock_orders: Dict[str, Dict[str, Any]] = {}
 
-        self.client = httpx.Client(timeout=timeout) if not self.mock_mode else None
+        # Token partagé par tous les clients du processus (renouvelé avant expiration)
+        self.tokens = None
+        self.client = None
+        if not self.mock_mode:
+            self.tokens = get_token_manager(self.auth_url, self.username, self.password, self.client_id)
+            # Client léger sur le pool de connexions partagé par le processus
+            self.client = shared_client(timeout=timeout, auth=OpenSliceAuth(self.tokens))
 
     def authenticate(self) -> str:
         """
         Obtient un token JWT aupres de Keycloak (port 8080).
         En mode mock, retourne un token simulé.
+
+        Le token est partagé par tous les clients du processus : il n'est demandé à
+        Keycloak que s'il est absent ou proche de l'expiration.
         """
         if self.mock_mode:
             self.token = "mock-jwt-token-for-testing-purposes-only"
             print("[MOCK] Authentification simulée -- Token JWT fictif généré")
             return self.token
-            
-        token_url = f"{self.auth_url}/auth/realms/openslice/protocol/openid-connect/token"
-
-        payload = {
-            "username": self.username,
-            "password": self.password,
-            "grant_type": "password",
-            "client_id": self.client_id
-        }
 
-        print(f"Authentification sur: {token_url} (client: {self.client_id})")
+        print(f"Authentification sur: {self.tokens.token_url} (client: {self.client_id})")
 
         try:
-            response = self.client.post(token_url, data=payload)
-            response.raise_for_status()
-
-            self.token = response.json()["access_token"]
+            self.token = self.tokens.get_token()
             print("Authentification reussie -- Token JWT obtenu")
             return self.token
 
@@ -79,12 +305,14 @@ class OpenSliceClient:
             print("  -> Verifiez que le container 'keycloak' est demarre")
             raise
         except KeyError:
-            print(f"Reponse inattendue: {response.json()}")
+            print("Reponse inattendue de Keycloak: 'access_token' absent")
             raise
 
     def _get_headers(self) -> Dict[str, str]:
-        """Headers HTTP avec token JWT. Authentifie automatiquement si besoin."""
-        if not self.token:
+        """Headers HTTP avec token JWT (token partagé, renouvelé si besoin)."""
+        if self.tokens is not None:
+            self.token = self.tokens.get_token()
+        elif not self.token:
             self.authenticate()
         return {
             "Authorization": f"Bearer {self.token}",
@@ -96,35 +324,45 @@ class OpenSliceClient:
         """
         Recupere toutes les ServiceSpecifications du catalogue OpenSlice (TMF633).
         En mode mock, retourne une liste vide (utiliser ChromaDB avec --mock).
+
+        Pour les grands catalogues, preferer iter_catalog() (une page en memoire).
         """
         if self.mock_mode:
             print("[MOCK] Catalogue simulé (utilisez ChromaDB avec --mock pour les services)")
-            # Retourner les services mock similaires à ceux dans ingest_catalog.py
-            return [
-                {"id": "mock-xr-service-001", "name": "XR Application Bundle", "description": "Extended Reality service bundle"},
-                {"id": "mock-video-streaming-002", "name": "4K Video Streaming Service", "description": "High-definition video streaming"},
-                {"id": "mock-iot-platform-003", "name": "IoT Platform Service", "description": "Industrial IoT platform"},
-                {"id": "mock-edge-compute-004", "name": "Edge Computing Service", "description": "Low-latency edge computing"},
-                {"id": "mock-5g-slice-005", "name": "5G Network Slice - eMBB", "description": "Enhanced Mobile Broadband 5G"},
-            ]
+            return [dict(service) for service in MOCK_CATALOG]
         
-        url = f"{self.base_url}/tmf-api/serviceCatalogManagement/v4/serviceSpecification"
-
-        print(f"Recuperation du catalogue sur: {url}")
+        print(f"Recuperation du catalogue sur: {self.base_url}")
+        services = [spec for page in self.iter_catalog_pages() for spec in page]
+        print(f"{len(services)} service(s) trouve(s) dans le catalogue")
+        return services
 
-        try:
-            response = self.client.get(url, headers=self._get_headers())
-            response.raise_for_status()
+    def iter_catalog_pages(
+        self,
+        page_size: Optional[int] = None,
+        fields: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Parcourt le catalogue TMF633 page par page (offset / limit).
 
-            services = response.json()
+        Args:
+            page_size: Taille des pages (defaut: settings.catalog_page_size)
+            fields: Projection TMF (defaut: tous les champs)
+        """
+        if self.mock_mode:
+            yield self.get_catalog()
+            return
 
+        url = f"{self.base_url}/tmf-api/serviceCatalogManagement/v4/serviceSpecification"
+        try:
             # Parfois OpenSlice encapsule la liste dans un dict
-            if isinstance(services, dict) and "serviceSpecification" in services:
-                services = services["serviceSpecification"]
-
-            print(f"{len(services)} service(s) trouve(s) dans le catalogue")
-            return services
-
+            yield from iter_tmf_pages(
+                self.client,
+                url,
+                self._get_headers(),
+                page_size=settings.catalog_page_size if page_size is None else page_size,
+                fields=fields,
+                list_key="serviceSpecification"
+            )
         except httpx.HTTPStatusError as e:
             print(f"Erreur HTTP {e.response.status_code}: {e.response.text}")
             raise
@@ -132,6 +370,11 @@ class OpenSliceClient:
             print(f"Erreur lors de la recuperation du catalogue: {e}")
             raise
 
+    def iter_catalog(self, page_size: Optional[int] = None, fields: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Parcourt les ServiceSpecifications une a une, page par page."""
+        for page in self.iter_catalog_pages(page_size, fields):
+            yield from page
+
 
     def submit_order(self, service_order: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -142,20 +385,8 @@ class OpenSliceClient:
         """
         # Mode mock : simuler la soumission
         if self.mock_mode:
-            order_id = f"mock-order-{uuid.uuid4().hex[:8]}"
-            print(f"[MOCK] Soumission simulée de l'ordre")
-            print(f"[MOCK] Ordre créé -- ID: {order_id} | Statut: ACKNOWLEDGED")
-            
-            # Stocker l'ordre simulé
-            mock_result = {
-                "id": order_id,
-                "state": "ACKNOWLEDGED",
-                "externalId": service_order.get("externalId", "unknown"),
-                "orderDate": datetime.now().isoformat(),
-                "serviceOrderItem": service_order.get("serviceOrderItem", []),
-                "@type": "ServiceOrder"
-            }
-            self._mock_orders[order_id] = mock_result
+            mock_result = _mock_order(service_order)
+            self._mock_orders[mock_result["id"]] = mock_result
             return mock_result
         
         url = f"{self.base_url}/tmf-api/serviceOrdering/v4/serviceOrder"
@@ -263,12 +494,243 @@ class OpenSliceClient:
             print(f"Erreur lors de la recuperation de l'inventaire: {e}")
             raise
 
+    def register_catalog_listener(
+        self,
+        callback: str,
+        event_types: Iterable[str] = CATALOG_EVENT_TYPES,
+        hub_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Abonne un listener aux evenements du catalogue (hub TMF633).
+
+        Appelle : POST /tmf-api/serviceCatalogManagement/v4/hub
+        Retourne : l'abonnement cree (dont 'id', a passer a unregister_catalog_listener)
+
+        Args:
+            callback: URL du listener joignable par OpenSlice
+            event_types: Types d'evenements notifies
+            hub_url: URL du hub (defaut: hub TMF633 de base_url, ex: bouchon local)
+        """
+        query = "eventType=" + ",".join(event_types)
+        if self.mock_mode:
+            subscription = {"id": f"mock-hub-{uuid.uuid4().hex[:8]}", "callback": callback, "query": query}
+            print(f"[MOCK] Abonnement simulé au hub -- ID: {subscription['id']}")
+            return subscription
+
+        url = hub_url or f"{self.base_url}/tmf-api/serviceCatalogManagement/v4/hub"
+        print(f"Abonnement au hub: {url} (callback: {callback.split('?', 1)[0]})")  # jeton du listener non journalise
+        try:
+            response = self.client.post(url, headers=self._get_headers(), json={"callback": callback, "query": query})
+            response.raise_for_status()
+            subscription = response.json()
+            print(f"Abonnement cree -- ID: {subscription.get('id', 'inconnu')}")
+            return subscription
+        except httpx.HTTPStatusError as e:
+            print(f"Erreur HTTP {e.response.status_code}: {e.response.text}")
+            raise
+        except Exception as e:
+            print(f"Erreur lors de l'abonnement au hub: {e}")
+            raise
+
+    def unregister_catalog_listener(self, subscription_id: str, hub_url: Optional[str] = None):
+        """
+        Supprime un abonnement au hub TMF633.
+
+        Appelle : DELETE /tmf-api/serviceCatalogManagement/v4/hub/{id}
+        """
+        if self.mock_mode:
+            print(f"[MOCK] Abonnement {subscription_id} supprimé")
+            return
+
+        url = f"{(hub_url or f'{self.base_url}/tmf-api/serviceCatalogManagement/v4/hub').rstrip('/')}/{subscription_id}"
+        try:
+            response = self.client.delete(url, headers=self._get_headers())
+            if response.status_code != 404:
+                response.raise_for_status()
+            print(f"Abonnement {subscription_id} supprime")
+        except httpx.HTTPStatusError as e:
+            print(f"Erreur HTTP {e.response.status_code}: {e.response.text}")
+            raise
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Statistiques du pool de connexions partagé (requetes, connexions, taux de reutilisation)."""
+        if self.mock_mode:
+            return {"mock": True}
+        return transport_stats()
+
     def close(self):
-        """Ferme le client HTTP proprement."""
+        """Ferme le client HTTP (le pool de connexions partagé reste ouvert)."""
         if self.client:
             self.client.close()
 
 
+class AsyncOpenSliceClient:
+    """
+    Equivalent asynchrone d'OpenSliceClient (httpx.AsyncClient)
+
+    Meme interface, en coroutines : authenticate, get_catalog, submit_order,
+    get_service_status, get_service_inventory. Le token est celui du TokenManager
+    partage (renouvele sans bloquer la boucle), les connexions passent par le pool
+    asynchrone partage de la boucle courante. Le client HTTP est cree a la premiere
+    requete, dans la boucle qui l'utilise.
+
+    Utilisation:
+        async with AsyncOpenSliceClient() as client:
+            catalog, inventory = await asyncio.gather(client.get_catalog(), client.get_service_inventory())
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        auth_url: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        client_id: Optional[str] = None,
+        timeout: float = 60.0,
+        mock_mode: Optional[bool] = None
+    ):
+        self.mock_mode = mock_mode if mock_mode is not None else settings.openslice_mock_mode
+        if self.mock_mode:
+            print("[MOCK MODE] Client OpenSlice asynchrone en mode simulation (pas de connexion réelle)")
+
+        self.base_url = base_url or settings.openslice_base_url
+        self.auth_url = auth_url or settings.openslice_auth_url
+        self.username = username or settings.openslice_username
+        self.password = password or settings.openslice_password
+        self.client_id = client_id or settings.openslice_client_id
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self._mock_orders: Dict[str, Dict[str, Any]] = {}
+
+        self.tokens = None
+        self.client: Optional[httpx.AsyncClient] = None
+        if not self.mock_mode:
+            self.tokens = get_token_manager(self.auth_url, self.username, self.password, self.client_id)
+
+    def _http(self) -> httpx.AsyncClient:
+        """Client asynchrone (cree a la premiere requete, dans la boucle courante)."""
+        if self.client is None:
+            self.client = shared_async_client(timeout=self.timeout, auth=OpenSliceAuth(self.tokens))
+        return self.client
+
+    async def authenticate(self) -> str:
+        """Obtient le token JWT partagé (Keycloak n'est sollicité que s'il est absent ou proche de l'expiration)."""
+        if self.mock_mode:
+            self.token = "mock-jwt-token-for-testing-purposes-only"
+            print("[MOCK] Authentification simulée -- Token JWT fictif généré")
+            return self.token
+        try:
+            self.token = await self.tokens.get_token_async()
+            print("Authentification reussie -- Token JWT obtenu")
+            return self.token
+        except httpx.HTTPStatusError as e:
+            print(f"Erreur HTTP {e.response.status_code}: {e.response.text}")
+            raise
+        except httpx.ConnectError:
+            print(f"Impossible de joindre Keycloak sur {self.auth_url}")
+            raise
+
+    def _get_headers(self) -> Dict[str, str]:
+        """Headers JSON (le token est ajouté par OpenSliceAuth à chaque requête)."""
+        return {"Content-Type": "application/json", "Accept": "application/json"}
+
+    async def get_catalog(self, page_size: Optional[int] = None) -> list:
+        """Recupere toutes les ServiceSpecifications du catalogue (TMF633), page par page."""
+        if self.mock_mode:
+            print("[MOCK] Catalogue simulé (utilisez ChromaDB avec --mock pour les services)")
+            return [dict(service) for service in MOCK_CATALOG]
+
+        url = f"{self.base_url}/tmf-api/serviceCatalogManagement/v4/serviceSpecification"
+        try:
+            services = []
+            async for page in aiter_tmf_pages(
+                self._http(),
+                url,
+                self._get_headers(),
+                page_size=settings.catalog_page_size if page_size is None else page_size,
+                list_key="serviceSpecification"
+            ):
+                services.extend(page)
+            print(f"{len(services)} service(s) trouve(s) dans le catalogue")
+            return services
+        except httpx.HTTPStatusError as e:
+            print(f"Erreur HTTP {e.response.status_code}: {e.response.text}")
+            raise
+
+    async def submit_order(self, service_order: Dict[str, Any]) -> Dict[str, Any]:
+        """Soumet un ordre de service (TMF641), timeout de 300 secondes comme le client synchrone."""
+        if self.mock_mode:
+            mock_result = _mock_order(service_order)
+            self._mock_orders[mock_result["id"]] = mock_result
+            return mock_result
+
+        url = f"{self.base_url}/tmf-api/serviceOrdering/v4/serviceOrder"
+        try:
+            response = await self._http().post(url, headers=self._get_headers(), json=service_order, timeout=300.0)
+            response.raise_for_status()
+            result = response.json()
+            print(f"Ordre créé avec succès -- ID: {result.get('id', 'inconnu')} | Statut: {result.get('state', 'inconnu')}")
+            return result
+        except httpx.TimeoutException as e:
+            print(f"TIMEOUT: OpenSlice a mis trop de temps à répondre ({e})")
+            print(f"   L'ordre peut quand même être en cours de création côté OpenSlice")
+            raise
+        except httpx.HTTPStatusError as e:
+            print(f"Erreur HTTP {e.response.status_code}: {e.response.text}")
+            raise
+
+    async def get_service_status(self, order_id: str) -> Dict[str, Any]:
+        """Recupere le statut d'un ordre de service (TMF641) : dict avec 'id', 'state', 'details'."""
+        if self.mock_mode:
+            order = self._mock_orders.get(order_id, {})
+            return {"id": order_id, "state": order.get("state", "inconnu"), "details": order}
+
+        url = f"{self.base_url}/tmf-api/serviceOrdering/v4/serviceOrder/{order_id}"
+        try:
+            response = await self._http().get(url, headers=self._get_headers())
+            response.raise_for_status()
+            result = response.json()
+            return {"id": order_id, "state": result.get("state", "inconnu"), "details": result}
+        except httpx.HTTPStatusError as e:
+            print(f"Erreur HTTP {e.response.status_code}: {e.response.text}")
+            raise
+
+    async def get_service_inventory(self) -> list:
+        """Recupere la liste des services deployes (TMF638)."""
+        if self.mock_mode:
+            return []
+
+        url = f"{self.base_url}/tmf-api/serviceInventory/v4/service"
+        try:
+            response = await self._http().get(url, headers=self._get_headers())
+            response.raise_for_status()
+            services = response.json()
+            if isinstance(services, dict) and "service" in services:
+                services = services["service"]
+            return services
+        except httpx.HTTPStatusError as e:
+            print(f"Erreur HTTP {e.response.status_code}: {e.response.text}")
+            raise
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Statistiques des pools de connexions partagés (asynchrone sous la cle "async")."""
+        if self.mock_mode:
+            return {"mock": True}
+        return transport_stats()
+
+    async def aclose(self):
+        """Ferme le client HTTP (le pool de connexions partagé reste ouvert)."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def __aenter__(self) -> "AsyncOpenSliceClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
 # TEST DIRECT
 if __name__ == "__main__":
     print("=" * 60)
@@ -14,12 +14,13 @@ Utilisation:
     server.authenticate()
     services = server.get_service_catalog()
 """
+import asyncio
 import json
 import logging
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
-from .openslice_client import OpenSliceClient
+from .openslice_client import AsyncOpenSliceClient, OpenSliceClient
 from config import settings
 
 # Configuration du logging
@@ -40,6 +41,7 @@ class OpenSliceMCPServer:
     def __init__(self):
         """Initialise le serveur MCP et le client OpenSlice"""
         self.client = OpenSliceClient()
+        self.async_client = AsyncOpenSliceClient(mock_mode=self.client.mock_mode)
         self._tools = {}
         self._resources = {}
         self._register_tools()
@@ -60,7 +62,8 @@ class OpenSliceMCPServer:
                     "properties": {},
                     "required": []
                 },
-                "handler": self._tool_authenticate
+                "handler": self._tool_authenticate,
+                "async_handler": self._tool_authenticate_async
             },
             "get_service_catalog": {
                 "description": "Récupère le catalogue complet des services (TMF633)",
@@ -69,7 +72,8 @@ class OpenSliceMCPServer:
                     "properties": {},
                     "required": []
                 },
-                "handler": self._tool_get_service_catalog
+                "handler": self._tool_get_service_catalog,
+                "async_handler": self._tool_get_service_catalog_async
             },
             "submit_service_order": {
                 "description": "Soumet un ordre de service à OpenSlice (TMF641)",
@@ -80,7 +84,8 @@ class OpenSliceMCPServer:
                     },
                     "required": ["service_order_json"]
                 },
-                "handler": self._tool_submit_service_order
+                "handler": self._tool_submit_service_order,
+                "async_handler": self._tool_submit_service_order_async
             },
             "get_order_status": {
                 "description": "Récupère le statut d'un ordre de service",
@@ -91,7 +96,8 @@ class OpenSliceMCPServer:
                     },
                     "required": ["order_id"]
                 },
-                "handler": self._tool_get_order_status
+                "handler": self._tool_get_order_status,
+                "async_handler": self._tool_get_order_status_async
             },
             "get_service_inventory": {
                 "description": "Récupère l'inventaire des services déployés (TMF638)",
@@ -100,7 +106,8 @@ class OpenSliceMCPServer:
                     "properties": {},
                     "required": []
                 },
-                "handler": self._tool_get_service_inventory
+                "handler": self._tool_get_service_inventory,
+                "async_handler": self._tool_get_service_inventory_async
             },
             "validate_service_order": {
                 "description": "Valide un ordre de service (validation côté client)",
@@ -111,7 +118,8 @@ class OpenSliceMCPServer:
                     },
                     "required": ["service_order_json"]
                 },
-                "handler": self._tool_validate_service_order
+                "handler": self._tool_validate_service_order,
+                "async_handler": self._tool_validate_service_order_async
             }
         }
         logger.info(f"{len(self._tools)} outils MCP enregistrés")
@@ -121,11 +129,18 @@ class OpenSliceMCPServer:
         self._resources = {
             "catalog://services": {
                 "description": "Liste des services disponibles",
-                "handler": self._resource_catalog
+                "handler": self._resource_catalog,
+                "async_handler": self._resource_catalog_async
             },
             "inventory://services": {
                 "description": "Services déployés dans l'inventaire",
-                "handler": self._resource_inventory
+                "handler": self._resource_inventory,
+                "async_handler": self._resource_inventory_async
+            },
+            "metrics://http-pool": {
+                "description": "Statistiques du pool de connexions HTTP partagé vers OpenSlice",
+                "handler": self._resource_http_pool,
+                "async_handler": self._resource_http_pool_async
             }
         }
         logger.info(f"✅ {len(self._resources)} ressources MCP enregistrées")
@@ -133,62 +148,97 @@ class OpenSliceMCPServer:
     # ========================================================================
     # IMPLÉMENTATION DES OUTILS MCP
     # ========================================================================
+    # Chaque outil a une version synchrone (OpenSliceClient) et une version
+    # asynchrone (AsyncOpenSliceClient) qui partagent la mise en forme du résultat.
+    
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        """Résultat d'erreur commun aux outils"""
+        logger.error(f" Erreur: {e}")
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    
+    def _authenticate_result(self, token: str) -> Dict[str, Any]:
+        logger.info("Authentification réussie")
+        return {
+            "status": "success",
+            "message": "Token JWT obtenu auprès de Keycloak",
+            "token_preview": token[:50] + "...",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _catalog_result(self, services: List[Dict[str, Any]]) -> Dict[str, Any]:
+        logger.info(f" Catalogue récupéré: {len(services)} service(s)")
+        return {
+            "status": "success",
+            "services": services,
+            "count": len(services),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _order_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        order_id = result.get("id", "inconnu")
+        logger.info(f" Ordre soumis: {order_id}")
+        return {
+            "status": "success",
+            "order_id": order_id,
+            "order_state": result.get("state", "unknown"),
+            "details": result,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _status_result(self, order_id: str, status: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info(f" Statut de l'ordre {order_id}: {status['state']}")
+        return {
+            "status": "success",
+            "order_id": order_id,
+            "order_state": status.get("state", "unknown"),
+            "details": status,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _inventory_result(self, inventory: List[Dict[str, Any]]) -> Dict[str, Any]:
+        logger.info(f" Inventaire récupéré: {len(inventory)} service(s) actif(s)")
+        return {
+            "status": "success",
+            "services": inventory,
+            "count": len(inventory),
+            "timestamp": datetime.now().isoformat()
+        }
     
     def _tool_authenticate(self, **kwargs) -> Dict[str, Any]:
         """Outil MCP: Authentification auprès de Keycloak"""
         try:
-            token = self.client.authenticate()
-            logger.info("Authentification réussie")
-            return {
-                "status": "success",
-                "message": "Token JWT obtenu auprès de Keycloak",
-                "token_preview": token[:50] + "...",
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._authenticate_result(self.client.authenticate())
         except Exception as e:
-            logger.error(f" Erreur d'authentification: {e}")
-            return {
-                "status": "error",
-                "message": str(e)
-            }
+            return self._error_result(e)
+    
+    async def _tool_authenticate_async(self, **kwargs) -> Dict[str, Any]:
+        try:
+            return self._authenticate_result(await self.async_client.authenticate())
+        except Exception as e:
+            return self._error_result(e)
     
     def _tool_get_service_catalog(self, **kwargs) -> Dict[str, Any]:
         """Outil MCP: Récupère le catalogue complet des services (TMF633)"""
         try:
-            services = self.client.get_catalog()
-            logger.info(f" Catalogue récupéré: {len(services)} service(s)")
-            return {
-                "status": "success",
-                "services": services,
-                "count": len(services),
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._catalog_result(self.client.get_catalog())
         except Exception as e:
-            logger.error(f" Erreur: {e}")
-            return {
-                "status": "error",
-                "message": str(e)
-            }
+            return self._error_result(e)
+    
+    async def _tool_get_service_catalog_async(self, **kwargs) -> Dict[str, Any]:
+        try:
+            return self._catalog_result(await self.async_client.get_catalog())
+        except Exception as e:
+            return self._error_result(e)
     
     def _tool_submit_service_order(self, service_order_json: str, **kwargs) -> Dict[str, Any]:
         """Outil MCP: Soumet un ordre de service à OpenSlice (TMF641)"""
         try:
-            # Parser le JSON
+            # Parser le JSON puis soumettre à OpenSlice
             service_order = json.loads(service_order_json)
-            
-            # Soumettre à OpenSlice
-            result = self.client.submit_order(service_order)
-            
-            order_id = result.get("id", "inconnu")
-            logger.info(f" Ordre soumis: {order_id}")
-            
-            return {
-                "status": "success",
-                "order_id": order_id,
-                "order_state": result.get("state", "unknown"),
-                "details": result,
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._order_result(self.client.submit_order(service_order))
         except json.JSONDecodeError as e:
             logger.error(f" JSON invalide: {e}")
             return {
@@ -196,50 +246,46 @@ class OpenSliceMCPServer:
                 "message": f"JSON invalide: {str(e)}"
             }
         except Exception as e:
-            logger.error(f" Erreur lors de la soumission: {e}")
+            return self._error_result(e)
+    
+    async def _tool_submit_service_order_async(self, service_order_json: str, **kwargs) -> Dict[str, Any]:
+        try:
+            service_order = json.loads(service_order_json)
+            return self._order_result(await self.async_client.submit_order(service_order))
+        except json.JSONDecodeError as e:
+            logger.error(f" JSON invalide: {e}")
             return {
                 "status": "error",
-                "message": str(e)
+                "message": f"JSON invalide: {str(e)}"
             }
+        except Exception as e:
+            return self._error_result(e)
     
     def _tool_get_order_status(self, order_id: str, **kwargs) -> Dict[str, Any]:
         """Outil MCP: Récupère le statut d'un ordre de service"""
         try:
-            status = self.client.get_service_status(order_id)
-            logger.info(f" Statut de l'ordre {order_id}: {status['state']}")
-            
-            return {
-                "status": "success",
-                "order_id": order_id,
-                "order_state": status.get("state", "unknown"),
-                "details": status,
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._status_result(order_id, self.client.get_service_status(order_id))
         except Exception as e:
-            logger.error(f" Erreur: {e}")
-            return {
-                "status": "error",
-                "message": str(e)
-            }
+            return self._error_result(e)
+    
+    async def _tool_get_order_status_async(self, order_id: str, **kwargs) -> Dict[str, Any]:
+        try:
+            return self._status_result(order_id, await self.async_client.get_service_status(order_id))
+        except Exception as e:
+            return self._error_result(e)
     
     def _tool_get_service_inventory(self, **kwargs) -> Dict[str, Any]:
         """Outil MCP: Récupère l'inventaire des services déployés (TMF638)"""
         try:
-            inventory = self.client.get_service_inventory()
-            logger.info(f" Inventaire récupéré: {len(inventory)} service(s) actif(s)")
-            
-            return {
-                "status": "success",
-                "services": inventory,
-                "count": len(inventory),
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._inventory_result(self.client.get_service_inventory())
         except Exception as e:
-            logger.error(f" Erreur: {e}")
-            return {
-                "status": "error",
-                "message": str(e)
-            }
+            return self._error_result(e)
+    
+    async def _tool_get_service_inventory_async(self, **kwargs) -> Dict[str, Any]:
+        try:
+            return self._inventory_result(await self.async_client.get_service_inventory())
+        except Exception as e:
+            return self._error_result(e)
     
     def _tool_validate_service_order(self, service_order_json: str, **kwargs) -> Dict[str, Any]:
         """Outil MCP: Valide un ordre de service (validation côté client)"""
@@ -298,6 +344,10 @@ class OpenSliceMCPServer:
                 "is_valid": False
             }
     
+    async def _tool_validate_service_order_async(self, service_order_json: str, **kwargs) -> Dict[str, Any]:
+        # Validation locale sans entrée / sortie : exécutée directement dans la boucle
+        return self._tool_validate_service_order(service_order_json, **kwargs)
+    
     # ========================================================================
     # IMPLÉMENTATION DES RESSOURCES MCP
     # ========================================================================
@@ -328,6 +378,44 @@ class OpenSliceMCPServer:
             logger.error(f"Erreur lors de la récupération de l'inventaire: {e}")
             return {"error": str(e)}
     
+    async def _resource_catalog_async(self) -> Dict[str, Any]:
+        try:
+            services = await self.async_client.get_catalog()
+            return {
+                "services": services,
+                "count": len(services),
+                "timestamp": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération du catalogue: {e}")
+            return {"error": str(e)}
+    
+    async def _resource_inventory_async(self) -> Dict[str, Any]:
+        try:
+            inventory = await self.async_client.get_service_inventory()
+            return {
+                "services": inventory,
+                "count": len(inventory),
+                "timestamp": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de l'inventaire: {e}")
+            return {"error": str(e)}
+    
+    def _resource_http_pool(self) -> Dict[str, Any]:
+        """Ressource MCP: Statistiques du pool HTTP (réutilisation des connexions)"""
+        return {
+            "stats": self.client.pool_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    async def _resource_http_pool_async(self) -> Dict[str, Any]:
+        # Depuis la boucle : le pool asynchrone (sous la clé "async") est inclus
+        return {
+            "stats": self.async_client.pool_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+    
     # ========================================================================
     # API PUBLIQUE DU SERVEUR MCP
     # ========================================================================
@@ -383,6 +471,63 @@ class OpenSliceMCPServer:
             logger.error(f"Erreur lors de l'accès à la ressource '{resource_uri}': {e}")
             return {"error": str(e)}
     
+    async def call_tool_async(self, tool_name: str, **kwargs) -> Dict[str, Any]:
+        """
+        Appelle un outil MCP depuis une coroutine
+        
+        Utilise la version asynchrone de l'outil (AsyncOpenSliceClient) ; un outil
+        sans version asynchrone est exécuté dans un thread pour ne pas bloquer la boucle.
+        Plusieurs appels peuvent être lancés en parallèle (asyncio.gather).
+        
+        Args:
+            tool_name: Nom de l'outil
+            **kwargs: Arguments de l'outil
+            
+        Returns:
+            Résultat de l'outil au format JSON
+        """
+        if tool_name not in self._tools:
+            return {
+                "status": "error",
+                "message": f"Outil MCP '{tool_name}' non trouvé. Outils disponibles: {list(self._tools.keys())}"
+            }
+        
+        tool = self._tools[tool_name]
+        try:
+            if tool.get("async_handler") is not None:
+                return await tool["async_handler"](**kwargs)
+            return await asyncio.to_thread(tool["handler"], **kwargs)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'appel de l'outil '{tool_name}': {e}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+    
+    async def read_resource_async(self, resource_uri: str) -> Dict[str, Any]:
+        """
+        Récupère une ressource MCP depuis une coroutine (voir call_tool_async)
+        
+        Args:
+            resource_uri: URI de la ressource (ex: "catalog://services")
+            
+        Returns:
+            Contenu de la ressource
+        """
+        if resource_uri not in self._resources:
+            return {
+                "error": f"Ressource '{resource_uri}' non trouvée. Ressources disponibles: {list(self._resources.keys())}"
+            }
+        
+        resource = self._resources[resource_uri]
+        try:
+            if resource.get("async_handler") is not None:
+                return await resource["async_handler"]()
+            return await asyncio.to_thread(resource["handler"])
+        except Exception as e:
+            logger.error(f"Erreur lors de l'accès à la ressource '{resource_uri}': {e}")
+            return {"error": str(e)}
+    
     def get_tools_info(self) -> Dict[str, Any]:
         """Retourne la liste et description des outils MCP"""
         return {
@@ -428,6 +573,11 @@ class OpenSliceMCPServer:
         """Ferme les connexions"""
         self.client.close()
         logger.info("Serveur MCP fermé")
+    
+    async def aclose(self):
+        """Ferme les connexions, y compris celles du client asynchrone (depuis sa boucle)"""
+        await self.async_client.aclose()
+        self.close()
 
 
 # ============================================================================
@@ -0,0 +1,522 @@
+"""
+Transport MCP distant : JSON-RPC 2.0 sur connexion persistante (socket Unix ou stdio)
+
+Rôle : Faire tourner un seul OpenSliceMCPServer par machine (scripts/mcp_server.py),
+       qui garde le token Keycloak, le pool de connexions et les caches pour tous les
+       workers du pipeline, au lieu d'un serveur embarqué par agent (MCPClient local).
+
+Architecture:
+    MCPClient(mode="remote")
+        -> RemoteMCPConnection (connexion persistante, partagée par le processus)
+        -> socket Unix (settings.mcp_socket_path) ou stdin / stdout d'un sous-processus
+        -> MCPRemoteServer : une tâche asyncio par requête (appels concurrents)
+        -> OpenSliceMCPServer.call_tool_async / read_resource_async
+
+Protocole (un message JSON par ligne, UTF-8) :
+    requête  : {"jsonrpc": "2.0", "id": 7, "method": "tools/call",
+                "params": {"name": "get_order_status", "arguments": {"order_id": "..."}}}
+    réponse  : {"jsonrpc": "2.0", "id": 7, "result": {...}}
+               {"jsonrpc": "2.0", "id": 7, "error": {"code": -32601, "message": "..."}}
+    méthodes : tools/call, resources/read, tools/list, resources/list, ping
+
+Les requêtes sont pipelinées : le client envoie sans attendre les réponses, le serveur
+répond dans l'ordre de fin de traitement et le client associe chaque réponse à son
+appelant par l'id.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Codes d'erreur JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Méthodes servies
+METHODS = ("tools/call", "resources/read", "tools/list", "resources/list", "ping")
+
+# Taille maximale d'un message lu par le serveur
+_MAX_LINE = 16 * 1024 * 1024
+
+
+class RemoteMCPError(RuntimeError):
+    """Erreur JSON-RPC renvoyée par le serveur MCP distant"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"MCP distant ({code}): {message}")
+        self.code = code
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _resolve(future: Future, result: Any = None, error: Optional[BaseException] = None):
+    """
+    Transmet une réponse à son appelant, sauf si la requête est déjà terminée
+
+    L'appelant peut avoir abandonné la Future (délai dépassé, tâche annulée) pendant
+    que la réponse arrivait : la réponse est alors ignorée.
+    """
+    if future.done() or not future.set_running_or_notify_cancel():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+# ============================================================================
+# SERVEUR
+# ============================================================================
+
+class MCPRemoteServer:
+    """
+    Expose un OpenSliceMCPServer en JSON-RPC sur un socket Unix ou sur stdio
+
+    Chaque requête est traitée dans sa propre tâche asyncio (au plus max_in_flight
+    à la fois par serveur) : un submit_service_order long ne bloque pas les appels
+    suivants de la même connexion.
+
+    Utilisation:
+        server = MCPRemoteServer(OpenSliceMCPServer())
+        server.serve_forever(socket_path="/tmp/ibn-mcp.sock")
+    """
+
+    def __init__(self, mcp_server, max_in_flight: Optional[int] = None):
+        """
+        Args:
+            mcp_server: OpenSliceMCPServer servi
+            max_in_flight: Requêtes traitées simultanément (défaut: settings.mcp_max_in_flight)
+        """
+        self.mcp_server = mcp_server
+        self.max_in_flight = max_in_flight or settings.mcp_max_in_flight
+        self.started_at = time.time()
+        self.stats = {"connections": 0, "requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers = set()
+        self._stopped: Optional[asyncio.Event] = None
+
+    # ------------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------------
+
+    async def _dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "tools/call":
+            name = params.get("name")
+            if not isinstance(name, str):
+                raise ValueError("params.name manquant")
+            return await self.mcp_server.call_tool_async(name, **(params.get("arguments") or {}))
+        if method == "resources/read":
+            uri = params.get("uri")
+            if not isinstance(uri, str):
+                raise ValueError("params.uri manquant")
+            return await self.mcp_server.read_resource_async(uri)
+        if method == "tools/list":
+            return self.mcp_server.get_tools_info()
+        if method == "resources/list":
+            return self.mcp_server.get_resources_info()
+        if method == "ping":
+            return {
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started_at, 1),
+                "mock_mode": self.mcp_server.client.mock_mode,
+                "stats": dict(self.stats)
+            }
+        raise ValueError(f"Méthode non gérée: {method}")
+
+    async def handle_message(self, message: Any) -> Optional[Dict[str, Any]]:
+        """
+        Traite un message JSON-RPC décodé
+
+        Returns:
+            Réponse JSON-RPC, ou None pour une notification (message sans id)
+        """
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or not isinstance(message.get("method"), str):
+            self.stats["errors"] += 1
+            return _error(message.get("id") if isinstance(message, dict) else None, INVALID_REQUEST, "Requête JSON-RPC invalide")
+
+        request_id = message.get("id")
+        params = message.get("params") or {}
+        self.stats["requests"] += 1
+        if message["method"] not in METHODS:
+            self.stats["errors"] += 1
+            response = _error(request_id, METHOD_NOT_FOUND, f"Méthode inconnue: {message['method']}")
+            return None if "id" not in message else response
+        try:
+            if not isinstance(params, dict):
+                raise ValueError("params doit être un objet")
+            result = await self._dispatch(message["method"], params)
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except (ValueError, TypeError) as e:
+            self.stats["errors"] += 1
+            response = _error(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Erreur lors du traitement de '{message['method']}': {e}")
+            response = _error(request_id, INTERNAL_ERROR, str(e))
+        return None if "id" not in message else response
+
+    # ------------------------------------------------------------------------
+    # Connexions
+    # ------------------------------------------------------------------------
+
+    async def _process(self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        async with self._semaphore:
+            self.stats["in_flight"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+            try:
+                try:
+                    message = json.loads(line)
+                except ValueError as e:
+                    self.stats["errors"] += 1
+                    response = _error(None, PARSE_ERROR, f"JSON invalide: {e}")
+                else:
+                    response = await self.handle_message(message)
+            finally:
+                self.stats["in_flight"] -= 1
+        if response is None:
+            return
+        try:
+            data = _encode(response)
+        except (TypeError, ValueError) as e:
+            data = _encode(_error(response.get("id"), INTERNAL_ERROR, f"Résultat non sérialisable: {e}"))
+        async with write_lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Lit les requêtes d'une connexion et les traite en parallèle"""
+        self.stats["connections"] += 1
+        self._writers.add(writer)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._process(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def serve_unix(self, socket_path: str):
+        """Écoute sur un socket Unix jusqu'à l'annulation de la tâche"""
+        if os.path.exists(socket_path):
+            if is_server_available(socket_path):
+                raise RuntimeError(f"Un serveur MCP écoute déjà sur {socket_path}")
+            os.unlink(socket_path)  # socket orphelin d'un serveur arrêté
+
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._server = await asyncio.start_unix_server(self._serve_connection, path=socket_path, limit=_MAX_LINE)
+        os.chmod(socket_path, 0o660)
+        print(f"Serveur MCP prêt sur {socket_path} (requêtes simultanées: {self.max_in_flight})")
+        self._stopped = asyncio.Event()
+        try:
+            await self._stopped.wait()
+        finally:
+            # Les connexions persistantes des clients sont fermées avec le serveur
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    async def serve_stdio(self, output: Optional[BinaryIO] = None):
+        """
+        Sert une seule connexion sur stdin / stdout (jusqu'à la fin de stdin)
+
+        Args:
+            output: Flux binaire des réponses (défaut: sys.stdout.buffer). Les print()
+                    du serveur ne doivent pas aller sur ce flux.
+        """
+        loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        reader = asyncio.StreamReader(limit=_MAX_LINE)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, output or sys.stdout.buffer
+        )
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self._serve_connection(reader, writer)
+
+    def serve_forever(self, socket_path: Optional[str] = None, stdio: bool = False, output: Optional[BinaryIO] = None):
+        """Démarre le serveur (bloquant) ; ferme les clients OpenSlice à l'arrêt"""
+
+        async def run():
+            # SIGTERM : arrêt propre (socket supprimé, clients OpenSlice fermés)
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+            try:
+                if stdio:
+                    await self.serve_stdio(output)
+                else:
+                    await self.serve_unix(socket_path or settings.mcp_socket_path)
+            finally:
+                await self.mcp_server.aclose()
+
+        try:
+            asyncio.run(run())
+        except asyncio.CancelledError:
+            print("Serveur MCP arrêté (SIGTERM)")
+
+    def shutdown(self):
+        """Arrête le serveur sur socket (depuis sa boucle)"""
+        if self._stopped is not None:
+            self._stopped.set()
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class RemoteMCPConnection:
+    """
+    Connexion persistante vers un serveur MCP distant, avec appels concurrents
+
+    Les requêtes de tous les threads (request) et de toutes les coroutines (arequest)
+    partagent la connexion : chacune reçoit un id, un thread lecteur route les réponses
+    vers les appelants. La connexion est rétablie à la requête suivante si elle tombe
+    (les requêtes en cours échouent avec ConnectionError).
+
+    Args:
+        socket_path: Socket Unix du serveur (défaut: settings.mcp_socket_path)
+        command: Commande d'un serveur à lancer en sous-processus et à joindre par stdio
+                 (ex: [sys.executable, "scripts/mcp_server.py", "--stdio"]) ; prioritaire
+                 sur socket_path
+        timeout: Délai maximal d'une requête (secondes, défaut: settings.mcp_request_timeout)
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        command: Optional[List[str]] = None,
+        timeout: Optional[float] = None
+    ):
+        self.socket_path = socket_path or settings.mcp_socket_path
+        self.command = list(command) if command else None
+        self.timeout = timeout or settings.mcp_request_timeout
+
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._wfile: Optional[BinaryIO] = None
+        self._sock: Optional[socket.socket] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._pid: Optional[int] = None
+        self._closed = False
+
+    @property
+    def target(self) -> str:
+        """Description du serveur joint (journalisation)"""
+        return " ".join(self.command) if self.command else self.socket_path
+
+    # ------------------------------------------------------------------------
+    # Connexion
+    # ------------------------------------------------------------------------
+
+    def _connect(self):
+        """Ouvre la connexion et démarre son thread lecteur (verrou tenu)"""
+        if self.command:
+            self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            rfile, self._wfile = self._process.stdout, self._process.stdin
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                self._sock.connect(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                self._sock.close()
+                self._sock = None
+                raise ConnectionError(
+                    f"Serveur MCP injoignable sur {self.socket_path} (python scripts/mcp_server.py)"
+                )
+            rfile, self._wfile = self._sock.makefile("rb"), self._sock.makefile("wb")
+        self._pid = os.getpid()
+        # Requêtes en attente de cette connexion (une connexion rétablie a les siennes)
+        self._pending = {}
+        threading.Thread(
+            target=self._read_loop, args=(rfile, self._pending), name="mcp-remote-reader", daemon=True
+        ).start()
+
+    def _disconnect(self):
+        """Ferme la connexion courante (verrou tenu)"""
+        wfile, sock, process = self._wfile, self._sock, self._process
+        self._wfile = self._sock = self._process = None
+        for closeable in (wfile, sock):
+            if closeable is not None:
+                try:
+                    closeable.close()
+                except OSError:
+                    pass
+        if process is not None:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+
+    def _read_loop(self, rfile: BinaryIO, pending: Dict[int, Future]):
+        """Route chaque réponse vers la requête de même id"""
+        try:
+            for line in rfile:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    logger.warning("Réponse MCP illisible ignorée")
+                    continue
+                with self._lock:
+                    future = pending.pop(message.get("id"), None)
+                if future is None:
+                    continue  # requête expirée
+                if "error" in message:
+                    error = message["error"] or {}
+                    _resolve(future, error=RemoteMCPError(error.get("code", INTERNAL_ERROR), error.get("message", "")))
+                else:
+                    _resolve(future, result=message.get("result"))
+        except (OSError, ValueError):
+            pass
+        finally:
+            rfile.close()
+            # Connexion perdue : échec des requêtes en attente, reconnexion à la requête suivante
+            with self._lock:
+                if self._pending is pending:
+                    self._disconnect()
+                lost = list(pending.values())
+                pending.clear()
+            for future in lost:
+                _resolve(future, error=ConnectionError(f"Connexion au serveur MCP perdue ({self.target})"))
+
+    # ------------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------------
+
+    def submit(self, method: str, params: Optional[Dict[str, Any]] = None) -> Tuple[int, Future]:
+        """
+        Envoie une requête sans attendre sa réponse
+
+        Returns:
+            (id, Future) : la Future reçoit le résultat ou l'erreur JSON-RPC
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise ConnectionError("Connexion MCP fermée")
+            request_id = next(self._ids)
+            data = _encode({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+            for attempt in range(2):
+                if self._wfile is None or self._pid != os.getpid():
+                    self._wfile = None  # après un fork, la connexion du parent n'est pas réutilisée
+                    self._connect()
+                self._pending[request_id] = future
+                try:
+                    self._wfile.write(data)
+                    self._wfile.flush()
+                    break
+                except OSError:
+                    self._pending.pop(request_id, None)
+                    self._disconnect()
+                    if attempt:
+                        raise
+        return request_id, future
+
+    def _discard(self, request_id: int):
+        """Oublie une requête terminée, expirée ou annulée (une réponse tardive est ignorée)"""
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """Envoie une requête et attend son résultat (bloquant)"""
+        request_id, future = self.submit(method, params)
+        try:
+            return future.result(timeout or self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Pas de réponse du serveur MCP à '{method}' en {timeout or self.timeout}s")
+        finally:
+            self._discard(request_id)
+
+    async def arequest(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """Envoie une requête et attend son résultat sans bloquer la boucle asyncio"""
+        request_id, future = self.submit(method, params)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Pas de réponse du serveur MCP à '{method}' en {timeout or self.timeout}s")
+        finally:
+            # Réponse reçue, délai dépassé ou tâche annulée (ex: gather) : l'id est libéré
+            self._discard(request_id)
+
+    def close(self):
+        """Ferme la connexion (et arrête le sous-processus stdio)"""
+        with self._lock:
+            self._closed = True
+            self._disconnect()
+
+
+_connections: Dict[Tuple[int, str], RemoteMCPConnection] = {}
+_connections_lock = threading.Lock()
+
+
+def get_remote_connection(socket_path: Optional[str] = None) -> RemoteMCPConnection:
+    """Connexion du processus vers le serveur MCP du socket (partagée par tous les MCPClient)"""
+    socket_path = socket_path or settings.mcp_socket_path
+    key = (os.getpid(), socket_path)
+    with _connections_lock:
+        connection = _connections.get(key)
+        if connection is None or connection._closed:
+            connection = RemoteMCPConnection(socket_path=socket_path)
+            _connections[key] = connection
+        return connection
+
+
+def get_server_info(socket_path: Optional[str] = None, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+    """Réponse au ping du serveur MCP (pid, uptime, mock_mode, stats), ou None s'il est injoignable"""
+    socket_path = socket_path or settings.mcp_socket_path
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(_encode({"jsonrpc": "2.0", "id": 0, "method": "ping"}))
+            with sock.makefile("rb") as rfile:
+                return json.loads(rfile.readline()).get("result")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def is_server_available(socket_path: Optional[str] = None) -> bool:
+    """Indique si un serveur MCP répond sur le socket"""
+    return get_server_info(socket_path) is not None
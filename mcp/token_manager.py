@@ -0,0 +1,357 @@
+"""
+Gestion partagée des tokens Keycloak pour OpenSlice
+
+Rôle : Fournir à tous les clients OpenSlice d'un processus (OpenSliceClient, MCPClient,
+       scripts) un même token JWT, renouvelé avant son expiration.
+
+- Expiration lue dans le claim "exp" du JWT (à défaut "expires_in" de Keycloak)
+- Renouvellement en arrière-plan via refresh_token, OPENSLICE_TOKEN_REFRESH_MARGIN
+  secondes avant l'expiration (password grant si le refresh_token a expiré)
+- Single-flight : les appelants concurrents partagent un seul renouvellement
+- Nouvel essai transparent sur 401 (OpenSliceAuth, branché sur httpx)
+- Cache fichier optionnel partagé entre processus (OPENSLICE_TOKEN_CACHE, verrou fcntl)
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from config import settings
+from .http_pool import shared_client
+
+try:
+    import fcntl
+except ImportError:  # Windows : cache fichier sans verrou
+    fcntl = None
+
+
+def decode_jwt_expiry(token: str) -> Optional[float]:
+    """
+    Lit le claim "exp" d'un JWT (sans vérifier la signature)
+
+    Returns:
+        Optional[float]: Expiration (timestamp Unix), None si illisible
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class TokenManager:
+    """
+    Token Keycloak partagé, renouvelé avant expiration
+
+    Utilisation:
+        manager = get_token_manager()
+        token = manager.get_token()                 # token valide (renouvelé si besoin)
+        token = manager.get_token(stale=token)      # après un 401 : un seul renouvellement
+    """
+
+    def __init__(
+        self,
+        auth_url: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        client_id: Optional[str] = None,
+        refresh_margin: Optional[float] = None,
+        cache_file: Optional[str] = None,
+        background: bool = True,
+        timeout: float = 30.0
+    ):
+        """
+        Args:
+            auth_url: URL de Keycloak (défaut: settings.openslice_auth_url)
+            username: Utilisateur OpenSlice (défaut: settings.openslice_username)
+            password: Mot de passe (défaut: settings.openslice_password)
+            client_id: Client Keycloak (défaut: settings.openslice_client_id)
+            refresh_margin: Secondes avant expiration où le token est renouvelé
+                            (défaut: settings.openslice_token_refresh_margin)
+            cache_file: Cache partagé entre processus (défaut: settings.openslice_token_cache,
+                        vide = aucun)
+            background: Renouvelle le token dans un thread avant son expiration
+            timeout: Timeout des requêtes vers Keycloak (secondes)
+        """
+        self.auth_url = auth_url or settings.openslice_auth_url
+        self.username = username or settings.openslice_username
+        self.password = password or settings.openslice_password
+        self.client_id = client_id or settings.openslice_client_id
+        self.refresh_margin = settings.openslice_token_refresh_margin if refresh_margin is None else refresh_margin
+        self.cache_file = settings.openslice_token_cache if cache_file is None else cache_file
+        self.background = background
+        self.token_url = f"{self.auth_url}/auth/realms/openslice/protocol/openid-connect/token"
+
+        self._http = shared_client(timeout=timeout)
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}
+        self._key = hashlib.sha256(f"{self.token_url}|{self.username}|{self.client_id}".encode()).hexdigest()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0  # requêtes effectivement envoyées à Keycloak
+
+    # ------------------------------------------------------------------
+    # Accès au token
+    # ------------------------------------------------------------------
+
+    def _fresh(self, state: Dict[str, Any], proactive: bool = True) -> bool:
+        """Vrai si le token n'a pas à être renouvelé (proactive=False : s'il n'a pas expiré)"""
+        if not state.get("access_token"):
+            return False
+        deadline = state.get("refresh_at" if proactive else "expires_at")
+        return deadline is None or deadline > time.time()
+
+    def get_token(self, stale: Optional[str] = None) -> str:
+        """
+        Retourne un token valide, renouvelé s'il expire dans moins de refresh_margin secondes
+
+        Args:
+            stale: Token refusé par OpenSlice (401) ; il est renouvelé une seule fois
+                   même si plusieurs appelants le signalent en même temps
+
+        Returns:
+            str: Token JWT
+        """
+        state = self._state
+        if self._fresh(state) and state["access_token"] != stale:
+            return state["access_token"]
+
+        with self._lock:  # single-flight : les autres appelants attendent ce renouvellement
+            state = self._state
+            if not (self._fresh(state) and state["access_token"] != stale):
+                try:
+                    self._state = self._renew(stale)
+                except Exception:
+                    if self._fresh(state, proactive=False) and state["access_token"] != stale:
+                        return state["access_token"]  # Keycloak injoignable : token encore valide
+                    raise
+                if stale:
+                    print("Token OpenSlice refusé (401) -- token renouvelé")
+            self._start_background()
+            return self._state["access_token"]
+
+    def invalidate(self):
+        """Oublie le token courant (le prochain appel en obtient un nouveau)"""
+        with self._lock:
+            self._state = {}
+
+    async def get_token_async(self, stale: Optional[str] = None) -> str:
+        """get_token() sans bloquer la boucle asyncio pendant un renouvellement"""
+        state = self._state
+        if self._fresh(state) and state["access_token"] != stale:
+            return state["access_token"]
+        return await asyncio.to_thread(self.get_token, stale)
+
+    # ------------------------------------------------------------------
+    # Renouvellement
+    # ------------------------------------------------------------------
+
+    def _renew(self, stale: Optional[str] = None) -> Dict[str, Any]:
+        """Nouveau token : cache fichier si un autre processus l'a renouvelé, sinon Keycloak"""
+        if not self.cache_file:
+            return self._request_token(self._state)
+        with self._file_lock():
+            cached = self._read_cache()
+            if self._fresh(cached) and cached["access_token"] != stale:
+                return cached
+            state = self._request_token(cached if cached.get("refresh_token") else self._state)
+            self._write_cache(state)
+            return state
+
+    def _request_token(self, previous: Dict[str, Any]) -> Dict[str, Any]:
+        """Appelle Keycloak (refresh_token si encore valide, sinon password grant)"""
+        refresh_token = previous.get("refresh_token")
+        refresh_expires_at = previous.get("refresh_expires_at")
+        if refresh_token and (refresh_expires_at is None or refresh_expires_at > time.time() + 5):
+            payload = {"grant_type": "refresh_token", "refresh_token": refresh_token, "client_id": self.client_id}
+            try:
+                return self._post(payload)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (400, 401):
+                    raise
+                # refresh_token révoqué ou session expirée : nouvelle authentification
+
+        payload = {
+            "username": self.username,
+            "password": self.password,
+            "grant_type": "password",
+            "client_id": self.client_id
+        }
+        return self._post(payload)
+
+    def _post(self, payload: Dict[str, str]) -> Dict[str, Any]:
+        response = self._http.post(self.token_url, data=payload)
+        response.raise_for_status()
+        body = response.json()
+        self.refreshes += 1
+        now = time.time()
+        access_token = body["access_token"]
+        expires_at = decode_jwt_expiry(access_token)
+        if expires_at is None and body.get("expires_in"):
+            expires_at = now + float(body["expires_in"])
+        refresh_at = None
+        if expires_at is not None:
+            # Marge plafonnée à la moitié de la durée de vie (tokens très courts)
+            lifetime = max(0.0, expires_at - now)
+            refresh_at = expires_at - min(self.refresh_margin, lifetime / 2)
+        refresh_expires_at = None
+        if body.get("refresh_expires_in"):  # 0 = session hors ligne sans expiration
+            refresh_expires_at = now + float(body["refresh_expires_in"])
+        return {
+            "key": self._key,
+            "access_token": access_token,
+            "expires_at": expires_at,
+            "refresh_at": refresh_at,
+            "refresh_token": body.get("refresh_token"),
+            "refresh_expires_at": refresh_expires_at,
+        }
+
+    def _start_background(self):
+        if self.background and self._thread is None and not self._stop.is_set():
+            self._thread = threading.Thread(target=self._refresh_loop, name="openslice-token", daemon=True)
+            self._thread.start()
+
+    def _refresh_loop(self):
+        """Renouvelle le token refresh_margin secondes avant son expiration"""
+        delay_after_error = 5.0
+        while not self._stop.is_set():
+            refresh_at = self._state.get("refresh_at")
+            if refresh_at is None:
+                return  # expiration inconnue : renouvellement à la demande (401)
+            wait = refresh_at - time.time()
+            if wait > 0:
+                self._wakeup.wait(wait)
+                self._wakeup.clear()
+                continue
+            try:
+                with self._lock:
+                    if not self._fresh(self._state):
+                        self._state = self._renew()
+                delay_after_error = 5.0
+            except Exception as e:
+                print(f"Renouvellement du token OpenSlice impossible ({e}), nouvel essai dans {delay_after_error:.0f} s")
+                self._wakeup.wait(delay_after_error)
+                self._wakeup.clear()
+                delay_after_error = min(delay_after_error * 2, 60.0)
+
+    # ------------------------------------------------------------------
+    # Cache fichier (partagé entre processus)
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self):
+        """Verrou exclusif entre processus sur le cache fichier"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+        with open(self.cache_file + ".lock", "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_cache(self) -> Dict[str, Any]:
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        state = entries.get(self._key) if isinstance(entries, dict) else None
+        return state if isinstance(state, dict) else {}
+
+    def _write_cache(self, state: Dict[str, Any]):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if not isinstance(entries, dict):
+                entries = {}
+        except (OSError, ValueError):
+            entries = {}
+        entries[self._key] = state
+        tmp = f"{self.cache_file}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.cache_file)
+
+    # ------------------------------------------------------------------
+
+    def close(self):
+        """Arrête le thread de renouvellement et ferme le client HTTP"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._http.close()
+
+
+class OpenSliceAuth(httpx.Auth):
+    """
+    Authentification httpx par token partagé, avec un nouvel essai sur 401
+
+    Branchée sur un httpx.Client ou httpx.AsyncClient (auth=OpenSliceAuth(...)),
+    elle ajoute le header Authorization à chaque requête ; si OpenSlice répond 401,
+    le token est renouvelé (une seule fois pour tous les appelants) et la requête
+    renvoyée une fois.
+    """
+
+    def __init__(self, manager: TokenManager):
+        self.manager = manager
+
+    def sync_auth_flow(self, request: httpx.Request):
+        token = self.manager.get_token()
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code == 401:
+            request.headers["Authorization"] = f"Bearer {self.manager.get_token(stale=token)}"
+            yield request
+
+    async def async_auth_flow(self, request: httpx.Request):
+        token = await self.manager.get_token_async()
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code == 401:
+            request.headers["Authorization"] = f"Bearer {await self.manager.get_token_async(stale=token)}"
+            yield request
+
+
+# Gestionnaires du processus, un par (Keycloak, utilisateur, client)
+_managers: Dict[Tuple[str, str, str], TokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(
+    auth_url: Optional[str] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    client_id: Optional[str] = None
+) -> TokenManager:
+    """
+    Gestionnaire de token partagé par tout le processus pour ces identifiants
+
+    Tous les OpenSliceClient (dont ceux créés par chaque MCPClient) et les scripts
+    réutilisent ainsi le même token au lieu de s'authentifier chacun.
+    """
+    auth_url = auth_url or settings.openslice_auth_url
+    username = username or settings.openslice_username
+    client_id = client_id or settings.openslice_client_id
+    key = (auth_url, username, client_id)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = TokenManager(auth_url, username, password, client_id)
+            _managers[key] = manager
+        return manager
@@ -9,7 +9,7 @@ from langgraph.graph import StateGraph, END
 from datetime import datetime
 
 from agents.agent1_interpreter import IntentInterpreterAgent
-from agents.agent2_selector import ServiceSelectorAgent
+from agents.agent2_selector import get_shared_selector
 from agents.agent3_translator import ServiceTranslatorAgent
 from agents.agent4_validator import ServiceValidatorAgent
 from mcp.mcp_client import MCPClient
@@ -114,6 +114,7 @@ class AgentState(TypedDict):
     """
     # Entree utilisateur
     user_query: str
+    tenant: Optional[str]            # Catalogue du tenant OpenSlice (None = catalogue par defaut)
 
     # Agent 1 : intention structuree
     intent: Optional[Intent]
@@ -200,7 +201,7 @@ def agent2_node(state: AgentState) -> dict:
         }
 
     try:
-        agent = ServiceSelectorAgent()
+        agent = get_shared_selector(state.get("tenant"))
         services = agent.select_services(state["intent"])
 
         print(f"[Agent 2] {len(services)} service(s) selectionne(s)")
@@ -324,7 +325,7 @@ def submit_to_openslice(state: AgentState) -> dict:
     context.notify_progress(f"Soumission à {mode_label}...", 0.9)
 
     try:
-        mcp_client = MCPClient(mode="local")
+        mcp_client = MCPClient()
         
         # Convertir l'ordre en JSON
         order_json = state["service_order"].model_dump_json(exclude_none=True)
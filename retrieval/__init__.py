@@ -0,0 +1,120 @@
+"""
+Retrieval - Briques de recherche pour l'Agent 2 (Service Selector)
+
+Ce module regroupe les composants de recherche utilisés par ServiceSelectorAgent
+et par le script d'ingestion :
+- Index lexical BM25 (index inversé) construit à l'ingestion
+- Fusion de classements par Reciprocal Rank Fusion (RRF)
+- Calcul des distances / scores compatibles avec ChromaDB
+- Affectation optimale sous-intentions -> services (méthode hongroise)
+- Backends d'embeddings (sentence-transformers, ONNX Runtime int8)
+- Service d'embeddings partagé par machine (socket Unix, micro-batching)
+- Encodage multi-processus des lots d'ingestion (EmbeddingProcessPool)
+- Micro-batching des recherches entre appels concurrents (RetrievalDispatcher)
+- Cache des résultats invalidé par version de catalogue (RetrievalCache)
+- Réglage des paramètres HNSW de la collection (espace, M, ef)
+- Index vectoriel compressé float16 / IVF-PQ avec re-classement exact (CompressedIndex)
+- Shards par catégorie et routage des sous-intentions (ShardIndex)
+- Gazetteer hors ligne et index des zones de couverture (Gazetteer, CoverageIndex)
+- Index des contraintes numériques pour écarter les services infaisables (ConstraintIndex)
+- Instantanés portables de la collection avec empreinte du modèle (export / import)
+- Regroupement des quasi-doublons du catalogue à l'ingestion (cluster_near_duplicates)
+"""
+
+from .lexical import BM25Index, tokenize
+from .fusion import reciprocal_rank_fusion
+from .scoring import collection_space, compute_distances, distance_to_score
+from .storage import (
+    artifact_path,
+    generation_name,
+    generation_number,
+    read_collection_alias,
+    remove_artifacts,
+    write_collection_alias,
+)
+from .assignment import solve_assignment
+from .embeddings import EMBEDDING_BACKENDS, OnnxInt8EmbeddingFunction, get_embedding_function
+from .embedding_server import EmbeddingServer, RemoteEmbeddingFunction, is_server_available
+from .embedding_pool import EmbeddingProcessPool
+from .metrics import Histogram
+from .dispatcher import RetrievalDispatcher
+from .cache import RetrievalCache
+from .compressed import COMPRESSED_MODES, CompressedIndex
+from .sharding import DOMAIN_ALIASES, ShardIndex
+from .geo import CoverageIndex, Gazetteer, Place
+from .constraints import ConstraintIndex, parse_characteristics, parse_guarantees, parse_requirements
+from .dedup import (
+    VARIANT_COUNT_KEY,
+    VARIANTS_KEY,
+    choose_representative,
+    cluster_near_duplicates,
+    parse_variants,
+    strip_variants,
+    variant_metadata,
+)
+from .snapshot import check_fingerprint, export_snapshot, load_snapshot, model_fingerprint, read_manifest
+from .tuning import (
+    HNSW_DEFAULTS,
+    HNSW_TUNING_KEY,
+    collection_hnsw_params,
+    collection_tuning,
+    equivalent_min_score,
+    select_config,
+    sweep_hnsw,
+)
+
+__all__ = [
+    "BM25Index",
+    "tokenize",
+    "reciprocal_rank_fusion",
+    "collection_space",
+    "compute_distances",
+    "distance_to_score",
+    "artifact_path",
+    "generation_name",
+    "generation_number",
+    "read_collection_alias",
+    "remove_artifacts",
+    "write_collection_alias",
+    "solve_assignment",
+    "EMBEDDING_BACKENDS",
+    "OnnxInt8EmbeddingFunction",
+    "get_embedding_function",
+    "EmbeddingServer",
+    "RemoteEmbeddingFunction",
+    "is_server_available",
+    "EmbeddingProcessPool",
+    "Histogram",
+    "RetrievalDispatcher",
+    "RetrievalCache",
+    "COMPRESSED_MODES",
+    "CompressedIndex",
+    "DOMAIN_ALIASES",
+    "ShardIndex",
+    "CoverageIndex",
+    "Gazetteer",
+    "Place",
+    "ConstraintIndex",
+    "parse_characteristics",
+    "parse_guarantees",
+    "parse_requirements",
+    "VARIANT_COUNT_KEY",
+    "VARIANTS_KEY",
+    "choose_representative",
+    "cluster_near_duplicates",
+    "parse_variants",
+    "strip_variants",
+    "variant_metadata",
+    "check_fingerprint",
+    "export_snapshot",
+    "load_snapshot",
+    "model_fingerprint",
+    "read_manifest",
+    "HNSW_DEFAULTS",
+    "HNSW_TUNING_KEY",
+    "collection_hnsw_params",
+    "collection_tuning",
+    "equivalent_min_score",
+    "select_config",
+    "sweep_hnsw",
+]
@@ -0,0 +1,97 @@
+"""
+Affectation optimale sous-intentions -> services
+
+Rôle: Remplacer l'affectation gloutonne (ordre des sous-intentions + seen_ids) par
+      une affectation qui maximise le score total sous contrainte d'unicité
+      (un service ne peut servir qu'une seule sous-intention).
+
+Algorithme: méthode hongroise (chemins augmentants les plus courts, O(n² m)),
+            la boucle interne sur les colonnes étant vectorisée avec NumPy.
+
+Les cases infaisables (candidat absent du pool de la sous-intention) valent -inf :
+l'algorithme minimise d'abord le nombre d'affectations infaisables, puis maximise
+le score. Une ligne affectée à une case infaisable est rendue non affectée (-1).
+"""
+import numpy as np
+
+
+def _hungarian_min_cost(cost: np.ndarray) -> np.ndarray:
+    """
+    Affectation de coût minimal pour une matrice n x m avec n <= m
+
+    Returns:
+        np.ndarray: Colonne affectée à chaque ligne (taille n)
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j] = ligne (1-indexée) affectée à la colonne j
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # Remonter le chemin augmentant
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    row_to_col = np.full(n, -1, dtype=np.int64)
+    for j in range(1, m + 1):
+        if p[j]:
+            row_to_col[p[j] - 1] = j - 1
+    return row_to_col
+
+
+def solve_assignment(scores: np.ndarray) -> np.ndarray:
+    """
+    Affectation maximisant la somme des scores, chaque colonne au plus une fois
+
+    Args:
+        scores: Matrice (sous-intentions x candidats), -inf pour les cases infaisables
+
+    Returns:
+        np.ndarray: Index du candidat retenu pour chaque ligne, -1 si aucun
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n, m = scores.shape
+    if n == 0 or m == 0:
+        return np.full(n, -1, dtype=np.int64)
+
+    feasible = np.isfinite(scores)
+    finite = scores[feasible]
+    # Pénalité supérieure à tout écart de score possible : priorité à la faisabilité
+    big = (np.abs(finite).max() + 1.0) * (n + m) if finite.size else 1.0
+    cost = np.where(feasible, -scores, big)
+
+    if n <= m:
+        row_to_col = _hungarian_min_cost(cost)
+    else:
+        col_to_row = _hungarian_min_cost(cost.T)
+        row_to_col = np.full(n, -1, dtype=np.int64)
+        row_to_col[col_to_row] = np.arange(m)
+
+    assigned = row_to_col >= 0
+    rows = np.nonzero(assigned)[0]
+    row_to_col[rows[~feasible[rows, row_to_col[rows]]]] = -1
+    return row_to_col
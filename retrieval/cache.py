@@ -0,0 +1,114 @@
+"""
+Cache versionné des résultats de recherche de l'Agent 2
+
+Pour un catalogue donné, les candidats retournés pour un texte de requête sont
+déterministes. Le cache les conserve, indexés par
+(texte, top_k, min_score, filtres), pour une version de catalogue donnée.
+
+La version du catalogue est un compteur monotone stocké dans les métadonnées de la
+collection ChromaDB ("catalog_version"), incrémenté à chaque ingestion. Dès qu'une
+nouvelle version est observée, toutes les entrées sont abandonnées d'un coup (échange
+du dictionnaire sous verrou) : aucun résultat d'une ancienne version ne peut être servi.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class RetrievalCache:
+    """
+    Cache LRU des candidats par requête, invalidé par version de catalogue
+
+    Utilisation:
+        cache = RetrievalCache(max_entries=10000)
+        cache.set_version(3)
+        cache.put(3, "5G Paris", 9, 0.5, candidates)
+        cache.get(3, "5G Paris", 9, 0.5)  # -> copie des candidats
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(query: str, top_k: int, min_score: float, filters: Optional[Dict[str, Any]]) -> str:
+        return json.dumps([query, top_k, min_score, filters], sort_keys=True, ensure_ascii=False)
+
+    @staticmethod
+    def _copy(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Les appelants annotent les candidats (domain, alternatives...) : copies superficielles
+        return [dict(candidate) for candidate in candidates]
+
+    def set_version(self, version: int) -> bool:
+        """
+        Déclare la version courante du catalogue
+
+        Returns:
+            bool: True si la version a changé (entrées abandonnées)
+        """
+        with self._lock:
+            if version == self._version:
+                return False
+            changed = self._version is not None
+            self._entries = OrderedDict()
+            self._version = version
+            if changed:
+                self.invalidations += 1
+            return changed
+
+    def get(
+        self,
+        version: int,
+        query: str,
+        top_k: int,
+        min_score: float,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Retourne une copie des candidats en cache, ou None"""
+        key = self._key(query, top_k, min_score, filters)
+        with self._lock:
+            candidates = self._entries.get(key) if version == self._version else None
+            if candidates is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._copy(candidates)
+
+    def put(
+        self,
+        version: int,
+        query: str,
+        top_k: int,
+        min_score: float,
+        candidates: List[Dict[str, Any]],
+        filters: Optional[Dict[str, Any]] = None
+    ):
+        """Enregistre les candidats d'une requête (ignoré si la version est périmée)"""
+        key = self._key(query, top_k, min_score, filters)
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = self._copy(candidates)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "invalidations": self.invalidations
+            }
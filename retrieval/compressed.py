@@ -0,0 +1,436 @@
+"""
+Index vectoriel compressé (float16 / IVF-PQ) pour les très grands catalogues
+
+Rôle: Remplacer la recherche HNSW de ChromaDB lorsque les embeddings float32
+      (384 dimensions) et les graphes HNSW ne tiennent plus dans la RAM des workers
+      (catalogues multi-tenants de plusieurs centaines de milliers de specs).
+
+Modes (settings.compressed_index_mode) :
+- "float16" : embeddings en demi-précision en RAM (2x moins), parcours exhaustif
+- "ivfpq"   : quantificateur grossier IVF (k-means, nlist listes) + quantification
+              produit (PQ, m sous-espaces x 256 centroïdes, 1 octet par sous-espace)
+              des résidus ; distances asymétriques (ADC) calculées sur les codes
+
+Dans les deux modes, la liste courte (rerank candidats) est re-classée avec les
+distances exactes sur les embeddings float32, conservés dans un fichier .npy à côté
+de l'index et projetés en mémoire (mmap) : seules les lignes re-classées sont lues.
+Les distances retournées suivent donc les conventions ChromaDB de l'espace choisi
+(voir scoring.compute_distances) et le score reste 1 / (1 + distance).
+
+Compromis mémoire / recall : pq_m (octets par vecteur), nlist / nprobe (fraction
+du catalogue parcourue) et rerank (taille de la liste courte).
+
+Fichiers (à côté de la collection, voir storage.artifact_path) :
+    {collection}.compressed.npz          -> codes, centroïdes, codebooks, listes
+    {collection}.compressed.vectors.npy  -> embeddings float32 pour le re-classement
+"""
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .scoring import compute_distances
+
+
+COMPRESSED_MODES = ("float16", "ivfpq")
+
+# Nombre de lignes traitées par bloc (borne la mémoire temporaire des distances)
+_CHUNK_ROWS = 65536
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Centroïde le plus proche (L2) de chaque ligne, par blocs"""
+    labels = np.empty(len(x), dtype=np.int32)
+    for start in range(0, len(x), _CHUNK_ROWS):
+        block = x[start:start + _CHUNK_ROWS]
+        labels[start:start + len(block)] = compute_distances(block, centroids, "l2").argmin(axis=1)
+    return labels
+
+
+def kmeans(x: np.ndarray, k: int, iterations: int = 20, seed: int = 0, max_samples: int = 65536) -> np.ndarray:
+    """
+    k-means de Lloyd (NumPy) entraîné sur un échantillon
+
+    Args:
+        x: Données (n, d)
+        k: Nombre de centroïdes
+        iterations: Nombre d'itérations
+        seed: Graine aléatoire
+        max_samples: Taille maximale de l'échantillon d'entraînement
+
+    Returns:
+        np.ndarray: Centroïdes (k, d) float32
+    """
+    rng = np.random.default_rng(seed)
+    if len(x) > max_samples:
+        x = x[rng.choice(len(x), max_samples, replace=False)]
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), k, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        labels = _assign(x, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, x)
+        counts = np.bincount(labels, minlength=k)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():  # listes vides : réinitialisées sur des points tirés au hasard
+            centroids[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+    return centroids
+
+
+class CompressedIndex:
+    """
+    Index vectoriel compressé avec re-classement exact
+
+    Utilisation:
+        index = CompressedIndex.build(ids, vectors, mode="ivfpq", space="l2")
+        index.save("openslice_services.compressed.npz")
+
+        index = CompressedIndex.load("openslice_services.compressed.npz")
+        results = index.search_batch(query_vectors, top_k=5)  # [[(id, distance), ...], ...]
+        index.memory_report()
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        mode: str,
+        space: str,
+        vectors: np.ndarray,
+        vectors16: Optional[np.ndarray] = None,
+        centroids: Optional[np.ndarray] = None,
+        codebooks: Optional[np.ndarray] = None,
+        codes: Optional[np.ndarray] = None,
+        list_offsets: Optional[np.ndarray] = None,
+        list_rows: Optional[np.ndarray] = None,
+        nprobe: int = 8,
+        rerank: int = 100
+    ):
+        if mode not in COMPRESSED_MODES:
+            raise ValueError(f"Mode d'index compressé inconnu: '{mode}'. Modes disponibles: {list(COMPRESSED_MODES)}")
+        self.ids = list(ids)
+        self.mode = mode
+        self.space = space
+        self.vectors = vectors            # float32 (n, d), projeté en mémoire après load()
+        self.vectors16 = vectors16        # float16 (n, d) - mode "float16"
+        self.centroids = centroids        # float32 (nlist, d) - mode "ivfpq"
+        self.codebooks = codebooks        # float32 (m, 256, d / m)
+        self.codes = codes                # uint8 (n, m), ordonnés par liste
+        self.list_offsets = list_offsets  # int64 (nlist + 1) : tranche de chaque liste
+        self.list_rows = list_rows        # int32 (n) : ligne d'origine de chaque code
+        self.nprobe = nprobe
+        self.rerank = rerank
+
+    # ========================================================================
+    # CONSTRUCTION / PERSISTANCE
+    # ========================================================================
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        mode: str = "ivfpq",
+        space: str = "l2",
+        nlist: int = 0,
+        pq_m: int = 48,
+        nprobe: int = 8,
+        rerank: int = 100,
+        seed: int = 0
+    ) -> "CompressedIndex":
+        """
+        Construit l'index à partir des embeddings du catalogue
+
+        Args:
+            ids: Identifiants des services (même ordre que vectors)
+            vectors: Embeddings (n, d)
+            mode: "float16" ou "ivfpq"
+            space: Espace de distance de la collection ("l2", "cosine" ou "ip")
+            nlist: Nombre de listes IVF (0 = 4 * sqrt(n))
+            pq_m: Nombre de sous-espaces PQ (doit diviser d), soit pq_m octets par vecteur
+            nprobe: Nombre de listes parcourues par requête
+            rerank: Taille de la liste courte re-classée exactement
+            seed: Graine des k-means
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        index = cls(ids, mode, space, vectors, nprobe=nprobe, rerank=rerank)
+        if mode == "float16":
+            index.vectors16 = vectors.astype(np.float16)
+            return index
+
+        n, dim = vectors.shape
+        if dim % pq_m:
+            raise ValueError(f"pq_m={pq_m} doit diviser la dimension des embeddings ({dim})")
+        x = index._prepare(vectors)
+        nlist = nlist or max(1, int(4 * np.sqrt(n)))
+        centroids = kmeans(x, nlist, seed=seed)
+        labels = _assign(x, centroids)
+        residuals = x - centroids[labels]
+
+        dsub = dim // pq_m
+        codebooks = np.empty((pq_m, 256, dsub), dtype=np.float32)
+        codes = np.empty((n, pq_m), dtype=np.uint8)
+        for j in range(pq_m):
+            sub = np.ascontiguousarray(residuals[:, j * dsub:(j + 1) * dsub])
+            book = kmeans(sub, 256, seed=seed + j + 1)
+            if len(book) < 256:  # catalogue plus petit que le codebook
+                book = np.vstack([book, np.repeat(book[-1:], 256 - len(book), axis=0)])
+            codebooks[j] = book
+            codes[:, j] = _assign(sub, book)
+
+        order = np.argsort(labels, kind="stable")
+        index.centroids = centroids
+        index.codebooks = codebooks
+        index.codes = codes[order]
+        index.list_rows = order.astype(np.int32)
+        index.list_offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=len(centroids)), out=index.list_offsets[1:])
+        return index
+
+    def updated(self, removed: Set[str], ids: Sequence[str], vectors: np.ndarray) -> "CompressedIndex":
+        """
+        Nouvel index sans les services removed, avec les services ids (ré)indexés
+
+        En mode "ivfpq", les nouveaux vecteurs sont encodés avec les centroïdes et
+        codebooks existants (pas de ré-entraînement) ; une ré-indexation complète
+        (--clear) les ré-entraîne sur tout le catalogue.
+
+        Args:
+            removed: Services à retirer (supprimés ou modifiés)
+            ids: Services à indexer, même ordre que vectors
+            vectors: Embeddings de ces services (len(ids), d)
+        """
+        drop = set(removed) | set(ids)
+        keep = np.fromiter((service_id not in drop for service_id in self.ids), dtype=bool, count=len(self.ids))
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.vectors.shape[1])
+        index = type(self)(
+            [service_id for service_id, k in zip(self.ids, keep) if k] + list(ids),
+            self.mode,
+            self.space,
+            np.ascontiguousarray(np.concatenate([np.asarray(self.vectors)[keep], vectors])),
+            nprobe=self.nprobe,
+            rerank=self.rerank
+        )
+        if self.mode == "float16":
+            index.vectors16 = np.concatenate([self.vectors16[keep], vectors.astype(np.float16)])
+            return index
+
+        # Liste et codes PQ de chaque ligne d'origine
+        labels = np.empty(len(self.ids), dtype=np.int64)
+        labels[self.list_rows] = np.repeat(np.arange(len(self.centroids)), np.diff(self.list_offsets))
+        codes = np.empty_like(self.codes)
+        codes[self.list_rows] = self.codes
+
+        x = index._prepare(vectors)
+        new_labels = _assign(x, self.centroids)
+        residuals = x - self.centroids[new_labels]
+        pq_m, dsub = self.codebooks.shape[0], self.codebooks.shape[2]
+        new_codes = np.empty((len(x), pq_m), dtype=np.uint8)
+        for j in range(pq_m):
+            new_codes[:, j] = _assign(np.ascontiguousarray(residuals[:, j * dsub:(j + 1) * dsub]), self.codebooks[j])
+
+        labels = np.concatenate([labels[keep], new_labels])
+        codes = np.concatenate([codes[keep], new_codes])
+        order = np.argsort(labels, kind="stable")
+        index.centroids = self.centroids
+        index.codebooks = self.codebooks
+        index.codes = codes[order]
+        index.list_rows = order.astype(np.int32)
+        index.list_offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=len(self.centroids)), out=index.list_offsets[1:])
+        return index
+
+    @staticmethod
+    def vectors_path(path: str) -> str:
+        """Fichier des embeddings float32 associé à un index .npz"""
+        return (path[:-4] if path.endswith(".npz") else path) + ".vectors.npy"
+
+    def save(self, path: str):
+        """Sauvegarde l'index (.npz) et les embeddings de re-classement (.npy)"""
+        arrays = {
+            "ids": np.array(self.ids, dtype=np.str_),
+            "config": np.array([self.mode, self.space], dtype=np.str_),
+            "params": np.array([self.nprobe, self.rerank], dtype=np.int64),
+        }
+        if self.mode == "float16":
+            arrays["vectors16"] = self.vectors16
+        else:
+            arrays.update(
+                centroids=self.centroids,
+                codebooks=self.codebooks,
+                codes=self.codes,
+                list_offsets=self.list_offsets,
+                list_rows=self.list_rows
+            )
+        np.savez(path, **arrays)
+        np.save(self.vectors_path(path), np.asarray(self.vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: str, nprobe: Optional[int] = None, rerank: Optional[int] = None) -> "CompressedIndex":
+        """
+        Charge un index sauvegardé par save()
+
+        Les embeddings float32 sont projetés en mémoire (mmap) ; nprobe et rerank
+        peuvent être surchargés sans reconstruire l'index.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            mode, space = data["config"].tolist()
+            saved_nprobe, saved_rerank = (int(x) for x in data["params"])
+            arrays = {name: data[name] for name in data.files if name not in ("ids", "config", "params")}
+            ids = data["ids"].tolist()
+        return cls(
+            ids=ids,
+            mode=mode,
+            space=space,
+            vectors=np.load(cls.vectors_path(path), mmap_mode="r"),
+            nprobe=nprobe or saved_nprobe,
+            rerank=rerank or saved_rerank,
+            **arrays
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ========================================================================
+    # RECHERCHE
+    # ========================================================================
+
+    def _prepare(self, x: np.ndarray) -> np.ndarray:
+        """Espace de la quantification : L2 sur vecteurs normalisés pour cosine / ip"""
+        x = np.asarray(x, dtype=np.float32)
+        return _normalize(x) if self.space in ("cosine", "ip") else x
+
+    def _shortlist_float16(self, queries: np.ndarray, size: int) -> List[np.ndarray]:
+        """Listes courtes par parcours exhaustif des embeddings float16 (toutes les requêtes par bloc)"""
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_dist = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self.vectors16), _CHUNK_ROWS):
+            block = self.vectors16[start:start + _CHUNK_ROWS]
+            rows = np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block)))
+            best_rows = np.concatenate([best_rows, rows], axis=1)
+            best_dist = np.concatenate([best_dist, compute_distances(queries, block, self.space)], axis=1)
+            if best_rows.shape[1] > size:
+                keep = np.argpartition(best_dist, size - 1, axis=1)[:, :size]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_dist = np.take_along_axis(best_dist, keep, axis=1)
+        return list(best_rows)
+
+    def _shortlist_ivfpq(self, queries: np.ndarray, size: int) -> List[np.ndarray]:
+        """
+        Listes courtes par distances asymétriques (ADC) dans les nprobe listes les plus proches
+
+        Avec r = q - c (résidu de la requête pour la liste c) et y le code PQ :
+            ||r - y||² = ||q - c||² + ||y||² + 2 <c, y> - 2 <q, y>
+        <q, y> est calculé une fois par requête et <c, y> une fois par liste parcourue,
+        par produits matriciels sur les codebooks.
+        """
+        prepared = self._prepare(queries)
+        coarse = compute_distances(prepared, self.centroids, "l2")
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(coarse, nprobe - 1, axis=1)[:, :nprobe]
+
+        pq_m, _, dsub = self.codebooks.shape
+        codebook_norms = (self.codebooks ** 2).sum(axis=2)  # (m, 256)
+        query_dots = np.einsum("qmd,mkd->qmk", prepared.reshape(len(prepared), pq_m, dsub), self.codebooks)
+
+        shortlists = []
+        for q, query_probes in enumerate(probes):
+            centroid_dots = np.einsum("pmd,mkd->pmk", self.centroids[query_probes].reshape(-1, pq_m, dsub), self.codebooks)
+            tables = codebook_norms + 2.0 * centroid_dots - 2.0 * query_dots[q]  # (nprobe, m, 256)
+            shortlists.append(self._adc_shortlist(query_probes, coarse[q, query_probes], tables, size))
+        return shortlists
+
+    def _adc_shortlist(self, probes: np.ndarray, coarse: np.ndarray, tables: np.ndarray, size: int) -> np.ndarray:
+        """Liste courte d'une requête à partir des tables de distances de chaque liste parcourue"""
+        sub_index = np.arange(tables.shape[1])
+        rows_parts, dist_parts = [], []
+        for c, base, table in zip(probes, coarse, tables):
+            start, end = self.list_offsets[c], self.list_offsets[c + 1]
+            if start == end:
+                continue
+            dist_parts.append(base + table[sub_index, self.codes[start:end]].sum(axis=1))
+            rows_parts.append(self.list_rows[start:end])
+        if not rows_parts:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(rows_parts)
+        distances = np.concatenate(dist_parts)
+        if len(rows) > size:
+            rows = rows[np.argpartition(distances, size - 1)[:size]]
+        return rows
+
+    def search_batch(self, query_vectors: np.ndarray, top_k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Recherche approchée puis re-classement exact de la liste courte
+
+        Args:
+            query_vectors: Embeddings des requêtes (n_queries, d)
+            top_k: Nombre de résultats par requête
+
+        Returns:
+            List[List[Tuple[str, float]]]: (id, distance exacte) triés par distance croissante
+        """
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        if top_k <= 0 or not self.ids:
+            return [[] for _ in range(len(query_vectors))]
+        size = max(self.rerank, top_k)
+        shortlist = self._shortlist_float16 if self.mode == "float16" else self._shortlist_ivfpq
+
+        results = []
+        for query, rows in zip(query_vectors, shortlist(query_vectors, size)):
+            rows = np.sort(rows)  # lecture séquentielle du mmap
+            if len(rows) == 0:
+                results.append([])
+                continue
+            distances = compute_distances(query[None, :], self.vectors[rows], self.space)[0]
+            order = np.argsort(distances, kind="stable")[:top_k]
+            results.append([(self.ids[rows[i]], float(distances[i])) for i in order])
+        return results
+
+    def search(self, query_vector: np.ndarray, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Recherche pour une seule requête"""
+        return self.search_batch(np.asarray(query_vector)[None, :], top_k=top_k)[0]
+
+    # ========================================================================
+    # EMPREINTE MÉMOIRE
+    # ========================================================================
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Empreinte mémoire de l'index
+
+        Returns:
+            Dict: octets résidents par composant, octets projetés (re-classement,
+                  lus à la demande) et ratio par rapport aux embeddings float32
+        """
+        n = len(self.ids)
+        dim = self.vectors.shape[1] if n else 0
+        components = {
+            "vectors16": self.vectors16,
+            "centroids": self.centroids,
+            "codebooks": self.codebooks,
+            "codes": self.codes,
+            "list_offsets": self.list_offsets,
+            "list_rows": self.list_rows,
+        }
+        resident = {name: int(array.nbytes) for name, array in components.items() if array is not None}
+        resident_total = sum(resident.values())
+        float32_bytes = n * dim * 4
+        return {
+            "mode": self.mode,
+            "space": self.space,
+            "count": n,
+            "dim": dim,
+            "nlist": len(self.centroids) if self.centroids is not None else None,
+            "pq_m": self.codebooks.shape[0] if self.codebooks is not None else None,
+            "nprobe": self.nprobe,
+            "rerank": self.rerank,
+            "resident_bytes": resident,
+            "resident_total_bytes": resident_total,
+            "bytes_per_vector": round(resident_total / n, 2) if n else 0,
+            "mapped_rerank_bytes": int(self.vectors.nbytes),
+            "float32_bytes": float32_bytes,
+            "compression_ratio": round(float32_bytes / resident_total, 2) if resident_total else None,
+        }
@@ -0,0 +1,321 @@
+"""
+Index des contraintes numériques du catalogue (faisabilité des services)
+
+Rôle: Écarter avant tout classement les services qui ne peuvent pas satisfaire les
+      exigences chiffrées d'une sous-intention (cpu >= 4, max_latency <= 5ms...),
+      pour qu'ils n'occupent ni le pool de candidats ni le prompt de l'Agent 3.
+
+- Les caractéristiques TMF633 typées (vCPU, RAM_GB, valueFrom / valueTo...) et les
+  garanties citées dans les descriptions ("latence < 5ms", "10 Gbps") sont
+  normalisées en intervalles [min, max] dans une unité canonique par attribut
+- Chaque attribut est stocké dans deux tableaux triés (bornes min et max) : une
+  exigence est vérifiée pour tout le catalogue par une recherche dichotomique
+  (np.searchsorted), sans parcourir les services
+- Un service dont l'attribut est inconnu n'est jamais écarté
+
+Fichier (à côté de la collection, voir storage.artifact_path) :
+    {collection}.constraints.npz  -> identifiants, bornes triées par attribut
+"""
+import re
+from typing import Any, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+# Attribut canonique -> (sens, synonymes). "min" : plus grand = meilleur (l'offre
+# maximale du service doit atteindre l'exigence) ; "max" : plus petit = meilleur
+# (la meilleure valeur garantie doit rester sous l'exigence).
+ATTRIBUTES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "cpu": ("min", ("cpu", "vcpu", "vcpus", "cores", "cpu_cores", "num_cpu", "cpus")),
+    "ram_gb": ("min", ("ram", "memory", "mem", "ram_gb", "memory_gb")),
+    "storage_gb": ("min", ("storage", "disk", "storage_gb", "disk_gb", "volume")),
+    "gpu": ("min", ("gpu", "gpus", "num_gpu")),
+    "bandwidth_mbps": ("min", ("bandwidth", "throughput", "bandwidth_mbps", "downlink", "debit", "data_rate")),
+    "users": ("min", ("users", "max_users", "capacity", "connections", "devices")),
+    "availability_pct": ("min", ("availability", "uptime", "sla")),
+    "latency_ms": ("max", ("latency", "latency_ms", "delay", "rtt")),
+    "jitter_ms": ("max", ("jitter", "jitter_ms")),
+}
+
+# Unités -> facteur vers l'unité canonique de leur famille (Go, ms, Mbit/s)
+_UNITS: Dict[str, float] = {
+    "kb": 1 / (1024 * 1024), "mb": 1 / 1024, "gb": 1.0, "tb": 1024.0,
+    "ko": 1 / (1024 * 1024), "mo": 1 / 1024, "go": 1.0, "to": 1024.0,
+    "us": 0.001, "µs": 0.001, "ms": 1.0, "s": 1000.0,
+    "kbps": 0.001, "mbps": 1.0, "gbps": 1000.0, "tbps": 1_000_000.0,
+    "kb/s": 0.001, "mb/s": 1.0, "gb/s": 1000.0, "kbit/s": 0.001, "mbit/s": 1.0, "gbit/s": 1000.0,
+    "%": 1.0,
+}
+
+_SYNONYMS = {synonym: attribute for attribute, (_, synonyms) in ATTRIBUTES.items() for synonym in synonyms}
+
+_QUANTITY = re.compile(r"(-?\d+(?:[.,]\d+)?)\s*([a-zµ%]+(?:/s)?)?", re.IGNORECASE)
+
+# Garanties de qualité de service dans les descriptions (français / anglais)
+_GUARANTEES = [
+    ("latency_ms", re.compile(
+        r"(?:latence|latency|delay|d[ée]lai)[^\d<>≤]{0,25}(?:[<≤]=?|under|below|inf[ée]rieure? [àa]|max(?:imum)?)?\s*"
+        r"(\d+(?:[.,]\d+)?)\s*(µs|us|ms|s)\b", re.IGNORECASE)),
+    ("jitter_ms", re.compile(
+        r"(?:gigue|jitter)[^\d<>≤]{0,25}(?:[<≤]=?)?\s*(\d+(?:[.,]\d+)?)\s*(µs|us|ms)\b", re.IGNORECASE)),
+    ("bandwidth_mbps", re.compile(
+        r"(\d+(?:[.,]\d+)?)\s*(kbps|mbps|gbps|tbps|[kmgt]b/s|[kmgt]bit/s)(?![a-z])", re.IGNORECASE)),
+    ("availability_pct", re.compile(
+        r"(\d{2}(?:[.,]\d+)?)\s*(%)\s*(?:de\s+)?(?:disponibilit|availability|uptime|sla)", re.IGNORECASE)),
+]
+
+
+def attribute_for(name: str) -> Tuple[Optional[str], float]:
+    """
+    Attribut canonique d'une exigence ou d'une caractéristique
+
+    Les préfixes min_ / max_ et un suffixe d'unité ("RAM_GB", "latency_ms") sont
+    reconnus ; le facteur retourné convertit une valeur sans unité.
+
+    Returns:
+        (attribut ou None, facteur de l'unité du nom)
+    """
+    tokens = [t for t in re.split(r"[^a-z0-9%]+", name.strip().lower()) if t]
+    while tokens and tokens[0] in ("min", "max", "minimum", "maximum", "target", "required", "num", "nb"):
+        tokens = tokens[1:]
+    if not tokens:
+        return None, 1.0
+    key = "_".join(tokens)
+    if key in _SYNONYMS:
+        attribute = _SYNONYMS[key]
+        return attribute, _UNITS.get(tokens[-1], 1.0) if len(tokens) > 1 else 1.0
+    if len(tokens) > 1 and tokens[-1] in _UNITS:
+        attribute = _SYNONYMS.get("_".join(tokens[:-1]))
+        if attribute:
+            return attribute, _UNITS[tokens[-1]]
+    return None, 1.0
+
+
+def parse_quantity(value: Any, default_scale: float = 1.0) -> Optional[float]:
+    """
+    Valeur numérique dans l'unité canonique ("32GB" -> 32, "512MB" -> 0.5,
+    "1s" -> 1000, "10Gbps" -> 10000, 4 -> 4) ; None si la valeur n'est pas chiffrée
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) * default_scale
+    match = _QUANTITY.search(str(value))
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", "."))
+    unit = (match.group(2) or "").lower()
+    if unit in _UNITS:
+        return number * _UNITS[unit]
+    return number * default_scale
+
+
+def parse_requirements(*requirements: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Exigences chiffrées d'une sous-intention, par attribut canonique
+
+    Les dictionnaires sont fusionnés dans l'ordre (les derniers l'emportent) :
+    parse_requirements(intent.qos, sub_intent.requirements)
+    """
+    constraints: Dict[str, float] = {}
+    for source in requirements:
+        for key, value in (source or {}).items():
+            attribute, scale = attribute_for(str(key))
+            if attribute is None:
+                continue
+            quantity = parse_quantity(value, scale)
+            if quantity is not None:
+                constraints[attribute] = quantity
+    return constraints
+
+
+def parse_characteristics(characteristics: Iterable[Dict[str, Any]]) -> Dict[str, Tuple[float, float]]:
+    """
+    Intervalles [min, max] des caractéristiques TMF633 chiffrées d'une spécification
+
+    Chaque serviceSpecCharacteristicValue contribue sa valeur ("value") ou son
+    intervalle (valueFrom / valueTo) ; les valeurs possibles d'une caractéristique
+    forment l'intervalle de configurations offertes.
+    """
+    ranges: Dict[str, Tuple[float, float]] = {}
+    for char in characteristics or []:
+        attribute, scale = attribute_for(str(char.get("name", "")))
+        if attribute is None:
+            continue
+        values = []
+        for spec_value in char.get("serviceSpecCharacteristicValue") or []:
+            unit_scale = _UNITS.get(str(spec_value.get("unitOfMeasure", "")).strip().lower(), scale)
+            for field in ("value", "valueFrom", "valueTo"):
+                quantity = parse_quantity(spec_value.get(field), unit_scale)
+                if quantity is not None:
+                    values.append(quantity)
+        if values:
+            lo, hi = ranges.get(attribute, (min(values), max(values)))
+            ranges[attribute] = (min(lo, *values), max(hi, *values))
+    return ranges
+
+
+def parse_guarantees(text: str) -> Dict[str, Tuple[float, float]]:
+    """Garanties chiffrées citées dans un texte ("latence < 5ms" -> latency_ms: (5, 5))"""
+    ranges: Dict[str, Tuple[float, float]] = {}
+    for attribute, pattern in _GUARANTEES:
+        values = [
+            float(number.replace(",", ".")) * _UNITS[unit.lower()]
+            for number, unit in pattern.findall(text or "")
+        ]
+        if values:
+            ranges[attribute] = (min(values), max(values))
+    return ranges
+
+
+class ConstraintIndex:
+    """
+    Intervalles numériques des services en tableaux triés par attribut
+
+    Utilisation:
+        index = ConstraintIndex.build(ids, ranges)   # ranges[i] = {"cpu": (2, 8), ...}
+        index.save("openslice_services.constraints.npz")
+
+        index = ConstraintIndex.load("openslice_services.constraints.npz")
+        index.infeasible({"cpu": 4, "latency_ms": 5})   # -> {service_id, ...}
+    """
+
+    def __init__(self, ids: Sequence[str], columns: Dict[str, Dict[str, np.ndarray]]):
+        self.ids = list(ids)
+        # attribut -> {"lo": bornes min triées, "lo_rows": services, "hi": ..., "hi_rows": ...}
+        self.columns = columns
+
+    # ========================================================================
+    # CONSTRUCTION / PERSISTANCE
+    # ========================================================================
+
+    @classmethod
+    def build(cls, ids: Sequence[str], ranges: Sequence[Dict[str, Tuple[float, float]]]) -> "ConstraintIndex":
+        """
+        Args:
+            ids: Identifiants des services
+            ranges: Intervalles connus de chaque service (attribut -> (min, max))
+        """
+        columns = {}
+        for attribute in sorted({a for service_ranges in ranges for a in service_ranges}):
+            rows = np.array([s for s, r in enumerate(ranges) if attribute in r], dtype=np.int64)
+            lo = np.array([ranges[s][attribute][0] for s in rows], dtype=np.float64)
+            hi = np.array([ranges[s][attribute][1] for s in rows], dtype=np.float64)
+            lo_order, hi_order = np.argsort(lo, kind="stable"), np.argsort(hi, kind="stable")
+            columns[attribute] = {
+                "lo": lo[lo_order], "lo_rows": rows[lo_order],
+                "hi": hi[hi_order], "hi_rows": rows[hi_order],
+            }
+        return cls(ids, columns)
+
+    def updated(
+        self,
+        removed: Set[str],
+        ids: Sequence[str],
+        ranges: Sequence[Dict[str, Tuple[float, float]]]
+    ) -> "ConstraintIndex":
+        """
+        Nouvel index sans les services removed, avec les services ids (ré)indexés
+
+        Les bornes des autres services sont reprises des tableaux triés de l'index.
+
+        Args:
+            removed: Services à retirer (supprimés ou modifiés)
+            ids: Services à indexer, même ordre que ranges
+            ranges: Intervalles connus de chaque service (attribut -> (min, max))
+        """
+        drop = set(removed) | set(ids)
+        keep = np.fromiter((service_id not in drop for service_id in self.ids), dtype=bool, count=len(self.ids))
+        rows = np.cumsum(keep) - 1
+        start = int(keep.sum())
+        columns = {}
+        for attribute in sorted(set(self.columns) | {a for service_ranges in ranges for a in service_ranges}):
+            column = self.columns.get(attribute)
+            new_rows = np.array([start + s for s, r in enumerate(ranges) if attribute in r], dtype=np.int64)
+            merged = {}
+            for side, bound in (("lo", 0), ("hi", 1)):
+                values = np.array([r[attribute][bound] for r in ranges if attribute in r], dtype=np.float64)
+                service_rows = new_rows
+                if column is not None:
+                    kept = keep[column[f"{side}_rows"]]
+                    values = np.concatenate([column[side][kept], values])
+                    service_rows = np.concatenate([rows[column[f"{side}_rows"][kept]], new_rows])
+                order = np.argsort(values, kind="stable")
+                merged[side], merged[f"{side}_rows"] = values[order], service_rows[order]
+            if len(merged["lo"]):
+                columns[attribute] = merged
+        new_ids = [service_id for service_id, k in zip(self.ids, keep) if k] + list(ids)
+        return type(self)(new_ids, columns)
+
+    def save(self, path: str):
+        """Sauvegarde l'index au format .npz"""
+        arrays = {
+            f"{attribute}.{key}": array
+            for attribute, column in self.columns.items()
+            for key, array in column.items()
+        }
+        np.savez(path, ids=np.array(self.ids, dtype=np.str_), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "ConstraintIndex":
+        """Charge un index sauvegardé par save()"""
+        columns: Dict[str, Dict[str, np.ndarray]] = {}
+        with np.load(path, allow_pickle=False) as data:
+            for name in data.files:
+                if name == "ids":
+                    continue
+                attribute, key = name.rsplit(".", 1)
+                columns.setdefault(attribute, {})[key] = data[name]
+            return cls(data["ids"].tolist(), columns)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ========================================================================
+    # FAISABILITÉ
+    # ========================================================================
+
+    def infeasible_mask(self, constraints: Dict[str, float]) -> np.ndarray:
+        """
+        Masque des services qui ne peuvent pas satisfaire les exigences
+
+        Pour chaque attribut, les services faisables sont une tranche contiguë du
+        tableau trié (suffixe des bornes max pour "min", préfixe des bornes min pour
+        "max") trouvée par np.searchsorted ; les autres services connus sont écartés.
+        """
+        infeasible = np.zeros(len(self.ids), dtype=bool)
+        for attribute, required in constraints.items():
+            column = self.columns.get(attribute)
+            if column is None or attribute not in ATTRIBUTES:
+                continue
+            if ATTRIBUTES[attribute][0] == "min":
+                cut = int(np.searchsorted(column["hi"], required, side="left"))
+                infeasible[column["hi_rows"][:cut]] = True
+            else:
+                cut = int(np.searchsorted(column["lo"], required, side="right"))
+                infeasible[column["lo_rows"][cut:]] = True
+        return infeasible
+
+    def infeasible(self, constraints: Optional[Dict[str, float]]) -> Set[str]:
+        """Identifiants des services écartés par les exigences"""
+        if not constraints:
+            return set()
+        return {self.ids[s] for s in np.flatnonzero(self.infeasible_mask(constraints))}
+
+    def ranges_of(self, service_id: str) -> Dict[str, Tuple[float, float]]:
+        """Intervalles connus d'un service (attribut -> (min, max))"""
+        try:
+            s = self.ids.index(service_id)
+        except ValueError:
+            return {}
+        ranges = {}
+        for attribute, column in self.columns.items():
+            lo = np.flatnonzero(column["lo_rows"] == s)
+            if len(lo):
+                hi = np.flatnonzero(column["hi_rows"] == s)
+                ranges[attribute] = (float(column["lo"][lo[0]]), float(column["hi"][hi[0]]))
+        return ranges
+
+    def stats(self) -> Dict[str, Any]:
+        """Nombre de services dont chaque attribut est connu"""
+        return {"services": len(self.ids), "attributes": {a: len(c["lo"]) for a, c in self.columns.items()}}
@@ -0,0 +1,134 @@
+"""
+Détection des quasi-doublons du catalogue (versions, clones par région, copies de test)
+
+Rôle: Regrouper à l'ingestion les ServiceSpecifications dont les embeddings sont
+      quasi identiques, pour n'indexer qu'un représentant par groupe (ses variantes
+      étant rattachées à ses métadonnées). Le top-k et les 'alternatives' de
+      l'Agent 2 ne sont plus encombrés de copies du même service.
+
+- Similarité cosinus calculée par blocs (produit matriciel NumPy, mémoire bornée
+  par block_size x taille du groupe)
+- Seuls les services de même signature (catégorie, localisation, contraintes...)
+  peuvent être regroupés : les filtres de couverture et de faisabilité restent exacts
+- Regroupement transitif (union-find) : A~B et B~C placent A, B et C ensemble
+- Mode incrémental : seuls les services modifiés sont comparés au reste du groupe
+"""
+import json
+import re
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+# Métadonnées des représentants (JSON des variantes, nombre de variantes)
+VARIANTS_KEY = "variants"
+VARIANT_COUNT_KEY = "variant_count"
+
+
+def _find(parent: np.ndarray, i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_near_duplicates(
+    vectors: np.ndarray,
+    groups: Sequence[Hashable],
+    threshold: float = 0.97,
+    block_size: int = 1024,
+    candidates: Optional[Iterable[int]] = None
+) -> np.ndarray:
+    """
+    Regroupe les vecteurs dont la similarité cosinus atteint le seuil
+
+    Args:
+        vectors: Embeddings (n, dim)
+        groups: Signature de chaque ligne ; seules des lignes de même signature
+                peuvent être regroupées
+        threshold: Similarité cosinus minimale entre deux quasi-doublons
+        block_size: Lignes comparées par produit matriciel
+        candidates: Lignes à comparer au reste de leur groupe (None = toutes)
+
+    Returns:
+        np.ndarray: Étiquette de groupe de chaque ligne (indice de la racine)
+    """
+    n = len(vectors)
+    parent = np.arange(n)
+    if n < 2:
+        return parent
+    unit = np.asarray(vectors, dtype=np.float32)
+    unit = unit / np.maximum(np.linalg.norm(unit, axis=1, keepdims=True), 1e-12)
+
+    members: Dict[Hashable, List[int]] = defaultdict(list)
+    for row, group in enumerate(groups):
+        members[group].append(row)
+    candidate_set = None if candidates is None else set(candidates)
+
+    for rows in members.values():
+        if len(rows) < 2:
+            continue
+        rows = np.asarray(rows)
+        if candidate_set is None:
+            queries = rows
+        else:
+            queries = np.asarray([row for row in rows if row in candidate_set], dtype=int)
+            if not len(queries):
+                continue
+        group_vectors = unit[rows]
+        for start in range(0, len(queries), block_size):
+            block = queries[start:start + block_size]
+            similarities = unit[block] @ group_vectors.T
+            hits_q, hits_g = np.nonzero(similarities >= threshold)
+            for q, g in zip(block[hits_q], rows[hits_g]):
+                if q != g:
+                    a, b = _find(parent, q), _find(parent, g)
+                    if a != b:
+                        parent[max(a, b)] = min(a, b)
+    return np.asarray([_find(parent, i) for i in range(n)])
+
+
+def version_key(version: Any) -> tuple:
+    """Clé de tri d'une version ("2.10.1" > "2.9") ; les versions absentes sont les plus anciennes"""
+    return tuple(int(part) for part in re.findall(r"\d+", str(version or "")))
+
+
+def choose_representative(metadatas: Sequence[Dict[str, Any]], ids: Sequence[str]) -> int:
+    """
+    Indice du représentant d'un groupe : version la plus récente, puis plus petit id
+
+    Args:
+        metadatas: Métadonnées des membres du groupe
+        ids: Identifiants des membres du groupe
+    """
+    # max() garde le premier maximum : parcours par id croissant pour départager les égalités
+    return max(
+        sorted(range(len(ids)), key=lambda i: ids[i]),
+        key=lambda i: version_key((metadatas[i] or {}).get("version"))
+    )
+
+
+def parse_variants(metadata: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Variantes rattachées à un représentant ({"id", "document", "metadata"}), [] sinon"""
+    raw = (metadata or {}).get(VARIANTS_KEY)
+    if not raw:
+        return []
+    try:
+        variants = json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+    return variants if isinstance(variants, list) else []
+
+
+def variant_metadata(variants: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Métadonnées ChromaDB d'un représentant portant ses variantes (valeurs scalaires)"""
+    return {
+        VARIANTS_KEY: json.dumps(list(variants), ensure_ascii=False, sort_keys=True),
+        VARIANT_COUNT_KEY: len(variants),
+    }
+
+
+def strip_variants(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Métadonnées d'un service sans ses variantes"""
+    return {k: v for k, v in (metadata or {}).items() if k not in (VARIANTS_KEY, VARIANT_COUNT_KEY)}
@@ -0,0 +1,238 @@
+"""
+Micro-batching des requêtes de recherche entre appels concurrents
+
+Rôle: Sous charge (serveur asynchrone, mode batch), chaque pipeline envoie sa propre
+      petite requête ChromaDB de 1 à 5 textes. Le dispatcher regroupe les textes de
+      tous les appels select_services() concurrents pendant une fenêtre courte
+      (ex: 2 ms ou 64 requêtes), exécute un seul encodage + top-k pour le lot, puis
+      redistribue les résultats aux appelants en attente.
+
+Architecture:
+    select_services() (thread A) --\\
+    select_services() (thread B) ---> RetrievalDispatcher --> _retrieve_batch(lot)
+    select_services() (thread C) --/        (1 thread)
+
+Métriques: histogrammes de taille de lot (requêtes) et d'attente en file (ms).
+Latences: les latences par composant du lot (lues par timings() sur le thread du
+dispatcher) reviennent à chaque appelant avec ses candidats, dans last_timings.
+"""
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import Histogram
+
+
+RetrieveBatchFn = Callable[..., List[List[Dict[str, Any]]]]
+TimingsFn = Callable[[], Dict[str, float]]
+
+
+@dataclass
+class _PendingRequest:
+    """Requête d'un appelant en attente dans la file du dispatcher"""
+    queries: List[str]
+    top_k: int
+    min_score: float
+    filters: List[Optional[Dict[str, Any]]]
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+def _fail(request: _PendingRequest, error: Exception):
+    """Transmet l'erreur à l'appelant s'il n'a pas encore de résultat"""
+    if not request.future.done():
+        request.future.set_exception(error)
+
+
+def _query_key(query: str, filters: Optional[Dict[str, Any]]) -> tuple:
+    return query, json.dumps(filters, sort_keys=True, ensure_ascii=False)
+
+
+class RetrievalDispatcher:
+    """
+    Regroupe les requêtes concurrentes en lots pour la fonction de recherche
+
+    Utilisation:
+        dispatcher = RetrievalDispatcher(agent._retrieve_batch, window_ms=2.0, max_batch_size=64)
+        candidates_per_query = dispatcher.submit(queries, top_k=9, min_score=0.5)
+        dispatcher.last_timings   # latences du lot qui a servi cet appel (thread courant)
+    """
+
+    def __init__(
+        self,
+        retrieve_batch: RetrieveBatchFn,
+        window_ms: float = 2.0,
+        max_batch_size: int = 64,
+        timeout: Optional[float] = 30.0,
+        timings: Optional[TimingsFn] = None
+    ):
+        """
+        Args:
+            retrieve_batch: Fonction (queries, top_k=..., min_score=..., filters=...) -> candidats par requête
+            window_ms: Durée maximale d'accumulation d'un lot (ms)
+            max_batch_size: Nombre de requêtes qui déclenche l'envoi immédiat du lot
+            timeout: Attente maximale d'un appelant (secondes, None = illimitée)
+            timings: Latences par composant du dernier appel à retrieve_batch sur le
+                     thread courant (ex: lambda: agent.last_timings), optionnel
+        """
+        self.retrieve_batch = retrieve_batch
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.timings = timings
+
+        self.batch_size_histogram = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.queue_wait_histogram = Histogram([0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100])
+
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._stopped = threading.Event()
+        self._submit_lock = threading.Lock()
+        self._local = threading.local()
+        self._worker = threading.Thread(target=self._run, name="retrieval-dispatcher", daemon=True)
+        self._worker.start()
+
+    def submit(
+        self,
+        queries: List[str],
+        top_k: int,
+        min_score: float,
+        filters: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Soumet les requêtes d'un appelant et attend leurs candidats
+
+        Args:
+            queries: Textes des requêtes
+            top_k: Nombre de candidats par requête
+            min_score: Score minimal
+            filters: Indications par requête (domaine de la sous-intention...), optionnel
+
+        Returns:
+            List[List[Dict]]: Candidats par requête, dans l'ordre de queries
+
+        Raises:
+            TimeoutError: Pas de résultat après self.timeout secondes
+        """
+        if not queries:
+            self._local.timings = {}
+            return []
+        request = _PendingRequest(list(queries), top_k, min_score, list(filters or [None] * len(queries)))
+        with self._submit_lock:
+            stopped = self._stopped.is_set()
+            if not stopped:
+                self._queue.put(request)
+        if stopped:
+            # Dispatcher arrêté : recherche directe, sans regroupement
+            results = self.retrieve_batch(request.queries, top_k=top_k, min_score=min_score, filters=request.filters)
+            self._local.timings = self._batch_timings()
+            return results
+        try:
+            results, timings = request.future.result(self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Pas de résultat du dispatcher de recherche en {self.timeout}s")
+        self._local.timings = timings
+        return results
+
+    @property
+    def last_timings(self) -> Dict[str, float]:
+        """Latences par composant (ms) du lot qui a servi le dernier submit() du thread courant"""
+        return getattr(self._local, "timings", {})
+
+    def _batch_timings(self) -> Dict[str, float]:
+        return dict(self.timings()) if self.timings else {}
+
+    def _collect(self, first: _PendingRequest) -> List[_PendingRequest]:
+        """Accumule les requêtes jusqu'à la fin de la fenêtre ou max_batch_size"""
+        batch = [first]
+        n_queries = len(first.queries)
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while n_queries < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_queries += len(request.queries)
+        return batch
+
+    def _run(self):
+        # Après close(), les requêtes déjà en file sont encore servies
+        while not (self._stopped.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = self._collect(first)
+            try:
+                self._serve(batch)
+            except Exception as e:
+                # Aucun appelant ne reste bloqué, le thread continue avec le lot suivant
+                for request in batch:
+                    _fail(request, e)
+
+    def _serve(self, batch: List[_PendingRequest]):
+        """Exécute un lot et transmet à chaque appelant ses candidats (ou l'erreur)"""
+        started = time.perf_counter()
+        for request in batch:
+            self.queue_wait_histogram.observe((started - request.enqueued_at) * 1000)
+
+        # Un appel par combinaison (top_k, min_score), requêtes identiques
+        # (même texte, mêmes filtres) dédupliquées
+        groups: Dict[tuple, List[_PendingRequest]] = {}
+        for request in batch:
+            groups.setdefault((request.top_k, request.min_score), []).append(request)
+
+        for (top_k, min_score), requests in groups.items():
+            try:
+                unique: Dict[tuple, tuple] = {}
+                for request in requests:
+                    for q, f in zip(request.queries, request.filters):
+                        unique.setdefault(_query_key(q, f), (q, f))
+                keys = list(unique)
+                results = self.retrieve_batch(
+                    [unique[key][0] for key in keys],
+                    top_k=top_k,
+                    min_score=min_score,
+                    filters=[unique[key][1] for key in keys]
+                )
+                if len(results) != len(keys):
+                    raise RuntimeError(f"{len(results)} résultat(s) pour {len(keys)} requête(s)")
+                self.batch_size_histogram.observe(len(keys))
+                timings = self._batch_timings()
+                by_key = dict(zip(keys, results))
+                for request in requests:
+                    # Copies : chaque appelant annote ses propres candidats (domain, alternatives...)
+                    request.future.set_result(([
+                        [dict(candidate) for candidate in by_key[_query_key(q, f)]]
+                        for q, f in zip(request.queries, request.filters)
+                    ], {"queue_ms": (started - request.enqueued_at) * 1000, **timings}))
+            except Exception as e:
+                for request in requests:
+                    _fail(request, e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Histogrammes de taille de lot et d'attente en file"""
+        return {
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_ms": self.queue_wait_histogram.snapshot()
+        }
+
+    def close(self):
+        """
+        Arrête le thread du dispatcher une fois la file vidée
+
+        Les appels à submit() suivants font une recherche directe.
+        """
+        with self._submit_lock:
+            self._stopped.set()
+        self._worker.join(timeout=5.0)
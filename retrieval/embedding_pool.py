@@ -0,0 +1,122 @@
+"""
+Encodage multi-processus des documents (ingestion des grands catalogues)
+
+Rôle: Répartir l'encodage des lots de scripts/ingest_catalog.py sur plusieurs
+      processus. Chaque processus charge sa propre copie du modèle d'embeddings
+      (sentence-transformers ou onnx-int8) avec un nombre de threads fixé, pour que
+      les processus ne se disputent pas les cœurs CPU. Les vecteurs reviennent au
+      processus parent, qui les écrit dans ChromaDB (upsert avec embeddings=).
+
+- Contexte "spawn" : aucun état PyTorch / ONNX Runtime hérité par fork
+- Threads par processus = cœurs disponibles / processus (sauf valeur explicite)
+- Le service d'embeddings partagé n'est pas utilisé par les processus : il
+  sérialiserait les lots sur un seul modèle
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from config import settings
+
+
+# Variables lues par OpenMP / MKL / BLAS au chargement des bibliothèques natives
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Fonction d'embeddings du processus de travail (initialisée une fois par processus)
+_worker_function = None
+
+
+def _init_worker(model_name: str, backend: str, num_threads: int, factory: Optional[Callable] = None):
+    """Charge le modèle dans le processus de travail avec un nombre de threads fixé"""
+    global _worker_function
+    for name in _THREAD_ENV_VARS:
+        os.environ[name] = str(num_threads)
+
+    if factory is not None:
+        _worker_function = factory()
+        return
+
+    if backend == "onnx-int8":
+        from .embeddings import OnnxInt8EmbeddingFunction
+        _worker_function = OnnxInt8EmbeddingFunction(
+            model_dir=settings.onnx_model_dir,
+            num_threads=num_threads
+        )
+        return
+
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+    from .embeddings import get_embedding_function
+    _worker_function = get_embedding_function(model_name=model_name, backend=backend, use_service=False)
+
+
+def _encode(documents: List[str]) -> np.ndarray:
+    return np.asarray(_worker_function(documents), dtype=np.float32)
+
+
+class EmbeddingProcessPool:
+    """
+    Pool de processus d'encodage, un modèle par processus
+
+    Utilisation:
+        with EmbeddingProcessPool(processes=4) as pool:
+            vectors = pool.encode(documents)  # np.ndarray (n, dim) float32
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        threads_per_process: int = 0,
+        model_name: Optional[str] = None,
+        backend: Optional[str] = None,
+        factory: Optional[Callable] = None
+    ):
+        """
+        Args:
+            processes: Nombre de processus d'encodage
+            threads_per_process: Threads du modèle par processus (0 = cœurs / processus)
+            model_name: Modèle sentence-transformers (défaut: settings.embedding_model)
+            backend: Backend d'embeddings (défaut: settings.embedding_backend)
+            factory: Fonction sans argument, importable par les processus "spawn", qui
+                     crée la fonction d'embeddings de chaque processus (remplace
+                     model_name / backend, ex: modèle maison ou tests)
+        """
+        self.processes = max(1, processes)
+        self.threads_per_process = threads_per_process or max(1, (os.cpu_count() or 1) // self.processes)
+        self.model_name = model_name or settings.embedding_model
+        self.backend = backend or settings.embedding_backend
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.backend, self.threads_per_process, factory)
+        )
+
+    def encode(self, documents: List[str]) -> np.ndarray:
+        """
+        Encode un lot de documents dans un processus de travail (appel bloquant)
+
+        Plusieurs threads peuvent appeler encode() en même temps : les lots sont alors
+        encodés en parallèle, un par processus.
+        """
+        return self._executor.submit(_encode, list(documents)).result()
+
+    def __call__(self, documents: List[str]) -> np.ndarray:
+        return self.encode(documents)
+
+    def close(self):
+        """Arrête les processus de travail"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "EmbeddingProcessPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
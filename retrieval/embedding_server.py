@@ -0,0 +1,376 @@
+"""
+Service d'embeddings partagé par machine (socket Unix)
+
+Rôle: Charger le modèle d'embeddings une seule fois par machine. Streamlit, les
+      exécutions CLI, l'ingestion et les scripts de test se connectent au démon au
+      lieu de charger chacun leur copie de MiniLM (plusieurs centaines de Mo de RSS).
+
+Architecture:
+    ServiceSelectorAgent / ingest_catalog.py
+        -> RemoteEmbeddingFunction (client, connexion persistante par thread)
+        -> socket Unix (settings.embedding_socket_path)
+        -> EmbeddingServer : micro-batching dynamique des textes reçus
+        -> fonction d'embeddings en mémoire (sentence-transformers ou onnx-int8)
+
+Protocole (trames préfixées par leur longueur, 4 octets big-endian) :
+    requête  : JSON {"op": "embed", "texts": [...]} ou {"op": "info"}
+    réponse  : JSON {"shape": [n, dim]} suivi d'une trame binaire float32 (embed)
+               JSON {"model": ..., "backend": ...} (info)
+               JSON {"error": "..."} en cas d'échec ou de trame invalide (la
+               connexion reste ouverte)
+
+Micro-batching: les textes de toutes les connexions sont regroupés pendant au plus
+max_wait_ms ou jusqu'à max_batch_size textes, encodés en un seul appel au modèle,
+puis redistribués à chaque appelant.
+"""
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+
+_HEADER = struct.Struct(">I")
+
+
+def _send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connexion fermée par le pair")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return _recv_exact(sock, size)
+
+
+# ============================================================================
+# SERVEUR
+# ============================================================================
+
+class EmbeddingServer:
+    """
+    Démon d'embeddings avec micro-batching dynamique
+
+    Utilisation:
+        server = EmbeddingServer("/tmp/ibn-embeddings.sock", embedding_function,
+                                 model_name="...", backend="sentence-transformers")
+        server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        embedding_function: EmbeddingFunction,
+        model_name: str,
+        backend: str,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self.socket_path = socket_path
+        self.embedding_function = embedding_function
+        self.model_name = model_name
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._pending: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._stopped = threading.Event()
+        self._server = None
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+
+    def _count(self, **increments: int):
+        """Incrémente les compteurs de self.stats (threads de connexion et batcher)"""
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def stats_snapshot(self) -> dict:
+        """Copie cohérente des compteurs"""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    # ------------------------------------------------------------------------
+    # Micro-batching
+    # ------------------------------------------------------------------------
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Soumet des textes au batcher et attend leurs embeddings"""
+        future: Future = Future()
+        self._pending.put((texts, future))
+        return future.result()
+
+    def _batch_loop(self):
+        """Regroupe les requêtes en attente et les encode en un seul appel au modèle"""
+        while not self._stopped.is_set():
+            try:
+                first = self._pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            n_texts = len(first[0])
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            while n_texts < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_texts += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = np.asarray(self.embedding_function(texts), dtype=np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self._count(batches=1)
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    # ------------------------------------------------------------------------
+    # Socket
+    # ------------------------------------------------------------------------
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def setup(self):
+                with server._connections_lock:
+                    server._connections.add(self.request)
+
+            def finish(self):
+                with server._connections_lock:
+                    server._connections.discard(self.request)
+
+            def handle(self):
+                while True:
+                    try:
+                        frame = _recv_frame(self.request)
+                    except (ConnectionError, OSError):
+                        return
+                    try:
+                        request = json.loads(frame)
+                        if not isinstance(request, dict):
+                            raise ValueError("objet JSON attendu")
+                    except ValueError as e:
+                        # Trame invalide : erreur renvoyée, la connexion reste utilisable
+                        server._count(errors=1)
+                        if not self._reply({"error": f"Requête invalide: {e}"}):
+                            return
+                        continue
+                    try:
+                        if request.get("op") == "info":
+                            _send_frame(self.request, json.dumps({
+                                "model": server.model_name,
+                                "backend": server.backend,
+                                "stats": server.stats_snapshot()
+                            }).encode())
+                            continue
+                        texts = request.get("texts", [])
+                        server._count(requests=1, texts=len(texts))
+                        vectors = server.embed(texts) if texts else np.zeros((0, 0), dtype=np.float32)
+                        _send_frame(self.request, json.dumps({"shape": list(vectors.shape)}).encode())
+                        _send_frame(self.request, np.ascontiguousarray(vectors).tobytes())
+                    except Exception as e:
+                        server._count(errors=1)
+                        if not self._reply({"error": str(e)}):
+                            return
+
+            def _reply(self, payload: dict) -> bool:
+                try:
+                    _send_frame(self.request, json.dumps(payload).encode())
+                    return True
+                except OSError:
+                    return False
+
+        return Handler
+
+    def serve_forever(self):
+        """Démarre le démon (bloquant) jusqu'à shutdown()"""
+        if os.path.exists(self.socket_path):
+            if is_server_available(self.socket_path):
+                raise RuntimeError(f"Un service d'embeddings écoute déjà sur {self.socket_path}")
+            os.unlink(self.socket_path)  # socket orphelin d'un démon arrêté
+
+        batcher = threading.Thread(target=self._batch_loop, name="embedding-batcher", daemon=True)
+        batcher.start()
+
+        class _Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+
+        self._server = _Server(self.socket_path, self._make_handler())
+        os.chmod(self.socket_path, 0o660)
+        print(f"Service d'embeddings prêt sur {self.socket_path} ({self.model_name}, backend: {self.backend})")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopped.set()
+            self._server.server_close()
+            # Connexions persistantes fermées : les clients se reconnectent ou chargent le modèle
+            with self._connections_lock:
+                for connection in self._connections:
+                    try:
+                        connection.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        """Arrête le démon"""
+        if self._server:
+            self._server.shutdown()
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+def _connect(socket_path: str, timeout: Optional[float]) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(socket_path)
+    return sock
+
+
+def get_server_info(socket_path: str, timeout: float = 1.0) -> Optional[dict]:
+    """Retourne le modèle / backend servis par le démon, ou None s'il est injoignable"""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        with _connect(socket_path, timeout) as sock:
+            _send_frame(sock, json.dumps({"op": "info"}).encode())
+            return json.loads(_recv_frame(sock))
+    except (OSError, ConnectionError, ValueError):
+        return None
+
+
+def is_server_available(socket_path: str) -> bool:
+    """Indique si un démon d'embeddings répond sur le socket"""
+    return get_server_info(socket_path) is not None
+
+
+class RemoteEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Fonction d'embeddings ChromaDB déléguée au démon local
+
+    Une connexion persistante est ouverte par thread et rétablie une fois en cas
+    de coupure. Si le démon reste injoignable (arrêt, redémarrage), le modèle est
+    chargé dans le processus (model_name / backend) et utilisé pour la suite.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        timeout: float = 60.0,
+        model_name: Optional[str] = None,
+        backend: Optional[str] = None
+    ):
+        """
+        Args:
+            socket_path: Socket Unix du démon
+            timeout: Délai maximal d'une requête (s)
+            model_name: Modèle servi par le démon (repli local, défaut: settings)
+            backend: Backend servi par le démon (repli local, défaut: settings)
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.model_name = model_name
+        self.backend = backend
+        self._local = threading.local()
+        self._fallback: Optional[EmbeddingFunction] = None
+        self._fallback_lock = threading.Lock()
+
+    @staticmethod
+    def name() -> str:
+        return "ibn_embedding_service"
+
+    def get_config(self) -> dict:
+        return {"socket_path": self.socket_path, "model_name": self.model_name, "backend": self.backend}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "RemoteEmbeddingFunction":
+        return RemoteEmbeddingFunction(
+            config["socket_path"], model_name=config.get("model_name"), backend=config.get("backend")
+        )
+
+    def _socket(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = _connect(self.socket_path, self.timeout)
+            self._local.sock = sock
+        return sock
+
+    def _request(self, texts: List[str]) -> np.ndarray:
+        sock = self._socket()
+        _send_frame(sock, json.dumps({"op": "embed", "texts": texts}).encode())
+        header = json.loads(_recv_frame(sock))
+        if "error" in header:
+            raise RuntimeError(f"Service d'embeddings: {header['error']}")
+        data = _recv_frame(sock)
+        return np.frombuffer(data, dtype=np.float32).reshape(header["shape"]).copy()
+
+    def _local_function(self) -> EmbeddingFunction:
+        """Modèle chargé dans le processus (une fois), en remplacement du démon"""
+        with self._fallback_lock:
+            if self._fallback is None:
+                from .embeddings import get_embedding_function
+                print(f"Service d'embeddings injoignable ({self.socket_path}): chargement local du modèle")
+                self._fallback = get_embedding_function(
+                    model_name=self.model_name, backend=self.backend, use_service=False
+                )
+            return self._fallback
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        if not texts:
+            return []
+        if self._fallback is not None:
+            return self._fallback(texts)
+        try:
+            vectors = self._request(texts)
+        except (OSError, ConnectionError):
+            self.close()
+            try:
+                vectors = self._request(texts)  # une reconnexion
+            except (OSError, ConnectionError):
+                self.close()
+                return self._local_function()(texts)
+        return [row for row in vectors]
+
+    def close(self):
+        """Ferme la connexion du thread courant"""
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            finally:
+                self._local.sock = None
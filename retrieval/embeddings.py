@@ -0,0 +1,197 @@
+"""
+Backends d'embeddings pour ChromaDB
+
+Rôle: Choisir l'implémentation du modèle d'embeddings utilisée par l'Agent 2 et par
+      scripts/ingest_catalog.py (settings.embedding_backend) :
+
+- "sentence-transformers" : modèle PyTorch via SentenceTransformerEmbeddingFunction (défaut)
+- "onnx-int8"             : MiniLM exporté en ONNX et quantifié int8, exécuté par
+                            ONNX Runtime sur CPU (voir scripts/export_onnx_model.py)
+
+Les deux backends produisent des vecteurs normalisés (mean pooling + L2), comme le
+pipeline sentence-transformers de all-MiniLM-L6-v2 : une collection doit néanmoins
+être ingérée et interrogée avec le même backend.
+
+Si le service d'embeddings local (scripts/embedding_server.py) tourne avec le même
+modèle et le même backend, get_embedding_function() s'y connecte au lieu de charger
+le modèle dans le processus.
+"""
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+
+from config import settings
+
+
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx-int8")
+
+# Fichiers produits par scripts/export_onnx_model.py
+ONNX_MODEL_FILE = "model_quantized.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+ONNX_MANIFEST_FILE = "export.json"  # {"model": <modèle Hugging Face exporté>}
+
+
+def onnx_exported_model(model_dir: str) -> Optional[str]:
+    """Modèle Hugging Face exporté dans model_dir (None pour un export sans manifeste)"""
+    path = os.path.join(model_dir, ONNX_MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("model")
+
+
+class OnnxInt8EmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Embeddings MiniLM quantifiés int8 exécutés par ONNX Runtime (CPU uniquement)
+
+    Dépendances optionnelles: onnxruntime, tokenizers
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        num_threads: int = 0,
+        batch_size: int = 32,
+        max_length: int = 256,
+        model_name: Optional[str] = None
+    ):
+        """
+        Args:
+            model_dir: Répertoire contenant model_quantized.onnx et tokenizer.json
+            num_threads: Threads intra-opérateur ONNX Runtime (0 = choix automatique)
+            batch_size: Nombre de textes encodés par appel au modèle
+            max_length: Longueur maximale en tokens (troncature)
+            model_name: Modèle attendu ; refusé s'il diffère du modèle exporté dans
+                        model_dir (export.json écrit par scripts/export_onnx_model.py)
+
+        Raises:
+            ValueError: model_dir contient l'export d'un autre modèle
+        """
+        exported = onnx_exported_model(model_dir)
+        if model_name and exported and exported != model_name:
+            raise ValueError(
+                f"Le modèle ONNX de {model_dir} a été exporté depuis '{exported}', "
+                f"pas depuis '{model_name}' : exportez-le (scripts/export_onnx_model.py --output) "
+                "ou corrigez ONNX_MODEL_DIR"
+            )
+        self.model_dir = model_dir
+        self.model_name = model_name or exported
+        self.num_threads = num_threads
+        self.max_length = max_length
+
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "Le backend 'onnx-int8' nécessite onnxruntime et tokenizers "
+                "(pip install onnxruntime tokenizers)"
+            ) from e
+
+        model_path = os.path.join(model_dir, ONNX_MODEL_FILE)
+        tokenizer_path = os.path.join(model_dir, ONNX_TOKENIZER_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"Modèle ONNX introuvable: {model_path}. "
+                "Exécutez d'abord: python scripts/export_onnx_model.py"
+            )
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.batch_size = batch_size
+
+    @staticmethod
+    def name() -> str:
+        return "onnx_int8"
+
+    def get_config(self) -> dict:
+        return {
+            "model_name": self.model_name,
+            "model_dir": self.model_dir,
+            "num_threads": self.num_threads,
+            "batch_size": self.batch_size,
+            "max_length": self.max_length,
+        }
+
+    @staticmethod
+    def build_from_config(config: dict) -> "OnnxInt8EmbeddingFunction":
+        return OnnxInt8EmbeddingFunction(**config)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode un lot de textes : mean pooling sur les tokens puis normalisation L2."""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        vectors = [
+            self._encode_batch(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        if not vectors:
+            return []
+        return [row for row in np.vstack(vectors).astype(np.float32)]
+
+
+def get_embedding_function(
+    model_name: Optional[str] = None,
+    backend: Optional[str] = None,
+    use_service: Optional[bool] = None
+) -> EmbeddingFunction:
+    """
+    Instancie la fonction d'embeddings ChromaDB du backend configuré
+
+    Args:
+        model_name: Modèle sentence-transformers (défaut: settings.embedding_model)
+        backend: Backend d'embeddings (défaut: settings.embedding_backend)
+        use_service: Utiliser le service d'embeddings local s'il est disponible
+                     (défaut: settings.embedding_service)
+
+    Returns:
+        EmbeddingFunction: Fonction utilisable par ChromaDB et par l'Agent 2
+    """
+    backend = backend or settings.embedding_backend
+    model_name = model_name or settings.embedding_model
+    use_service = settings.embedding_service if use_service is None else use_service
+
+    if use_service:
+        from .embedding_server import RemoteEmbeddingFunction, get_server_info
+        info = get_server_info(settings.embedding_socket_path)
+        if info and info.get("model") == model_name and info.get("backend") == backend:
+            print(f"Service d'embeddings partagé utilisé: {settings.embedding_socket_path}")
+            return RemoteEmbeddingFunction(settings.embedding_socket_path, model_name=model_name, backend=backend)
+
+    if backend == "onnx-int8":
+        return OnnxInt8EmbeddingFunction(
+            model_dir=settings.onnx_model_dir,
+            num_threads=settings.embedding_num_threads,
+            model_name=model_name
+        )
+    if backend == "sentence-transformers":
+        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+    raise ValueError(f"Backend d'embeddings inconnu: '{backend}'. Backends disponibles: {list(EMBEDDING_BACKENDS)}")
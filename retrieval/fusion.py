@@ -0,0 +1,29 @@
+"""
+Fusion de classements par Reciprocal Rank Fusion (RRF)
+
+RRF combine plusieurs classements sans normaliser leurs scores :
+    score_rrf(d) = somme_i 1 / (k + rang_i(d))
+Un document absent d'un classement n'y contribue pas.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fusionne plusieurs classements d'identifiants
+
+    Args:
+        rankings: Liste de classements (ids du meilleur au moins bon)
+        k: Constante d'amortissement RRF (60 dans l'article original)
+
+    Returns:
+        List[(id, score_rrf)] triée par score décroissant
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,497 @@
+"""
+Gazetteer hors ligne et index des zones de couverture du catalogue
+
+Rôle: Relier la localisation libre d'une intention ("Nice") aux zones couvertes par
+      les services du catalogue, décrites uniquement en texte ("Île-de-France
+      (Paris)", caractéristique TMF633 "Location"). Les lieux sont résolus par un
+      gazetteer intégré (villes, régions, pays) sans aucun appel réseau, puis les
+      zones de couverture de tous les services sont indexées dans un KD-tree
+      construit à l'ingestion.
+
+- Gazetteer: centroïde + rectangle englobant (lat/lon) de chaque lieu ; les villes
+  sont approximées par un disque de rayon radius_km. settings.gazetteer_path ajoute
+  des lieux (JSON) au gazetteer intégré.
+- CoverageIndex: KD-tree implicite (tableau de permutation) sur les centroïdes des
+  zones, projetés en km. Une localisation est comparée aux zones proches en
+  O(log n) : distance rectangle-rectangle, nulle si les zones se recouvrent.
+
+Fichier (à côté de la collection, voir storage.artifact_path) :
+    {collection}.geo.npz  -> identifiants, zones (service, rectangle, centroïde), KD-tree
+"""
+import json
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.2
+
+# Rayon par défaut d'une ville (agglomération) en km
+DEFAULT_CITY_RADIUS_KM = 15.0
+
+# Nombre maximal de jetons d'un nom de lieu ("provence alpes cote d azur")
+_MAX_NGRAM = 6
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+@dataclass(frozen=True)
+class Place:
+    """Lieu du gazetteer : centroïde et rectangle englobant (min_lat, min_lon, max_lat, max_lon)"""
+    name: str
+    kind: str
+    lat: float
+    lon: float
+    bbox: Tuple[float, float, float, float]
+
+
+# Régions (rectangles englobants approximatifs) : nom, (min_lat, min_lon, max_lat, max_lon), alias
+# Pas d'alias génériques ("national", "eu") : ils apparaissent dans des descriptions
+# sans désigner de zone ("national roaming", "EU regulation")
+_REGIONS = [
+    ("Île-de-France", (48.12, 1.45, 49.24, 3.56), ("idf", "paris region", "region parisienne")),
+    ("Provence-Alpes-Côte d'Azur", (42.98, 4.23, 45.13, 7.72), ("paca", "provence")),
+    ("Côte d'Azur", (43.40, 6.60, 44.00, 7.55), ("french riviera", "riviera")),
+    ("Auvergne-Rhône-Alpes", (44.11, 2.06, 46.80, 7.19), ("aura", "rhone alpes")),
+    ("Occitanie", (42.33, -0.33, 45.05, 4.85), ()),
+    ("Nouvelle-Aquitaine", (42.78, -1.79, 47.18, 2.61), ("aquitaine",)),
+    ("Bretagne", (47.28, -5.14, 48.90, -1.02), ("brittany",)),
+    ("Pays de la Loire", (46.27, -2.63, 48.57, 0.92), ()),
+    ("Normandie", (48.18, -1.95, 50.07, 1.80), ("normandy",)),
+    ("Hauts-de-France", (48.84, 1.38, 51.09, 4.26), ()),
+    ("Grand Est", (47.42, 3.38, 50.17, 8.23), ("alsace", "lorraine")),
+    ("Bourgogne-Franche-Comté", (46.16, 2.85, 48.40, 7.14), ("bourgogne", "burgundy")),
+    ("Centre-Val de Loire", (46.35, 0.05, 48.94, 3.13), ("centre val de loire",)),
+    ("Corse", (41.33, 8.53, 43.03, 9.56), ("corsica",)),
+    ("France", (41.30, -5.20, 51.10, 9.60), ("nationwide", "metropole")),
+    ("Belgique", (49.50, 2.54, 51.50, 6.41), ("belgium",)),
+    ("Suisse", (45.82, 5.96, 47.81, 10.49), ("switzerland",)),
+    ("Europe", (34.50, -10.50, 71.20, 31.60), ()),
+]
+
+# Villes : nom, latitude, longitude, alias
+_CITIES = [
+    ("Paris", 48.857, 2.352, ()),
+    ("Marseille", 43.296, 5.370, ()),
+    ("Lyon", 45.764, 4.836, ()),
+    ("Toulouse", 43.605, 1.444, ()),
+    ("Nice", 43.710, 7.262, ()),
+    ("Nantes", 47.218, -1.554, ()),
+    ("Strasbourg", 48.573, 7.752, ()),
+    ("Montpellier", 43.611, 3.877, ()),
+    ("Bordeaux", 44.838, -0.579, ()),
+    ("Lille", 50.629, 3.057, ()),
+    ("Rennes", 48.117, -1.678, ()),
+    ("Reims", 49.258, 4.032, ()),
+    ("Toulon", 43.124, 5.928, ()),
+    ("Grenoble", 45.188, 5.724, ()),
+    ("Dijon", 47.322, 5.041, ()),
+    ("Angers", 47.478, -0.563, ()),
+    ("Nîmes", 43.837, 4.360, ()),
+    ("Clermont-Ferrand", 45.777, 3.087, ()),
+    ("Saint-Étienne", 45.440, 4.387, ()),
+    ("Le Havre", 49.494, 0.108, ()),
+    ("Rouen", 49.443, 1.099, ()),
+    ("Caen", 49.182, -0.370, ()),
+    ("Brest", 48.390, -4.486, ()),
+    ("Tours", 47.394, 0.685, ()),
+    ("Orléans", 47.902, 1.909, ()),
+    ("Limoges", 45.834, 1.261, ()),
+    ("Poitiers", 46.580, 0.340, ()),
+    ("La Rochelle", 46.160, -1.151, ()),
+    ("Amiens", 49.894, 2.296, ()),
+    ("Metz", 49.119, 6.176, ()),
+    ("Nancy", 48.692, 6.184, ()),
+    ("Besançon", 47.238, 6.024, ()),
+    ("Le Mans", 48.006, 0.199, ()),
+    ("Perpignan", 42.699, 2.895, ()),
+    ("Pau", 43.295, -0.370, ()),
+    ("Avignon", 43.949, 4.806, ()),
+    ("Aix-en-Provence", 43.529, 5.447, ("aix",)),
+    ("Cannes", 43.552, 7.017, ()),
+    ("Antibes", 43.580, 7.125, ()),
+    ("Sophia Antipolis", 43.616, 7.055, ("sophia",)),
+    ("Monaco", 43.738, 7.424, ()),
+    ("Ajaccio", 41.919, 8.738, ()),
+    ("Bastia", 42.697, 9.450, ()),
+    ("Versailles", 48.804, 2.120, ()),
+    ("Saclay", 48.731, 2.170, ("paris saclay",)),
+    ("La Défense", 48.892, 2.236, ()),
+    ("Bruxelles", 50.850, 4.352, ("brussels",)),
+    ("Genève", 46.204, 6.143, ("geneva",)),
+    ("Luxembourg", 49.611, 6.130, ()),
+    ("Londres", 51.507, -0.128, ("london",)),
+    ("Berlin", 52.520, 13.405, ()),
+    ("Madrid", 40.417, -3.704, ()),
+    ("Barcelone", 41.385, 2.173, ("barcelona",)),
+    ("Rome", 41.903, 12.496, ("roma",)),
+    ("Milan", 45.464, 9.190, ("milano",)),
+]
+
+
+def normalize_place(text: str) -> str:
+    """Forme normalisée d'un nom de lieu : minuscules, sans accents ni ponctuation"""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return " ".join(_TOKEN_PATTERN.findall(normalized))
+
+
+def city_bbox(lat: float, lon: float, radius_km: float = DEFAULT_CITY_RADIUS_KM) -> Tuple[float, float, float, float]:
+    """Rectangle englobant d'un disque de rayon radius_km autour d'un point"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return (lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+
+
+def _project(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Projection sinusoïdale en km (distances correctes à l'échelle d'un pays)"""
+    lat_rad = np.radians(lat)
+    return np.stack([EARTH_RADIUS_KM * np.radians(lon) * np.cos(lat_rad), EARTH_RADIUS_KM * lat_rad], axis=-1)
+
+
+def bbox_distance_km(bbox: Sequence[float], bboxes: np.ndarray) -> np.ndarray:
+    """
+    Distance (km) entre un rectangle et un ensemble de rectangles, nulle s'ils se recouvrent
+
+    Args:
+        bbox: (min_lat, min_lon, max_lat, max_lon)
+        bboxes: Tableau (n, 4) au même format
+    """
+    bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    gap_lat = np.maximum(0.0, np.maximum(bboxes[:, 0] - bbox[2], bbox[0] - bboxes[:, 2]))
+    gap_lon = np.maximum(0.0, np.maximum(bboxes[:, 1] - bbox[3], bbox[1] - bboxes[:, 3]))
+    mid_lat = np.radians((bboxes[:, 0] + bboxes[:, 2] + bbox[0] + bbox[2]) / 4)
+    return np.hypot(gap_lat * KM_PER_DEGREE_LAT, gap_lon * KM_PER_DEGREE_LAT * np.cos(mid_lat))
+
+
+class Gazetteer:
+    """
+    Gazetteer hors ligne (villes, régions, pays)
+
+    Utilisation:
+        gazetteer = Gazetteer.default()
+        gazetteer.lookup("Nice")                                   # -> Place
+        gazetteer.find_places("Connectivité couvrant l'Île-de-France (Paris)")
+    """
+
+    def __init__(self, places: Sequence[Place], aliases: Optional[Dict[str, str]] = None):
+        self.places: Dict[str, Place] = {}
+        for place in places:
+            self.places[normalize_place(place.name)] = place
+        for alias, name in (aliases or {}).items():
+            place = self.places.get(normalize_place(name))
+            if place is not None:
+                self.places.setdefault(normalize_place(alias), place)
+
+    @classmethod
+    def default(cls, extra_path: Optional[str] = None) -> "Gazetteer":
+        """
+        Gazetteer intégré, complété par un fichier JSON optionnel
+
+        Format du fichier : liste de {"name", "lat", "lon", "kind"?, "bbox"?, "radius_km"?, "aliases"?}
+        (sans "bbox", le lieu est un disque de rayon radius_km autour du point)
+        """
+        places, aliases = [], {}
+        for name, bbox, names in _REGIONS:
+            places.append(Place(name, "region", (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2, bbox))
+            aliases.update({alias: name for alias in names})
+        for name, lat, lon, names in _CITIES:
+            places.append(Place(name, "city", lat, lon, city_bbox(lat, lon)))
+            aliases.update({alias: name for alias in names})
+        if extra_path:
+            with open(extra_path, encoding="utf-8") as f:
+                for entry in json.load(f):
+                    lat, lon = float(entry["lat"]), float(entry["lon"])
+                    bbox = entry.get("bbox") or city_bbox(lat, lon, float(entry.get("radius_km", DEFAULT_CITY_RADIUS_KM)))
+                    places.append(Place(entry["name"], entry.get("kind", "city"), lat, lon, tuple(float(v) for v in bbox)))
+                    aliases.update({alias: entry["name"] for alias in entry.get("aliases", [])})
+        return cls(places, aliases)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def lookup(self, text: Optional[str]) -> Optional[Place]:
+        """
+        Résout une localisation libre ("Nice", "Paris, France")
+
+        Le nom complet est essayé d'abord, puis le lieu le plus précis mentionné
+        (une ville plutôt que sa région ou son pays).
+        """
+        if not text:
+            return None
+        text = str(text)
+        place = self.places.get(normalize_place(text))
+        if place is not None:
+            return place
+        found = self.find_places(text, proper_nouns=False)
+        cities = [p for p in found if p.kind == "city"]
+        return (cities or found or [None])[0]
+
+    def find_places(self, text: str, proper_nouns: bool = True) -> List[Place]:
+        """
+        Lieux mentionnés dans un texte (correspondance la plus longue d'abord)
+
+        Args:
+            text: Texte libre (description, nom de service, caractéristique)
+            proper_nouns: Ne retenir que les mentions commençant par une majuscule
+                          (évite "nice" adjectif dans les descriptions en anglais)
+        """
+        words = _TOKEN_PATTERN.findall(text)
+        tokens = [normalize_place(word) for word in words]
+        found: List[Place] = []
+        i = 0
+        while i < len(tokens):
+            match = None
+            if not proper_nouns or words[i][:1].isupper():
+                for n in range(min(_MAX_NGRAM, len(tokens) - i), 0, -1):
+                    place = self.places.get(" ".join(tokens[i:i + n]))
+                    if place is not None:
+                        match = (place, n)
+                        break
+            if match is None:
+                i += 1
+                continue
+            if match[0] not in found:
+                found.append(match[0])
+            i += match[1]
+        return found
+
+
+class CoverageIndex:
+    """
+    Zones de couverture des services, indexées par un KD-tree sur leurs centroïdes
+
+    Utilisation:
+        index = CoverageIndex.build(ids, coverages)   # coverages[i] = [Place, ...]
+        index.save("openslice_services.geo.npz")
+
+        index = CoverageIndex.load("openslice_services.geo.npz")
+        index.match(gazetteer.lookup("Nice"), radius_km=50)   # -> {service_id: distance_km}
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        area_service: np.ndarray,
+        area_names: Sequence[str],
+        bboxes: np.ndarray,
+        tree: np.ndarray
+    ):
+        self.ids = list(ids)              # tous les services (couverture connue ou non)
+        self.area_service = area_service  # int64 (n_areas,) : service de chaque zone
+        self.area_names = list(area_names)
+        self.bboxes = bboxes              # float64 (n_areas, 4) : min_lat, min_lon, max_lat, max_lon
+        self.tree = tree                  # int64 (n_areas,) : permutation du KD-tree implicite
+        centroid_lat = (bboxes[:, 0] + bboxes[:, 2]) / 2 if len(bboxes) else np.zeros(0)
+        centroid_lon = (bboxes[:, 1] + bboxes[:, 3]) / 2 if len(bboxes) else np.zeros(0)
+        self.points = _project(centroid_lat, centroid_lon).reshape(-1, 2)
+        # Demi-diagonale maximale : rayon de recherche à ajouter autour des centroïdes
+        corners = _project(bboxes[:, 0], bboxes[:, 1]).reshape(-1, 2) if len(bboxes) else np.zeros((0, 2))
+        self.max_half_diagonal = float(np.max(np.linalg.norm(self.points - corners, axis=1))) if len(bboxes) else 0.0
+        self.covered_ids = {self.ids[s] for s in np.unique(area_service)}
+
+    # ========================================================================
+    # CONSTRUCTION / PERSISTANCE
+    # ========================================================================
+
+    @classmethod
+    def build(cls, ids: Sequence[str], coverages: Sequence[Sequence[Place]]) -> "CoverageIndex":
+        """
+        Indexe les zones couvertes par chaque service
+
+        Args:
+            ids: Identifiants des services
+            coverages: Lieux couverts par chaque service (liste vide = couverture inconnue)
+        """
+        area_service, area_names, bboxes = [], [], []
+        for s, places in enumerate(coverages):
+            for place in places:
+                area_service.append(s)
+                area_names.append(place.name)
+                bboxes.append(place.bbox)
+        return cls._from_areas(ids, np.asarray(area_service, dtype=np.int64), area_names, bboxes)
+
+    @classmethod
+    def _from_areas(
+        cls,
+        ids: Sequence[str],
+        area_service: np.ndarray,
+        area_names: Sequence[str],
+        bboxes: Sequence[Sequence[float]]
+    ) -> "CoverageIndex":
+        """Construit le KD-tree des centroïdes des zones"""
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        centroids = _project((bboxes[:, 0] + bboxes[:, 2]) / 2, (bboxes[:, 1] + bboxes[:, 3]) / 2).reshape(-1, 2)
+        return cls(ids, area_service, area_names, bboxes, _build_kdtree(centroids))
+
+    def updated(self, removed: Set[str], ids: Sequence[str], coverages: Sequence[Sequence[Place]]) -> "CoverageIndex":
+        """
+        Nouvel index sans les services removed, avec les services ids (ré)indexés
+
+        Les zones des autres services sont reprises de l'index ; seul le KD-tree
+        est reconstruit.
+
+        Args:
+            removed: Services à retirer (supprimés ou modifiés)
+            ids: Services à indexer, même ordre que coverages
+            coverages: Lieux couverts par chaque service (liste vide = couverture inconnue)
+        """
+        drop = set(removed) | set(ids)
+        keep = np.fromiter((service_id not in drop for service_id in self.ids), dtype=bool, count=len(self.ids))
+        rows = np.cumsum(keep) - 1
+        start = int(keep.sum())
+        kept = keep[self.area_service]
+        area_service = list(rows[self.area_service[kept]])
+        area_names = [name for name, k in zip(self.area_names, kept) if k]
+        bboxes = [tuple(bbox) for bbox in self.bboxes[kept]]
+        for s, places in enumerate(coverages, start=start):
+            for place in places:
+                area_service.append(s)
+                area_names.append(place.name)
+                bboxes.append(place.bbox)
+        new_ids = [service_id for service_id, k in zip(self.ids, keep) if k] + list(ids)
+        return self._from_areas(new_ids, np.asarray(area_service, dtype=np.int64), area_names, bboxes)
+
+    def save(self, path: str):
+        """Sauvegarde l'index au format .npz"""
+        np.savez(
+            path,
+            ids=np.array(self.ids, dtype=np.str_),
+            area_service=self.area_service,
+            area_names=np.array(self.area_names, dtype=np.str_),
+            bboxes=self.bboxes,
+            tree=self.tree
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CoverageIndex":
+        """Charge un index sauvegardé par save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                ids=data["ids"].tolist(),
+                area_service=data["area_service"],
+                area_names=data["area_names"].tolist(),
+                bboxes=data["bboxes"],
+                tree=data["tree"]
+            )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ========================================================================
+    # RECHERCHE
+    # ========================================================================
+
+    def match(self, place: Place, radius_km: float = 50.0, nearest: bool = True) -> Dict[str, float]:
+        """
+        Services dont la couverture contient ou est la plus proche d'un lieu
+
+        Les zones à moins de radius_km du lieu (0 si elles le recouvrent) sont
+        retenues ; si aucune ne l'est et que nearest est vrai, les services de la
+        zone la plus proche le sont.
+
+        Returns:
+            Dict[str, float]: service -> distance (km) de sa zone la plus proche
+        """
+        if not len(self.area_service):
+            return {}
+        center = _project(np.array([place.lat]), np.array([place.lon]))[0]
+        corner = _project(np.array([place.bbox[0]]), np.array([place.bbox[1]]))[0]
+        reach = radius_km + float(np.linalg.norm(center - corner)) + self.max_half_diagonal
+        areas = _kdtree_within(self.points, self.tree, center, reach)
+        if not areas:
+            if not nearest:
+                return {}
+            areas = [_kdtree_nearest(self.points, self.tree, center)]
+        areas = np.asarray(areas, dtype=np.int64)
+        distances = bbox_distance_km(place.bbox, self.bboxes[areas])
+        if not np.any(distances <= radius_km):
+            if not nearest:
+                return {}
+            keep = distances <= distances.min()  # zone la plus proche (couverture voisine)
+        else:
+            keep = distances <= radius_km
+        matches: Dict[str, float] = {}
+        for area, distance in zip(areas[keep], distances[keep]):
+            service_id = self.ids[self.area_service[area]]
+            matches[service_id] = round(min(matches.get(service_id, math.inf), float(distance)), 1)
+        return matches
+
+    def coverage_of(self, service_id: str) -> List[str]:
+        """Noms des zones couvertes par un service"""
+        try:
+            s = self.ids.index(service_id)
+        except ValueError:
+            return []
+        return [self.area_names[a] for a in np.flatnonzero(self.area_service == s)]
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre de services, de services à couverture connue et de zones"""
+        return {"services": len(self.ids), "covered": len(self.covered_ids), "areas": len(self.area_service)}
+
+
+# ============================================================================
+# KD-TREE IMPLICITE (2D)
+# ============================================================================
+# Le nœud d'une tranche [lo, hi) est l'élément médian tree[(lo + hi) // 2] ; la
+# profondeur détermine l'axe de coupe (x puis y). Aucun pointeur n'est stocké.
+
+def _build_kdtree(points: np.ndarray) -> np.ndarray:
+    tree = np.arange(len(points), dtype=np.int64)
+    stack = [(0, len(points), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= 1:
+            continue
+        mid = (lo + hi) // 2
+        segment = tree[lo:hi]
+        tree[lo:hi] = segment[np.argpartition(points[segment, depth % 2], mid - lo)]
+        stack.append((lo, mid, depth + 1))
+        stack.append((mid + 1, hi, depth + 1))
+    return tree
+
+
+def _kdtree_within(points: np.ndarray, tree: np.ndarray, target: np.ndarray, radius: float) -> List[int]:
+    """Points à moins de radius du point cible"""
+    found = []
+    stack = [(0, len(tree), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if lo >= hi:
+            continue
+        mid = (lo + hi) // 2
+        node = int(tree[mid])
+        if np.linalg.norm(points[node] - target) <= radius:
+            found.append(node)
+        delta = target[depth % 2] - points[node, depth % 2]
+        if delta - radius <= 0:
+            stack.append((lo, mid, depth + 1))
+        if delta + radius >= 0:
+            stack.append((mid + 1, hi, depth + 1))
+    return found
+
+
+def _kdtree_nearest(points: np.ndarray, tree: np.ndarray, target: np.ndarray) -> int:
+    """Point le plus proche du point cible"""
+    best, best_distance = -1, math.inf
+    stack = [(0, len(tree), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if lo >= hi:
+            continue
+        mid = (lo + hi) // 2
+        node = int(tree[mid])
+        distance = float(np.linalg.norm(points[node] - target))
+        if distance < best_distance:
+            best, best_distance = node, distance
+        delta = float(target[depth % 2] - points[node, depth % 2])
+        near, far = ((lo, mid), (mid + 1, hi)) if delta < 0 else ((mid + 1, hi), (lo, mid))
+        if abs(delta) < best_distance:
+            stack.append((far[0], far[1], depth + 1))
+        stack.append((near[0], near[1], depth + 1))  # visité en premier
+    return best
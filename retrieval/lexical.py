@@ -0,0 +1,278 @@
+"""
+Index lexical BM25 (index inversé) pour le catalogue de services
+
+Rôle: Compléter la recherche vectorielle sur les jetons exacts ("5G", "LTE",
+      "eMBB", noms de produits) que les embeddings MiniLM ont tendance à lisser.
+
+L'index est construit par scripts/ingest_catalog.py sur les mêmes documents que
+ceux produits par create_service_document(), puis sauvegardé au format .npz
+à côté de la collection ChromaDB.
+
+Format (CSR) :
+    vocabulary[t]                       -> terme t (trié)
+    offsets[t] : offsets[t + 1]         -> tranche des postings du terme t
+    postings_doc / postings_weight      -> (document, poids BM25 précalculé)
+    postings_tf / doc_lengths           -> fréquences et longueurs (mise à jour incrémentale)
+
+Le poids BM25 d'un couple (terme, document) ne dépend pas de la requête : il est
+précalculé à la construction, le score d'une requête est donc une simple somme.
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe un texte en jetons normalisés
+
+    - minuscules, accents supprimés ("réalité" -> "realite")
+    - séparation sur la ponctuation et les underscores ("5G_Slice" -> "5g", "slice")
+    """
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return _TOKEN_PATTERN.findall(normalized)
+
+
+def _term_freqs(documents: Iterable[str]) -> List[Dict[str, int]]:
+    """Fréquence de chaque jeton dans chaque document"""
+    term_freqs = []
+    for document in documents:
+        freqs: Dict[str, int] = {}
+        for token in tokenize(document or ""):
+            freqs[token] = freqs.get(token, 0) + 1
+        term_freqs.append(freqs)
+    return term_freqs
+
+
+def _flatten(
+    term_freqs: List[Dict[str, int]],
+    position: Dict[str, int],
+    start: int = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Postings (terme, document, fréquence) à plat ; les documents sont numérotés à partir de start"""
+    terms, docs, tfs = [], [], []
+    for doc_idx, freqs in enumerate(term_freqs, start=start):
+        for term, tf in freqs.items():
+            terms.append(position[term])
+            docs.append(doc_idx)
+            tfs.append(tf)
+    return np.array(terms, dtype=np.int64), np.array(docs, dtype=np.int64), np.array(tfs, dtype=np.float32)
+
+
+class BM25Index:
+    """
+    Index inversé BM25 (Okapi) en représentation CSR NumPy
+
+    Utilisation:
+        index = BM25Index.build(ids, documents)
+        index.save("openslice_services.bm25.npz")
+
+        index = BM25Index.load("openslice_services.bm25.npz")
+        results = index.search_batch(["5G eMBB Paris", "VR simulation"], top_k=3)
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        vocabulary: Sequence[str],
+        offsets: np.ndarray,
+        postings_doc: np.ndarray,
+        postings_weight: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75,
+        postings_tf: Optional[np.ndarray] = None,
+        doc_lengths: Optional[np.ndarray] = None
+    ):
+        self.ids = list(ids)
+        self.vocabulary = list(vocabulary)
+        self.offsets = offsets
+        self.postings_doc = postings_doc
+        self.postings_weight = postings_weight
+        self.postings_tf = postings_tf      # None : index sauvegardé sans fréquences (pas de mise à jour)
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self._term_index: Dict[str, int] = {term: i for i, term in enumerate(self.vocabulary)}
+
+    # ========================================================================
+    # CONSTRUCTION / PERSISTANCE
+    # ========================================================================
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        documents: Iterable[str],
+        k1: float = 1.5,
+        b: float = 0.75
+    ) -> "BM25Index":
+        """
+        Construit l'index à partir des documents du catalogue
+
+        Args:
+            ids: Identifiants des services (même ordre que documents)
+            documents: Documents textuels (create_service_document)
+            k1: Saturation de la fréquence des termes
+            b: Normalisation par la longueur du document
+        """
+        term_freqs = _term_freqs(documents)
+        vocabulary = sorted({term for freqs in term_freqs for term in freqs})
+        terms, docs, tfs = _flatten(term_freqs, {term: t for t, term in enumerate(vocabulary)})
+        doc_lengths = np.array([sum(f.values()) for f in term_freqs], dtype=np.float32)
+        return cls._from_postings(ids, vocabulary, terms, docs, tfs, doc_lengths, k1, b)
+
+    @classmethod
+    def _from_postings(
+        cls,
+        ids: Sequence[str],
+        vocabulary: Sequence[str],
+        terms: np.ndarray,
+        docs: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float,
+        b: float
+    ) -> "BM25Index":
+        """Trie les postings (terme, document, fréquence) en CSR et précalcule les poids BM25"""
+        n_docs = len(doc_lengths)
+        avgdl = float(doc_lengths.mean()) if n_docs and doc_lengths.mean() > 0 else 1.0
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order].astype(np.int32), tfs[order].astype(np.float32)
+
+        df = np.bincount(terms, minlength=len(vocabulary))
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+        idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = k1 * (1.0 - b + b * doc_lengths[docs] / avgdl)
+        weights = (idf[terms] * tfs * (k1 + 1.0) / (tfs + norm)).astype(np.float32)
+        return cls(ids, vocabulary, offsets, docs, weights, k1=k1, b=b, postings_tf=tfs, doc_lengths=doc_lengths)
+
+    def updated(self, removed: Set[str], ids: Sequence[str], documents: Iterable[str]) -> "BM25Index":
+        """
+        Nouvel index sans les services removed, avec les services ids (ré)indexés
+
+        Les fréquences des autres services sont reprises de l'index (leurs documents
+        ne sont pas relus) ; idf et longueur moyenne sont recalculés sur le résultat.
+
+        Args:
+            removed: Services à retirer (supprimés ou modifiés)
+            ids: Services à indexer, même ordre que documents
+            documents: Documents textuels de ces services
+        """
+        if self.postings_tf is None or self.doc_lengths is None:
+            raise ValueError("Index BM25 sans fréquences de termes : reconstruction complète requise")
+        drop = set(removed) | set(ids)
+        keep = np.fromiter((service_id not in drop for service_id in self.ids), dtype=bool, count=len(self.ids))
+        rows = np.cumsum(keep) - 1
+        term_freqs = _term_freqs(documents)
+
+        vocabulary = sorted(set(self.vocabulary).union(*term_freqs))
+        position = {term: t for t, term in enumerate(vocabulary)}
+        old_terms = np.repeat(
+            np.fromiter((position[term] for term in self.vocabulary), dtype=np.int64, count=len(self.vocabulary)),
+            np.diff(self.offsets)
+        )
+        kept = keep[self.postings_doc]
+        terms, docs, tfs = _flatten(term_freqs, position, start=int(keep.sum()))
+        terms = np.concatenate([old_terms[kept], terms])
+        docs = np.concatenate([rows[self.postings_doc[kept]], docs])
+        tfs = np.concatenate([self.postings_tf[kept], tfs])
+
+        # Termes qui n'apparaissent plus dans aucun document
+        used = np.bincount(terms, minlength=len(vocabulary)) > 0
+        vocabulary = [term for term, keep_term in zip(vocabulary, used) if keep_term]
+        terms = (np.cumsum(used) - 1)[terms]
+
+        new_ids = [service_id for service_id, k in zip(self.ids, keep) if k] + list(ids)
+        doc_lengths = np.concatenate([
+            self.doc_lengths[keep],
+            np.array([sum(f.values()) for f in term_freqs], dtype=np.float32)
+        ])
+        return self._from_postings(new_ids, vocabulary, terms, docs, tfs, doc_lengths, self.k1, self.b)
+
+    def save(self, path: str):
+        """Sauvegarde l'index au format NumPy compressé (.npz)"""
+        np.savez_compressed(
+            path,
+            ids=np.array(self.ids, dtype=np.str_),
+            vocabulary=np.array(self.vocabulary, dtype=np.str_),
+            offsets=self.offsets,
+            postings_doc=self.postings_doc,
+            postings_weight=self.postings_weight,
+            params=np.array([self.k1, self.b], dtype=np.float32),
+            **({} if self.postings_tf is None else {"postings_tf": self.postings_tf, "doc_lengths": self.doc_lengths})
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Charge un index sauvegardé par save()"""
+        with np.load(path, allow_pickle=False) as data:
+            k1, b = (float(x) for x in data["params"])
+            return cls(
+                ids=data["ids"].tolist(),
+                vocabulary=data["vocabulary"].tolist(),
+                offsets=data["offsets"],
+                postings_doc=data["postings_doc"],
+                postings_weight=data["postings_weight"],
+                k1=k1,
+                b=b,
+                postings_tf=data["postings_tf"] if "postings_tf" in data.files else None,
+                doc_lengths=data["doc_lengths"] if "doc_lengths" in data.files else None
+            )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ========================================================================
+    # RECHERCHE
+    # ========================================================================
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Recherche BM25 pour une seule requête"""
+        return self.search_batch([query], top_k=top_k)[0]
+
+    def search_batch(self, queries: Sequence[str], top_k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Recherche BM25 pour un lot de requêtes en une seule passe
+
+        Les listes de postings de chaque terme distinct du lot ne sont lues qu'une
+        fois, puis partagées entre les requêtes qui contiennent ce terme.
+
+        Args:
+            queries: Textes des requêtes
+            top_k: Nombre de résultats par requête
+
+        Returns:
+            List[List[(id, score)]]: Résultats par requête, score décroissant
+        """
+        if top_k <= 0:
+            return [[] for _ in queries]
+        query_terms = [set(tokenize(q)) for q in queries]
+        slices: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term in set().union(*query_terms) if query_terms else ():
+            t = self._term_index.get(term)
+            if t is not None:
+                start, end = self.offsets[t], self.offsets[t + 1]
+                slices[term] = (self.postings_doc[start:end], self.postings_weight[start:end])
+
+        results = []
+        for terms in query_terms:
+            parts = [slices[term] for term in terms if term in slices]
+            if not parts:
+                results.append([])
+                continue
+            docs = np.concatenate([p[0] for p in parts])
+            weights = np.concatenate([p[1] for p in parts])
+            unique_docs, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights)
+            k = min(top_k, len(unique_docs))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            results.append([(self.ids[unique_docs[i]], float(scores[i])) for i in best])
+        return results
@@ -0,0 +1,65 @@
+"""
+Métriques légères (histogrammes à seaux fixes) pour la couche de recherche
+
+Les histogrammes sont thread-safe et exposent un instantané sérialisable en JSON
+(compteurs par seau, moyenne, quantiles approchés par la borne haute du seau).
+"""
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Sequence
+
+
+class Histogram:
+    """
+    Histogramme cumulatif à seaux fixes
+
+    Utilisation:
+        h = Histogram([1, 2, 4, 8])
+        h.observe(3)
+        h.snapshot()  # {"count": 1, "mean": 3.0, "p50": 4, ...}
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # dernier seau : +inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Enregistre une observation"""
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Quantile approché (borne haute du seau qui contient le rang q)"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            cumulative = 0
+            for i, n in enumerate(self.counts):
+                cumulative += n
+                if cumulative >= rank:
+                    return self.buckets[i] if i < len(self.buckets) else self.max
+            return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Instantané de l'histogramme"""
+        with self._lock:
+            labels = [f"<={b:g}" for b in self.buckets] + ["+inf"]
+            buckets = dict(zip(labels, self.counts))
+            count, total, maximum = self.count, self.total, self.max
+        return {
+            "count": count,
+            "mean": round(total / count, 3) if count else 0.0,
+            "max": round(maximum, 3),
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets
+        }
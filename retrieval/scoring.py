@@ -0,0 +1,55 @@
+"""
+Distances et scores alignés sur les conventions de ChromaDB
+
+ChromaDB (hnswlib) renvoie selon l'espace "hnsw:space" de la collection :
+- l2     : distance euclidienne au carré
+- cosine : 1 - similarité cosinus
+- ip     : 1 - produit scalaire
+L'Agent 2 convertit ensuite la distance en score par 1 / (1 + distance).
+"""
+import numpy as np
+
+
+def compute_distances(queries: np.ndarray, vectors: np.ndarray, space: str = "l2") -> np.ndarray:
+    """
+    Calcule la matrice de distances requêtes x vecteurs
+
+    Args:
+        queries: Embeddings des requêtes (n_queries, dim)
+        vectors: Embeddings des documents (n_docs, dim)
+        space: Espace de distance ChromaDB ("l2", "cosine" ou "ip")
+
+    Returns:
+        np.ndarray: Distances (n_queries, n_docs)
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if space == "cosine":
+        q = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        v = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return 1.0 - q @ v.T
+    if space == "ip":
+        return 1.0 - queries @ vectors.T
+    # l2 : ||q||² + ||v||² - 2 q.v (borné à 0 pour absorber les erreurs d'arrondi)
+    sq = (queries ** 2).sum(axis=1)[:, None] + (vectors ** 2).sum(axis=1)[None, :]
+    return np.maximum(sq - 2.0 * queries @ vectors.T, 0.0)
+
+
+def collection_space(collection) -> str:
+    """
+    Espace de distance d'une collection ChromaDB ("l2" par défaut)
+
+    Les versions récentes de ChromaDB exposent l'espace dans collection.configuration,
+    les plus anciennes uniquement dans les métadonnées ("hnsw:space").
+    """
+    configuration = getattr(collection, "configuration", None)
+    if isinstance(configuration, dict):
+        hnsw = configuration.get("hnsw") or {}
+        if hnsw.get("space"):
+            return hnsw["space"]
+    return (collection.metadata or {}).get("hnsw:space", "l2")
+
+
+def distance_to_score(distance):
+    """Convertit une distance ChromaDB en score de similarité dans ]0, 1]"""
+    return 1 / (1 + distance)
@@ -0,0 +1,284 @@
+"""
+Partitionnement du catalogue par catégorie et routage des requêtes
+
+Rôle: Éviter que chaque requête parcoure tout le catalogue (XR, réseau,
+      divertissement...) : les embeddings sont regroupés en shards NumPy par
+      catégorie de service et un routeur choisit, pour chaque sous-intention, les
+      1 à 2 shards les plus pertinents. Seuls ces shards sont parcourus (recherche
+      exacte), le coût par requête dépend donc de la taille des shards et non de
+      la taille totale du catalogue.
+
+Routage (ShardIndex.route) :
+1. Le domaine de la sous-intention ("ran", "cloud", "xr"...) désigne directement un
+   shard s'il correspond à une catégorie (nom ou alias de DOMAIN_ALIASES)
+2. Les shards restants sont choisis par similarité cosinus entre la requête et le
+   centroïde de chaque shard
+
+Fichiers (à côté de la collection, voir storage.artifact_path) :
+    {collection}.shards.npz          -> noms, centroïdes, tranches, identifiants
+    {collection}.shards.vectors.npy  -> embeddings triés par shard (projetés en mémoire)
+"""
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .scoring import compute_distances
+
+
+# Shard des services sans catégorie
+DEFAULT_SHARD = "uncategorized"
+
+# Domaines de sous-intention (Agent 1) -> catégorie du catalogue (minuscules)
+DOMAIN_ALIASES = {
+    "ran": "network",
+    "core": "network",
+    "transport": "network",
+    "connectivity": "network",
+    "5g": "network",
+    "compute": "cloud",
+    "storage": "cloud",
+    "database": "cloud",
+    "backend": "cloud",
+    "mec": "edge",
+    "ar": "xr",
+    "vr": "xr",
+    "mr": "xr",
+    "video": "entertainment",
+    "streaming": "entertainment",
+    "media": "entertainment",
+}
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+
+
+class ShardIndex:
+    """
+    Shards NumPy par catégorie avec routeur centroïde / domaine
+
+    Utilisation:
+        index = ShardIndex.build(ids, vectors, categories, space="l2")
+        index.save("openslice_services.shards.npz")
+
+        index = ShardIndex.load("openslice_services.shards.npz")
+        results = index.search_batch(query_vectors, top_k=5, domains=["ran", "cloud"])
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        names: Sequence[str],
+        offsets: np.ndarray,
+        centroids: np.ndarray,
+        vectors: np.ndarray,
+        space: str = "l2",
+        routes: int = 2
+    ):
+        self.ids = list(ids)            # identifiants triés par shard
+        self.names = list(names)        # catégorie de chaque shard
+        self.offsets = offsets          # int64 (n_shards + 1) : tranche de chaque shard
+        self.centroids = centroids      # float32 (n_shards, d), normalisés
+        self.vectors = vectors          # float32 (n, d), triés par shard
+        self.space = space
+        self.routes = routes
+        self._shard_of_name = {name.lower(): s for s, name in enumerate(self.names)}
+
+    # ========================================================================
+    # CONSTRUCTION / PERSISTANCE
+    # ========================================================================
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        categories: Sequence[Optional[str]],
+        space: str = "l2",
+        routes: int = 2
+    ) -> "ShardIndex":
+        """
+        Regroupe les embeddings du catalogue par catégorie
+
+        Args:
+            ids: Identifiants des services
+            vectors: Embeddings (n, d), même ordre que ids
+            categories: Catégorie de chaque service (None -> DEFAULT_SHARD)
+            space: Espace de distance de la collection
+            routes: Nombre maximal de shards parcourus par requête
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        labels = [category or DEFAULT_SHARD for category in categories]
+        names = sorted(set(labels), key=str.lower)
+        shard_of = {name: s for s, name in enumerate(names)}
+        shard_labels = np.array([shard_of[label] for label in labels], dtype=np.int64)
+
+        order = np.argsort(shard_labels, kind="stable")
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(shard_labels, minlength=len(names)), out=offsets[1:])
+        sorted_vectors = np.ascontiguousarray(vectors[order])
+        centroids = np.stack([
+            _normalize(_normalize(sorted_vectors[offsets[s]:offsets[s + 1]]).mean(axis=0))
+            for s in range(len(names))
+        ]) if names else np.zeros((0, vectors.shape[1] if vectors.ndim == 2 else 0), dtype=np.float32)
+        return cls([ids[i] for i in order], names, offsets, centroids.astype(np.float32), sorted_vectors, space, routes)
+
+    def updated(
+        self,
+        removed: Set[str],
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        categories: Sequence[Optional[str]]
+    ) -> "ShardIndex":
+        """
+        Nouveaux shards sans les services removed, avec les services ids (ré)indexés
+
+        Les embeddings et catégories des autres services sont repris des shards
+        existants ; les centroïdes sont recalculés.
+
+        Args:
+            removed: Services à retirer (supprimés ou modifiés)
+            ids: Services à indexer, même ordre que vectors et categories
+            vectors: Embeddings de ces services (len(ids), d)
+            categories: Catégorie de chaque service (None -> DEFAULT_SHARD)
+        """
+        drop = set(removed) | set(ids)
+        keep = np.fromiter((service_id not in drop for service_id in self.ids), dtype=bool, count=len(self.ids))
+        shard_of_row = np.repeat(np.arange(len(self.names)), np.diff(self.offsets))
+        return self.build(
+            [service_id for service_id, k in zip(self.ids, keep) if k] + list(ids),
+            np.concatenate([
+                np.asarray(self.vectors)[keep],
+                np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.vectors.shape[1])
+            ]),
+            [self.names[s] for s in shard_of_row[keep]] + list(categories),
+            space=self.space,
+            routes=self.routes
+        )
+
+    @staticmethod
+    def vectors_path(path: str) -> str:
+        """Fichier des embeddings associé à un index .npz"""
+        return (path[:-4] if path.endswith(".npz") else path) + ".vectors.npy"
+
+    def save(self, path: str):
+        """Sauvegarde les shards (.npz) et leurs embeddings (.npy)"""
+        np.savez(
+            path,
+            ids=np.array(self.ids, dtype=np.str_),
+            names=np.array(self.names, dtype=np.str_),
+            offsets=self.offsets,
+            centroids=self.centroids,
+            space=np.array(self.space, dtype=np.str_)
+        )
+        np.save(self.vectors_path(path), np.asarray(self.vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: str, routes: int = 2) -> "ShardIndex":
+        """Charge des shards sauvegardés par save() (embeddings projetés en mémoire)"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                ids=data["ids"].tolist(),
+                names=data["names"].tolist(),
+                offsets=data["offsets"],
+                centroids=data["centroids"],
+                vectors=np.load(cls.vectors_path(path), mmap_mode="r"),
+                space=str(data["space"]),
+                routes=routes
+            )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def shard_sizes(self) -> Dict[str, int]:
+        """Nombre de services par shard"""
+        return {name: int(self.offsets[s + 1] - self.offsets[s]) for s, name in enumerate(self.names)}
+
+    # ========================================================================
+    # ROUTAGE / RECHERCHE
+    # ========================================================================
+
+    def _domain_shard(self, domain: Optional[str]) -> Optional[int]:
+        if not domain:
+            return None
+        key = domain.strip().lower()
+        if key in self._shard_of_name:
+            return self._shard_of_name[key]
+        return self._shard_of_name.get(DOMAIN_ALIASES.get(key, ""))
+
+    def route(self, query_vectors: np.ndarray, domains: Optional[Sequence[Optional[str]]] = None) -> List[List[int]]:
+        """
+        Choisit les shards à parcourir pour chaque requête
+
+        Args:
+            query_vectors: Embeddings des requêtes (n_queries, d)
+            domains: Domaine de la sous-intention de chaque requête (optionnel)
+
+        Returns:
+            List[List[int]]: Indices des shards (au plus self.routes) par requête
+        """
+        if not self.names:
+            return [[] for _ in range(len(query_vectors))]
+        similarities = _normalize(np.asarray(query_vectors, dtype=np.float32)) @ self.centroids.T
+        domains = domains or [None] * len(query_vectors)
+        routes = []
+        for similarity, domain in zip(similarities, domains):
+            chosen = []
+            shard = self._domain_shard(domain)
+            if shard is not None:
+                chosen.append(shard)
+            for s in np.argsort(-similarity, kind="stable"):
+                if len(chosen) >= self.routes:
+                    break
+                if int(s) not in chosen:
+                    chosen.append(int(s))
+            routes.append(chosen)
+        return routes
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int = 10,
+        domains: Optional[Sequence[Optional[str]]] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Recherche exacte dans les shards routés, résultats fusionnés par distance
+
+        Les requêtes routées vers un même shard sont traitées ensemble (un produit
+        matriciel par shard pour tout le lot).
+
+        Returns:
+            List[List[Tuple[str, float]]]: (id, distance) triés par distance croissante
+        """
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        routes = self.route(query_vectors, domains)
+        per_query: List[List[Tuple[np.ndarray, np.ndarray]]] = [[] for _ in range(len(query_vectors))]
+
+        by_shard: Dict[int, List[int]] = {}
+        for q, shards in enumerate(routes):
+            for s in shards:
+                by_shard.setdefault(s, []).append(q)
+        for s, query_rows in by_shard.items():
+            start, end = int(self.offsets[s]), int(self.offsets[s + 1])
+            if start == end or top_k <= 0:
+                continue
+            distances = compute_distances(query_vectors[query_rows], self.vectors[start:end], self.space)
+            k = min(top_k, end - start)
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            for row, q in enumerate(query_rows):
+                per_query[q].append((top[row] + start, distances[row, top[row]]))
+
+        results = []
+        for parts in per_query:
+            if not parts:
+                results.append([])
+                continue
+            rows = np.concatenate([p[0] for p in parts])
+            distances = np.concatenate([p[1] for p in parts])
+            order = np.argsort(distances, kind="stable")[:top_k]
+            results.append([(self.ids[rows[i]], float(distances[i])) for i in order])
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Taille des shards et nombre de shards parcourus par requête"""
+        return {"shards": self.shard_sizes(), "routes": self.routes, "space": self.space}
@@ -0,0 +1,185 @@
+"""
+Instantanés portables de la collection de services (déploiement sur une flotte)
+
+Rôle: Exporter la collection ChromaDB d'un nœud (embeddings, ids, documents,
+      métadonnées, version du catalogue, paramètres HNSW) dans une archive tar,
+      puis la réimporter sur d'autres nœuds sans accès à OpenSlice ni ré-encodage.
+
+Contenu de l'archive :
+    manifest.json  : format, collection, version du catalogue, nombre de services,
+                     empreinte du modèle d'embeddings, paramètres HNSW
+    vectors.npy    : embeddings float32 (n, dim), dans l'ordre de records.jsonl
+    records.jsonl  : une ligne JSON {"id", "document", "metadata"} par service
+
+L'empreinte du modèle contient son nom, son backend, la dimension et les vecteurs
+d'un petit jeu de textes de référence : à l'import, le modèle local doit produire
+les mêmes vecteurs (similarité cosinus >= FINGERPRINT_MIN_COSINE), sinon les
+requêtes seraient encodées dans un autre espace que le catalogue importé.
+"""
+import io
+import json
+import os
+import tarfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+SNAPSHOT_FORMAT = 1
+
+# Textes encodés pour comparer le modèle d'export et le modèle local
+FINGERPRINT_PROBES = (
+    "Service: 5G_Slice_Paris_Region | Category: Network",
+    "Serveur de contenu pour réalité augmentée à basse latence",
+    "IoT platform for industrial sensors",
+)
+
+# Similarité minimale entre vecteurs de référence (écarts numériques CPU / GPU tolérés)
+FINGERPRINT_MIN_COSINE = 0.999
+
+_MANIFEST = "manifest.json"
+_VECTORS = "vectors.npy"
+_RECORDS = "records.jsonl"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def model_fingerprint(embedding_function, model_name: str, backend: str) -> Dict[str, Any]:
+    """
+    Empreinte d'un modèle d'embeddings (nom, backend, dimension, vecteurs de référence)
+
+    Args:
+        embedding_function: Fonction d'embeddings ChromaDB
+        model_name: Nom du modèle (settings.embedding_model)
+        backend: Backend d'embeddings (settings.embedding_backend)
+    """
+    probes = np.asarray(embedding_function(list(FINGERPRINT_PROBES)), dtype=np.float32)
+    return {
+        "model": model_name,
+        "backend": backend,
+        "dimension": int(probes.shape[1]),
+        "probes": probes.tolist(),
+    }
+
+
+def check_fingerprint(expected: Dict[str, Any], actual: Dict[str, Any]) -> Optional[str]:
+    """
+    Compare deux empreintes de modèle
+
+    Returns:
+        Optional[str]: Description de l'incompatibilité, None si les modèles concordent
+    """
+    for key in ("model", "backend", "dimension"):
+        if expected.get(key) != actual.get(key):
+            return f"{key}: '{expected.get(key)}' dans l'instantané, '{actual.get(key)}' en local"
+    a = _normalize(np.asarray(expected["probes"], dtype=np.float32))
+    b = _normalize(np.asarray(actual["probes"], dtype=np.float32))
+    cosine = float((a * b).sum(axis=1).min())
+    if cosine < FINGERPRINT_MIN_COSINE:
+        return f"vecteurs de référence différents (cosinus minimal {cosine:.4f} < {FINGERPRINT_MIN_COSINE})"
+    return None
+
+
+def _add_bytes(archive: tarfile.TarFile, name: str, data: bytes):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    archive.addfile(info, io.BytesIO(data))
+
+
+def export_snapshot(
+    collection,
+    path: str,
+    fingerprint: Dict[str, Any],
+    extra: Optional[Dict[str, Any]] = None,
+    page_size: int = 5000
+) -> Dict[str, Any]:
+    """
+    Exporte une collection ChromaDB dans une archive tar
+
+    La collection est lue par pages (limit / offset) ; les documents et métadonnées
+    sont écrits au fil de l'eau, seuls les embeddings sont regroupés en mémoire.
+
+    Args:
+        collection: Collection ChromaDB à exporter
+        path: Chemin de l'archive (.tar, ou .tar.gz pour la compresser)
+        fingerprint: Empreinte du modèle ayant produit les embeddings (model_fingerprint)
+        extra: Champs ajoutés au manifeste (version du catalogue, paramètres HNSW...)
+        page_size: Services lus par appel à collection.get()
+
+    Returns:
+        Dict: Manifeste écrit dans l'archive
+    """
+    vectors: List[np.ndarray] = []
+    records = io.BytesIO()
+    offset = 0
+    while True:
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=page_size,
+            offset=offset
+        )
+        ids = page["ids"]
+        if not ids:
+            break
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        for service_id, document, metadata in zip(ids, page["documents"], page["metadatas"]):
+            line = json.dumps({"id": service_id, "document": document, "metadata": metadata or {}}, ensure_ascii=False)
+            records.write(line.encode("utf-8") + b"\n")
+        offset += len(ids)
+
+    matrix = np.vstack(vectors) if vectors else np.zeros((0, fingerprint["dimension"]), dtype=np.float32)
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "collection": collection.name,
+        "count": int(matrix.shape[0]),
+        "dimension": int(matrix.shape[1]),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "fingerprint": fingerprint,
+        **(extra or {})
+    }
+
+    vector_bytes = io.BytesIO()
+    np.save(vector_bytes, matrix, allow_pickle=False)
+    mode = "w:gz" if path.endswith((".gz", ".tgz")) else "w"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with tarfile.open(path, mode) as archive:
+        _add_bytes(archive, _MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+        _add_bytes(archive, _VECTORS, vector_bytes.getvalue())
+        _add_bytes(archive, _RECORDS, records.getvalue())
+    return manifest
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Lit le manifeste d'une archive sans charger les embeddings"""
+    with tarfile.open(path, "r:*") as archive:
+        return json.load(archive.extractfile(_MANIFEST))
+
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Lit une archive produite par export_snapshot
+
+    Seuls les membres attendus sont lus (aucune extraction sur disque).
+
+    Returns:
+        Dict: {"manifest", "ids", "documents", "metadatas", "embeddings" (np.ndarray)}
+    """
+    with tarfile.open(path, "r:*") as archive:
+        manifest = json.load(archive.extractfile(_MANIFEST))
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Format d'instantané non supporté: {manifest.get('format')}")
+        embeddings = np.load(io.BytesIO(archive.extractfile(_VECTORS).read()), allow_pickle=False)
+        ids, documents, metadatas = [], [], []
+        for line in archive.extractfile(_RECORDS):
+            if line.strip():
+                record = json.loads(line)
+                ids.append(record["id"])
+                documents.append(record["document"])
+                metadatas.append(record["metadata"] or None)
+    if len(ids) != embeddings.shape[0]:
+        raise ValueError(f"Instantané incohérent: {len(ids)} services pour {embeddings.shape[0]} embeddings")
+    return {"manifest": manifest, "ids": ids, "documents": documents, "metadatas": metadatas, "embeddings": embeddings}
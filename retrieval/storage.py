@@ -0,0 +1,89 @@
+"""
+Emplacement des artefacts d'index stockés à côté de ChromaDB
+
+Les index annexes (lexical, etc.) sont construits par scripts/ingest_catalog.py
+et relus par l'Agent 2. Ils vivent dans le répertoire de persistance ChromaDB,
+préfixés par le nom de la collection.
+
+Ré-indexation bleu/vert : chaque ré-indexation complète écrit une nouvelle
+génération de la collection ("openslice_services.g7") et ses artefacts, puis un
+alias ("openslice_services.alias.json") est basculé atomiquement vers elle.
+"""
+import json
+import os
+import re
+from typing import Optional
+
+
+# Artefacts dérivés d'une collection (supprimés avec sa génération)
+ARTIFACT_KINDS = (
+    "bm25.npz",
+    "compressed.npz",
+    "compressed.vectors.npy",
+    "shards.npz",
+    "shards.vectors.npy",
+    "geo.npz",
+    "constraints.npz",
+)
+
+
+def artifact_path(persist_directory: str, collection_name: str, kind: str) -> str:
+    """
+    Retourne le chemin d'un artefact d'index pour une collection
+
+    Args:
+        persist_directory: Répertoire de persistance ChromaDB
+        collection_name: Nom de la collection ChromaDB
+        kind: Type d'artefact avec son extension (ex: "bm25.npz")
+
+    Returns:
+        str: Chemin du fichier, ex: ./data/chroma_db/openslice_services.bm25.npz
+    """
+    return os.path.join(persist_directory, f"{collection_name}.{kind}")
+
+
+def generation_name(collection_name: str, generation: int) -> str:
+    """Nom de la collection ChromaDB d'une génération (ex: openslice_services.g7)"""
+    return f"{collection_name}.g{generation}"
+
+
+def generation_number(collection_name: str, physical_name: str) -> Optional[int]:
+    """
+    Numéro de génération d'une collection physique (0 = collection sans génération)
+
+    Returns:
+        Optional[int]: None si physical_name n'est pas une génération de collection_name
+    """
+    if physical_name == collection_name:
+        return 0
+    match = re.fullmatch(re.escape(collection_name) + r"\.g(\d+)", physical_name)
+    return int(match.group(1)) if match else None
+
+
+def read_collection_alias(persist_directory: str, collection_name: str) -> Optional[str]:
+    """Collection physique désignée par l'alias (None si aucun alias n'a été publié)"""
+    try:
+        with open(artifact_path(persist_directory, collection_name, "alias.json"), encoding="utf-8") as f:
+            return json.load(f).get("collection")
+    except (OSError, ValueError):
+        return None
+
+
+def write_collection_alias(persist_directory: str, collection_name: str, physical_name: str):
+    """Bascule atomiquement l'alias vers une collection physique (écriture + os.replace)"""
+    path = artifact_path(persist_directory, collection_name, "alias.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"collection": physical_name}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def remove_artifacts(persist_directory: str, physical_name: str):
+    """Supprime les artefacts dérivés d'une collection physique"""
+    for kind in ARTIFACT_KINDS:
+        try:
+            os.remove(artifact_path(persist_directory, physical_name, kind))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,223 @@
+"""
+Réglage des paramètres HNSW de la collection de services
+
+Rôle: Balayer l'espace de distance ("hnsw:space") et les paramètres du graphe HNSW
+      ("hnsw:M", "hnsw:construction_ef", "hnsw:search_ef") sur les embeddings du
+      catalogue, mesurer recall@k (par rapport à la recherche exacte dans le même
+      espace) et latence sur un jeu de requêtes mis de côté, puis retenir la
+      configuration la plus rapide qui atteint l'objectif de recall.
+
+Les configurations candidates sont construites dans des collections ChromaDB
+éphémères à partir des embeddings déjà calculés (aucun ré-encodage). La
+configuration retenue est appliquée par ServiceSelectorAgent.rebuild_collection()
+et enregistrée dans les métadonnées de la collection (clé HNSW_TUNING_KEY).
+
+Changer d'espace de distance change le score 1 / (1 + distance) des services, donc
+le sens de min_score : scripts/tune_index.py conserve l'espace de la collection
+sauf demande explicite, et indique alors le seuil équivalent (equivalent_min_score).
+"""
+import itertools
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .scoring import compute_distances
+
+
+# Paramètres HNSW de ChromaDB (défauts de hnswlib)
+HNSW_DEFAULTS = {
+    "hnsw:space": "l2",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100,
+    "hnsw:search_ef": 100,
+}
+
+# Clé des métadonnées de collection portant le résultat du dernier réglage (JSON)
+HNSW_TUNING_KEY = "hnsw_tuning"
+
+# Correspondance clés de métadonnées -> champs de collection.configuration["hnsw"]
+_CONFIGURATION_FIELDS = {
+    "hnsw:space": "space",
+    "hnsw:M": "max_neighbors",
+    "hnsw:construction_ef": "ef_construction",
+    "hnsw:search_ef": "ef_search",
+}
+
+
+# Distance de chaque espace en multiple de la distance cosinus, pour des vecteurs
+# normalisés (embeddings MiniLM) : ||q - v||² = 2 (1 - cos), 1 - q.v = 1 - cos
+_COSINE_DISTANCE_SCALE = {"l2": 2.0, "cosine": 1.0, "ip": 1.0}
+
+
+def equivalent_min_score(min_score: float, from_space: str, to_space: str) -> float:
+    """
+    Seuil min_score qui retient les mêmes services après un changement d'espace
+
+    Valable pour des embeddings normalisés ; le score est 1 / (1 + distance).
+
+    Args:
+        min_score: Seuil utilisé avec from_space (0-1]
+        from_space: Espace de distance actuel ("l2", "cosine" ou "ip")
+        to_space: Nouvel espace de distance
+    """
+    if min_score <= 0:
+        return min_score
+    distance = 1 / min_score - 1
+    distance *= _COSINE_DISTANCE_SCALE[to_space] / _COSINE_DISTANCE_SCALE[from_space]
+    return 1 / (1 + distance)
+
+
+def collection_hnsw_params(collection) -> Dict[str, Any]:
+    """
+    Paramètres HNSW effectifs d'une collection ChromaDB
+
+    Comme collection_space(), lit collection.configuration (ChromaDB récent) puis
+    les métadonnées "hnsw:*", et complète avec les valeurs par défaut.
+    """
+    params = dict(HNSW_DEFAULTS)
+    metadata = collection.metadata or {}
+    params.update({key: metadata[key] for key in HNSW_DEFAULTS if key in metadata})
+    configuration = getattr(collection, "configuration", None)
+    if isinstance(configuration, dict):
+        hnsw = configuration.get("hnsw") or {}
+        for key, field in _CONFIGURATION_FIELDS.items():
+            if hnsw.get(field) is not None:
+                params[key] = hnsw[field]
+    return params
+
+
+def collection_tuning(collection) -> Optional[Dict[str, Any]]:
+    """Résultat du dernier réglage enregistré sur la collection (ou None)"""
+    raw = (collection.metadata or {}).get(HNSW_TUNING_KEY)
+    return json.loads(raw) if raw else None
+
+
+def exact_neighbors(queries: np.ndarray, vectors: np.ndarray, space: str, k: int) -> np.ndarray:
+    """Indices des k plus proches voisins exacts (référence du recall)"""
+    distances = compute_distances(queries, vectors, space)
+    return np.argsort(distances, axis=1, kind="stable")[:, :k]
+
+
+def _recall(found: List[List[int]], exact: np.ndarray) -> float:
+    k = exact.shape[1]
+    return float(np.mean([len(set(f) & set(e.tolist())) / k for f, e in zip(found, exact)]))
+
+
+def evaluate_config(
+    client,
+    params: Dict[str, Any],
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    exact: np.ndarray,
+    search_efs: Sequence[int],
+    k: int
+) -> List[Dict[str, Any]]:
+    """
+    Construit une collection éphémère pour (space, M, construction_ef) et mesure
+    chaque valeur de search_ef
+
+    Returns:
+        List[Dict]: Un résultat par search_ef (params, recall, latences)
+    """
+    name = f"tuning_{uuid.uuid4().hex}"
+    ids = [str(i) for i in range(len(vectors))]
+    start = time.perf_counter()
+    collection = client.create_collection(
+        name=name,
+        metadata={**params, "hnsw:search_ef": search_efs[0]},
+        embedding_function=None
+    )
+    max_batch = getattr(client, "get_max_batch_size", lambda: 5000)()
+    for i in range(0, len(ids), max_batch):
+        collection.add(ids=ids[i:i + max_batch], embeddings=vectors[i:i + max_batch].tolist())
+    build_s = time.perf_counter() - start
+
+    results = []
+    try:
+        for search_ef in search_efs:
+            if search_ef != search_efs[0]:
+                collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+            found, latencies = [], []
+            for q in queries:
+                t = time.perf_counter()
+                res = collection.query(query_embeddings=[q.tolist()], n_results=k, include=[])
+                latencies.append((time.perf_counter() - t) * 1000)
+                found.append([int(i) for i in res["ids"][0]])
+            p50, p95 = np.percentile(latencies, [50, 95])
+            results.append({
+                "params": {**params, "hnsw:search_ef": search_ef},
+                "recall": round(_recall(found, exact), 4),
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "build_s": round(build_s, 3),
+            })
+    finally:
+        client.delete_collection(name=name)
+    return results
+
+
+def sweep_hnsw(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    spaces: Sequence[str] = ("l2", "cosine"),
+    ms: Sequence[int] = (8, 16, 32),
+    construction_efs: Sequence[int] = (100, 200),
+    search_efs: Sequence[int] = (10, 50, 100, 200),
+    k: int = 10,
+    verbose: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Balaie la grille de paramètres HNSW
+
+    Args:
+        vectors: Embeddings du catalogue (n_docs, dim)
+        queries: Embeddings des requêtes mises de côté (n_queries, dim)
+        spaces, ms, construction_efs, search_efs: Grille de paramètres
+        k: Taille du top-k pour le recall
+        verbose: Afficher chaque configuration mesurée
+
+    Returns:
+        List[Dict]: Résultats (params, recall, p50_ms, p95_ms, build_s)
+    """
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    client = chromadb.EphemeralClient(settings=ChromaSettings(anonymized_telemetry=False))
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    k = min(k, len(vectors))
+    search_efs = sorted(search_efs)
+
+    results = []
+    for space in spaces:
+        exact = exact_neighbors(queries, vectors, space, k)
+        for m, construction_ef in itertools.product(ms, construction_efs):
+            params = {"hnsw:space": space, "hnsw:M": m, "hnsw:construction_ef": construction_ef}
+            for result in evaluate_config(client, params, vectors, queries, exact, search_efs, k):
+                results.append(result)
+                if verbose:
+                    p = result["params"]
+                    print(f"   space={space:<6} M={m:<3} construction_ef={construction_ef:<4} "
+                          f"search_ef={p['hnsw:search_ef']:<4} recall@{k}={result['recall']:.4f} "
+                          f"p50={result['p50_ms']:.3f} ms")
+    return results
+
+
+def select_config(results: List[Dict[str, Any]], recall_target: float) -> Dict[str, Any]:
+    """
+    Retient la configuration la plus rapide (p50) qui atteint recall_target
+
+    Si aucune configuration n'atteint l'objectif, retourne celle de meilleur recall
+    (champ "meets_target" à False).
+    """
+    if not results:
+        raise ValueError("Aucun résultat de réglage")
+    eligible = [r for r in results if r["recall"] >= recall_target]
+    if eligible:
+        best = min(eligible, key=lambda r: (r["p50_ms"], r["params"]["hnsw:search_ef"]))
+        return {**best, "meets_target": True}
+    best = max(results, key=lambda r: (r["recall"], -r["p50_ms"]))
+    return {**best, "meets_target": False}
@@ -0,0 +1,424 @@
+"""
+Benchmark de la recherche de services (Agent 2) sur catalogues synthétiques
+
+Ce script:
+1. Génère des catalogues TMF633 synthétiques (1k à 1M ServiceSpecifications)
+   au format de create_service_document(), et des requêtes de sous-intentions
+2. Encode documents et requêtes (modèle d'embeddings réel ou hachage rapide)
+3. Pour chaque backend (Chroma HNSW, NumPy exact, ...) mesure :
+   - temps d'ingestion, taille de l'index, RSS du processus
+   - latence par requête p50 / p95 / p99
+   - débit en lots (requêtes/s)
+   - recall@k par rapport à la recherche exacte
+4. Écrit un rapport JSON comparable d'une version à l'autre
+
+Usage:
+    python scripts/bench_retrieval.py
+    python scripts/bench_retrieval.py --sizes 1000,10000 --embeddings model
+    python scripts/bench_retrieval.py --backends numpy-exact --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import settings
+from retrieval import CompressedIndex, compute_distances, tokenize
+from scripts.ingest_catalog import create_service_document
+
+
+# ============================================================================
+# CATALOGUE ET REQUÊTES SYNTHÉTIQUES
+# ============================================================================
+
+CATEGORIES = {
+    "XR": ["AR", "VR", "MR", "Holographic"],
+    "Network": ["5G", "4G LTE", "eMBB", "URLLC", "mMTC", "Fiber", "WiFi 6"],
+    "Cloud": ["Compute", "Storage", "GPU", "Kubernetes", "Database"],
+    "Edge": ["MEC", "CDN", "Edge AI", "Video Analytics"],
+    "Entertainment": ["Video Streaming", "Cloud Gaming", "Live Broadcast"],
+    "IoT": ["Smart City", "Industrial IoT", "Telemetry", "Asset Tracking"],
+}
+CITIES = ["Paris", "Nice", "Lyon", "Marseille", "Toulouse", "Lille", "Bordeaux", "Nantes", "Strasbourg", "Rennes"]
+QUALIFIERS = ["low latency", "high throughput", "ultra-reliable", "standard", "premium", "best effort", "secure", "multi-user"]
+CHARACTERISTICS = ["vCPU", "RAM_GB", "Location", "Bandwidth_Mbps", "Latency_ms", "Storage_GB", "GPU", "Availability"]
+
+
+def generate_catalog(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Génère n ServiceSpecifications TMF633 synthétiques
+
+    Args:
+        n: Nombre de spécifications
+        seed: Graine aléatoire (catalogue reproductible)
+    """
+    rng = random.Random(seed)
+    categories = list(CATEGORIES)
+    specs = []
+    for i in range(n):
+        category = rng.choice(categories)
+        kind = rng.choice(CATEGORIES[category])
+        city = rng.choice(CITIES)
+        qualifier = rng.choice(QUALIFIERS)
+        specs.append({
+            "id": f"spec-{i:07d}",
+            "name": f"{kind.replace(' ', '_')}_{category}_{city}_{i}",
+            "description": f"{qualifier.capitalize()} {kind} {category.lower()} service covering {city} region",
+            "category": category,
+            "version": f"{rng.randint(1, 3)}.{rng.randint(0, 9)}",
+            "lifecycleStatus": "Active",
+            "serviceType": kind,
+            "serviceSpecCharacteristic": [{"name": c} for c in rng.sample(CHARACTERISTICS, rng.randint(2, 5))],
+        })
+    return specs
+
+
+def generate_queries(n: int, seed: int = 7) -> List[str]:
+    """Génère n descriptions de sous-intentions (style Agent 1)"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        category = rng.choice(list(CATEGORIES))
+        kind = rng.choice(CATEGORIES[category])
+        queries.append(f"{rng.choice(QUALIFIERS)} {kind} {category.lower()} service in {rng.choice(CITIES)}")
+    return queries
+
+
+# ============================================================================
+# EMBEDDINGS
+# ============================================================================
+
+def hash_embed(texts: List[str], dim: int = 384) -> np.ndarray:
+    """
+    Embeddings par hachage de jetons (rapides, sans modèle)
+
+    Permet de mesurer le comportement des index à 1M de documents sans le coût
+    d'encodage du modèle ; les vecteurs restent corrélés au texte.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode())
+            vectors[i, h % dim] += 1.0 if (h >> 16) & 1 else -1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def get_embedder(kind: str) -> Callable[[List[str]], np.ndarray]:
+    """Fonction d'encodage : 'hash' ou 'model' (settings.embedding_backend)"""
+    if kind == "hash":
+        return hash_embed
+    from retrieval import get_embedding_function
+    ef = get_embedding_function()
+
+    def embed(texts: List[str], batch_size: int = 256) -> np.ndarray:
+        parts = [np.asarray(ef(texts[i:i + batch_size]), dtype=np.float32) for i in range(0, len(texts), batch_size)]
+        return np.vstack(parts)
+    return embed
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class NumpyExactBackend:
+    """Recherche exacte par produit matriciel (référence du recall)"""
+
+    name = "numpy-exact"
+
+    def __init__(self, space: str = "l2"):
+        self.space = space
+        self.vectors = None
+
+    def build(self, ids: List[str], vectors: np.ndarray, documents: List[str]):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def search(self, queries: np.ndarray, k: int) -> np.ndarray:
+        distances = compute_distances(queries, self.vectors, self.space)
+        k = min(k, distances.shape[1])
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(distances, top, axis=1).argsort(axis=1, kind="stable")
+        return np.take_along_axis(top, order, axis=1)
+
+    def size_bytes(self) -> int:
+        return int(self.vectors.nbytes)
+
+    def close(self):
+        self.vectors = None
+
+
+class ChromaHNSWBackend:
+    """Collection ChromaDB persistante (index HNSW), comme l'Agent 2"""
+
+    name = "chroma-hnsw"
+
+    def __init__(self, space: str = "l2"):
+        self.space = space
+        self.directory = tempfile.mkdtemp(prefix="bench_chroma_")
+        self.collection = None
+        self._index_of: Dict[str, int] = {}
+
+    def build(self, ids: List[str], vectors: np.ndarray, documents: List[str]):
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+        client = chromadb.PersistentClient(path=self.directory, settings=ChromaSettings(anonymized_telemetry=False))
+        self.collection = client.create_collection(
+            name="bench_services",
+            metadata={"hnsw:space": self.space},
+            embedding_function=None
+        )
+        max_batch = getattr(client, "get_max_batch_size", lambda: 5000)()
+        for start in range(0, len(ids), max_batch):
+            end = start + max_batch
+            self.collection.add(
+                ids=ids[start:end],
+                embeddings=vectors[start:end].tolist(),
+                documents=documents[start:end]
+            )
+        self._index_of = {service_id: i for i, service_id in enumerate(ids)}
+
+    def search(self, queries: np.ndarray, k: int) -> np.ndarray:
+        results = self.collection.query(query_embeddings=queries.tolist(), n_results=k, include=[])
+        return np.array([
+            [self._index_of[service_id] for service_id in row] + [-1] * (k - len(row))
+            for row in results["ids"]
+        ])
+
+    def size_bytes(self) -> int:
+        return directory_size(self.directory)
+
+    def close(self):
+        self.collection = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class CompressedBackend:
+    """Index compressé de l'Agent 2 (float16 / IVF-PQ + re-classement exact)"""
+
+    mode = "ivfpq"
+
+    def __init__(self, space: str = "l2"):
+        self.space = space
+        self.directory = tempfile.mkdtemp(prefix="bench_compressed_")
+        self.index = None
+        self._index_of: Dict[str, int] = {}
+
+    def build(self, ids: List[str], vectors: np.ndarray, documents: List[str]):
+        path = os.path.join(self.directory, "bench.compressed.npz")
+        CompressedIndex.build(ids, vectors, mode=self.mode, space=self.space).save(path)
+        self.index = CompressedIndex.load(path)
+        self._index_of = {service_id: i for i, service_id in enumerate(ids)}
+
+    def search(self, queries: np.ndarray, k: int) -> np.ndarray:
+        return np.array([
+            [self._index_of[service_id] for service_id, _ in row] + [-1] * (k - len(row))
+            for row in self.index.search_batch(queries, top_k=k)
+        ])
+
+    def size_bytes(self) -> int:
+        return self.index.memory_report()["resident_total_bytes"]
+
+    def close(self):
+        self.index = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class Float16Backend(CompressedBackend):
+    name = "float16"
+    mode = "float16"
+
+
+class IVFPQBackend(CompressedBackend):
+    name = "ivfpq"
+    mode = "ivfpq"
+
+
+# Backends disponibles (nom -> fabrique)
+BACKENDS: Dict[str, Callable[[], Any]] = {
+    NumpyExactBackend.name: NumpyExactBackend,
+    ChromaHNSWBackend.name: ChromaHNSWBackend,
+    Float16Backend.name: Float16Backend,
+    IVFPQBackend.name: IVFPQBackend,
+}
+
+
+# ============================================================================
+# MESURES
+# ============================================================================
+
+def directory_size(path: str) -> int:
+    """Taille totale des fichiers d'un répertoire (octets)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            total += os.path.getsize(os.path.join(root, f))
+    return total
+
+
+def current_rss_mb() -> float:
+    """RSS courant du processus (Mo), pic RSS si /proc n'est pas disponible"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def recall_at_k(found: np.ndarray, exact: np.ndarray) -> float:
+    """Recall@k moyen d'un résultat approché par rapport au résultat exact"""
+    k = exact.shape[1]
+    hits = [len(set(f.tolist()) & set(e.tolist())) / k for f, e in zip(found, exact)]
+    return float(np.mean(hits))
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3)}
+
+
+def bench_backend(
+    backend,
+    ids: List[str],
+    doc_vectors: np.ndarray,
+    documents: List[str],
+    query_vectors: np.ndarray,
+    exact: np.ndarray,
+    k: int,
+    batch_size: int
+) -> Dict[str, Any]:
+    """Mesure un backend sur un catalogue déjà encodé"""
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    backend.build(ids, doc_vectors, documents)
+    ingest_s = time.perf_counter() - start
+    rss_after = current_rss_mb()
+
+    latencies = []
+    for q in query_vectors:
+        t = time.perf_counter()
+        backend.search(q[None, :], k)
+        latencies.append((time.perf_counter() - t) * 1000)
+
+    start = time.perf_counter()
+    found = [backend.search(query_vectors[i:i + batch_size], k) for i in range(0, len(query_vectors), batch_size)]
+    batch_s = time.perf_counter() - start
+    found = np.vstack(found)
+
+    return {
+        "ingest_s": round(ingest_s, 3),
+        "index_bytes": backend.size_bytes(),
+        "rss_mb": round(rss_after, 1),
+        "rss_delta_mb": round(rss_after - rss_before, 1),
+        "latency_ms": percentiles(latencies),
+        "batch_throughput_qps": round(len(query_vectors) / batch_s, 1) if batch_s > 0 else None,
+        f"recall@{k}": round(recall_at_k(found, exact), 4),
+    }
+
+
+def run_benchmark(
+    sizes: List[int],
+    backends: List[str],
+    embeddings: str,
+    n_queries: int,
+    k: int,
+    batch_size: int,
+    space: str
+) -> Dict[str, Any]:
+    """Exécute le benchmark pour chaque taille de catalogue et chaque backend"""
+    embed = get_embedder(embeddings)
+    queries = generate_queries(n_queries)
+    query_vectors = embed(queries)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "config": {
+            "sizes": sizes,
+            "backends": backends,
+            "embeddings": embeddings if embeddings == "hash" else f"{settings.embedding_model} ({settings.embedding_backend})",
+            "queries": n_queries,
+            "k": k,
+            "batch_size": batch_size,
+            "space": space,
+        },
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+        },
+        "results": {},
+    }
+
+    for n in sizes:
+        print(f"\n{'='*80}\nCATALOGUE: {n} spécifications\n{'='*80}")
+        specs = generate_catalog(n)
+        ids = [spec["id"] for spec in specs]
+        documents = [create_service_document(spec) for spec in specs]
+        del specs
+
+        start = time.perf_counter()
+        doc_vectors = embed(documents)
+        embed_s = time.perf_counter() - start
+        print(f"   Encodage: {embed_s:.1f} s ({n / embed_s:.0f} docs/s)")
+
+        reference = NumpyExactBackend(space)
+        reference.build(ids, doc_vectors, documents)
+        exact = reference.search(query_vectors, k)
+        reference.close()
+
+        size_results = {"embed_s": round(embed_s, 3)}
+        for name in backends:
+            backend = BACKENDS[name](space)
+            try:
+                size_results[name] = bench_backend(backend, ids, doc_vectors, documents, query_vectors, exact, k, batch_size)
+            finally:
+                backend.close()
+            r = size_results[name]
+            print(f"   [{name}] ingest {r['ingest_s']} s | index {r['index_bytes'] / 1e6:.1f} Mo | "
+                  f"p50 {r['latency_ms']['p50']} ms | p99 {r['latency_ms']['p99']} ms | "
+                  f"{r['batch_throughput_qps']} req/s | recall@{k} {r[f'recall@{k}']}")
+        report["results"][str(n)] = size_results
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche de services (Agent 2)")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="Tailles de catalogue (séparées par des virgules)")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help=f"Backends à mesurer ({', '.join(BACKENDS)})")
+    parser.add_argument("--embeddings", choices=["hash", "model"], default="hash", help="Encodage des textes")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes synthétiques")
+    parser.add_argument("--k", type=int, default=10, help="Taille du top-k")
+    parser.add_argument("--batch-size", type=int, default=32, help="Taille des lots pour le débit")
+    parser.add_argument("--space", choices=["l2", "cosine", "ip"], default="l2", help="Espace de distance")
+    parser.add_argument("--output", default="bench_retrieval_report.json", help="Fichier du rapport JSON")
+
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    backends = [b for b in args.backends.split(",") if b]
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        parser.error(f"Backends inconnus: {unknown}. Disponibles: {list(BACKENDS)}")
+
+    report = run_benchmark(sizes, backends, args.embeddings, args.queries, args.k, args.batch_size, args.space)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Rapport écrit: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
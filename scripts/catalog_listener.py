@@ -0,0 +1,431 @@
+"""
+Listener des notifications TMF633 (mises à jour du catalogue en continu)
+
+Ce script:
+1. Démarre un petit serveur HTTP qui reçoit les notifications du catalogue
+   (ServiceSpecificationCreate / Change / Delete)
+2. S'abonne au hub TMF633 d'OpenSlice (POST .../serviceCatalogManagement/v4/hub)
+   avec une URL de callback portant un jeton secret, et supprime l'abonnement à
+   l'arrêt ; les notifications sans ce jeton sont refusées (401)
+3. Regroupe les événements reçus pendant une courte fenêtre (dernier événement
+   par service conservé), puis applique en une fois les upserts et suppressions
+   à la collection ChromaDB, sans parcourir le catalogue OpenSlice
+4. Reconstruit les index dérivés et incrémente la version du catalogue : les
+   agents de sélection en cours d'exécution rechargent l'index à la requête suivante
+
+Usage:
+    python scripts/catalog_listener.py --callback-url http://ibn-host:8090/listener
+    python scripts/catalog_listener.py --hub-url http://localhost:9000/hub --callback-url http://localhost:8090/listener
+    python scripts/catalog_listener.py --no-register --secret <jeton>  # Abonnement géré ailleurs
+"""
+import argparse
+import hmac
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agent2_selector import ServiceSelectorAgent, tenant_collection_name
+from config import settings
+from mcp.openslice_client import OpenSliceClient
+from scripts.ingest_catalog import (
+    CONTENT_HASH_KEY,
+    attach_variants,
+    build_derived_indexes,
+    embed_and_upsert,
+    get_openslice_token,
+    hydrate_service_specifications,
+    iter_service_records,
+    load_variants,
+    needs_hydration,
+    settle_changes,
+)
+
+
+def event_action(event_type: str) -> Optional[str]:
+    """
+    Action à appliquer pour un type d'événement TMF633
+
+    Returns:
+        "upsert" (création / modification), "delete", ou None (événement ignoré)
+    """
+    event_type = (event_type or "").lower()
+    if not event_type.startswith("servicespecification"):
+        return None
+    if "delete" in event_type:
+        return "delete"
+    if "create" in event_type or "change" in event_type:
+        return "upsert"
+    return None
+
+
+def parse_notification(body: Dict[str, Any], path: str = "") -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Extrait (type d'événement, ServiceSpecification) d'une notification TMF
+
+    Le type est lu dans "eventType", sinon dans le dernier segment du chemin
+    (/listener/serviceSpecificationCreateEvent). La spec est lue dans
+    event.serviceSpecification (format TMF v4), sinon à la racine du message.
+    """
+    event_type = body.get("eventType") or path.rstrip("/").rsplit("/", 1)[-1]
+    event = body.get("event") if isinstance(body.get("event"), dict) else body
+    spec = event.get("serviceSpecification")
+    return event_type, spec if isinstance(spec, dict) else None
+
+
+class CatalogEventCoalescer:
+    """
+    Regroupe les événements du catalogue et les applique par lots
+
+    Seul le dernier événement de chaque service est conservé (une création suivie
+    d'une suppression ne coûte qu'une suppression). Un lot est appliqué debounce_s
+    secondes après son premier événement, ou dès max_pending services en attente.
+    En cas d'échec, les événements du lot sont remis en attente (sauf si un
+    événement plus récent est arrivé entre-temps) et rejoués après un délai qui
+    double à chaque échec (au plus max_backoff_s) ; après max_retries échecs
+    consécutifs, ils sont abandonnés (la prochaine synchronisation --sync les rattrape).
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[Dict[str, Dict[str, Any]], Set[str]], Dict[str, int]],
+        debounce_s: float = 2.0,
+        max_pending: int = 500,
+        max_retries: int = 5,
+        max_backoff_s: float = 300.0
+    ):
+        """
+        Args:
+            apply: Fonction (upserts {id: spec}, suppressions {id}) -> compteurs
+            debounce_s: Fenêtre de regroupement (secondes)
+            max_pending: Nombre de services en attente qui déclenche l'application
+            max_retries: Nouvelles tentatives d'un événement en échec avant abandon
+            max_backoff_s: Délai maximal avant une nouvelle tentative (secondes)
+        """
+        self.apply = apply
+        self.debounce_s = debounce_s
+        self.max_pending = max(1, max_pending)
+        self.max_retries = max_retries
+        self.max_backoff_s = max_backoff_s
+
+        self._pending: Dict[str, Tuple[str, Optional[Dict[str, Any]]]] = {}
+        self._failures: Dict[str, int] = {}
+        self._first_at: Optional[float] = None
+        self._retry_at = 0.0
+        self._condition = threading.Condition()
+        self._closed = False
+        self.received = 0
+        self.batches = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="catalog-events", daemon=True)
+        self._thread.start()
+
+    def submit(self, action: str, service_id: str, spec: Optional[Dict[str, Any]] = None):
+        """Ajoute un événement ("upsert" avec la spec, ou "delete")"""
+        with self._condition:
+            self._pending[service_id] = (action, spec)
+            self._failures.pop(service_id, None)  # nouvel événement : compteur d'échecs remis à zéro
+            self.received += 1
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+            self._condition.notify()
+
+    def _take_batch(self) -> Optional[Dict[str, Tuple[str, Optional[Dict[str, Any]]]]]:
+        with self._condition:
+            while True:
+                if self._pending:
+                    now = time.monotonic()
+                    wait = max(self._first_at + self.debounce_s, self._retry_at) - now
+                    if self._retry_at > now and not self._closed:
+                        self._condition.wait(self._retry_at - now)  # délai après échec, même lot plein
+                        continue
+                    if wait <= 0 or len(self._pending) >= self.max_pending or self._closed:
+                        batch, self._pending, self._first_at = self._pending, {}, None
+                        return batch
+                    self._condition.wait(wait)
+                elif self._closed:
+                    return None
+                else:
+                    self._condition.wait()
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            upserts = {sid: spec for sid, (action, spec) in batch.items() if action == "upsert"}
+            deletes = {sid for sid, (action, _) in batch.items() if action == "delete"}
+            try:
+                counts = self.apply(upserts, deletes)
+                with self._condition:
+                    self.batches += 1
+                    self._retry_at = 0.0
+                    for service_id in batch:
+                        self._failures.pop(service_id, None)
+                print(f"✅ Lot appliqué: {counts['upserted']} écrit(s), {counts['deleted']} supprimé(s), "
+                      f"{counts['unchanged']} inchangé(s)")
+            except Exception as e:
+                with self._condition:
+                    if self._closed:
+                        print(f"❌ Échec de l'application du lot ({len(batch)} service(s)) à l'arrêt: {e}")
+                        return
+                    dropped = []
+                    for service_id, event in batch.items():
+                        if service_id in self._pending:
+                            continue  # événement plus récent reçu entre-temps
+                        failures = self._failures.get(service_id, 0) + 1
+                        if failures > self.max_retries:
+                            self._failures.pop(service_id, None)
+                            dropped.append(service_id)
+                            continue
+                        self._failures[service_id] = failures
+                        self._pending[service_id] = event
+                    self.dropped += len(dropped)
+                    attempts = max((self._failures.get(sid, 0) for sid in batch), default=1)
+                    backoff = min(self.debounce_s * 2 ** attempts, self.max_backoff_s)
+                    self._retry_at = time.monotonic() + backoff
+                    if self._pending and self._first_at is None:
+                        self._first_at = time.monotonic()
+                print(f"❌ Échec de l'application du lot ({len(batch)} service(s)): {e}")
+                if dropped:
+                    print(f"⚠️  {len(dropped)} événement(s) abandonné(s) après {self.max_retries} nouvelles tentatives "
+                          "(rattrapés par ingest_catalog.py --sync)")
+                if len(dropped) < len(batch):
+                    print(f"   Nouvel essai dans {backoff:.0f} s")
+
+    def close(self):
+        """Applique les événements en attente puis arrête le thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+
+def apply_catalog_events(
+    agent: ServiceSelectorAgent,
+    upserts: Dict[str, Dict[str, Any]],
+    deletes: Set[str],
+    token_provider: Callable[[], str] = get_openslice_token
+) -> Dict[str, int]:
+    """
+    Applique un lot d'événements à la collection (sans parcourir le catalogue)
+
+    Les specs "allégées" sont complétées par l'endpoint de détail (CATALOG_HYDRATION),
+    les services dont l'empreinte n'a pas changé (y compris les variantes rattachées
+    à un représentant) ne sont pas ré-encodés et les services écrits sont regroupés
+    avec leurs quasi-doublons. Si la collection a changé, les index dérivés sont mis
+    à jour à partir des services modifiés et la version du catalogue incrémentée.
+
+    Returns:
+        Dict[str, int]: Compteurs upserted / deleted / unchanged
+    """
+    agent.follow_collection_alias()  # une ré-indexation complète a pu publier une nouvelle génération
+    specs = [{"id": service_id, **spec} for service_id, spec in upserts.items()]
+    if settings.catalog_hydration and any(needs_hydration(spec) for spec in specs):
+        specs = list(hydrate_service_specifications(specs, token_provider()))
+
+    records = list(iter_service_records(specs))
+    variants = load_variants(agent)
+    stored = {
+        entry["id"]: (entry.get("metadata") or {}).get(CONTENT_HASH_KEY)
+        for entries in variants.values() for entry in entries
+    }
+    if records or deletes:
+        existing = agent.collection.get(ids=[r[0] for r in records] + sorted(deletes), include=["metadatas"])
+        stored.update(
+            (service_id, (metadata or {}).get(CONTENT_HASH_KEY))
+            for service_id, metadata in zip(existing["ids"], existing["metadatas"])
+        )
+
+    modified = [r for r in records if stored.get(r[0], "") != r[2][CONTENT_HASH_KEY]]
+    removed = {service_id for service_id in deletes if service_id in stored}
+    counts = {"upserted": len(modified), "deleted": len(removed), "unchanged": len(records) - len(modified)}
+
+    if modified:
+        embed_and_upsert(agent, attach_variants(modified, variants))
+    if modified or removed:
+        changed = settle_changes(agent, {r[0] for r in modified}, removed, variants)
+        build_derived_indexes(agent, changed)
+        version = agent.bump_catalog_version()
+        print(f"✅ Version du catalogue: {version}")
+    return counts
+
+
+# Paramètre de requête de l'URL de callback portant le jeton du listener
+LISTENER_TOKEN_PARAM = "token"
+
+
+def callback_with_token(callback: str, token: str) -> str:
+    """URL de callback enregistrée au hub : le hub la rappelle telle quelle, jeton compris"""
+    parts = urlsplit(callback)
+    query = parse_qs(parts.query)
+    query[LISTENER_TOKEN_PARAM] = [token]
+    return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def request_token(path: str, headers) -> Optional[str]:
+    """Jeton d'une notification : paramètre ?token=, en-tête X-Listener-Token ou Bearer"""
+    values = parse_qs(urlsplit(path).query).get(LISTENER_TOKEN_PARAM)
+    if values:
+        return values[-1]
+    if headers.get("X-Listener-Token"):
+        return headers.get("X-Listener-Token")
+    authorization = headers.get("Authorization") or ""
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return None
+
+
+def make_handler(coalescer: CatalogEventCoalescer, secret: str):
+    """
+    Classe de handler HTTP qui transmet les notifications au coalesceur
+
+    Args:
+        coalescer: Coalesceur des événements
+        secret: Jeton exigé dans chaque notification (voir request_token)
+    """
+    if not secret:
+        raise ValueError("Un jeton est requis pour recevoir les notifications du catalogue")
+    expected = secret.encode("utf-8")
+
+    class CatalogNotificationHandler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            token = request_token(self.path, self.headers)
+            if token is None or not hmac.compare_digest(token.encode("utf-8"), expected):
+                self._reply(401, {"error": "jeton du listener absent ou invalide"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(body, dict):
+                    raise ValueError("notification JSON attendue")
+            except ValueError as e:
+                self._reply(400, {"error": str(e)})
+                return
+
+            event_type, spec = parse_notification(body, urlsplit(self.path).path)
+            action = event_action(event_type)
+            service_id = (spec or {}).get("id")
+            if action is None or not service_id:
+                self._reply(202, {"status": "ignored"})
+                return
+            coalescer.submit(action, service_id, spec if action == "upsert" else None)
+            self._reply(201, {"status": "accepted"})
+
+        def _reply(self, status: int, payload: Dict[str, Any]):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # une ligne par lot appliqué suffit
+
+    return CatalogNotificationHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Listener des notifications du catalogue OpenSlice (TMF633)"
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=8090, help="Port d'écoute")
+    parser.add_argument(
+        "--callback-url",
+        default=None,
+        help="URL du listener joignable par le hub OpenSlice (obligatoire sauf --no-register)"
+    )
+    parser.add_argument(
+        "--hub-url",
+        default=None,
+        help="URL du hub TMF633 (défaut: hub d'OPENSLICE_BASE_URL ; ex: bouchon local)"
+    )
+    parser.add_argument(
+        "--no-register",
+        action="store_true",
+        help="Ne pas s'abonner au hub (abonnement géré par ailleurs, avec --secret)"
+    )
+    parser.add_argument(
+        "--secret",
+        default=settings.catalog_listener_secret,
+        help="Jeton exigé dans les notifications (défaut: CATALOG_LISTENER_SECRET, "
+             "sinon généré et enregistré dans l'URL de callback de l'abonnement)"
+    )
+    parser.add_argument(
+        "--tenant",
+        default=None,
+        help="Tenant OpenSlice dont le catalogue est mis à jour (collection dédiée)"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=2.0,
+        help="Fenêtre de regroupement des événements (secondes)"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=500,
+        help="Services en attente qui déclenchent l'application immédiate du lot"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=5,
+        help="Nouvelles tentatives d'un lot en échec (délai doublé à chaque échec) avant abandon"
+    )
+
+    args = parser.parse_args()
+    if not args.no_register and not args.callback_url:
+        parser.error("--callback-url est obligatoire pour s'abonner au hub (URL joignable par OpenSlice)")
+    if args.no_register and not args.secret:
+        parser.error("--secret (ou CATALOG_LISTENER_SECRET) est obligatoire avec --no-register")
+    secret = args.secret or secrets.token_urlsafe(32)
+
+    agent = ServiceSelectorAgent(collection_name=tenant_collection_name(args.tenant))
+    coalescer = CatalogEventCoalescer(
+        lambda upserts, deletes: apply_catalog_events(agent, upserts, deletes),
+        debounce_s=args.debounce,
+        max_pending=args.max_pending,
+        max_retries=args.max_retries
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(coalescer, secret))
+
+    client = None
+    subscription_id = None
+    if not args.no_register:
+        client = OpenSliceClient()
+        subscription_id = client.register_catalog_listener(
+            callback_with_token(args.callback_url, secret), hub_url=args.hub_url
+        ).get("id")
+
+    print(f"📡 Listener du catalogue à l'écoute sur {args.host}:{server.server_address[1]}"
+          + (f" (callback: {args.callback_url})" if args.callback_url else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nArrêt du listener...")
+    finally:
+        server.server_close()
+        coalescer.close()
+        if client is not None:
+            if subscription_id:
+                try:
+                    client.unregister_catalog_listener(subscription_id, hub_url=args.hub_url)
+                except Exception as e:
+                    print(f"⚠️  Suppression de l'abonnement impossible: {e}")
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
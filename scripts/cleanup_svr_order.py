@@ -1,10 +1,10 @@
-import httpx
 import sys
 import os
 
 # Ajout du chemin pour importer tes réglages
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from config import settings
+from mcp.http_pool import shared_client, transport_stats
 from scripts.ingest_catalog import get_openslice_token
 
 def cleanup():
@@ -15,9 +15,11 @@ def cleanup():
     base_url = f"{settings.openslice_base_url}/tmf-api/serviceOrdering/v4/serviceOrder"
     headers = {"Authorization": f"Bearer {token}"}
 
+    # Client sur le pool partagé : une connexion keep-alive pour toutes les suppressions
+    client = shared_client(timeout=10.0, headers=headers)
     try:
         # 1. Lister tous les ordres existants
-        response = httpx.get(base_url, headers=headers, timeout=10.0)
+        response = client.get(base_url)
         response.raise_for_status()
         orders = response.json()
 
@@ -33,7 +35,7 @@ def cleanup():
             if not order_id: continue
 
             del_url = f"{base_url}/{order_id}"
-            del_resp = httpx.delete(del_url, headers=headers, timeout=10.0)
+            del_resp = client.delete(del_url)
             
             if del_resp.status_code in [200, 204]:
                 print(f"✅ Ordre supprimé : {order_id}")
@@ -41,9 +43,13 @@ def cleanup():
                 print(f"⚠️ Échec suppression {order_id}: {del_resp.status_code}")
 
         print("\n✅ Nettoyage terminé.")
+        stats = transport_stats()
+        print(f"🔌 {stats['requests']} requête(s), {stats['new_connections']} connexion(s) ouverte(s)")
 
     except Exception as e:
         print(f"❌ Erreur lors du nettoyage : {e}")
+    finally:
+        client.close()
 
 if __name__ == "__main__":
     cleanup()
\ No newline at end of file
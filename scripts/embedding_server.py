@@ -0,0 +1,70 @@
+"""
+Service d'embeddings partagé (un modèle chargé une fois par machine)
+
+Ce script:
+1. Charge le modèle d'embeddings (settings.embedding_model / settings.embedding_backend)
+2. Écoute sur un socket Unix (settings.embedding_socket_path)
+3. Regroupe les textes reçus de tous les processus en micro-batches
+
+L'Agent 2, scripts/ingest_catalog.py et les scripts de test l'utilisent
+automatiquement lorsqu'il est démarré (EMBEDDING_SERVICE=true), et chargent
+le modèle localement sinon.
+
+Usage:
+    python scripts/embedding_server.py
+    python scripts/embedding_server.py --max-batch-size 128 --max-wait-ms 2
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import settings
+from retrieval.embeddings import get_embedding_function
+from retrieval.embedding_server import EmbeddingServer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Service d'embeddings partagé sur socket Unix"
+    )
+    parser.add_argument(
+        "--socket",
+        default=settings.embedding_socket_path,
+        help="Chemin du socket Unix (défaut: settings.embedding_socket_path)"
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=64,
+        help="Nombre maximal de textes encodés en un appel au modèle"
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=5.0,
+        help="Attente maximale pour compléter un micro-batch (ms)"
+    )
+
+    args = parser.parse_args()
+
+    print(f"Chargement du modèle d'embeddings: {settings.embedding_model} (backend: {settings.embedding_backend})")
+    embedding_function = get_embedding_function(use_service=False)
+
+    server = EmbeddingServer(
+        socket_path=args.socket,
+        embedding_function=embedding_function,
+        model_name=settings.embedding_model,
+        backend=settings.embedding_backend,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nService d'embeddings arrêté")
+
+
+if __name__ == "__main__":
+    main()
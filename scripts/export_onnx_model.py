@@ -0,0 +1,103 @@
+"""
+Export du modèle d'embeddings en ONNX quantifié int8
+
+Ce script:
+1. Charge le modèle Hugging Face (settings.embedding_model) et son tokenizer
+2. Exporte le transformer en ONNX (axes batch / séquence dynamiques)
+3. Quantifie les poids en int8 (quantification dynamique ONNX Runtime)
+4. Écrit model_quantized.onnx, tokenizer.json et export.json (modèle exporté)
+   dans settings.onnx_model_dir
+
+Le backend "onnx-int8" (EMBEDDING_BACKEND=onnx-int8) utilise ensuite ces fichiers
+pour l'Agent 2 et pour scripts/ingest_catalog.py.
+
+Usage:
+    python scripts/export_onnx_model.py
+    python scripts/export_onnx_model.py --output ./data/onnx/minilm-int8
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import settings
+from retrieval.embeddings import ONNX_MANIFEST_FILE, ONNX_MODEL_FILE, ONNX_TOKENIZER_FILE
+
+
+def export_model(model_name: str, output_dir: str, opset: int = 14):
+    """
+    Exporte et quantifie le modèle d'embeddings
+
+    Args:
+        model_name: Modèle Hugging Face (ex: sentence-transformers/all-MiniLM-L6-v2)
+        output_dir: Répertoire de sortie
+        opset: Version d'opset ONNX
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    int8_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+
+    print(f"1️⃣  Chargement de {model_name}...")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+
+    print("2️⃣  Export ONNX (float32)...")
+    sample = tokenizer(["export onnx"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+
+    print("3️⃣  Quantification int8...")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+    # tokenizer.json (tokenizer "fast" sérialisé) lu par la librairie tokenizers
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, ONNX_TOKENIZER_FILE))
+
+    # Modèle d'origine, vérifié au chargement (EMBEDDING_MODEL doit correspondre)
+    with open(os.path.join(output_dir, ONNX_MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump({"model": model_name}, f)
+
+    size_mb = os.path.getsize(int8_path) / (1024 * 1024)
+    print(f"✅ Modèle exporté: {int8_path} ({size_mb:.1f} Mo)")
+    print("   Activez-le avec EMBEDDING_BACKEND=onnx-int8 puis ré-ingérez le catalogue (--clear)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export du modèle d'embeddings en ONNX quantifié int8"
+    )
+    parser.add_argument(
+        "--model",
+        default=settings.embedding_model,
+        help="Modèle Hugging Face à exporter"
+    )
+    parser.add_argument(
+        "--output",
+        default=settings.onnx_model_dir,
+        help="Répertoire de sortie (défaut: settings.onnx_model_dir)"
+    )
+
+    args = parser.parse_args()
+    export_model(args.model, args.output)
+
+
+if __name__ == "__main__":
+    main()
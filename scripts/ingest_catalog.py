@@ -3,48 +3,95 @@ Script d'ingestion du catalogue OpenSlice (TMF633) dans ChromaDB
 
 Ce script:
 1. Se connecte à l'API OpenSlice TMF633 (Service Catalog Management)
-2. Récupère toutes les ServiceSpecifications
-3. Génère des embeddings pour chaque service
+2. Récupère les ServiceSpecifications page par page (offset / limit / fields) et
+   complète en parallèle celles que la liste renvoie sans leurs caractéristiques
+3. Génère des embeddings par lots pendant que les pages suivantes sont récupérées
+   (file bornée entre récupération et encodage : mémoire constante), dans le
+   processus ou sur un pool de processus (INGEST_PROCESSES)
 4. Stocke les vecteurs dans ChromaDB pour la recherche sémantique
+5. Construit l'index lexical BM25 (recherche hybride de l'Agent 2)
+6. Construit l'index vectoriel compressé si VECTOR_BACKEND=compressed
+7. Construit les shards par catégorie si CATEGORY_SHARDING=true
+8. Construit l'index des zones de couverture (gazetteer hors ligne)
+9. Construit l'index des contraintes numériques (caractéristiques, garanties QoS)
+
+Avec DEDUP_NEAR_DUPLICATES=true (désactivé par défaut), les quasi-doublons (versions,
+clones par région, copies de test) sont regroupés après l'encodage : un seul
+représentant par groupe reste indexé, les autres services lui sont rattachés comme
+variantes.
+
+Avec --sync, seuls les services nouveaux ou modifiés (empreinte du document et des
+métadonnées) sont ré-encodés, les services disparus d'OpenSlice sont supprimés et
+les index dérivés ne sont mis à jour, à partir des seuls services modifiés, que si
+le catalogue a changé.
 
 Usage:
     python scripts/ingest_catalog.py
-    python scripts/ingest_catalog.py --clear  # Efface d'abord la collection
+    python scripts/ingest_catalog.py --clear  # Ré-indexation complète (bleu/vert)
+    python scripts/ingest_catalog.py --sync   # Synchronisation incrémentale
+    python scripts/ingest_catalog.py --tenant operator-a  # Catalogue d'un tenant
+    python scripts/ingest_catalog.py --processes 4  # Encodage sur 4 processus
+    python scripts/ingest_catalog.py --export snapshot.tar  # Instantané portable de l'index
+    python scripts/ingest_catalog.py --import snapshot.tar  # Nœud sans accès à OpenSlice
 """
 import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import queue
 import sys
 import os
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Set, Tuple
 import httpx
+import numpy as np
 from tqdm import tqdm
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from agents.agent2_selector import ServiceSelectorAgent
+from agents.agent2_selector import ServiceSelectorAgent, tenant_collection_name
 from config import settings
+from mcp.openslice_client import CATALOG_FIELDS, hydrate_tmf_items, iter_tmf_pages
+from mcp.http_pool import shared_client
+from mcp.token_manager import OpenSliceAuth, get_token_manager
+from retrieval import (
+    BM25Index,
+    CompressedIndex,
+    ConstraintIndex,
+    CoverageIndex,
+    EmbeddingProcessPool,
+    ShardIndex,
+    VARIANT_COUNT_KEY,
+    choose_representative,
+    cluster_near_duplicates,
+    collection_space,
+    parse_characteristics,
+    parse_guarantees,
+    parse_variants,
+    strip_variants,
+    variant_metadata,
+)
 
 
 def get_openslice_token() -> str:
     """
     Obtient un token d'authentification pour OpenSlice
     
+    Le token est celui du gestionnaire partagé par le processus (get_token_manager) :
+    Keycloak n'est sollicité que si le token est absent ou proche de l'expiration
+    (ou via le cache fichier OPENSLICE_TOKEN_CACHE partagé entre processus).
+    
     Returns:
         str: Token JWT
     """
-    auth_url = f"{settings.openslice_auth_url}/auth/realms/openslice/protocol/openid-connect/token"
-    
-    data = {
-        "username": settings.openslice_username,
-        "password": settings.openslice_password,
-        "grant_type": "password",
-        "client_id": "osapiWebClientId"
-    }
+    manager = get_token_manager()
+    auth_url = manager.token_url
     
     try:
         print(f"Authentification Keycloak: {auth_url}")
-        response = httpx.post(auth_url, data=data, timeout=30.0)
-        response.raise_for_status()
-        token = response.json()["access_token"]
+        token = manager.get_token()
         print("✅ Authentification réussie")
         return token
     except httpx.HTTPStatusError as e:
@@ -64,6 +111,123 @@ def get_openslice_token() -> str:
         raise
 
 
+def iter_service_specifications(token: Optional[str] = None, page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourt les ServiceSpecifications du catalogue OpenSlice (TMF633) page par page
+
+    Seule la page courante est gardée en mémoire ; la projection CATALOG_FIELDS
+    limite les réponses aux champs utilisés pour l'indexation.
+
+    Args:
+        token: Token JWT d'authentification (None = token partagé, renouvelé pendant
+               le parcours et sur 401)
+        page_size: Taille des pages (défaut: settings.catalog_page_size)
+    """
+    # API TMF633: Service Catalog Management
+    catalog_url = f"{settings.openslice_base_url}/tmf-api/serviceCatalogManagement/v4/serviceSpecification"
+    
+    headers = {"Accept": "application/json"}
+    auth = None
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    else:
+        auth = OpenSliceAuth(get_token_manager())
+    
+    print(f"Récupération des services depuis: {catalog_url}")
+    with shared_client(timeout=60.0, auth=auth) as client:
+        for page in iter_tmf_pages(
+            client,
+            catalog_url,
+            headers,
+            page_size=settings.catalog_page_size if page_size is None else page_size,
+            fields=CATALOG_FIELDS,
+            list_key="serviceSpecification"
+        ):
+            yield from page
+
+
+# Champs utilisés par l'indexation, parfois absents des réponses de la liste TMF633
+DETAIL_FIELDS = ("serviceSpecCharacteristic", "category", "serviceType")
+
+
+def needs_hydration(service_spec: Dict[str, Any]) -> bool:
+    """Vrai si la spec renvoyée par la liste ne porte pas tous les champs DETAIL_FIELDS"""
+    return any(field not in service_spec for field in DETAIL_FIELDS)
+
+
+def hydrate_service_specifications(
+    service_specs: Iterable[Dict[str, Any]],
+    token: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    retries: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Complète les ServiceSpecifications "allégées" avec leur détail TMF633, en flux
+
+    Les specs sont regroupées par paquets (une page TMF633) ; dans chaque paquet, les
+    specs auxquelles il manque un champ de DETAIL_FIELDS sont complétées en parallèle
+    par GET .../serviceSpecification/{id} (httpx.AsyncClient authentifié, connexions
+    réutilisées pendant tout le parcours, au plus `concurrency` requêtes par hôte,
+    reprises sur erreurs transitoires). L'ordre des specs est conservé.
+
+    Args:
+        service_specs: Specs renvoyées par la liste (ex: iter_service_specifications)
+        token: Token JWT d'authentification (None = token partagé, renouvelé sur 401)
+        chunk_size: Specs par paquet (défaut: settings.catalog_page_size)
+        concurrency: Requêtes de détail simultanées par hôte (défaut: settings.hydration_concurrency)
+        retries: Nouvelles tentatives par spec (défaut: settings.hydration_retries)
+    """
+    catalog_url = f"{settings.openslice_base_url}/tmf-api/serviceCatalogManagement/v4/serviceSpecification"
+    chunk_size = chunk_size or settings.catalog_page_size or 200
+    concurrency = max(1, concurrency or settings.hydration_concurrency)
+    retries = settings.hydration_retries if retries is None else retries
+
+    loop = asyncio.new_event_loop()
+    headers = {"Accept": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    client = httpx.AsyncClient(
+        headers=headers,
+        auth=None if token else OpenSliceAuth(get_token_manager()),
+        timeout=60.0,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    )
+    hydrated = 0
+
+    def flush(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        nonlocal hydrated
+        shallow = [i for i, spec in enumerate(chunk) if needs_hydration(spec)]
+        if not shallow:
+            return chunk
+        details = loop.run_until_complete(hydrate_tmf_items(
+            client,
+            catalog_url,
+            [chunk[i] for i in shallow],
+            concurrency=concurrency,
+            retries=retries
+        ))
+        for i, spec in zip(shallow, details):
+            hydrated += spec is not chunk[i]
+            chunk[i] = spec
+        return chunk
+
+    try:
+        chunk = []
+        for service_spec in service_specs:
+            chunk.append(service_spec)
+            if len(chunk) >= chunk_size:
+                yield from flush(chunk)
+                chunk = []
+        if chunk:
+            yield from flush(chunk)
+        if hydrated:
+            print(f"🔎 {hydrated} ServiceSpecification(s) complétée(s) via l'endpoint de détail")
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+
+
 def fetch_service_specifications(token: str) -> List[Dict[str, Any]]:
     """
     Récupère toutes les ServiceSpecifications du catalogue OpenSlice (TMF633)
@@ -74,31 +238,14 @@ def fetch_service_specifications(token: str) -> List[Dict[str, Any]]:
     Returns:
         List[Dict]: Liste des ServiceSpecifications
     """
-    # API TMF633: Service Catalog Management
-    catalog_url = f"{settings.openslice_base_url}/tmf-api/serviceCatalogManagement/v4/serviceSpecification"
-    
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json"
-    }
-    
     try:
-        print(f"Récupération des services depuis: {catalog_url}")
-        response = httpx.get(catalog_url, headers=headers, timeout=60.0)
-        response.raise_for_status()
-        
-        services = response.json()
-        
-        # Gestion de la pagination si nécessaire
-        if isinstance(services, dict) and "serviceSpecification" in services:
-            services = services["serviceSpecification"]
-        
+        services = list(iter_service_specifications(token))
         print(f"✅ {len(services)} ServiceSpecification(s) récupérée(s)")
         return services
         
     except httpx.HTTPStatusError as e:
         print(f"❌ Erreur HTTP {e.response.status_code}: {e}")
-        print(f"   URL: {catalog_url}")
+        print(f"   URL: {e.request.url}")
         raise
     except Exception as e:
         print(f"❌ Erreur lors de la récupération: {e}")
@@ -151,6 +298,16 @@ def create_service_document(service_spec: Dict[str, Any]) -> str:
     return " | ".join(parts)
 
 
+# Métadonnée portant l'empreinte du contenu indexé d'un service (synchronisation)
+CONTENT_HASH_KEY = "content_hash"
+
+# Caractéristiques TMF633 décrivant la zone de couverture d'un service
+COVERAGE_CHARACTERISTICS = {"location", "coverage", "coverage_area", "coveragearea", "region", "area"}
+
+# Services lus par appel à collection.get() (index dérivés, quasi-doublons)
+COLLECTION_PAGE_SIZE = 5000
+
+
 def extract_metadata(service_spec: Dict[str, Any]) -> Dict[str, str]:
     """
     Extrait les métadonnées importantes d'une ServiceSpecification
@@ -183,15 +340,806 @@ def extract_metadata(service_spec: Dict[str, Any]) -> Dict[str, str]:
     if "serviceSpecCharacteristic" in service_spec:
         metadata["num_characteristics"] = str(len(service_spec["serviceSpecCharacteristic"]))
     
+    # Zone de couverture (caractéristique "Location" / "Coverage", valeurs séparées par des virgules)
+    locations = []
+    for char in service_spec.get("serviceSpecCharacteristic") or []:
+        if str(char.get("name", "")).strip().lower() in COVERAGE_CHARACTERISTICS:
+            for value in char.get("serviceSpecCharacteristicValue") or []:
+                if value.get("value"):
+                    locations.append(str(value["value"]))
+    if locations:
+        metadata["location"] = ", ".join(locations)
+    
+    # Intervalles des caractéristiques chiffrées (vCPU, RAM_GB...), sérialisés en JSON
+    ranges = parse_characteristics(service_spec.get("serviceSpecCharacteristic") or [])
+    if ranges:
+        metadata["constraints"] = json.dumps(ranges, sort_keys=True)
+    
     return metadata
 
 
-def ingest_catalog(clear_existing: bool = False):
+def read_collection(
+    agent: ServiceSelectorAgent,
+    include: List[str],
+    ids: Optional[Iterable[str]] = None,
+    page_size: int = COLLECTION_PAGE_SIZE
+) -> Dict[str, Any]:
+    """
+    Lit la collection, ou seulement les services ids, par pages de collection.get()
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        include: Champs lus ("documents", "metadatas", "embeddings")
+        ids: Services à lire (None = toute la collection) ; les absents sont ignorés
+        page_size: Services lus par appel à collection.get()
+
+    Returns:
+        Dict: "ids" et une liste par champ lu ; "embeddings" est un tableau (n, d)
+    """
+    def pages():
+        if ids is not None:
+            wanted = sorted(ids)
+            for start in range(0, len(wanted), page_size):
+                yield agent.collection.get(ids=wanted[start:start + page_size], include=include)
+            return
+        offset = 0
+        while True:
+            page = agent.collection.get(include=include, limit=page_size, offset=offset)
+            if not page["ids"]:
+                return
+            yield page
+            offset += len(page["ids"])
+
+    content: Dict[str, Any] = {"ids": [], **{key: [] for key in include}}
+    for page in pages():
+        if not page["ids"]:
+            continue
+        content["ids"].extend(page["ids"])
+        for key in include:
+            if key == "embeddings":
+                content[key].append(np.asarray(page[key], dtype=np.float32).reshape(len(page["ids"]), -1))
+            else:
+                content[key].extend(page[key])
+    if "embeddings" in include:
+        content["embeddings"] = np.vstack(content["embeddings"]) if content["embeddings"] else np.zeros((0, 0), dtype=np.float32)
+    return content
+
+
+def refresh_index(
+    agent: ServiceSelectorAgent,
+    current: Any,
+    changed: Optional[Set[str]],
+    include: List[str],
+    update: Callable[[Any, Dict[str, Any]], Any],
+    build: Callable[[Dict[str, Any]], Any]
+) -> Any:
+    """
+    Met à jour un index dérivé à partir des services modifiés, ou le reconstruit
+
+    Avec changed, seuls ces services sont relus (les absents de la collection ont été
+    supprimés) et update(current, content) les applique à l'index courant. L'index est
+    reconstruit sur toute la collection (build(content)) sans changed, sans index
+    courant, ou si le résultat ne couvre pas exactement la collection.
+    """
+    index = None
+    if changed is not None and current is not None:
+        index = update(current, read_collection(agent, include, ids=changed))
+    if index is None or len(index) != agent.collection.count():
+        index = build(read_collection(agent, include))
+    return index
+
+
+def build_lexical_index(agent: ServiceSelectorAgent, changed: Optional[Set[str]] = None) -> BM25Index:
+    """
+    Construit l'index lexical BM25 sur l'ensemble des documents de la collection
+
+    Les documents sont relus depuis ChromaDB : l'index couvre donc exactement le
+    texte produit par create_service_document(), y compris les services ingérés
+    lors d'exécutions précédentes (ingestion sans --clear).
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        changed: Services écrits ou supprimés depuis la dernière construction
+                 (None = reconstruction complète, voir refresh_index)
+
+    Returns:
+        BM25Index: Index construit et sauvegardé à côté de la collection
+    """
+    current = agent.lexical_index
+    index = refresh_index(
+        agent,
+        current if current is not None and current.postings_tf is not None else None,
+        changed,
+        ["documents"],
+        lambda index, content: index.updated(changed, content["ids"], content["documents"]),
+        lambda content: BM25Index.build(content["ids"], content["documents"])
+    )
+    index.save(agent.lexical_index_path)
+    agent.lexical_index = index
+    print(f"✅ Index lexical BM25 construit ({len(index)} documents, {len(index.vocabulary)} termes)")
+    return index
+
+
+def build_compressed_index(agent: ServiceSelectorAgent, changed: Optional[Set[str]] = None) -> CompressedIndex:
+    """
+    Construit l'index vectoriel compressé (float16 / IVF-PQ) sur les embeddings de la collection
+
+    Les embeddings sont relus depuis ChromaDB (aucun ré-encodage) et l'index utilise
+    l'espace de distance de la collection. La mise à jour incrémentale encode les
+    services modifiés avec les centroïdes existants.
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        changed: Services écrits ou supprimés depuis la dernière construction
+                 (None = reconstruction complète, voir refresh_index)
+
+    Returns:
+        CompressedIndex: Index construit et sauvegardé à côté de la collection
+    """
+    space = collection_space(agent.collection)
+    current = agent.compressed_index
+    if current is not None and (current.mode != settings.compressed_index_mode or current.space != space):
+        current = None
+    index = refresh_index(
+        agent,
+        current,
+        changed,
+        ["embeddings"],
+        lambda index, content: index.updated(changed, content["ids"], content["embeddings"]),
+        lambda content: CompressedIndex.build(
+            content["ids"],
+            content["embeddings"],
+            mode=settings.compressed_index_mode,
+            space=space,
+            nlist=settings.compressed_nlist,
+            pq_m=settings.compressed_pq_m,
+            nprobe=settings.compressed_nprobe,
+            rerank=settings.compressed_rerank
+        )
+    )
+    index.save(agent.compressed_index_path)
+    agent.compressed_index = index
+    report = index.memory_report()
+    print(f"✅ Index compressé construit ({report['mode']}, {report['count']} services, "
+          f"{report['bytes_per_vector']} octets/vecteur, compression x{report['compression_ratio']})")
+    return index
+
+
+def build_shard_index(agent: ServiceSelectorAgent, changed: Optional[Set[str]] = None) -> ShardIndex:
+    """
+    Regroupe les embeddings de la collection en shards par catégorie de service
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        changed: Services écrits ou supprimés depuis la dernière construction
+                 (None = reconstruction complète, voir refresh_index)
+
+    Returns:
+        ShardIndex: Shards construits et sauvegardés à côté de la collection
+    """
+    def categories(content):
+        return [(metadata or {}).get("category") for metadata in content["metadatas"]]
+
+    space = collection_space(agent.collection)
+    current = agent.shard_index if agent.shard_index is not None and agent.shard_index.space == space else None
+    index = refresh_index(
+        agent,
+        current,
+        changed,
+        ["embeddings", "metadatas"],
+        lambda index, content: index.updated(changed, content["ids"], content["embeddings"], categories(content)),
+        lambda content: ShardIndex.build(
+            content["ids"],
+            content["embeddings"],
+            categories(content),
+            space=space,
+            routes=settings.shard_routes
+        )
+    )
+    index.save(agent.shard_index_path)
+    agent.shard_index = index
+    sizes = ", ".join(f"{name}: {size}" for name, size in index.shard_sizes().items())
+    print(f"✅ Shards par catégorie construits ({sizes})")
+    return index
+
+
+def build_coverage_index(agent: ServiceSelectorAgent, changed: Optional[Set[str]] = None) -> CoverageIndex:
+    """
+    Construit l'index des zones de couverture des services de la collection
+
+    Les zones viennent de la métadonnée "location" (caractéristique TMF633) si elle
+    existe, sinon des noms de lieux cités dans le document (nom, description).
+    Les services sans lieu reconnu ont une couverture inconnue : ils ne sont jamais
+    exclus par le filtre géographique.
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible, gazetteer)
+        changed: Services écrits ou supprimés depuis la dernière construction
+                 (None = reconstruction complète, voir refresh_index)
+
+    Returns:
+        CoverageIndex: Index construit et sauvegardé à côté de la collection
+    """
+    def coverages(content):
+        result = []
+        for document, metadata in zip(content["documents"], content["metadatas"]):
+            location = (metadata or {}).get("location")
+            if location:
+                result.append(agent.gazetteer.find_places(str(location), proper_nouns=False))
+            else:
+                result.append(agent.gazetteer.find_places(document or ""))
+        return result
+
+    index = refresh_index(
+        agent,
+        agent.coverage_index,
+        changed,
+        ["documents", "metadatas"],
+        lambda index, content: index.updated(changed, content["ids"], coverages(content)),
+        lambda content: CoverageIndex.build(content["ids"], coverages(content))
+    )
+    index.save(agent.coverage_index_path)
+    agent.coverage_index = index
+    stats = index.stats()
+    print(f"✅ Index de couverture construit ({stats['covered']}/{stats['services']} services localisés, "
+          f"{stats['areas']} zones)")
+    return index
+
+
+def build_constraint_index(agent: ServiceSelectorAgent, changed: Optional[Set[str]] = None) -> ConstraintIndex:
+    """
+    Construit l'index des contraintes numériques des services de la collection
+
+    Les intervalles viennent des caractéristiques chiffrées (métadonnée "constraints",
+    voir extract_metadata) et des garanties citées dans le document ("latence < 5ms") ;
+    une caractéristique l'emporte sur une garantie textuelle du même attribut.
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        changed: Services écrits ou supprimés depuis la dernière construction
+                 (None = reconstruction complète, voir refresh_index)
+
+    Returns:
+        ConstraintIndex: Index construit et sauvegardé à côté de la collection
+    """
+    def ranges(content):
+        result = []
+        for document, metadata in zip(content["documents"], content["metadatas"]):
+            service_ranges = parse_guarantees(document or "")
+            for attribute, (lo, hi) in json.loads((metadata or {}).get("constraints") or "{}").items():
+                service_ranges[attribute] = (float(lo), float(hi))
+            result.append(service_ranges)
+        return result
+
+    index = refresh_index(
+        agent,
+        agent.constraint_index,
+        changed,
+        ["documents", "metadatas"],
+        lambda index, content: index.updated(changed, content["ids"], ranges(content)),
+        lambda content: ConstraintIndex.build(content["ids"], ranges(content))
+    )
+    index.save(agent.constraint_index_path)
+    agent.constraint_index = index
+    attributes = ", ".join(f"{name}: {count}" for name, count in index.stats()["attributes"].items())
+    print(f"✅ Index des contraintes construit ({len(index)} services, {attributes or 'aucun attribut chiffré'})")
+    return index
+
+
+def content_hash(document: str, metadata: Dict[str, Any]) -> str:
+    """
+    Empreinte SHA-256 du contenu indexé d'un service (document + métadonnées)
+
+    La métadonnée CONTENT_HASH_KEY elle-même est exclue du calcul.
+    """
+    payload = json.dumps(
+        [document, {k: v for k, v in metadata.items() if k != CONTENT_HASH_KEY}],
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_derived_indexes(agent: ServiceSelectorAgent, changed: Optional[Set[str]] = None):
+    """
+    Reconstruit les index dérivés de la collection (BM25, couverture, contraintes, compressé, shards)
+
+    Avec changed (services écrits ou supprimés, voir settle_changes), les index
+    existants sont mis à jour en ne relisant que ces services.
+    """
+    build_lexical_index(agent, changed)
+    build_coverage_index(agent, changed)
+    build_constraint_index(agent, changed)
+    if settings.vector_backend == "compressed":
+        build_compressed_index(agent, changed)
+    if settings.category_sharding:
+        build_shard_index(agent, changed)
+
+
+def iter_service_records(service_specs: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Transforme les ServiceSpecifications en (id, document, métadonnées) à indexer
+
+    Les services sans identifiant ou déjà vus sont ignorés ; les métadonnées portent
+    l'empreinte du contenu (CONTENT_HASH_KEY) utilisée par --sync.
+    """
+    seen = set()
+    for service_spec in service_specs:
+        # UUID du service (clé primaire)
+        service_id = service_spec.get("id") or service_spec.get("uuid")
+        if not service_id:
+            print(f"⚠️  Service sans ID ignoré: {service_spec.get('name', 'Unknown')}")
+            continue
+        if service_id in seen:
+            print(f"⚠️  Service en double ignoré: {service_id}")
+            continue
+        seen.add(service_id)
+        
+        # Document textuel pour l'embedding
+        document = create_service_document(service_spec)
+        
+        # Métadonnées (avec l'empreinte du contenu pour --sync)
+        metadata = extract_metadata(service_spec)
+        metadata[CONTENT_HASH_KEY] = content_hash(document, metadata)
+        yield service_id, document, metadata
+
+
+def embed_and_upsert(
+    agent: ServiceSelectorAgent,
+    records: Iterable[Tuple[str, str, Dict[str, Any]]],
+    batch_size: Optional[int] = None,
+    queue_batches: Optional[int] = None,
+    workers: Optional[int] = None,
+    processes: Optional[int] = None
+) -> int:
+    """
+    Encode et écrit des services dans la collection par lots, en flux
+
+    Un thread producteur consomme `records` (donc les pages TMF633 récupérées sur le
+    réseau) et dépose des lots de taille fixe dans une file bornée ; les threads
+    d'encodage calculent les embeddings de chaque lot et l'écrivent (upsert avec
+    embeddings précalculés). La récupération des pages suivantes se poursuit pendant
+    l'encodage, et au plus queue_batches lots attendent en mémoire.
+
+    Avec processes > 0, les lots sont encodés par un EmbeddingProcessPool (un modèle
+    par processus, threads fixés) et au moins un thread d'écriture par processus
+    alimente le pool. Le débit (services/s) est affiché en fin d'ingestion.
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible, modèle d'embeddings)
+        records: (id, document, métadonnées), ex: iter_service_records(...)
+        batch_size: Services par lot (défaut: settings.ingest_batch_size)
+        queue_batches: Lots en attente au maximum (défaut: settings.ingest_queue_batches)
+        workers: Threads d'encodage / écriture (défaut: settings.ingest_workers)
+        processes: Processus d'encodage (défaut: settings.ingest_processes, 0 = aucun)
+
+    Returns:
+        int: Nombre de services écrits
+    """
+    batch_size = min(batch_size or settings.ingest_batch_size, agent.client.get_max_batch_size())
+    processes = settings.ingest_processes if processes is None else processes
+    pool = EmbeddingProcessPool(processes, settings.ingest_threads_per_process) if processes > 0 else None
+    encode = pool.encode if pool else agent.embedding_function
+    workers = max(1, workers or settings.ingest_workers, processes)
+    batches: "queue.Queue[Optional[list]]" = queue.Queue(maxsize=max(1, queue_batches or settings.ingest_queue_batches))
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    written = [0]
+    lock = threading.Lock()
+    progress = tqdm(desc="Encodage", unit="service")
+
+    def put(item: Optional[list]):
+        # Abandon des lots après une erreur ; les marqueurs de fin sont toujours livrés
+        while True:
+            if stop.is_set() and item is not None:
+                return
+            try:
+                batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        batch = []
+        try:
+            for record in records:
+                if stop.is_set():
+                    break
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    put(batch)
+                    batch = []
+            if batch:
+                put(batch)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            for _ in range(workers):
+                put(None)
+
+    def consume():
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if stop.is_set():
+                continue  # vidage de la file après une erreur
+            try:
+                ids, documents, metadatas = (list(column) for column in zip(*batch))
+                embeddings = encode(documents)
+                agent.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+                with lock:
+                    written[0] += len(ids)
+                    progress.update(len(ids))
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=produce, name="ingest-fetch", daemon=True)]
+    threads += [threading.Thread(target=consume, name=f"ingest-embed-{i}", daemon=True) for i in range(workers)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        progress.close()
+        if pool:
+            pool.close()
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - start
+    if written[0]:
+        mode = f"{processes} processus x {pool.threads_per_process} threads" if pool else f"{workers} thread(s)"
+        print(f"⏱️  {written[0]} service(s) encodé(s) en {elapsed:.1f} s "
+              f"({written[0] / max(elapsed, 1e-9):.1f} services/s, {mode})")
+    return written[0]
+
+
+def sync_collection(
+    agent: ServiceSelectorAgent,
+    records: Iterable[Tuple[str, str, Dict[str, Any]]],
+    processes: Optional[int] = None
+) -> Tuple[Dict[str, int], Set[str]]:
+    """
+    Synchronise la collection avec le catalogue amont, sans ré-encoder l'inchangé
+
+    Les empreintes stockées dans les métadonnées (CONTENT_HASH_KEY) sont comparées à
+    celles du catalogue : seuls les services nouveaux ou modifiés sont encodés et
+    écrits (upsert, en flux via embed_and_upsert), les services absents du catalogue
+    sont supprimés. Les services ingérés avant l'ajout des empreintes sont considérés
+    comme modifiés une fois. Si le catalogue amont est vide, rien n'est supprimé.
+
+    Les variantes rattachées à un représentant (quasi-doublons) sont comparées avec
+    leur propre empreinte ; les services écrits sont ensuite regroupés avec le reste
+    de la collection (collapse_duplicates).
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        records: Catalogue amont (id, document, métadonnées avec CONTENT_HASH_KEY)
+        processes: Processus d'encodage (défaut: settings.ingest_processes)
+
+    Returns:
+        Tuple: Compteurs added / changed / removed / unchanged, et services dont les
+               index dérivés doivent être mis à jour (build_derived_indexes)
+    """
+    existing = read_collection(agent, ["metadatas"])
+    variants = {}
+    stored = {}
+    for service_id, metadata in zip(existing["ids"], existing["metadatas"]):
+        stored[service_id] = (metadata or {}).get(CONTENT_HASH_KEY)
+        entries = parse_variants(metadata)
+        if entries:
+            variants[service_id] = entries
+    known = {
+        entry["id"]: (entry.get("metadata") or {}).get(CONTENT_HASH_KEY)
+        for entries in variants.values() for entry in entries
+    }
+    known.update(stored)
+
+    counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    seen = set()
+    written = set()
+
+    def modified():
+        for record in records:
+            service_id, _, metadata = record
+            seen.add(service_id)
+            if service_id not in known:
+                counts["added"] += 1
+            elif known[service_id] != metadata[CONTENT_HASH_KEY]:
+                counts["changed"] += 1
+            else:
+                counts["unchanged"] += 1
+                continue
+            written.add(service_id)
+            yield record
+
+    embed_and_upsert(agent, attach_variants(modified(), variants), processes=processes)
+    if not seen:
+        return counts, written  # catalogue amont vide (ou inaccessible) : aucune suppression
+
+    removed = set(known) - seen
+    counts["removed"] = len(removed)
+    return counts, settle_changes(agent, written, removed, variants, processes=processes)
+
+
+def settle_changes(
+    agent: ServiceSelectorAgent,
+    written: Set[str],
+    removed: Set[str],
+    variants: Dict[str, List[Dict[str, Any]]],
+    processes: Optional[int] = None
+) -> Set[str]:
+    """
+    Termine une mise à jour incrémentale après l'écriture des services modifiés
+
+    Retire les services supprimés en amont (indexés ou variantes), détache de leur
+    ancien représentant les variantes ré-écrites, ré-indexe les variantes d'un
+    représentant supprimé, puis regroupe les quasi-doublons parmi les services écrits.
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        written: Services écrits (nouveaux ou modifiés)
+        removed: Services disparus du catalogue amont
+        variants: Variantes des représentants avant la mise à jour
+        processes: Processus d'encodage (défaut: settings.ingest_processes)
+
+    Returns:
+        Set[str]: Services écrits, supprimés ou rattachés comme variantes, à appliquer
+                  aux index dérivés (build_derived_indexes)
+    """
+    rewritten = {entry["id"] for entries in variants.values() for entry in entries} & written
+    orphans = []
+    if removed or rewritten:
+        orphans = detach_services(agent, removed | rewritten, variants)
+    if orphans:
+        embed_and_upsert(agent, orphans, processes=processes)
+    touched = written | removed | {service_id for service_id, _, _ in orphans}
+    if settings.dedup_near_duplicates and (written or orphans):
+        touched |= collapse_duplicates(agent, written | {service_id for service_id, _, _ in orphans})
+    return touched
+
+
+def load_variants(agent: ServiceSelectorAgent) -> Dict[str, List[Dict[str, Any]]]:
+    """Variantes rattachées aux représentants de la collection {id du représentant: variantes}"""
+    result = agent.collection.get(where={VARIANT_COUNT_KEY: {"$gt": 0}}, include=["metadatas"])
+    return {
+        service_id: parse_variants(metadata)
+        for service_id, metadata in zip(result["ids"], result["metadatas"])
+    }
+
+
+def attach_variants(
+    records: Iterable[Tuple[str, str, Dict[str, Any]]],
+    variants: Dict[str, List[Dict[str, Any]]]
+) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Conserve les variantes des représentants ré-écrits (upsert d'un service modifié)
+
+    Les variantes sont ajoutées après le calcul de l'empreinte : CONTENT_HASH_KEY
+    reste celle du catalogue amont.
+    """
+    for service_id, document, metadata in records:
+        if variants.get(service_id):
+            metadata = {**metadata, **variant_metadata(variants[service_id])}
+        yield service_id, document, metadata
+
+
+def detach_services(
+    agent: ServiceSelectorAgent,
+    service_ids: Set[str],
+    variants: Dict[str, List[Dict[str, Any]]]
+) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Retire des services de la collection, qu'ils soient indexés ou rattachés comme variantes
+
+    Les variantes visées sont retirées de leur représentant, les services indexés
+    sont supprimés. Les variantes restantes d'un représentant supprimé sont renvoyées
+    pour être ré-indexées (puis regroupées de nouveau par collapse_duplicates).
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        service_ids: Services à retirer (supprimés ou ré-indexés séparément)
+        variants: Variantes des représentants (load_variants)
+
+    Returns:
+        List: (id, document, métadonnées) des variantes orphelines à ré-indexer
+    """
+    orphans, updates = [], {}
+    for representative, entries in variants.items():
+        kept = [entry for entry in entries if entry["id"] not in service_ids]
+        if representative in service_ids:
+            orphans.extend((entry["id"], entry["document"], entry["metadata"]) for entry in kept)
+        elif len(kept) < len(entries):
+            updates[representative] = kept
+
+    if updates:
+        current = agent.collection.get(ids=sorted(updates), include=["metadatas"])
+        agent.collection.update(
+            ids=current["ids"],
+            metadatas=[
+                {**(metadata or {}), **variant_metadata(updates[service_id])}
+                for service_id, metadata in zip(current["ids"], current["metadatas"])
+            ]
+        )
+
+    attached = {entry["id"] for entries in variants.values() for entry in entries}
+    removed = sorted(service_ids - attached)
+    max_batch = agent.client.get_max_batch_size()
+    for start in range(0, len(removed), max_batch):
+        agent.collection.delete(ids=removed[start:start + max_batch])
+    return orphans
+
+
+def nearest_neighbours(
+    agent: ServiceSelectorAgent,
+    service_ids: Set[str],
+    neighbours: int,
+    include: List[str],
+    page_size: int = COLLECTION_PAGE_SIZE
+) -> Dict[str, Any]:
+    """
+    Relit des services et leurs plus proches voisins dans la collection
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        service_ids: Services de départ (les absents de la collection sont ignorés)
+        neighbours: Voisins demandés par service
+        include: Champs lus (doit contenir "embeddings")
+        page_size: Services lus, ou requêtes envoyées, par appel ChromaDB
+
+    Returns:
+        Dict: Même format que read_collection, services de départ en premier
+    """
+    content = read_collection(agent, include, ids=service_ids, page_size=page_size)
+    n_results = min(neighbours + 1, agent.collection.count())
+    if not content["ids"] or n_results < 1:
+        return content
+    seen = set(content["ids"])
+    vectors = [content["embeddings"]]
+    for start in range(0, len(content["ids"]), page_size):
+        part = agent.collection.query(
+            query_embeddings=content["embeddings"][start:start + page_size].tolist(),
+            n_results=n_results,
+            include=include
+        )
+        for q, row_ids in enumerate(part["ids"]):
+            for j, service_id in enumerate(row_ids):
+                if service_id in seen:
+                    continue
+                seen.add(service_id)
+                content["ids"].append(service_id)
+                vectors.append(np.asarray(part["embeddings"][q][j], dtype=np.float32).reshape(1, -1))
+                for key in include:
+                    if key != "embeddings":
+                        content[key].append(part[key][q][j])
+    content["embeddings"] = np.vstack(vectors)
+    return content
+
+
+def collapse_duplicates(
+    agent: ServiceSelectorAgent,
+    service_ids: Optional[Iterable[str]] = None,
+    page_size: int = COLLECTION_PAGE_SIZE
+) -> Set[str]:
+    """
+    Regroupe les quasi-doublons de la collection sous un représentant
+
+    Les embeddings stockés sont comparés par blocs (cluster_near_duplicates) entre
+    services de même signature (settings.dedup_group_by). Dans chaque groupe, le
+    représentant (version la plus récente, puis plus petit id) reste indexé et reçoit
+    les autres membres, et leurs propres variantes, dans ses métadonnées ; les autres
+    membres sont supprimés de la collection. Les variantes redevenues des services
+    indexés (modifiées en amont) sont retirées de leur ancien représentant.
+
+    En mode incrémental, seuls les services donnés et leurs settings.dedup_neighbors
+    plus proches voisins (requête ChromaDB) sont relus : la collection n'est pas
+    parcourue.
+
+    Args:
+        agent: Agent de sélection (collection ChromaDB cible)
+        service_ids: Services nouveaux ou modifiés à comparer au reste de leur groupe
+                     (None = regroupement complet de la collection)
+        page_size: Services lus par appel à collection.get()
+
+    Returns:
+        Set[str]: Services rattachés comme variantes (retirés de la collection) lors de cet appel
+    """
+    include = ["embeddings", "documents", "metadatas"]
+    candidates = None
+    if service_ids is None:
+        content = read_collection(agent, include, page_size=page_size)
+    else:
+        wanted = set(service_ids)
+        content = nearest_neighbours(agent, wanted, settings.dedup_neighbors, include, page_size=page_size)
+        candidates = [row for row, service_id in enumerate(content["ids"]) if service_id in wanted]
+    ids, documents = content["ids"], content["documents"]
+    metadatas = [metadata or {} for metadata in content["metadatas"]]
+    if len(ids) < 2:
+        return set()
+
+    keys = [key.strip() for key in settings.dedup_group_by.split(",") if key.strip()]
+    groups = [tuple(metadata.get(key) for key in keys) for metadata in metadatas]
+    labels = cluster_near_duplicates(content["embeddings"], groups, settings.dedup_threshold, candidates=candidates)
+
+    clusters: Dict[int, List[int]] = {}
+    for row, label in enumerate(labels):
+        clusters.setdefault(int(label), []).append(row)
+
+    merged: Dict[int, Dict[str, Dict[str, Any]]] = {}
+    collapsed = set()
+    for rows in clusters.values():
+        if len(rows) < 2:
+            continue
+        representative = rows[choose_representative([metadatas[r] for r in rows], [ids[r] for r in rows])]
+        entries = {}
+        for row in rows:
+            entries.update((entry["id"], entry) for entry in parse_variants(metadatas[row]))
+        for row in rows:
+            if row != representative:
+                entries[ids[row]] = {"id": ids[row], "document": documents[row], "metadata": strip_variants(metadatas[row])}
+                collapsed.add(ids[row])
+        merged[representative] = entries
+
+    remaining = set(ids) - collapsed
+    update_ids, update_metadatas = [], []
+    for row, metadata in enumerate(metadatas):
+        if ids[row] in collapsed:
+            continue
+        previous = parse_variants(metadata)
+        if row not in merged and not previous:
+            continue
+        entries = merged.get(row) or {entry["id"]: entry for entry in previous}
+        kept = [entry for variant_id, entry in sorted(entries.items()) if variant_id not in remaining]
+        if row in merged or len(kept) < len(previous):
+            update_ids.append(ids[row])
+            update_metadatas.append({**metadata, **variant_metadata(kept)})
+
+    max_batch = agent.client.get_max_batch_size()
+    for start in range(0, len(update_ids), max_batch):
+        agent.collection.update(
+            ids=update_ids[start:start + max_batch],
+            metadatas=update_metadatas[start:start + max_batch]
+        )
+    removed = sorted(collapsed)
+    for start in range(0, len(removed), max_batch):
+        agent.collection.delete(ids=removed[start:start + max_batch])
+    if collapsed:
+        print(f"✅ Quasi-doublons: {len(collapsed)} service(s) rattaché(s) à {len(merged)} représentant(s) "
+              f"(seuil cosinus {settings.dedup_threshold})")
+    return collapsed
+
+
+def ingest_catalog(
+    clear_existing: bool = False,
+    tenant: Optional[str] = None,
+    sync: bool = False,
+    processes: Optional[int] = None
+) -> bool:
     """
     Pipeline complet d'ingestion du catalogue OpenSlice dans ChromaDB
     
+    Avec clear_existing, la nouvelle génération n'est préparée qu'une fois la première
+    page du catalogue récupérée, et elle est supprimée si l'ingestion échoue avant la
+    bascule de l'alias. Sans clear_existing (--sync ou ingestion simple), les services
+    sont écrits en place dans la collection publiée : une exécution interrompue laisse
+    des services écrits sans index dérivés ni nouvelle version, ce que la
+    synchronisation suivante rattrape (empreintes).
+    
     Args:
-        clear_existing: Si True, efface la collection existante avant l'ingestion
+        clear_existing: Si True, ré-indexe dans une nouvelle génération de la collection,
+                        publiée (bascule de l'alias) une fois l'ingestion terminée
+        tenant: Tenant dont la collection est alimentée (None = catalogue par défaut)
+        sync: Si True, synchronisation incrémentale (upsert des services nouveaux ou
+              modifiés, suppression des services disparus)
+        processes: Processus d'encodage (défaut: settings.ingest_processes)
+    
+    Returns:
+        bool: False si OpenSlice est injoignable, le catalogue vide ou l'ingestion en échec
     """
     print("\n" + "="*80)
     print("INGESTION DU CATALOGUE OPENSLICE (TMF633 → ChromaDB)")
@@ -199,74 +1147,79 @@ def ingest_catalog(clear_existing: bool = False):
     
     # 1. Initialiser l'agent de sélection (= ChromaDB)
     print("1️⃣  Initialisation de ChromaDB...")
-    agent = ServiceSelectorAgent()
-    
-    # Effacer la collection si demandé
-    if clear_existing:
-        print("Suppression de la collection existante...")
-        agent.client.delete_collection(name=agent.collection_name)
-        agent.collection = agent.client.create_collection(
-            name=agent.collection_name,
-            embedding_function=agent.embedding_function,
-            metadata={"description": "OpenSlice Service Catalog"}
-        )
-        print("✅ Collection réinitialisée")
+    agent = ServiceSelectorAgent(collection_name=tenant_collection_name(tenant))
     
     # 2. Authentification OpenSlice
     print("\n2️⃣  Authentification OpenSlice...")
     try:
-        token = get_openslice_token()
+        get_openslice_token()
     except Exception:
         print("\n⚠️  IMPOSSIBLE DE SE CONNECTER À OPENSLICE")
         print("    Pour tester sans OpenSlice, vous pouvez créer des services de test:")
         print("    python scripts/ingest_catalog.py --mock")
-        return
+        return False
     
-    # 3. Récupération des ServiceSpecifications
-    print("\n3️⃣  Récupération du catalogue TMF633...")
+    # 3. Récupération paginée du catalogue et encodage en flux
+    print("\n3️⃣  Récupération du catalogue TMF633 et ingestion dans ChromaDB (flux paginé)...")
+    # Token partagé : renouvelé pendant les longues ingestions (expiration, 401)
+    specs = iter_service_specifications()
+    if settings.catalog_hydration:
+        specs = hydrate_service_specifications(specs)
+    records = iter_service_records(specs)
     try:
-        service_specs = fetch_service_specifications(token)
-    except Exception:
-        print("\n⚠️  IMPOSSIBLE DE RÉCUPÉRER LE CATALOGUE")
-        return
-    
-    if not service_specs:
+        first = next(records, None)
+    except Exception as e:
+        print(f"\n⚠️  IMPOSSIBLE DE RÉCUPÉRER LE CATALOGUE: {e}")
+        return False
+    if first is None:
         print("\n⚠️  Aucune ServiceSpecification trouvée dans OpenSlice")
         print("    Créez d'abord des services dans l'interface OpenSlice")
-        return
-    
-    # 4. Ingestion dans ChromaDB
-    print(f"\n4️⃣  Ingestion de {len(service_specs)} service(s) dans ChromaDB...")
-    
-    ids = []
-    documents = []
-    metadatas = []
+        return False
+    records = itertools.chain([first], records)
     
-    for service_spec in tqdm(service_specs, desc="Traitement"):
-        # UUID du service (clé primaire)
-        service_id = service_spec.get("id") or service_spec.get("uuid")
-        if not service_id:
-            print(f"⚠️  Service sans ID ignoré: {service_spec.get('name', 'Unknown')}")
-            continue
-        
-        # Document textuel pour l'embedding
-        document = create_service_document(service_spec)
-        
-        # Métadonnées
-        metadata = extract_metadata(service_spec)
+    # Ré-indexation complète dans une nouvelle génération (bleu/vert) si demandé
+    if clear_existing:
+        agent.stage_collection("OpenSlice Service Catalog")
+        print(f"✅ Nouvelle génération '{agent.physical_collection}' préparée "
+              "(la collection publiée reste servie jusqu'à la bascule)")
+    published = False
+    try:
+        if sync:
+            # Synchronisation incrémentale : seuls les services nouveaux / modifiés sont encodés
+            counts, changed = sync_collection(agent, records, processes=processes)
+            total = sum(counts.values()) - counts["removed"]
+        else:
+            total = embed_and_upsert(agent, records, processes=processes)
+            if total and settings.dedup_near_duplicates:
+                collapse_duplicates(agent)
+        if not total:
+            print("\n⚠️  Aucune ServiceSpecification indexable dans OpenSlice")
+            return False
         
-        ids.append(service_id)
-        documents.append(document)
-        metadatas.append(metadata)
-    
-    # Batch insertion dans ChromaDB
-    if ids:
-        agent.collection.add(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
-        print(f"\n✅ {len(ids)} service(s) ingéré(s) avec succès!")
+        # 4. Index dérivés et version du catalogue
+        if sync:
+            print(f"\n✅ Synchronisation: {counts['added']} ajouté(s), {counts['changed']} modifié(s), "
+                  f"{counts['removed']} supprimé(s), {counts['unchanged']} inchangé(s)")
+            if counts["added"] or counts["changed"] or counts["removed"]:
+                build_derived_indexes(agent, changed)
+                version = agent.bump_catalog_version()
+                print(f"✅ Version du catalogue: {version}")
+            else:
+                print("✅ Catalogue inchangé: index et version conservés")
+        else:
+            print(f"\n✅ {total} service(s) ingéré(s) avec succès!")
+            build_derived_indexes(agent)
+            version = agent.bump_catalog_version()
+            print(f"✅ Version du catalogue: {version}")
+        if agent.publish_collection():
+            print(f"✅ Alias basculé vers '{agent.physical_collection}'")
+        published = True
+    except Exception as e:
+        print(f"\n⚠️  IMPOSSIBLE DE RÉCUPÉRER OU D'INGÉRER LE CATALOGUE: {e}")
+        return False
+    finally:
+        if clear_existing and not published and agent.discard_staged_collection():
+            print("⚠️  Génération préparée supprimée: la collection publiée reste servie")
     
     # 5. Statistiques finales
     print("\n" + "="*80)
@@ -276,22 +1229,90 @@ def ingest_catalog(clear_existing: bool = False):
     for key, value in stats.items():
         print(f"{key}: {value}")
     print("="*80 + "\n")
+    return True
+
+
+def export_catalog(path: str, tenant: Optional[str] = None):
+    """
+    Exporte la collection (embeddings, documents, métadonnées, version) dans une archive
+
+    Args:
+        path: Chemin de l'archive (.tar ou .tar.gz)
+        tenant: Tenant dont la collection est exportée (None = catalogue par défaut)
+    """
+    print(f"\n📦 Export de l'index vers {path}...\n")
+    agent = ServiceSelectorAgent(collection_name=tenant_collection_name(tenant))
+    manifest = agent.export_snapshot(path)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"✅ {manifest['count']} service(s) exporté(s) (version {manifest['catalog_version']}, "
+          f"modèle {manifest['fingerprint']['model']} / {manifest['fingerprint']['backend']}, {size_mb:.1f} Mo)")
 
 
-def create_mock_services():
+def import_catalog(path: str, tenant: Optional[str] = None, check_model: bool = True):
+    """
+    Remplace la collection par une archive produite par --export (sans accès à OpenSlice)
+
+    Le modèle d'embeddings local doit correspondre à celui de l'export ; les index
+    dérivés sont reconstruits à partir de la collection importée.
+
+    Args:
+        path: Chemin de l'archive
+        tenant: Tenant dont la collection est remplacée (None = catalogue par défaut)
+        check_model: Vérifier l'empreinte du modèle d'embeddings
+    """
+    print(f"\n📦 Import de l'index depuis {path}...\n")
+    agent = ServiceSelectorAgent(collection_name=tenant_collection_name(tenant))
+    published = False
+    try:
+        manifest = agent.import_snapshot(path, check_model=check_model)
+        print(f"✅ {manifest['count']} service(s) importé(s) depuis l'instantané du {manifest['created_at']}")
+        build_derived_indexes(agent)
+        version = agent.bump_catalog_version(minimum=int(manifest.get("catalog_version", 0)))
+        agent.publish_collection()
+        published = True
+    except ValueError as e:
+        print(f"❌ Import refusé: {e}")
+        print("    Utilisez le même EMBEDDING_MODEL / EMBEDDING_BACKEND que le nœud d'export")
+        return
+    finally:
+        if not published and agent.discard_staged_collection():
+            print("⚠️  Génération préparée supprimée: la collection publiée reste servie")
+    print(f"✅ Version du catalogue: {version} (collection '{agent.physical_collection}' publiée)")
+
+
+def create_mock_services(tenant: Optional[str] = None):
     """Crée des services de test pour valider le système sans OpenSlice"""
     print("\n📦 Création de services de test (mode mock)...\n")
     
-    agent = ServiceSelectorAgent()
+    agent = ServiceSelectorAgent(collection_name=tenant_collection_name(tenant))
     
-    # Effacer la collection existante
-    agent.client.delete_collection(name=agent.collection_name)
-    agent.collection = agent.client.create_collection(
-        name=agent.collection_name,
-        embedding_function=agent.embedding_function,
-        metadata={"description": "Mock OpenSlice Service Catalog"}
-    )
+    # Nouvelle génération de la collection (publiée après construction des index,
+    # supprimée si la création échoue avant la bascule)
+    agent.stage_collection("Mock OpenSlice Service Catalog")
+    published = False
+    try:
+        _add_mock_services(agent)
+        build_derived_indexes(agent)
+        agent.bump_catalog_version()
+        agent.publish_collection()
+        published = True
+    finally:
+        if not published and agent.discard_staged_collection():
+            print("⚠️  Génération préparée supprimée: la collection publiée reste servie")
+    print()
     
+    # Afficher les stats
+    stats = agent.get_collection_stats()
+    print("="*80)
+    print("STATISTIQUES:")
+    print("="*80)
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+    print("="*80 + "\n")
+
+
+def _add_mock_services(agent: ServiceSelectorAgent):
+    """Insère les services de test dans la collection de l'agent"""
     # Services de test
     mock_services = [
         {
@@ -339,36 +1360,33 @@ def create_mock_services():
         ids.append(service["id"])
         
         # Document textuel
-        doc = f"Service: {service['name']} | Description: {service['description']} | Category: {service['category']} | Type: {service['type']}"
+        category = service["metadata"].get("category", "General")
+        service_type = service["metadata"].get("type", "")
+        doc = f"Service: {service['name']} | Description: {service['description']} | Category: {category} | Type: {service_type}"
         documents.append(doc)
         
         # Métadonnées
         metadata = {
             "name": service["name"],
-            "category": service["category"],
-            "type": service["type"],
+            "category": category,
+            "type": service_type,
             # "num_characteristics": service["num_characteristics"],
             "status": "active"
         }
+        if "location" in service["metadata"]:
+            metadata["location"] = service["metadata"]["location"]
+        metadata[CONTENT_HASH_KEY] = content_hash(doc, metadata)
         metadatas.append(metadata)
     
-    # Insertion
+    # Insertion (embeddings calculés par l'agent : la collection n'a pas de fonction d'embeddings)
     agent.collection.add(
         ids=ids,
+        embeddings=np.asarray(agent.embedding_function(documents), dtype=np.float32).tolist(),
         documents=documents,
         metadatas=metadatas
     )
     
-    print(f"✅ {len(ids)} services de test créés!\n")
-    
-    # Afficher les stats
-    stats = agent.get_collection_stats()
-    print("="*80)
-    print("STATISTIQUES:")
-    print("="*80)
-    for key, value in stats.items():
-        print(f"{key}: {value}")
-    print("="*80 + "\n")
+    print(f"✅ {len(ids)} services de test créés!")
 
 
 def main():
@@ -378,20 +1396,59 @@ def main():
     parser.add_argument(
         "--clear",
         action="store_true",
-        help="Efface la collection existante avant l'ingestion"
+        help="Ré-indexe tout le catalogue dans une nouvelle génération, publiée à la fin (bleu/vert)"
     )
     parser.add_argument(
         "--mock",
         action="store_true",
         help="Crée des services de test sans se connecter à OpenSlice"
     )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Synchronisation incrémentale (ré-encode uniquement les services nouveaux ou modifiés)"
+    )
+    parser.add_argument(
+        "--tenant",
+        default=None,
+        help="Tenant OpenSlice dont le catalogue est ingéré (collection dédiée)"
+    )
+    parser.add_argument(
+        "--export",
+        metavar="ARCHIVE",
+        default=None,
+        help="Exporte l'index ingéré dans une archive (.tar / .tar.gz) pour d'autres nœuds"
+    )
+    parser.add_argument(
+        "--import",
+        dest="import_path",
+        metavar="ARCHIVE",
+        default=None,
+        help="Remplace l'index par une archive produite par --export (sans OpenSlice)"
+    )
+    parser.add_argument(
+        "--skip-model-check",
+        action="store_true",
+        help="Importe même si le modèle d'embeddings local diffère de celui de l'export"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Processus d'encodage, un modèle par processus (défaut: INGEST_PROCESSES)"
+    )
     
     args = parser.parse_args()
     
-    if args.mock:
-        create_mock_services()
+    if args.export:
+        export_catalog(args.export, tenant=args.tenant)
+    elif args.import_path:
+        import_catalog(args.import_path, tenant=args.tenant, check_model=not args.skip_model_check)
+    elif args.mock:
+        create_mock_services(tenant=args.tenant)
     else:
-        ingest_catalog(clear_existing=args.clear)
+        if not ingest_catalog(clear_existing=args.clear, tenant=args.tenant, sync=args.sync, processes=args.processes):
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+"""
+Serveur MCP OpenSlice partagé (un serveur par machine)
+
+Ce script:
+1. Crée un OpenSliceMCPServer (token Keycloak, pool de connexions, caches)
+2. Écoute sur un socket Unix (settings.mcp_socket_path), ou sur stdin / stdout
+3. Traite en parallèle les requêtes JSON-RPC de tous les workers du pipeline
+
+Les agents (MCPClient) l'utilisent automatiquement lorsqu'il est démarré dans le
+même mode mock / réel (MCP_MODE=auto), et embarquent leur propre serveur sinon.
+
+Usage:
+    python scripts/mcp_server.py
+    python scripts/mcp_server.py --max-in-flight 64
+    python scripts/mcp_server.py --stdio   # lancé par un client (MCPClient(command=[...]))
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import settings
+from mcp.openslice_mcp_server import OpenSliceMCPServer
+from mcp.remote_transport import MCPRemoteServer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serveur MCP OpenSlice partagé (JSON-RPC sur socket Unix ou stdio)"
+    )
+    parser.add_argument(
+        "--socket",
+        default=settings.mcp_socket_path,
+        help="Chemin du socket Unix (défaut: settings.mcp_socket_path)"
+    )
+    parser.add_argument(
+        "--stdio",
+        action="store_true",
+        help="Sert une seule connexion sur stdin / stdout au lieu du socket"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=settings.mcp_max_in_flight,
+        help="Requêtes traitées simultanément"
+    )
+
+    args = parser.parse_args()
+
+    output = None
+    if args.stdio:
+        # stdout est réservé aux réponses JSON-RPC : les print() du serveur vont sur stderr
+        output = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    server = MCPRemoteServer(OpenSliceMCPServer(), max_in_flight=args.max_in_flight)
+    try:
+        server.serve_forever(socket_path=args.socket, stdio=args.stdio, output=output)
+    except KeyboardInterrupt:
+        print("\nServeur MCP arrêté")
+
+
+if __name__ == "__main__":
+    main()
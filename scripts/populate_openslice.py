@@ -1,4 +1,3 @@
-import httpx
 import sys
 import os
 import json
@@ -7,6 +6,7 @@ import json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from config import settings
 from scripts.ingest_catalog import get_openslice_token # On réutilise ta fonction d'auth
+from mcp.http_pool import shared_client
 
 def create_remote_service(token: str, service_data: dict):
     url = f"{settings.openslice_base_url}/tmf-api/serviceCatalogManagement/v4/serviceSpecification"
@@ -32,7 +32,8 @@ def create_remote_service(token: str, service_data: dict):
     }
 
     try:
-        response = httpx.post(url, headers=headers, json=payload, timeout=10.0)
+        with shared_client(timeout=10.0) as client:  # pool partagé : connexion réutilisée d'un service à l'autre
+            response = client.post(url, headers=headers, json=payload)
         if response.status_code in [201, 200]:
             print(f"✅ Service créé : {service_data['name']} (ID: {response.json().get('id')})")
         else:
@@ -0,0 +1,117 @@
+"""
+Test de parité entre les backends d'embeddings (PyTorch vs ONNX int8)
+
+Ce script vérifie, sur le catalogue ingéré dans ChromaDB, que le backend
+"onnx-int8" retrouve les mêmes services que le backend "sentence-transformers" :
+1. Lecture des documents de la collection ingérée
+2. Encodage des documents et des requêtes avec les deux backends
+3. Recherche exacte top-k pour chaque backend
+4. Accord top-k (recouvrement moyen) et similarité cosinus des embeddings
+
+Usage:
+    python scripts/test_embedding_parity.py
+    python scripts/test_embedding_parity.py --top-k 3 --threshold 0.9
+"""
+import argparse
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agent2_selector import ServiceSelectorAgent
+from retrieval import compute_distances, get_embedding_function
+
+
+# Requêtes représentatives des descriptions de sous-intentions produites par l'Agent 1
+SAMPLE_QUERIES = [
+    "cloud hosting for augmented reality AR and virtual reality VR applications",
+    "5G radio access network with mobile broadband low latency connectivity",
+    "réseau mobile 4G LTE pour smartphones",
+    "video streaming service for multimedia content",
+    "edge computing with low latency 5ms",
+    "mixed reality collaboration platform",
+]
+
+
+def print_section(title: str):
+    """Affiche un titre de section"""
+    print(f"\n{'='*80}")
+    print(f"{title}")
+    print(f"{'='*80}")
+
+
+def print_result(status: str, message: str = "", details: str = ""):
+    """Affiche un résultat formaté"""
+    icon = "[OK]" if status == "success" else "[ERROR]"
+    print(f"\n{icon} {message}")
+    if details:
+        print(f"   {details}")
+
+
+def exact_top_k(query_vectors: np.ndarray, doc_vectors: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices des top_k documents les plus proches (distance L2 exacte)"""
+    distances = compute_distances(query_vectors, doc_vectors, "l2")
+    return np.argsort(distances, axis=1, kind="stable")[:, :top_k]
+
+
+def main():
+    """Comparaison des backends sur le catalogue ingéré"""
+    parser = argparse.ArgumentParser(description="Parité top-k PyTorch vs ONNX int8")
+    parser.add_argument("--top-k", type=int, default=3, help="Taille du top-k comparé")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Accord top-k minimal (0-1)")
+    args = parser.parse_args()
+
+    print_section("PARITÉ DES BACKENDS D'EMBEDDINGS (sentence-transformers vs onnx-int8)")
+
+    agent = ServiceSelectorAgent()
+    content = agent.collection.get(include=["documents", "metadatas"])
+    documents = content["documents"]
+    if not documents:
+        print_result("error", "Collection vide", "Exécutez d'abord: python scripts/ingest_catalog.py")
+        return 1
+
+    # Requêtes : exemples fixes + noms des services ingérés
+    queries = SAMPLE_QUERIES + [m.get("name", "") for m in content["metadatas"] if m and m.get("name")]
+    top_k = min(args.top_k, len(documents))
+
+    vectors = {}
+    for backend in ("sentence-transformers", "onnx-int8"):
+        try:
+            ef = get_embedding_function(backend=backend)
+        except (ImportError, FileNotFoundError) as e:
+            print_result("error", f"Backend '{backend}' indisponible", str(e))
+            return 1
+        vectors[backend] = (
+            np.asarray(ef(documents), dtype=np.float32),
+            np.asarray(ef(queries), dtype=np.float32)
+        )
+
+    ref_docs, ref_queries = vectors["sentence-transformers"]
+    onnx_docs, onnx_queries = vectors["onnx-int8"]
+
+    ref_top = exact_top_k(ref_queries, ref_docs, top_k)
+    onnx_top = exact_top_k(onnx_queries, onnx_docs, top_k)
+    overlap = np.array([
+        len(set(a) & set(b)) / top_k for a, b in zip(ref_top.tolist(), onnx_top.tolist())
+    ])
+    top1 = float(np.mean(ref_top[:, 0] == onnx_top[:, 0]))
+    cosine = float(np.mean(np.sum(ref_docs * onnx_docs, axis=1) / (
+        np.linalg.norm(ref_docs, axis=1) * np.linalg.norm(onnx_docs, axis=1)
+    )))
+
+    print(f"\n   Documents: {len(documents)} | Requêtes: {len(queries)} | top-k: {top_k}")
+    print(f"   Accord top-{top_k} moyen : {overlap.mean():.3f} (min: {overlap.min():.3f})")
+    print(f"   Accord top-1           : {top1:.3f}")
+    print(f"   Cosinus moyen (docs)   : {cosine:.4f}")
+
+    if overlap.mean() >= args.threshold:
+        print_result("success", f"Parité atteinte (seuil: {args.threshold})")
+        return 0
+    print_result("error", f"Parité insuffisante (seuil: {args.threshold})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Réglage automatique de l'index HNSW de la collection de services
+
+Ce script:
+1. Lit les embeddings de la collection ingérée (aucun ré-encodage du catalogue)
+2. Met de côté un jeu de requêtes (documents tirés au hasard et/ou --queries-file)
+3. Balaye hnsw:M, hnsw:construction_ef et hnsw:search_ef (et hnsw:space avec --spaces)
+   et mesure recall@k (par rapport à la recherche exacte) et latence p50
+4. Retient la configuration la plus rapide qui atteint l'objectif de recall, dans
+   l'espace de distance actuel sauf --allow-space-change (le score des services, et
+   donc min_score, dépend de l'espace)
+5. Reconstruit la collection avec cette configuration et l'enregistre dans ses
+   métadonnées (sauf --dry-run)
+
+Usage:
+    python scripts/tune_index.py
+    python scripts/tune_index.py --recall-target 0.98 --k 5
+    python scripts/tune_index.py --queries-file queries.txt --dry-run
+    python scripts/tune_index.py --spaces l2,cosine --allow-space-change
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agent2_selector import ServiceSelectorAgent
+from config import settings
+from retrieval import collection_hnsw_params, equivalent_min_score, select_config, sweep_hnsw
+from scripts.ingest_catalog import build_derived_indexes, read_collection
+
+
+def parse_list(value: str, cast=int):
+    return [cast(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Réglage des paramètres HNSW de la collection de services")
+    parser.add_argument("--recall-target", type=float, default=0.95, help="Recall@k minimal (0-1)")
+    parser.add_argument("--k", type=int, default=10, help="Taille du top-k pour le recall")
+    parser.add_argument("--spaces", help="Espaces de distance à tester (défaut: espace actuel de la collection)")
+    parser.add_argument("--allow-space-change", action="store_true",
+                        help="Autoriser un autre espace de distance (change le score des services et le sens de min_score)")
+    parser.add_argument("--m", default="8,16,32", help="Valeurs de hnsw:M")
+    parser.add_argument("--construction-ef", default="100,200", help="Valeurs de hnsw:construction_ef")
+    parser.add_argument("--search-ef", default="10,50,100,200", help="Valeurs de hnsw:search_ef")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Fraction du catalogue mise de côté comme requêtes")
+    parser.add_argument("--max-queries", type=int, default=500, help="Nombre maximal de requêtes")
+    parser.add_argument("--queries-file", help="Requêtes supplémentaires (une par ligne, ex: descriptions de sous-intentions)")
+    parser.add_argument("--dry-run", action="store_true", help="Afficher la configuration retenue sans reconstruire")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du tirage des requêtes")
+
+    args = parser.parse_args()
+
+    print("="*80)
+    print("RÉGLAGE DE L'INDEX HNSW")
+    print("="*80)
+
+    agent = ServiceSelectorAgent()
+    vectors = read_collection(agent, include=["embeddings"])["embeddings"]
+    if len(vectors) == 0:
+        print("❌ Collection vide. Exécutez d'abord: python scripts/ingest_catalog.py")
+        return 1
+
+    # Requêtes mises de côté : documents retirés de l'index de réglage + fichier optionnel
+    rng = random.Random(args.seed)
+    n_holdout = min(args.max_queries, int(len(vectors) * args.holdout)) if len(vectors) > 1 else 0
+    holdout = set(rng.sample(range(len(vectors)), n_holdout))
+    queries = [vectors[i] for i in sorted(holdout)]
+    indexed = np.asarray([v for i, v in enumerate(vectors) if i not in holdout], dtype=np.float32)
+    if args.queries_file:
+        with open(args.queries_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+        queries.extend(np.asarray(agent.embedding_function(texts), dtype=np.float32))
+    if not queries:
+        print("❌ Aucune requête de réglage (catalogue trop petit ?). Utilisez --queries-file.")
+        return 1
+    queries = np.asarray(queries[:args.max_queries], dtype=np.float32)
+
+    current = collection_hnsw_params(agent.collection)
+    print(f"\n   Services indexés: {len(indexed)} | Requêtes: {len(queries)} | objectif recall@{args.k}: {args.recall_target}")
+    print(f"   Configuration actuelle: {current}\n")
+
+    current_space = current["hnsw:space"]
+    results = sweep_hnsw(
+        indexed,
+        queries,
+        spaces=parse_list(args.spaces, str) if args.spaces else [current_space],
+        ms=parse_list(args.m),
+        construction_efs=parse_list(args.construction_ef),
+        search_efs=parse_list(args.search_ef),
+        k=args.k
+    )
+    best = select_config(results, args.recall_target)
+    if best["params"]["hnsw:space"] != current_space and not args.allow_space_change:
+        print(f"\n  Espace '{best['params']['hnsw:space']}' ignoré: il change le score des services "
+              f"(min_score), relancez avec --allow-space-change pour l'appliquer")
+        same_space = [r for r in results if r["params"]["hnsw:space"] == current_space]
+        if not same_space:
+            print(f"❌ Aucune configuration mesurée dans l'espace actuel '{current_space}'")
+            return 1
+        best = select_config(same_space, args.recall_target)
+
+    print(f"\n{'='*80}")
+    if best["meets_target"]:
+        print(f"✅ Configuration retenue: {best['params']}")
+    else:
+        print(f"  Objectif non atteint, meilleur recall retenu: {best['params']}")
+    print(f"   recall@{args.k}={best['recall']} | p50={best['p50_ms']} ms | p95={best['p95_ms']} ms")
+    space_change = None
+    if best["params"]["hnsw:space"] != current_space:
+        space_change = {
+            "from": current_space,
+            "to": best["params"]["hnsw:space"],
+            # Seuil par défaut de select_services() et son équivalent dans le nouvel espace
+            "min_score": {"0.5": round(equivalent_min_score(0.5, current_space, best["params"]["hnsw:space"]), 4)},
+        }
+        print(f"  Espace de distance modifié ({current_space} -> {space_change['to']}): "
+              f"min_score=0.5 correspond désormais à min_score={space_change['min_score']['0.5']}")
+
+    if args.dry_run:
+        print("\n(dry-run: collection inchangée)")
+        return 0
+
+    tuning = json.dumps({
+        "params": best["params"],
+        "recall": best["recall"],
+        "recall_target": args.recall_target,
+        "k": args.k,
+        "p50_ms": best["p50_ms"],
+        "p95_ms": best["p95_ms"],
+        "queries": len(queries),
+        "tuned_at": datetime.now().isoformat(),
+        "space_change": space_change,
+    })
+    count = agent.rebuild_collection(best["params"], tuning=tuning)
+    build_derived_indexes(agent)  # nouvelle génération (et l'espace de distance a pu changer)
+    version = agent.bump_catalog_version()
+    agent.publish_collection()
+    print(f"\n✅ Collection reconstruite ({count} services, '{agent.physical_collection}', version {version})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Configuration commune des tests
+
+Les tests n'appellent ni le LLM ni OpenSlice : une cle factice suffit pour charger
+config.settings.
+"""
+import os
+import sys
+
+os.environ.setdefault("LLM_API_KEY", "test")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest  # noqa: E402
+
+from config import settings  # noqa: E402
+from tests.helpers import HashEmbeddingFunction  # noqa: E402
+
+
+@pytest.fixture
+def build_selector(tmp_path, monkeypatch):
+    """Construit un ServiceSelectorAgent indexant les specs TMF633 données (index dérivés compris)"""
+    from agents.agent2_selector import ServiceSelectorAgent
+    from scripts import ingest_catalog
+
+    monkeypatch.setattr(settings, "chroma_persist_dir", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "catalog_hydration", False)
+
+    def build(specs, collection_name="tests"):
+        agent = ServiceSelectorAgent(collection_name=collection_name, embedding_function=HashEmbeddingFunction())
+        ingest_catalog.embed_and_upsert(agent, iter(list(ingest_catalog.iter_service_records(specs))))
+        ingest_catalog.build_derived_indexes(agent)
+        agent.bump_catalog_version()
+        agent.reload_lexical_index()
+        return agent
+
+    return build
@@ -0,0 +1,39 @@
+"""
+Outils communs des tests (embeddings sans modèle, specs TMF633 minimales)
+"""
+import hashlib
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction
+
+from retrieval.lexical import tokenize
+
+
+class HashEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Embeddings déterministes sans modèle : sac de tokens haché sur 64 dimensions"""
+
+    def __init__(self):
+        pass
+
+    def __call__(self, input: Documents):
+        vectors = []
+        for text in input:
+            vector = np.zeros(64, dtype=np.float32)
+            for token in tokenize(text):
+                vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % 64] += 1
+            norm = np.linalg.norm(vector)
+            vectors.append(vector / (norm if norm else 1))
+        return vectors
+
+
+def make_spec(service_id: str, name: str, description: str = "", category: str = "Network", **extra):
+    """ServiceSpecification TMF633 minimale"""
+    return {
+        "id": service_id,
+        "name": name,
+        "description": description,
+        "category": category,
+        "serviceType": "CFS",
+        "serviceSpecCharacteristic": [],
+        **extra,
+    }
@@ -0,0 +1,92 @@
+"""
+Tests de l'affectation optimale sous-intentions -> services (méthode hongroise)
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from retrieval.assignment import solve_assignment
+from tests.helpers import make_spec
+
+
+def greedy_assignment(scores):
+    """Ancienne affectation : ordre des sous-intentions, meilleur candidat non encore pris"""
+    seen, result = set(), []
+    for row in scores:
+        free = [j for j in np.argsort(-row) if np.isfinite(row[j]) and j not in seen]
+        result.append(free[0] if free else -1)
+        seen.update(free[:1])
+    return np.asarray(result)
+
+
+def evaluate(scores, assignment):
+    """(nombre de sous-intentions affectées, score total)"""
+    rows = [i for i, j in enumerate(assignment) if j >= 0]
+    return len(rows), sum(scores[i, assignment[i]] for i in rows)
+
+
+def brute_force(scores):
+    n, m = scores.shape
+    best = (0, 0.0)
+    for cols in itertools.permutations(list(range(m)) + [-1] * n, n):
+        if any(c >= 0 and not np.isfinite(scores[i, c]) for i, c in enumerate(cols)):
+            continue
+        assigned, total = evaluate(scores, cols)
+        if (assigned, total) > (best[0], best[1] + 1e-9):
+            best = (assigned, total)
+    return best
+
+
+def test_optimal_beats_greedy_on_shared_favourite():
+    scores = np.array([[0.9, 0.8], [0.85, 0.1]])
+    assert greedy_assignment(scores).tolist() == [0, 1]
+    assert solve_assignment(scores).tolist() == [1, 0]
+
+
+def test_optimal_assigns_rows_greedy_leaves_empty():
+    scores = np.array([[0.9, 0.8], [0.9, -np.inf]])
+    assert greedy_assignment(scores).tolist() == [0, -1]
+    assert solve_assignment(scores).tolist() == [1, 0]
+
+
+@pytest.mark.parametrize("shape", [(3, 3), (3, 5), (4, 2), (5, 5)])
+def test_matches_brute_force(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(20):
+        scores = rng.random(shape)
+        scores[rng.random(shape) < 0.3] = -np.inf
+        assignment = solve_assignment(scores)
+        assigned = assignment[assignment >= 0]
+        assert len(set(assigned.tolist())) == len(assigned)
+        count, total = evaluate(scores, assignment)
+        best_count, best_total = brute_force(scores)
+        assert count == best_count
+        assert total == pytest.approx(best_total)
+        greedy_count, greedy_total = evaluate(scores, greedy_assignment(scores))
+        assert (count, total + 1e-9) >= (greedy_count, greedy_total)
+
+
+def test_empty_matrices():
+    assert solve_assignment(np.zeros((2, 0))).tolist() == [-1, -1]
+    assert solve_assignment(np.full((2, 2), -np.inf)).tolist() == [-1, -1]
+
+
+def test_window_widens_only_when_infeasible(build_selector):
+    agent = build_selector([make_spec("svc", "Service", "service")])
+
+    def candidate(service_id, score):
+        return {"id": service_id, "score": score}
+
+    # Les deux sous-intentions ont le même premier candidat : top_k=1 est infaisable
+    candidates = [
+        [candidate("a", 0.9), candidate("b", 0.5)],
+        [candidate("a", 0.8), candidate("c", 0.7)],
+    ]
+    selected, window = agent._assign_candidates(candidates, top_k=1)
+    assert window == 2
+    assert [s["id"] for s in selected] == ["a", "c"]
+
+    selected, window = agent._assign_candidates([[candidate("a", 0.9)], [candidate("b", 0.4)]], top_k=1)
+    assert window == 1
+    assert [s["id"] for s in selected] == ["a", "b"]
@@ -0,0 +1,201 @@
+"""
+Tests du client OpenSlice asynchrone (AsyncOpenSliceClient) et des appels MCP concurrents (call_tool_async)
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from config import settings
+from mcp import openslice_client
+from mcp.openslice_client import AsyncOpenSliceClient
+from mcp.openslice_mcp_server import OpenSliceMCPServer
+from mcp.token_manager import TokenManager
+from tests.test_token_manager import FakeKeycloak
+
+BASE_URL = "http://openslice"
+CATALOG = [{"id": f"spec-{i}", "name": f"Service {i}"} for i in range(5)]
+
+
+class FakeOpenSlice:
+    """API TMF simulée : pagination du catalogue, 401 sur token révoqué, appels simultanés mesurés"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.revoked = set()
+        self.tokens = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        token = request.headers.get("Authorization", "")
+        self.tokens.append(token)
+        if token in self.revoked:
+            return httpx.Response(401)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        path = request.url.path
+        if path.endswith("/serviceSpecification"):
+            offset = int(request.url.params.get("offset", 0))
+            limit = int(request.url.params.get("limit", len(CATALOG)))
+            return httpx.Response(200, json=CATALOG[offset:offset + limit])
+        if path.endswith("/serviceOrder"):
+            order = json.loads(request.content)
+            return httpx.Response(201, json={"id": "order-1", "state": "ACKNOWLEDGED", **order})
+        if "/serviceOrder/" in path:
+            return httpx.Response(200, json={"id": path.rsplit("/", 1)[-1], "state": "COMPLETED"})
+        if path.endswith("/service"):
+            return httpx.Response(200, json={"service": [{"id": "svc-1", "state": "active"}]})
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def keycloak():
+    return FakeKeycloak()
+
+
+@pytest.fixture
+def openslice(monkeypatch):
+    api = FakeOpenSlice()
+    monkeypatch.setattr(
+        openslice_client,
+        "shared_async_client",
+        lambda timeout, auth: httpx.AsyncClient(transport=httpx.MockTransport(api), timeout=timeout, auth=auth)
+    )
+    return api
+
+
+@pytest.fixture
+def make_client(keycloak, openslice):
+    managers = []
+
+    def make():
+        client = AsyncOpenSliceClient(base_url=BASE_URL, auth_url="http://keycloak-async", mock_mode=False)
+        client.tokens = TokenManager(
+            auth_url="http://keycloak-async",
+            username="admin",
+            password="secret",
+            client_id="osapiWebClientId",
+            cache_file="",
+            background=False
+        )
+        client.tokens._http = httpx.Client(transport=httpx.MockTransport(keycloak))
+        managers.append(client.tokens)
+        return client
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+def test_calls_run_concurrently_with_one_token(make_client, keycloak, openslice):
+    async def run():
+        async with make_client() as client:
+            return await asyncio.gather(
+                client.get_catalog(page_size=2),
+                client.get_service_inventory(),
+                client.get_service_status("order-7"),
+                client.submit_order({"externalId": "ext-1"}),
+            )
+
+    catalog, inventory, status, order = asyncio.run(run())
+    assert catalog == CATALOG  # trois pages de 2, 2 et 1 services
+    assert inventory == [{"id": "svc-1", "state": "active"}]
+    assert status["state"] == "COMPLETED" and status["id"] == "order-7"
+    assert order["id"] == "order-1" and order["externalId"] == "ext-1"
+
+    assert openslice.peak >= 2  # les requêtes se chevauchent au lieu de s'enchaîner
+    assert keycloak.grants == ["password"]
+    assert len(set(openslice.tokens)) == 1 and openslice.tokens[0].startswith("Bearer ")
+
+
+def test_revoked_token_is_renewed_once(make_client, keycloak, openslice):
+    async def run():
+        async with make_client() as client:
+            token = await client.authenticate()
+            openslice.revoked.add(f"Bearer {token}")
+            return await asyncio.gather(*(client.get_service_status(f"order-{i}") for i in range(4)))
+
+    statuses = asyncio.run(run())
+    assert [status["state"] for status in statuses] == ["COMPLETED"] * 4
+    assert keycloak.grants == ["password", "refresh_token"]
+
+
+def test_client_is_closed_by_context_manager(make_client):
+    async def run():
+        async with make_client() as client:
+            await client.get_service_inventory()
+            http = client.client
+        return client, http
+
+    client, http = asyncio.run(run())
+    assert client.client is None and http.is_closed
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    monkeypatch.setattr(settings, "openslice_mock_mode", True)
+    server = OpenSliceMCPServer()
+    yield server
+    server.close()
+
+
+def test_call_tool_async_in_mock_mode(mock_server):
+    order_json = json.dumps({"externalId": "ext-2", "serviceOrderItem": [{"action": "add"}]})
+
+    async def run():
+        catalog, submitted = await asyncio.gather(
+            mock_server.call_tool_async("get_service_catalog"),
+            mock_server.call_tool_async("submit_service_order", service_order_json=order_json),
+        )
+        status = await mock_server.call_tool_async("get_order_status", order_id=submitted["order_id"])
+        return catalog, submitted, status
+
+    catalog, submitted, status = asyncio.run(run())
+    assert catalog["status"] == "success" and catalog["count"] == len(openslice_client.MOCK_CATALOG)
+    assert submitted["status"] == "success"
+    assert status["order_state"] == "ACKNOWLEDGED"
+
+
+def test_call_tool_async_errors_and_sync_fallback(mock_server):
+    # Outil sans version asynchrone : exécuté dans un thread
+    del mock_server._tools["validate_service_order"]["async_handler"]
+
+    async def run():
+        return await asyncio.gather(
+            mock_server.call_tool_async("unknown_tool"),
+            mock_server.call_tool_async("submit_service_order", service_order_json="{invalide"),
+            mock_server.call_tool_async("validate_service_order", service_order_json="{}"),
+        )
+
+    unknown, invalid, validated = asyncio.run(run())
+    assert unknown["status"] == "error" and "non trouvé" in unknown["message"]
+    assert invalid["status"] == "error" and "JSON invalide" in invalid["message"]
+    expected = mock_server.call_tool("validate_service_order", service_order_json="{}")
+    assert validated["errors"] == expected["errors"] and validated["errors"]
+
+
+def test_server_tools_use_the_async_client(make_client, openslice, monkeypatch):
+    monkeypatch.setattr(settings, "openslice_mock_mode", True)
+    server = OpenSliceMCPServer()
+    server.async_client = make_client()
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                server.call_tool_async("get_service_catalog"),
+                server.call_tool_async("get_service_inventory"),
+            )
+        finally:
+            await server.aclose()
+
+    catalog, inventory = asyncio.run(run())
+    assert catalog["status"] == "success" and catalog["count"] == len(CATALOG)
+    assert inventory["count"] == 1
+    assert openslice.peak >= 2
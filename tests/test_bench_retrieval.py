@@ -0,0 +1,39 @@
+"""
+Tests du benchmark de recherche sur catalogue synthétique (petite taille)
+"""
+import numpy as np
+
+from scripts import bench_retrieval
+
+
+def test_synthetic_catalog_is_reproducible():
+    first = bench_retrieval.generate_catalog(50)
+    assert first == bench_retrieval.generate_catalog(50)
+    assert len({spec["id"] for spec in first}) == 50
+    assert bench_retrieval.generate_queries(5) == bench_retrieval.generate_queries(5)
+
+
+def test_recall_at_k():
+    exact = np.array([[0, 1, 2], [3, 4, 5]])
+    assert bench_retrieval.recall_at_k(exact, exact) == 1.0
+    assert bench_retrieval.recall_at_k(np.array([[2, 1, 9], [7, 8, 9]]), exact) == 1 / 3
+
+
+def test_run_benchmark_report(capsys):
+    report = bench_retrieval.run_benchmark(
+        sizes=[400],
+        backends=["numpy-exact", "chroma-hnsw", "float16"],
+        embeddings="hash",
+        n_queries=20,
+        k=5,
+        batch_size=8,
+        space="l2"
+    )
+    results = report["results"]["400"]
+    assert results["numpy-exact"]["recall@5"] == 1.0
+    assert results["float16"]["recall@5"] >= 0.95
+    assert results["chroma-hnsw"]["recall@5"] >= 0.9
+    for name in ("numpy-exact", "chroma-hnsw", "float16"):
+        assert set(results[name]["latency_ms"]) == {"p50", "p95", "p99"}
+        assert results[name]["index_bytes"] > 0
+    assert results["float16"]["index_bytes"] < results["numpy-exact"]["index_bytes"]
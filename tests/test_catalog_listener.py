@@ -0,0 +1,144 @@
+"""
+Tests du listener TMF633 : décodage des notifications, regroupement, reprises et jeton
+"""
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from scripts import catalog_listener
+from scripts.catalog_listener import (
+    CatalogEventCoalescer,
+    apply_catalog_events,
+    callback_with_token,
+    event_action,
+    make_handler,
+    parse_notification,
+)
+from tests.helpers import make_spec
+
+SPECS = [
+    make_spec("video", "Video streaming edge", "low latency video streaming"),
+    make_spec("iot", "IoT gateway", "industrial telemetry gateway"),
+]
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition non atteinte"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("event_type,action", [
+    ("ServiceSpecificationCreateEvent", "upsert"),
+    ("serviceSpecificationChangeEvent", "upsert"),
+    ("ServiceSpecificationDeleteEvent", "delete"),
+    ("ServiceSpecificationStateChangeEvent", "upsert"),
+    ("ServiceOrderCreateEvent", None),
+    ("ServiceSpecificationAttributeValueEvent", None),
+    (None, None),
+])
+def test_event_action(event_type, action):
+    assert event_action(event_type) == action
+
+
+def test_parse_notification_formats():
+    spec = {"id": "video", "name": "Video"}
+    assert parse_notification({"eventType": "ServiceSpecificationCreateEvent", "event": {"serviceSpecification": spec}}) \
+        == ("ServiceSpecificationCreateEvent", spec)
+    assert parse_notification({"serviceSpecification": spec}, "/listener/serviceSpecificationDeleteEvent/") \
+        == ("serviceSpecificationDeleteEvent", spec)
+    assert parse_notification({"eventType": "X", "event": {"serviceSpecification": "video"}}) == ("X", None)
+
+
+def test_coalescer_keeps_last_event_per_service():
+    applied = []
+    coalescer = CatalogEventCoalescer(
+        lambda upserts, deletes: applied.append((upserts, deletes)) or {"upserted": 0, "deleted": 0, "unchanged": 0},
+        debounce_s=0.05
+    )
+    coalescer.submit("upsert", "video", {"name": "Video"})
+    coalescer.submit("upsert", "iot", {"name": "IoT"})
+    coalescer.submit("delete", "video")
+    _wait_for(lambda: coalescer.batches == 1)
+    coalescer.close()
+    assert applied == [({"iot": {"name": "IoT"}}, {"video"})]
+    assert coalescer.received == 3
+
+
+def test_failing_batch_backs_off_then_is_dropped():
+    attempts = []
+
+    def apply(upserts, deletes):
+        attempts.append(time.monotonic())
+        raise RuntimeError("ChromaDB indisponible")
+
+    coalescer = CatalogEventCoalescer(apply, debounce_s=0.02, max_retries=2, max_backoff_s=0.2)
+    coalescer.submit("delete", "video")
+    _wait_for(lambda: coalescer.dropped == 1)
+    time.sleep(0.1)
+    coalescer.close()
+
+    assert len(attempts) == 3  # premier essai + 2 nouvelles tentatives, puis abandon
+    delays = [b - a for a, b in zip(attempts, attempts[1:])]
+    assert delays[1] > delays[0]
+
+
+def test_apply_catalog_events_updates_collection(build_selector):
+    agent = build_selector(SPECS)
+    version = agent.catalog_version
+    updated = make_spec("iot", "IoT gateway", "industrial telemetry gateway in Lyon")
+    upserts = {spec["id"]: spec for spec in (SPECS[0], updated, make_spec("vr", "VR simulation", "virtual reality"))}
+
+    counts = apply_catalog_events(agent, upserts, {"video-old"}, token_provider=lambda: "token")
+
+    assert counts == {"upserted": 2, "deleted": 0, "unchanged": 1}
+    assert sorted(agent.collection.get()["ids"]) == ["iot", "video", "vr"]
+    assert agent.catalog_version == version + 1
+
+    counts = apply_catalog_events(agent, {}, {"video"}, token_provider=lambda: "token")
+    assert counts == {"upserted": 0, "deleted": 1, "unchanged": 0}
+    assert sorted(agent.collection.get()["ids"]) == ["iot", "vr"]
+    assert "video" not in agent.lexical_index.ids
+
+
+@pytest.fixture
+def listener():
+    submitted = []
+
+    class Recorder:
+        def submit(self, action, service_id, spec=None):
+            submitted.append((action, service_id))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(Recorder(), "s3cret"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/listener", submitted
+    server.shutdown()
+    server.server_close()
+
+
+def test_notifications_require_the_listener_token(listener):
+    url, submitted = listener
+    body = {"eventType": "ServiceSpecificationDeleteEvent", "event": {"serviceSpecification": {"id": "video"}}}
+
+    assert httpx.post(url, json=body).status_code == 401
+    assert httpx.post(callback_with_token(url, "wrong"), json=body).status_code == 401
+    assert httpx.post(callback_with_token(url, "s3cret"), json=body).status_code == 201
+    assert httpx.post(url, json=body, headers={"Authorization": "Bearer s3cret"}).status_code == 201
+    path_typed = callback_with_token(url + "/serviceSpecificationDeleteEvent", "s3cret")
+    assert httpx.post(path_typed, json={"serviceSpecification": {"id": "iot"}}).status_code == 201
+    assert submitted == [("delete", "video"), ("delete", "video"), ("delete", "iot")]
+
+
+def test_registration_requires_callback_url(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["catalog_listener.py"])
+    with pytest.raises(SystemExit):
+        catalog_listener.main()
+    monkeypatch.setattr("sys.argv", ["catalog_listener.py", "--no-register"])
+    monkeypatch.setattr(catalog_listener.settings, "catalog_listener_secret", "")
+    with pytest.raises(SystemExit):
+        catalog_listener.main()
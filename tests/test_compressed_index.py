@@ -0,0 +1,101 @@
+"""
+Tests de l'index compressé (float16 / IVF-PQ) : recall, mise à jour incrémentale, persistance
+"""
+import numpy as np
+import pytest
+
+from retrieval import CompressedIndex, compute_distances
+
+
+CENTERS = np.random.default_rng(42).normal(size=(20, 32))
+
+
+def clustered_vectors(n, seed=0):
+    """Embeddings groupés autour des mêmes centres (catalogue, requêtes, ajouts)"""
+    rng = np.random.default_rng(seed)
+    points = CENTERS[rng.integers(len(CENTERS), size=n)] + 0.3 * rng.normal(size=(n, CENTERS.shape[1]))
+    return points.astype(np.float32)
+
+
+def recall(index, vectors, ids, queries, k=10):
+    exact = np.argsort(compute_distances(queries, vectors, index.space), axis=1)[:, :k]
+    found = index.search_batch(queries, top_k=k)
+    return np.mean([
+        len({service_id for service_id, _ in row} & {ids[i] for i in truth}) / k
+        for row, truth in zip(found, exact)
+    ])
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    vectors = clustered_vectors(2000)
+    ids = [f"s{i}" for i in range(len(vectors))]
+    queries = clustered_vectors(50, seed=1)
+    return ids, vectors, queries
+
+
+@pytest.mark.parametrize("mode,space,minimum", [
+    ("float16", "l2", 0.99),
+    ("float16", "cosine", 0.99),
+    ("ivfpq", "l2", 0.9),
+    ("ivfpq", "cosine", 0.9),
+])
+def test_recall_against_exact_search(catalog, mode, space, minimum):
+    ids, vectors, queries = catalog
+    index = CompressedIndex.build(ids, vectors, mode=mode, space=space, pq_m=8, nprobe=8, rerank=100)
+    assert recall(index, vectors, ids, queries) >= minimum
+
+
+def test_results_carry_exact_distances(catalog):
+    ids, vectors, queries = catalog
+    index = CompressedIndex.build(ids, vectors, mode="ivfpq", pq_m=8)
+    for service_id, distance in index.search(queries[0], top_k=5):
+        expected = compute_distances(queries[:1], vectors[[ids.index(service_id)]], "l2")[0, 0]
+        assert distance == pytest.approx(float(expected), rel=1e-5)
+
+
+@pytest.mark.parametrize("mode", ["float16", "ivfpq"])
+def test_updated_removes_and_adds(catalog, mode):
+    ids, vectors, queries = catalog
+    index = CompressedIndex.build(ids[:1500], vectors[:1500], mode=mode, pq_m=8)
+    removed = set(ids[:100])
+    changed = ids[100:110]
+    new_vectors = clustered_vectors(len(changed) + 500, seed=2)
+    updated = index.updated(removed, changed + ids[1500:], new_vectors)
+
+    assert len(updated) == 1400 + 500
+    assert not removed & set(updated.ids)
+    # Un service modifié est trouvé avec son nouvel embedding, pas avec l'ancien
+    assert updated.search(new_vectors[0], top_k=1)[0] == (changed[0], pytest.approx(0.0, abs=1e-4))
+    assert updated.search(new_vectors[-1], top_k=1)[0][0] == ids[-1]
+    # Les codebooks ne sont pas ré-entraînés et le recall reste correct
+    if mode == "ivfpq":
+        assert updated.codebooks is index.codebooks
+    all_vectors = np.concatenate([vectors[110:1500], new_vectors])
+    all_ids = ids[110:1500] + changed + ids[1500:]
+    order = [all_ids.index(service_id) for service_id in updated.ids]
+    assert recall(updated, all_vectors[order], updated.ids, queries) >= 0.9
+
+
+@pytest.mark.parametrize("mode", ["float16", "ivfpq"])
+def test_save_and_load(catalog, tmp_path, mode):
+    ids, vectors, queries = catalog
+    index = CompressedIndex.build(ids, vectors, mode=mode, pq_m=8, nprobe=4, rerank=50)
+    path = str(tmp_path / "services.compressed.npz")
+    index.save(path)
+    loaded = CompressedIndex.load(path)
+    assert (loaded.mode, loaded.space, loaded.nprobe, loaded.rerank) == (mode, "l2", 4, 50)
+    assert loaded.search_batch(queries, top_k=5) == index.search_batch(queries, top_k=5)
+    assert CompressedIndex.load(path, nprobe=16).nprobe == 16
+
+    report = loaded.memory_report()
+    assert report["count"] == len(ids)
+    assert report["resident_total_bytes"] < vectors.nbytes
+
+
+def test_invalid_parameters(catalog):
+    ids, vectors, _ = catalog
+    with pytest.raises(ValueError):
+        CompressedIndex.build(ids, vectors, mode="ivfpq", pq_m=7)
+    with pytest.raises(ValueError):
+        CompressedIndex.build(ids, vectors, mode="pq")
@@ -0,0 +1,103 @@
+"""
+Tests de l'index des contraintes numériques (exigences, caractéristiques, faisabilité)
+"""
+import numpy as np
+import pytest
+
+from retrieval.constraints import (
+    ConstraintIndex,
+    parse_characteristics,
+    parse_guarantees,
+    parse_quantity,
+    parse_requirements,
+)
+
+
+def test_parse_quantity_units():
+    assert parse_quantity("32GB") == 32
+    assert parse_quantity("512MB") == 0.5
+    assert parse_quantity("1s") == 1000
+    assert parse_quantity("10Gbps") == 10000
+    assert parse_quantity("2,5 ms") == 2.5
+    assert parse_quantity(4) == 4
+    assert parse_quantity("8", default_scale=1024) == 8192
+    assert parse_quantity(True) is None
+    assert parse_quantity("haute") is None
+
+
+def test_parse_requirements_normalizes_names_and_units():
+    constraints = parse_requirements(
+        {"max_latency": "10ms", "bandwidth": "1Gbps"},
+        {"cpu": 4, "RAM_GB": "16", "max_latency": "5ms", "location": "Nice", "redundancy": True}
+    )
+    assert constraints == {"latency_ms": 5.0, "bandwidth_mbps": 1000.0, "cpu": 4.0, "ram_gb": 16.0}
+    assert parse_requirements(None, {}) == {}
+
+
+def test_parse_characteristics_and_guarantees():
+    ranges = parse_characteristics([
+        {"name": "vCPU", "serviceSpecCharacteristicValue": [{"value": "2"}, {"value": "8"}]},
+        {"name": "Memory", "serviceSpecCharacteristicValue": [{"valueFrom": 512, "valueTo": 2048, "unitOfMeasure": "MB"}]},
+        {"name": "Location", "serviceSpecCharacteristicValue": [{"value": "Paris"}]},
+    ])
+    assert ranges == {"cpu": (2.0, 8.0), "ram_gb": (0.5, 2.0)}
+    assert parse_guarantees("Slice URLLC, latence < 5ms, jusqu'à 10 Gbps, 99.99% de disponibilité") == {
+        "latency_ms": (5.0, 5.0),
+        "bandwidth_mbps": (10000.0, 10000.0),
+        "availability_pct": (99.99, 99.99),
+    }
+
+
+RANGES = {
+    "small": {"cpu": (1, 2), "latency_ms": (20, 50)},
+    "large": {"cpu": (4, 16), "latency_ms": (1, 10)},
+    "edge": {"cpu": (2, 4), "latency_ms": (5, 5)},
+    "unknown": {},
+}
+
+
+def brute_force_infeasible(constraints):
+    """Référence : un service est écarté si un intervalle connu ne peut satisfaire l'exigence"""
+    result = set()
+    for service_id, ranges in RANGES.items():
+        if "cpu" in constraints and "cpu" in ranges and ranges["cpu"][1] < constraints["cpu"]:
+            result.add(service_id)
+        if "latency_ms" in constraints and "latency_ms" in ranges and ranges["latency_ms"][0] > constraints["latency_ms"]:
+            result.add(service_id)
+    return result
+
+
+@pytest.fixture
+def index():
+    return ConstraintIndex.build(list(RANGES), list(RANGES.values()))
+
+
+def test_infeasible(index):
+    assert index.infeasible({"cpu": 4}) == {"small"}
+    assert index.infeasible({"latency_ms": 5}) == {"small"}
+    assert index.infeasible({"latency_ms": 4}) == {"small", "edge"}
+    assert index.infeasible({"cpu": 8, "latency_ms": 5}) == {"small", "edge"}
+    assert index.infeasible({"users": 100}) == set()  # attribut inconnu de tout le catalogue
+    assert index.infeasible(None) == set()
+
+
+def test_infeasible_matches_brute_force(index):
+    for cpu in (0, 1, 2, 3, 4, 16, 17):
+        for latency in (0.5, 1, 5, 10, 20, 60):
+            constraints = {"cpu": cpu, "latency_ms": latency}
+            assert index.infeasible(constraints) == brute_force_infeasible(constraints)
+
+
+def test_updated_and_reload(index, tmp_path):
+    updated = index.updated({"large"}, ["small", "gpu"], [{"cpu": (8, 8)}, {"gpu": (1, 2)}])
+    assert updated.ids == ["edge", "unknown", "small", "gpu"]
+    assert updated.ranges_of("small") == {"cpu": (8.0, 8.0)}
+    assert updated.infeasible({"cpu": 8, "latency_ms": 4, "gpu": 4}) == {"edge", "gpu"}
+
+    path = str(tmp_path / "services.constraints.npz")
+    updated.save(path)
+    loaded = ConstraintIndex.load(path)
+    assert loaded.ids == updated.ids
+    assert loaded.stats() == updated.stats()
+    for name in ("lo", "hi", "lo_rows", "hi_rows"):
+        np.testing.assert_array_equal(loaded.columns["cpu"][name], updated.columns["cpu"][name])
@@ -0,0 +1,44 @@
+"""
+Tests du regroupement des quasi-doublons et du choix du représentant
+"""
+import numpy as np
+
+from retrieval.dedup import choose_representative, cluster_near_duplicates, version_key
+
+
+def test_version_key_orders_numerically():
+    assert version_key("2.10.1") > version_key("2.9")
+    assert version_key("1.0.1") > version_key("1.0")
+    assert version_key(None) < version_key("0.1")
+
+
+def test_representative_is_latest_version():
+    assert choose_representative([{"version": "2.0"}, {}], ["a", "b"]) == 0
+    assert choose_representative([{}, {"version": "2.0"}], ["a", "b"]) == 1
+    assert choose_representative([{"version": "1.0"}, {"version": "1.0.1"}], ["a", "b"]) == 1
+    assert choose_representative([{"version": "2.10"}, {"version": "2.9"}], ["a", "b"]) == 0
+
+
+def test_representative_ties_on_smallest_id():
+    assert choose_representative([{"version": "1.0"}, {"version": "1.0"}], ["b", "a"]) == 1
+    assert choose_representative([None, {}], ["z", "y"]) == 1
+
+
+def test_clusters_are_transitive_within_groups():
+    vectors = np.asarray([
+        [1.0, 0.0, 0.0],
+        [0.99, 0.14, 0.0],   # ~ ligne 0
+        [0.96, 0.28, 0.0],   # ~ ligne 1, pas directement ~ ligne 0
+        [0.0, 1.0, 0.0],
+        [1.0, 0.0, 0.0],     # identique à la ligne 0, autre signature
+    ])
+    labels = cluster_near_duplicates(vectors, ["a", "a", "a", "a", "b"], threshold=0.98)
+    assert labels[0] == labels[1] == labels[2]
+    assert len({labels[0], labels[3], labels[4]}) == 3
+
+
+def test_candidates_limit_comparisons():
+    vectors = np.asarray([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0], [0.0, 1.0]])
+    labels = cluster_near_duplicates(vectors, ["g"] * 4, threshold=0.99, candidates=[2])
+    assert labels[2] == labels[3]
+    assert labels[0] != labels[1]
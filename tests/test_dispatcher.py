@@ -0,0 +1,112 @@
+"""
+Tests du RetrievalDispatcher (regroupement, erreurs, arrêt)
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from retrieval.dispatcher import RetrievalDispatcher
+
+
+class FakeRetriever:
+    """Fonction de recherche qui renvoie un candidat par requête et compte ses appels"""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, queries, top_k, min_score, filters=None):
+        with self.lock:
+            self.calls.append(list(queries))
+        time.sleep(self.delay)
+        return [[{"id": query, "score": 1.0}] for query in queries]
+
+
+@pytest.fixture
+def make_dispatcher():
+    dispatchers = []
+
+    def make(retrieve_batch, **kwargs):
+        dispatcher = RetrievalDispatcher(retrieve_batch, **kwargs)
+        dispatchers.append(dispatcher)
+        return dispatcher
+
+    yield make
+    for dispatcher in dispatchers:
+        dispatcher.close()
+
+
+def test_concurrent_submits_are_batched_and_deduplicated(make_dispatcher):
+    retriever = FakeRetriever()
+    dispatcher = make_dispatcher(retriever, window_ms=50, max_batch_size=64)
+    queries = [f"q{i % 4}" for i in range(16)]
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(lambda q: dispatcher.submit([q], top_k=3, min_score=0.5), queries))
+
+    assert [result[0][0]["id"] for result in results] == queries
+    assert len(retriever.calls) < len(queries)
+    assert all(len(call) == len(set(call)) for call in retriever.calls)
+
+
+def test_callers_get_independent_copies(make_dispatcher):
+    dispatcher = make_dispatcher(FakeRetriever(), window_ms=1)
+    first = dispatcher.submit(["a"], top_k=1, min_score=0.0)
+    first[0][0]["domain"] = "modifié"
+    assert "domain" not in dispatcher.submit(["a"], top_k=1, min_score=0.0)[0][0]
+
+
+def test_retrieve_error_is_raised_to_callers(make_dispatcher):
+    def failing(queries, **kwargs):
+        raise ValueError("index indisponible")
+
+    dispatcher = make_dispatcher(failing, window_ms=1)
+    with pytest.raises(ValueError):
+        dispatcher.submit(["a"], top_k=1, min_score=0.0)
+
+
+def test_mismatched_results_fail_without_killing_worker(make_dispatcher):
+    calls = []
+
+    def short(queries, **kwargs):
+        calls.append(queries)
+        return [] if len(calls) == 1 else [[{"id": q}] for q in queries]
+
+    dispatcher = make_dispatcher(short, window_ms=1, timeout=2)
+    with pytest.raises(RuntimeError):
+        dispatcher.submit(["a"], top_k=1, min_score=0.0)
+    # Le thread du dispatcher sert toujours les lots suivants
+    assert dispatcher.submit(["b"], top_k=1, min_score=0.0) == [[{"id": "b"}]]
+
+
+def test_submit_after_close_falls_back_to_direct_call(make_dispatcher):
+    retriever = FakeRetriever()
+    dispatcher = make_dispatcher(retriever, window_ms=1)
+    dispatcher.close()
+    assert dispatcher.submit(["a"], top_k=1, min_score=0.0) == [[{"id": "a", "score": 1.0}]]
+    assert retriever.calls == [["a"]]
+
+
+def test_submit_times_out(make_dispatcher):
+    dispatcher = make_dispatcher(FakeRetriever(delay=0.5), window_ms=1, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        dispatcher.submit(["a"], top_k=1, min_score=0.0)
+
+
+def test_batch_timings_reach_each_caller(make_dispatcher):
+    local = threading.local()
+
+    def retrieve(queries, **kwargs):
+        local.timings = {"vector_ms": float(len(queries))}
+        return [[{"id": q}] for q in queries]
+
+    dispatcher = make_dispatcher(retrieve, window_ms=1, timings=lambda: getattr(local, "timings", {}))
+    dispatcher.submit(["a", "b"], top_k=1, min_score=0.0)
+    timings = dispatcher.last_timings
+    assert timings["vector_ms"] == 2.0
+    assert timings["queue_ms"] >= 0.0
+    # Les latences restent propres au thread appelant
+    with ThreadPoolExecutor(1) as pool:
+        assert pool.submit(lambda: dispatcher.last_timings).result() == {}
@@ -0,0 +1,72 @@
+"""
+Tests du backend d'embeddings onnx-int8 (parité avec sentence-transformers, export du bon modèle)
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from agents.agent2_selector import ServiceSelectorAgent
+from config import settings
+from retrieval import compute_distances
+from retrieval.embeddings import ONNX_MANIFEST_FILE, ONNX_MODEL_FILE, OnnxInt8EmbeddingFunction
+from tests.helpers import HashEmbeddingFunction
+
+DOCUMENTS = [
+    "Edge AR content provider for low latency augmented reality rendering",
+    "Mixed reality collaboration hub sharing holograms between users",
+    "VR simulation core for immersive virtual reality environments",
+    "5G slice covering Paris region with latency below 5ms",
+    "HD video streaming for standard multimedia content",
+    "Legacy 4G LTE access for smartphones and tablets",
+]
+QUERIES = [
+    "cloud hosting for augmented reality AR and virtual reality VR applications",
+    "5G radio access network with mobile broadband low latency connectivity",
+    "réseau mobile 4G LTE pour smartphones",
+    "video streaming service for multimedia content",
+]
+
+
+def test_refuses_export_of_another_model(tmp_path):
+    with open(tmp_path / ONNX_MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump({"model": "sentence-transformers/all-mpnet-base-v2"}, f)
+    with pytest.raises(ValueError, match="all-mpnet-base-v2"):
+        OnnxInt8EmbeddingFunction(str(tmp_path), model_name="sentence-transformers/all-MiniLM-L6-v2")
+
+
+def test_backend_mismatch_is_reported_not_fatal(tmp_path, capsys):
+    directory = str(tmp_path / "chroma")
+    ServiceSelectorAgent(persist_directory=directory, embedding_function=HashEmbeddingFunction(),
+                         embedding_backend="sentence-transformers")
+    agent = ServiceSelectorAgent(persist_directory=directory, embedding_function=HashEmbeddingFunction(),
+                                 embedding_backend="onnx-int8")
+    assert agent.physical_collection == "openslice_services"
+    assert "backend 'sentence-transformers'" in capsys.readouterr().out
+
+
+def test_onnx_int8_matches_sentence_transformers():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    if not os.path.exists(os.path.join(settings.onnx_model_dir, ONNX_MODEL_FILE)):
+        pytest.skip(f"Export ONNX absent de {settings.onnx_model_dir} (scripts/export_onnx_model.py)")
+
+    reference = sentence_transformers.SentenceTransformer(settings.embedding_model)
+    onnx = OnnxInt8EmbeddingFunction(settings.onnx_model_dir, model_name=settings.embedding_model)
+    vectors = {
+        "reference": [np.asarray(reference.encode(texts, normalize_embeddings=True), dtype=np.float32)
+                      for texts in (DOCUMENTS, QUERIES)],
+        "onnx": [np.asarray(onnx(texts), dtype=np.float32) for texts in (DOCUMENTS, QUERIES)],
+    }
+
+    cosine = np.sum(vectors["reference"][0] * vectors["onnx"][0], axis=1)
+    assert cosine.min() > 0.98
+    top = {
+        name: np.argsort(compute_distances(queries, docs, "l2"), axis=1, kind="stable")[:, :3]
+        for name, (docs, queries) in vectors.items()
+    }
+    assert (top["reference"][:, 0] == top["onnx"][:, 0]).all()
+    overlap = np.mean([len(set(a) & set(b)) / 3 for a, b in zip(top["reference"].tolist(), top["onnx"].tolist())])
+    assert overlap >= 0.9
@@ -0,0 +1,46 @@
+"""
+Tests de l'encodage multi-processus (EmbeddingProcessPool, contexte "spawn")
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from retrieval.embedding_pool import EmbeddingProcessPool
+from tests.helpers import HashEmbeddingFunction
+
+
+class WorkerProbe:
+    """Fonction d'embeddings qui renvoie le nombre de threads et le pid du processus"""
+
+    def __call__(self, input):
+        return [[float(os.environ["OMP_NUM_THREADS"]), float(os.getpid())] for _ in input]
+
+
+def test_pool_matches_in_process_encoding():
+    documents = [f"service {i} low latency video slice" for i in range(40)]
+    batches = [documents[i:i + 8] for i in range(0, len(documents), 8)]
+    with EmbeddingProcessPool(processes=2, factory=HashEmbeddingFunction) as pool:
+        with ThreadPoolExecutor(4) as threads:
+            encoded = list(threads.map(pool.encode, batches))
+
+    expected = np.asarray(HashEmbeddingFunction()(documents), dtype=np.float32)
+    assert all(vectors.dtype == np.float32 for vectors in encoded)
+    np.testing.assert_allclose(np.vstack(encoded), expected, rtol=1e-6)
+
+
+def test_workers_run_in_separate_processes_with_fixed_threads():
+    with EmbeddingProcessPool(processes=2, threads_per_process=3, factory=WorkerProbe) as pool:
+        assert pool.threads_per_process == 3
+        with ThreadPoolExecutor(8) as threads:
+            probes = np.vstack(list(threads.map(pool, [["doc"]] * 16)))
+    assert set(probes[:, 0]) == {3.0}
+    assert os.getpid() not in set(probes[:, 1].astype(int))
+
+
+def test_default_threads_split_cores():
+    pool = EmbeddingProcessPool(processes=2, factory=HashEmbeddingFunction)
+    try:
+        assert pool.threads_per_process == max(1, (os.cpu_count() or 1) // 2)
+    finally:
+        pool.close()
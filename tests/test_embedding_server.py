@@ -0,0 +1,110 @@
+"""
+Tests du service d'embeddings partagé (aller-retour client / démon, trames invalides, repli local)
+"""
+import json
+import socket
+import threading
+import time
+
+import chromadb
+import numpy as np
+import pytest
+from chromadb.config import Settings as ChromaSettings
+
+from agents.agent2_selector import ServiceSelectorAgent
+from retrieval import embeddings
+from retrieval.embedding_server import (
+    EmbeddingServer,
+    RemoteEmbeddingFunction,
+    _recv_frame,
+    _send_frame,
+    get_server_info,
+)
+from tests.helpers import HashEmbeddingFunction
+
+TEXTS = ["5G slice Paris", "edge video streaming", "IoT gateway"]
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = str(tmp_path / "emb.sock")
+    server = EmbeddingServer(path, HashEmbeddingFunction(), model_name="hash", backend="test", max_wait_ms=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.time() + 5
+    while get_server_info(path) is None:
+        assert time.time() < deadline, "démon d'embeddings non démarré"
+        time.sleep(0.01)
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+def test_round_trip_matches_local_function(server):
+    remote = RemoteEmbeddingFunction(server.socket_path)
+    vectors = remote(TEXTS)
+    assert np.allclose(vectors, HashEmbeddingFunction()(TEXTS))
+    info = get_server_info(server.socket_path)
+    assert (info["model"], info["backend"]) == ("hash", "test")
+    assert info["stats"]["texts"] == len(TEXTS)
+
+
+def test_invalid_frame_keeps_connection_open(server):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        sock.connect(server.socket_path)
+        for payload in (b"{not json", b"\xff\xfe", b"[1, 2]"):
+            _send_frame(sock, payload)
+            assert "error" in json.loads(_recv_frame(sock))
+        _send_frame(sock, json.dumps({"op": "embed", "texts": TEXTS[:1]}).encode())
+        assert json.loads(_recv_frame(sock))["shape"] == [1, 64]
+        _recv_frame(sock)
+    assert server.stats_snapshot()["errors"] == 3
+
+
+def test_concurrent_clients_are_counted(server):
+    remote = RemoteEmbeddingFunction(server.socket_path)
+    threads = [threading.Thread(target=lambda: [remote(TEXTS) for _ in range(10)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = server.stats_snapshot()
+    assert stats["requests"] == 80
+    assert stats["texts"] == 80 * len(TEXTS)
+
+
+def test_falls_back_to_local_model_when_server_is_gone(server, monkeypatch):
+    loaded = []
+    monkeypatch.setattr(
+        embeddings, "get_embedding_function",
+        lambda **kwargs: loaded.append(kwargs) or HashEmbeddingFunction()
+    )
+    remote = RemoteEmbeddingFunction(server.socket_path, model_name="hash", backend="test")
+    remote(TEXTS)
+    server.shutdown()
+    time.sleep(0.2)
+
+    assert np.allclose(remote(TEXTS), HashEmbeddingFunction()(TEXTS))
+    remote(TEXTS)
+    assert loaded == [{"model_name": "hash", "backend": "test", "use_service": False}]
+
+
+def test_agent_opens_collection_indexed_with_a_named_function(tmp_path, server):
+    class NamedHashEmbeddingFunction(HashEmbeddingFunction):
+        @staticmethod
+        def name():
+            return "sentence_transformer"
+
+        def get_config(self):
+            return {"model_name": "all-MiniLM-L6-v2"}
+
+    directory = str(tmp_path / "chroma")
+    client = chromadb.PersistentClient(path=directory, settings=ChromaSettings(anonymized_telemetry=False))
+    client.create_collection(name="openslice_services", embedding_function=NamedHashEmbeddingFunction())
+    remote = RemoteEmbeddingFunction(server.socket_path)
+
+    agent = ServiceSelectorAgent(persist_directory=directory, embedding_function=remote, client=client)
+
+    assert agent.physical_collection == "openslice_services"
+    assert [c.name for c in client.list_collections()] == ["openslice_services"]
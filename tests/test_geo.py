@@ -0,0 +1,107 @@
+"""
+Tests du gazetteer hors ligne, de l'index des zones de couverture et du bonus de localisation
+"""
+import numpy as np
+import pytest
+
+from config import settings
+from retrieval.geo import CoverageIndex, Gazetteer, bbox_distance_km
+from tests.helpers import make_spec
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return Gazetteer.default()
+
+
+def names(places):
+    return [place.name for place in places]
+
+
+def test_find_places_longest_match_first(gazetteer):
+    text = "Connectivité couvrant la Provence-Alpes-Côte d'Azur et Nice"
+    assert names(gazetteer.find_places(text)) == ["Provence-Alpes-Côte d'Azur", "Nice"]
+
+
+def test_find_places_requires_proper_nouns(gazetteer):
+    assert gazetteer.find_places("a nice low latency slice") == []
+    assert names(gazetteer.find_places("a nice slice", proper_nouns=False)) == ["Nice"]
+
+
+def test_generic_words_are_not_places(gazetteer):
+    assert gazetteer.find_places("National roaming compliant with EU regulation") == []
+    assert gazetteer.lookup("national") is None
+    assert gazetteer.lookup("nationwide").name == "France"
+
+
+def test_lookup_prefers_city(gazetteer):
+    assert gazetteer.lookup("Île-de-France (Paris)").name == "Paris"
+    assert gazetteer.lookup("ile de france").name == "Île-de-France"
+    assert gazetteer.lookup("Atlantis") is None
+
+
+def brute_force_match(index, place, radius_km):
+    distances = bbox_distance_km(place.bbox, index.bboxes)
+    matches = {}
+    for area in np.flatnonzero(distances <= radius_km):
+        service_id = index.ids[index.area_service[area]]
+        matches[service_id] = round(min(matches.get(service_id, np.inf), float(distances[area])), 1)
+    return matches
+
+
+def test_match_agrees_with_brute_force(gazetteer):
+    cities = [place for place in gazetteer.places.values() if place.kind == "city"]
+    regions = [place for place in gazetteer.places.values() if place.kind == "region"]
+    ids = [f"s{i}" for i in range(len(cities))] + ["region", "unknown"]
+    coverages = [[city] for city in cities] + [[regions[0], regions[1]], []]
+    index = CoverageIndex.build(ids, coverages)
+    for place in cities + regions:
+        for radius_km in (0.0, 50.0, 300.0):
+            assert index.match(place, radius_km, nearest=False) == brute_force_match(index, place, radius_km)
+    assert index.stats() == {"services": len(ids), "covered": len(ids) - 1, "areas": len(cities) + 2}
+
+
+def test_match_falls_back_to_nearest_zone(gazetteer):
+    index = CoverageIndex.build(["paris", "lyon"], [[gazetteer.lookup("Paris")], [gazetteer.lookup("Lyon")]])
+    grenoble = gazetteer.lookup("Grenoble")
+    assert index.match(grenoble, radius_km=10, nearest=False) == {}
+    assert list(index.match(grenoble, radius_km=10)) == ["lyon"]
+
+
+def test_updated_and_reload(gazetteer, tmp_path):
+    nice, paris, lille = gazetteer.lookup("Nice"), gazetteer.lookup("Paris"), gazetteer.lookup("Lille")
+    index = CoverageIndex.build(["a", "b", "c"], [[nice], [paris], []])
+    updated = index.updated({"a"}, ["b", "d"], [[lille], [nice]])
+    assert updated.ids == ["c", "b", "d"]
+    assert updated.coverage_of("b") == ["Lille"]
+    assert list(updated.match(nice, radius_km=10, nearest=False)) == ["d"]
+    assert updated.match(paris, radius_km=10, nearest=False) == {}
+
+    path = str(tmp_path / "coverage.geo.npz")
+    updated.save(path)
+    loaded = CoverageIndex.load(path)
+    assert loaded.ids == updated.ids
+    assert loaded.covered_ids == {"b", "d"}
+    assert loaded.match(lille, radius_km=10) == updated.match(lille, radius_km=10)
+
+
+def test_location_filter_is_off_by_default():
+    assert type(settings).model_fields["location_filter"].default == "off"
+
+
+def test_boost_reorders_without_changing_score(build_selector, monkeypatch):
+    monkeypatch.setattr(settings, "location_filter", "boost")
+    agent = build_selector([
+        make_spec("paris", "Video slice Paris", "video streaming slice", location="Paris"),
+        make_spec("nice", "Video slice Nice", "video streaming slice low latency", location="Nice"),
+    ])
+    agent.lexical_index = None  # recherche vectorielle seule
+    query = "video streaming slice Paris"
+    plain = {s["id"]: s["score"] for s in agent._search_batch([query], top_k=5, min_score=0.0)[0]}
+    assert plain["paris"] > plain["nice"]
+
+    monkeypatch.setattr(settings, "location_boost", 1.0)
+    boosted = agent._search_batch([query], top_k=5, min_score=0.0, filters=[{"location": "Nice"}])[0]
+    assert [s["id"] for s in boosted] == ["nice", "paris"]
+    assert {s["id"]: s["score"] for s in boosted} == plain
+    assert boosted[0]["coverage_km"] == 0.0
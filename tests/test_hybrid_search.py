@@ -0,0 +1,42 @@
+"""
+Tests de la recherche hybride (vectorielle + BM25) de l'Agent 2
+"""
+import pytest
+
+from config import settings
+from tests.helpers import make_spec
+
+
+SPECS = [
+    make_spec("video", "Video streaming edge", "low latency video streaming for live events"),
+    make_spec("parking", "Parking sensors", "smart parking occupancy sensors platform"),
+    make_spec("iot", "IoT gateway", "industrial telemetry gateway"),
+]
+QUERY = "live video streaming platform"
+
+
+@pytest.fixture
+def selector(build_selector):
+    agent = build_selector(SPECS)
+    assert agent.lexical_index is not None
+    return agent
+
+
+def test_lexical_hit_below_min_score_is_dropped(selector, monkeypatch):
+    # "parking" ne partage que le terme générique "platform" avec la requête
+    monkeypatch.setattr(settings, "lexical_min_score", 0.0)
+    ids = [service["id"] for service in selector._search_batch([QUERY], top_k=5, min_score=0.5)[0]]
+    assert ids == ["video"]
+
+
+def test_strong_lexical_hit_kept_with_lexical_min_score(selector, monkeypatch):
+    monkeypatch.setattr(settings, "lexical_min_score", 0.5)
+    ids = [service["id"] for service in selector._search_batch([QUERY], top_k=5, min_score=0.5)[0]]
+    assert ids[0] == "video"
+    assert "parking" in ids
+
+
+def test_fusion_keeps_vector_score(selector):
+    candidates = selector._search_batch([QUERY], top_k=5, min_score=0.0)[0]
+    assert candidates[0]["id"] == "video"
+    assert all(0.0 <= service["score"] <= 1.0 and "rrf_score" in service for service in candidates)
@@ -0,0 +1,83 @@
+"""
+Tests de la complétion concurrente des specs TMF633 "allégées" (hydrate_tmf_items)
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from mcp.openslice_client import hydrate_tmf_items
+from scripts.ingest_catalog import needs_hydration
+
+BASE_URL = "http://openslice-a/tmf-api/serviceCatalogManagement/v4/serviceSpecification"
+DETAIL = {"category": "Network", "serviceType": "CFS", "serviceSpecCharacteristic": []}
+
+
+class FakeCatalog:
+    """Endpoint de détail TMF633 : mesure les requêtes simultanées par hôte"""
+
+    def __init__(self, delay=0.01, failures=None):
+        self.delay = delay
+        self.failures = dict(failures or {})  # id -> nombre de 503 avant succès
+        self.in_flight = {}
+        self.peak = {}
+        self.peak_total = 0
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests += 1
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        self.peak_total = max(self.peak_total, sum(self.in_flight.values()))
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[host] -= 1
+        spec_id = request.url.path.rsplit("/", 1)[-1]
+        if spec_id == "missing":
+            return httpx.Response(404)
+        if self.failures.get(spec_id, 0) > 0:
+            self.failures[spec_id] -= 1
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"id": spec_id, **DETAIL})
+
+
+def hydrate(catalog, items, **kwargs):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(catalog)) as client:
+            return await hydrate_tmf_items(client, BASE_URL, items, **kwargs)
+    return asyncio.run(run())
+
+
+def test_details_are_merged_in_order():
+    items = [{"id": f"s{i}", "name": f"Service {i}"} for i in range(10)]
+    items[3] = {"id": "missing", "name": "Supprimé"}
+    items.append({"name": "Sans id"})
+    hydrated = hydrate(FakeCatalog(), items, concurrency=4)
+
+    assert [item.get("id") for item in hydrated] == [item.get("id") for item in items]
+    assert hydrated[0] == {"id": "s0", "name": "Service 0", **DETAIL}
+    assert hydrated[3] is items[3] and hydrated[-1] is items[-1]
+    assert needs_hydration(items[0]) and not needs_hydration(hydrated[0])
+
+
+def test_concurrency_is_bounded_per_host():
+    catalog = FakeCatalog(delay=0.02)
+    items = [{"id": f"a{i}"} for i in range(12)]
+    items += [{"id": f"b{i}", "href": f"http://openslice-b/serviceSpecification/b{i}"} for i in range(12)]
+    hydrate(catalog, items, concurrency=3)
+
+    assert catalog.peak == {"openslice-a": 3, "openslice-b": 3}
+    assert catalog.peak_total == 6  # les deux hôtes sont interrogés en parallèle
+    assert catalog.requests == 24
+
+
+def test_transient_errors_are_retried():
+    catalog = FakeCatalog(failures={"s1": 2})
+    hydrated = hydrate(catalog, [{"id": "s0"}, {"id": "s1"}], retries=2, backoff=0)
+    assert hydrated[1]["category"] == "Network"
+    assert catalog.requests == 4
+
+    with pytest.raises(httpx.HTTPStatusError):
+        hydrate(FakeCatalog(failures={"s1": 5}), [{"id": "s0"}, {"id": "s1"}], retries=1, backoff=0)
@@ -0,0 +1,88 @@
+"""
+Tests de la ré-indexation bleu/vert (--clear) lorsque l'ingestion échoue
+"""
+import pytest
+
+from agents.agent2_selector import ServiceSelectorAgent
+from config import settings
+from retrieval.storage import read_collection_alias
+from scripts import ingest_catalog
+from tests.helpers import HashEmbeddingFunction, make_spec
+
+SPECS = [
+    make_spec("video", "Video streaming edge", "low latency video streaming"),
+    make_spec("iot", "IoT gateway", "industrial telemetry gateway"),
+]
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """Catalogue OpenSlice simulé : pages renvoyées par iter_service_specifications"""
+    monkeypatch.setattr(settings, "chroma_persist_dir", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "catalog_hydration", False)
+    monkeypatch.setattr(ingest_catalog, "get_openslice_token", lambda: "token")
+    monkeypatch.setattr(
+        ingest_catalog,
+        "ServiceSelectorAgent",
+        lambda **kwargs: ServiceSelectorAgent(embedding_function=HashEmbeddingFunction(), **kwargs)
+    )
+    catalog = {"specs": SPECS, "fail_after": None}
+
+    def iter_specs():
+        for i, spec in enumerate(catalog["specs"]):
+            if i == catalog["fail_after"]:
+                raise RuntimeError("OpenSlice indisponible")
+            yield spec
+
+    monkeypatch.setattr(ingest_catalog, "iter_service_specifications", iter_specs)
+    return catalog
+
+
+def _generations():
+    agent = ServiceSelectorAgent(embedding_function=HashEmbeddingFunction())
+    return sorted(name for name in agent._collection_names() if name != agent.collection_name)
+
+
+def test_clear_publishes_new_generation(upstream):
+    assert ingest_catalog.ingest_catalog(clear_existing=True)
+    assert read_collection_alias(settings.chroma_persist_dir, "openslice_services") == _generations()[0]
+
+
+@pytest.mark.parametrize("fail_after", [0, 1])
+def test_failed_clear_leaves_no_staged_generation(upstream, fail_after):
+    upstream["fail_after"] = fail_after
+    assert not ingest_catalog.ingest_catalog(clear_existing=True)
+    assert _generations() == []
+    assert read_collection_alias(settings.chroma_persist_dir, "openslice_services") is None
+
+
+def test_cli_exits_non_zero_on_failure(upstream, monkeypatch):
+    upstream["specs"] = []
+    monkeypatch.setattr("sys.argv", ["ingest_catalog.py", "--clear"])
+    with pytest.raises(SystemExit) as exit_info:
+        ingest_catalog.main()
+    assert exit_info.value.code == 1
+
+
+def _fail(*args, **kwargs):
+    raise RuntimeError("index dérivés en échec")
+
+
+def test_failed_import_leaves_no_staged_generation(upstream, tmp_path, monkeypatch):
+    assert ingest_catalog.ingest_catalog(clear_existing=True)
+    published = _generations()
+    archive = str(tmp_path / "catalog.tar")
+    ingest_catalog.export_catalog(archive)
+
+    monkeypatch.setattr(ingest_catalog, "build_derived_indexes", _fail)
+    with pytest.raises(RuntimeError):
+        ingest_catalog.import_catalog(archive)
+    assert _generations() == published
+    assert read_collection_alias(settings.chroma_persist_dir, "openslice_services") == published[0]
+
+
+def test_failed_mock_creation_leaves_no_staged_generation(upstream, monkeypatch):
+    monkeypatch.setattr(ingest_catalog, "build_derived_indexes", _fail)
+    with pytest.raises(RuntimeError):
+        ingest_catalog.create_mock_services()
+    assert _generations() == []
@@ -0,0 +1,78 @@
+"""
+Tests de la synchronisation incrémentale du catalogue (--sync)
+"""
+import numpy as np
+
+from config import settings
+from scripts import ingest_catalog
+from tests.helpers import make_spec
+
+SPECS = [
+    make_spec("video", "Video streaming edge", "low latency video streaming for live events in Nice"),
+    make_spec("parking", "Parking sensors", "smart parking occupancy sensors platform"),
+    make_spec("iot", "IoT gateway", "industrial telemetry gateway latency < 10ms"),
+    make_spec("xr", "XR rendering", "augmented reality rendering server in Paris"),
+]
+UPDATED = [
+    SPECS[0],
+    make_spec("parking", "Parking sensors", "smart parking occupancy sensors platform in Lyon"),
+    SPECS[3],
+    make_spec("vr", "VR simulation", "virtual reality simulation engine latency < 5ms"),
+]
+
+
+def _sync(agent):
+    records = ingest_catalog.iter_service_records(UPDATED)
+    counts, changed = ingest_catalog.sync_collection(agent, records, processes=0)
+    ingest_catalog.build_derived_indexes(agent, changed)
+    return counts, changed
+
+
+def test_sync_reads_only_changed_services(build_selector, monkeypatch):
+    monkeypatch.setattr(settings, "dedup_near_duplicates", True)
+    agent = build_selector(SPECS)
+    calls = []
+    get = agent.collection.get
+    monkeypatch.setattr(agent.collection, "get", lambda **kwargs: calls.append(kwargs) or get(**kwargs))
+
+    counts, changed = _sync(agent)
+
+    assert counts == {"added": 1, "changed": 1, "removed": 1, "unchanged": 2}
+    assert changed == {"parking", "iot", "vr"}
+    # Seule la comparaison des empreintes parcourt la collection (métadonnées, par pages)
+    full_reads = [call for call in calls if "ids" not in call]
+    assert full_reads and all(call["include"] == ["metadatas"] and call.get("limit") for call in full_reads)
+
+
+def test_incremental_indexes_match_full_rebuild(build_selector, monkeypatch):
+    agent = build_selector(SPECS)
+    _sync(agent)
+    incremental = (agent.lexical_index, agent.coverage_index, agent.constraint_index)
+
+    ingest_catalog.build_derived_indexes(agent)
+    lexical, coverage, constraints = agent.lexical_index, agent.coverage_index, agent.constraint_index
+
+    assert sorted(incremental[0].ids) == sorted(lexical.ids) == ["parking", "video", "vr", "xr"]
+    for query in ("parking Lyon", "virtual reality latency", "video streaming"):
+        assert dict(incremental[0].search(query)) == dict(lexical.search(query))
+    assert {i: incremental[1].coverage_of(i) for i in lexical.ids} == {i: coverage.coverage_of(i) for i in lexical.ids}
+    assert {i: incremental[2].ranges_of(i) for i in lexical.ids} == {i: constraints.ranges_of(i) for i in lexical.ids}
+    assert np.isclose(
+        incremental[0].postings_weight.sum(), lexical.postings_weight.sum()
+    )
+
+
+def test_rebuild_collection_copies_by_pages(build_selector, monkeypatch):
+    agent = build_selector(SPECS)
+    before = agent.collection.get(include=["embeddings", "documents"])
+    calls = []
+    get = agent.collection.get
+    monkeypatch.setattr(agent.collection, "get", lambda **kwargs: calls.append(kwargs) or get(**kwargs))
+    monkeypatch.setattr(agent.client, "get_max_batch_size", lambda: 3)
+
+    assert agent.rebuild_collection({"hnsw:space": "cosine"}) == len(SPECS)
+
+    after = agent.collection.get(ids=before["ids"], include=["embeddings", "documents"])
+    assert after["ids"] == before["ids"] and after["documents"] == before["documents"]
+    assert np.allclose(after["embeddings"], before["embeddings"])
+    assert calls and all(call["limit"] == 3 for call in calls)
@@ -0,0 +1,106 @@
+"""
+Tests de RemoteMCPConnection (pipelining, delai depasse, annulation)
+
+Un faux serveur JSON-RPC sur socket Unix renvoie ses params apres params["delay"]
+secondes, chaque requete dans son propre thread (reponses dans le desordre).
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from mcp.remote_transport import RemoteMCPConnection, RemoteMCPError
+
+
+class FakeServer:
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(socket_path)
+        self.sock.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        lock = threading.Lock()
+        with conn, conn.makefile("rb") as rfile:
+            for line in rfile:
+                threading.Thread(target=self._reply, args=(conn, lock, json.loads(line)), daemon=True).start()
+
+    def _reply(self, conn, lock, message):
+        params = message.get("params") or {}
+        time.sleep(params.get("delay", 0))
+        if message["method"] == "fail":
+            response = {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32603, "message": "boom"}}
+        else:
+            response = {"jsonrpc": "2.0", "id": message["id"], "result": params}
+        with lock:
+            try:
+                conn.sendall(json.dumps(response).encode() + b"\n")
+            except OSError:
+                pass
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def connection(tmp_path):
+    server = FakeServer(str(tmp_path / "mcp.sock"))
+    connection = RemoteMCPConnection(socket_path=server.socket_path, timeout=5)
+    yield connection
+    connection.close()
+    server.close()
+
+
+def test_pipelined_requests_get_their_own_response(connection):
+    async def run():
+        return await asyncio.gather(*[
+            connection.arequest("echo", {"n": n, "delay": 0.2 - n * 0.04}) for n in range(5)
+        ])
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    assert [result["n"] for result in results] == list(range(5))
+    assert time.perf_counter() - start < 0.6  # en parallele, pas en serie
+
+
+def test_error_response_raises_remote_error(connection):
+    with pytest.raises(RemoteMCPError):
+        connection.request("fail")
+    assert connection.request("echo", {"ok": True}) == {"ok": True}
+
+
+def test_late_response_after_timeout_keeps_connection(connection):
+    with pytest.raises(TimeoutError):
+        connection.request("echo", {"delay": 0.3}, timeout=0.05)
+    time.sleep(0.4)  # la reponse tardive arrive et est ignoree
+    assert connection._pending == {}
+    assert connection.request("echo", {"n": 1}) == {"n": 1}
+
+
+def test_cancelled_caller_does_not_break_other_requests(connection):
+    async def run():
+        # Tache annulee pendant l'attente (ex: gather / TaskGroup dont une tache echoue)
+        slow = asyncio.ensure_future(connection.arequest("echo", {"delay": 0.3}))
+        await asyncio.sleep(0.05)
+        slow.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await slow
+        other = asyncio.ensure_future(connection.arequest("echo", {"n": 2, "delay": 0.5}))
+        await asyncio.sleep(0.4)  # la reponse de la requete annulee arrive entre-temps
+        return await other
+
+    assert asyncio.run(run()) == {"n": 2, "delay": 0.5}
+    assert connection._pending == {}
+    assert connection.request("echo", {"n": 3}) == {"n": 3}
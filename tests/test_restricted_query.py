@@ -0,0 +1,50 @@
+"""
+Tests de la recherche vectorielle avec services exclus (Agent 2)
+"""
+import numpy as np
+import pytest
+
+from config import settings
+from tests.helpers import make_spec
+
+SPECS = [
+    make_spec("video", "Video streaming edge", "low latency video streaming for live events"),
+    make_spec("video-cdn", "Video CDN", "video streaming content delivery"),
+    make_spec("parking", "Parking sensors", "smart parking occupancy sensors platform"),
+    make_spec("iot", "IoT gateway", "industrial telemetry gateway"),
+]
+
+
+@pytest.fixture
+def selector(build_selector):
+    return build_selector(SPECS)
+
+
+def _ids(selector, skip, top_k=2):
+    embeddings = np.asarray(selector.embedding_function(["live video streaming"]), dtype=np.float32)
+    return selector._restricted_query(embeddings, top_k, [skip])["ids"][0]
+
+
+def test_small_exclusion_filtered_client_side(selector, monkeypatch):
+    monkeypatch.setattr(settings, "exclusion_ids_ratio", 0.5)
+    calls = []
+    query = selector.collection.query
+    monkeypatch.setattr(selector.collection, "query", lambda **kwargs: calls.append(kwargs) or query(**kwargs))
+
+    ids = _ids(selector, {"video"})
+
+    assert calls[0]["ids"] is None and calls[0]["n_results"] == 3
+    assert "video" not in ids and len(ids) == 2
+    assert ids[0] == "video-cdn"
+
+
+def test_large_exclusion_uses_ids_filter(selector, monkeypatch):
+    monkeypatch.setattr(settings, "exclusion_ids_ratio", 0.5)
+    calls = []
+    query = selector.collection.query
+    monkeypatch.setattr(selector.collection, "query", lambda **kwargs: calls.append(kwargs) or query(**kwargs))
+
+    ids = _ids(selector, {"video", "parking", "iot"})
+
+    assert sorted(calls[0]["ids"]) == ["video-cdn"]
+    assert ids == ["video-cdn"]
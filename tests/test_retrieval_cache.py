@@ -0,0 +1,71 @@
+"""
+Tests du cache versionné des résultats de recherche (invalidation par version du catalogue)
+"""
+from retrieval.cache import RetrievalCache
+from scripts import ingest_catalog
+from tests.helpers import make_spec
+
+CANDIDATES = [{"id": "video", "score": 0.9}]
+
+
+def test_hit_returns_a_copy():
+    cache = RetrievalCache()
+    cache.set_version(1)
+    cache.put(1, "5G Paris", 5, 0.5, CANDIDATES)
+
+    first = cache.get(1, "5G Paris", 5, 0.5)
+    first[0]["domain"] = "ran"
+
+    assert cache.get(1, "5G Paris", 5, 0.5) == CANDIDATES
+    assert cache.get(1, "5G Paris", 3, 0.5) is None  # top_k fait partie de la clé
+
+
+def test_new_version_drops_all_entries():
+    cache = RetrievalCache()
+    assert not cache.set_version(1)
+    cache.put(1, "5G Paris", 5, 0.5, CANDIDATES)
+
+    assert cache.set_version(2)
+    assert not cache.set_version(2)
+    assert cache.get(2, "5G Paris", 5, 0.5) is None
+    assert cache.get(1, "5G Paris", 5, 0.5) is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["invalidations"] == 1
+
+
+def test_put_from_stale_version_is_ignored():
+    # Recherche commencée sur la version 1, terminée après l'ingestion de la version 2
+    cache = RetrievalCache()
+    cache.set_version(2)
+    cache.put(1, "5G Paris", 5, 0.5, CANDIDATES)
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction():
+    cache = RetrievalCache(max_entries=2)
+    cache.set_version(1)
+    for query in ("a", "b"):
+        cache.put(1, query, 5, 0.5, CANDIDATES)
+    cache.get(1, "a", 5, 0.5)
+    cache.put(1, "c", 5, 0.5, CANDIDATES)
+
+    assert cache.get(1, "b", 5, 0.5) is None
+    assert cache.get(1, "a", 5, 0.5) is not None
+
+
+def test_selector_cache_invalidated_by_ingestion(build_selector):
+    agent = build_selector([make_spec("iot", "IoT gateway", "industrial telemetry gateway")])
+    query = "live video streaming"
+    assert [c["id"] for c in agent._retrieve_batch([query], 3, 0.0)[0]] == ["iot"]
+    agent._retrieve_batch([query], 3, 0.0)
+    stats = agent.cache.stats()
+    assert stats["hits"] == 1
+
+    spec = make_spec("video", "Video streaming", "live video streaming platform")
+    ingest_catalog.embed_and_upsert(agent, ingest_catalog.iter_service_records([spec]), processes=0)
+    ingest_catalog.build_derived_indexes(agent)
+    agent.bump_catalog_version()
+
+    ids = [c["id"] for c in agent._retrieve_batch([query], 3, 0.0)[0]]
+    assert ids[0] == "video"
+    assert agent.cache.stats()["invalidations"] == stats["invalidations"] + 1
+    assert agent.cache.stats()["version"] == stats["version"] + 1
@@ -0,0 +1,45 @@
+"""
+Tests de l'agent de sélection partagé entre threads (mesures par thread)
+"""
+import threading
+
+from config import settings
+from schemas.intent import Intent, SubIntent
+from tests.helpers import make_spec
+
+SPECS = [
+    make_spec("video", "Video streaming", "live video streaming platform"),
+    make_spec("iot", "IoT gateway", "sensor telemetry gateway"),
+]
+
+
+def test_last_timings_are_per_thread(build_selector):
+    agent = build_selector(SPECS)
+    agent.last_timings = {"main": 1.0}
+    seen = {}
+
+    def worker():
+        seen["before"] = dict(agent.last_timings)
+        agent._search_batch(["live video streaming"], top_k=1, min_score=0.0)
+        seen["after"] = dict(agent.last_timings)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen["before"] == {}
+    assert seen["after"] and "main" not in seen["after"]
+    assert agent.last_timings == {"main": 1.0}
+
+
+def test_select_services_reports_timings_with_batching(build_selector, monkeypatch, capsys):
+    monkeypatch.setattr(settings, "retrieval_batching", True)
+    monkeypatch.setattr(settings, "retrieval_cache", False)
+    agent = build_selector(SPECS)
+    try:
+        intent = Intent(sub_intents=[SubIntent(domain="video", description="live video streaming")])
+        assert agent.select_services(intent, top_k=1, min_score=0.0)
+    finally:
+        agent.close()
+    assert "vector_ms" in agent.last_timings and "queue_ms" in agent.last_timings
+    assert "Latence: queue" in capsys.readouterr().out
@@ -0,0 +1,89 @@
+"""
+Tests du pool d'agents par tenant (tenants inconnus, éviction LRU, épinglage, chargement unique)
+"""
+import threading
+import time
+
+import pytest
+
+from agents import selector_pool
+from agents.selector_pool import SelectorPool
+from config import settings
+from tests.helpers import HashEmbeddingFunction, make_spec
+
+SPECS = [
+    make_spec("video", "Video streaming", "live video streaming platform"),
+    make_spec("iot", "IoT gateway", "sensor telemetry gateway"),
+]
+
+
+@pytest.fixture
+def pool(build_selector, monkeypatch):
+    """Pool sur trois tenants ingérés (a, b, c), modèle d'embeddings sans téléchargement"""
+    for tenant in ("a", "b", "c"):
+        build_selector(SPECS, collection_name=f"openslice_services_{tenant}")
+    monkeypatch.setattr(selector_pool, "get_embedding_function", HashEmbeddingFunction)
+    pool = SelectorPool(max_resident=2, persist_directory=settings.chroma_persist_dir)
+    yield pool
+    pool.close()
+
+
+def _collections(pool):
+    _, client = pool._shared_resources()
+    return sorted(c.name for c in client.list_collections())
+
+
+def test_unknown_tenant_is_an_error(pool):
+    before = _collections(pool)
+    with pytest.raises(ValueError, match="introuvable"):
+        pool.get("operator-typo")
+    assert _collections(pool) == before
+    assert "operator-typo" not in pool.stats()["tenants"]
+
+
+def test_least_recently_used_tenant_is_evicted(pool):
+    a = pool.get("a")
+    pool.get("b")
+    assert pool.get("a") is a  # "b" devient le moins récemment utilisé
+    pool.get("c")
+
+    stats = pool.stats()
+    assert stats["resident"] == 2
+    assert {k for k, v in stats["tenants"].items() if v["resident"]} == {"a", "c"}
+    assert stats["tenants"]["b"]["evictions"] == 1
+    assert stats["tenants"]["a"]["hits"] == 1
+
+
+def test_pinned_tenants_are_never_evicted(pool):
+    pool.warm(["a"], pin=True)
+    for tenant in ("b", "c", "b"):
+        pool.get(tenant)
+    stats = pool.stats()["tenants"]
+    assert stats["a"]["resident"] and stats["a"]["pinned"] and stats["a"]["evictions"] == 0
+
+
+def test_memory_budget_excludes_hnsw(pool):
+    pool.get("a")
+    stats = pool.stats()
+    assert stats["tenants"]["a"]["hnsw_memory_bytes"] > 0
+    assert stats["memory_bytes"] == stats["tenants"]["a"]["memory_bytes"]
+
+
+def test_concurrent_requests_load_a_tenant_once(pool, monkeypatch):
+    load = pool._load
+
+    def slow_load(tenant):
+        time.sleep(0.2)
+        return load(tenant)
+
+    monkeypatch.setattr(pool, "_load", slow_load)
+    agents = []
+    threads = [threading.Thread(target=lambda: agents.append(pool.get("a"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(agents) == 8 and all(agent is agents[0] for agent in agents)
+    stats = pool.stats()["tenants"]["a"]
+    assert stats["loads"] == 1 and stats["misses"] == 8
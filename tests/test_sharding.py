@@ -0,0 +1,86 @@
+"""
+Tests des shards par catégorie : routage (domaine, centroïdes) et fusion des résultats
+"""
+import numpy as np
+import pytest
+
+from retrieval import compute_distances
+from retrieval.sharding import DEFAULT_SHARD, ShardIndex
+
+
+def axis_vectors(axis, n, dim=8, seed=0):
+    """Embeddings proches de l'axe donné (un axe par catégorie)"""
+    rng = np.random.default_rng(seed + axis)
+    vectors = 0.1 * rng.normal(size=(n, dim))
+    vectors[:, axis] += 1.0
+    return vectors.astype(np.float32)
+
+
+@pytest.fixture
+def catalog():
+    categories = ["Network"] * 10 + ["Cloud"] * 10 + ["XR"] * 10 + [None] * 5
+    vectors = np.concatenate([axis_vectors(0, 10), axis_vectors(1, 10), axis_vectors(2, 10), axis_vectors(3, 5)])
+    ids = [f"s{i:02d}" for i in range(len(categories))]
+    return ids, vectors, categories
+
+
+def test_build_groups_by_category(catalog):
+    index = ShardIndex.build(*catalog)
+    assert index.shard_sizes() == {"Cloud": 10, "Network": 10, DEFAULT_SHARD: 5, "XR": 10}
+    assert len(index) == 35
+
+
+def test_route_by_domain_then_centroid(catalog):
+    index = ShardIndex.build(*catalog, routes=2)
+    names = index.names
+    query = axis_vectors(1, 1, seed=9)  # proche des services Cloud
+
+    assert [names[s] for s in index.route(query)[0]][0] == "Cloud"
+    # Le domaine (ou son alias) désigne le premier shard, le centroïde le second
+    assert [names[s] for s in index.route(query, domains=["ran"])[0]] == ["Network", "Cloud"]
+    assert [names[s] for s in index.route(query, domains=["XR"])[0]] == ["XR", "Cloud"]
+    # Domaine inconnu : routage par centroïdes seulement
+    assert index.route(query, domains=["unknown"]) == index.route(query)
+
+
+def test_search_merges_routed_shards(catalog):
+    ids, vectors, categories = catalog
+    index = ShardIndex.build(ids, vectors, categories, routes=2)
+    queries = np.concatenate([axis_vectors(0, 1, seed=5), axis_vectors(2, 1, seed=6)])
+    domains = ["network", "cloud"]
+    results = index.search_batch(queries, top_k=15, domains=domains)
+
+    for query, domain, routes, found in zip(queries, domains, index.route(queries, domains), results):
+        routed = {index.names[s] for s in routes}
+        assert domain.capitalize() in routed
+        # Fusion : même résultat qu'une recherche exacte limitée aux shards routés
+        allowed = [i for i, c in enumerate(categories) if (c or DEFAULT_SHARD) in routed]
+        exact = compute_distances(query[None, :], vectors[allowed], "l2")[0]
+        expected = [ids[allowed[i]] for i in np.argsort(exact, kind="stable")[:15]]
+        assert [service_id for service_id, _ in found] == expected
+        distances = [d for _, d in found]
+        assert distances == sorted(distances)
+
+
+def test_routes_one_matches_single_shard(catalog):
+    index = ShardIndex.build(*catalog, routes=1)
+    results = index.search_batch(axis_vectors(0, 1, seed=7), top_k=20, domains=["cloud"])[0]
+    cloud = {f"s{i:02d}" for i in range(10, 20)}
+    assert {service_id for service_id, _ in results} == cloud
+
+
+def test_updated_and_reload(catalog, tmp_path):
+    ids, vectors, categories = catalog
+    index = ShardIndex.build(ids, vectors, categories)
+    # s00 quitte Network pour XR, s20 est supprimé, s99 est ajouté sans catégorie
+    updated = index.updated({"s20"}, ["s00", "s99"], np.stack([vectors[25], vectors[30]]), ["XR", None])
+    assert updated.shard_sizes() == {"Cloud": 10, "Network": 9, DEFAULT_SHARD: 6, "XR": 10}
+    assert "s20" not in updated.ids
+    assert updated.search_batch(vectors[25:26], top_k=2, domains=["xr"])[0][0][1] == pytest.approx(0.0, abs=1e-5)
+
+    path = str(tmp_path / "services.shards.npz")
+    updated.save(path)
+    loaded = ShardIndex.load(path, routes=2)
+    assert loaded.ids == updated.ids
+    queries = axis_vectors(2, 3, seed=8)
+    assert loaded.search_batch(queries, top_k=5) == updated.search_batch(queries, top_k=5)
@@ -0,0 +1,119 @@
+"""
+Tests des instantanés portables (export / import avec vérification de l'empreinte du modèle)
+"""
+import io
+import json
+import tarfile
+
+import numpy as np
+import pytest
+
+from agents.agent2_selector import ServiceSelectorAgent
+from config import settings
+from retrieval.snapshot import check_fingerprint, load_snapshot, model_fingerprint, read_manifest
+from retrieval.storage import read_collection_alias
+from scripts import ingest_catalog
+from tests.helpers import HashEmbeddingFunction, make_spec
+
+SPECS = [
+    make_spec("video", "Video streaming edge", "low latency video streaming", version="1.2"),
+    make_spec("iot", "IoT gateway", "industrial telemetry gateway"),
+    make_spec("xr", "XR rendering", "cloud rendering for augmented reality", category="XR"),
+]
+
+
+class ShiftedHashEmbeddingFunction(HashEmbeddingFunction):
+    """Autre "modèle" de même dimension : vecteurs décalés d'une composante"""
+
+    def __call__(self, input):
+        return [np.roll(vector, 1) for vector in super().__call__(input)]
+
+
+def use_node(monkeypatch, tmp_path, name, embedding_function=HashEmbeddingFunction):
+    """Nœud de la flotte : répertoire ChromaDB et modèle d'embeddings propres"""
+    monkeypatch.setattr(settings, "chroma_persist_dir", str(tmp_path / name))
+    monkeypatch.setattr(
+        ingest_catalog,
+        "ServiceSelectorAgent",
+        lambda **kwargs: ServiceSelectorAgent(embedding_function=embedding_function(), **kwargs)
+    )
+
+
+@pytest.fixture
+def archive(build_selector, tmp_path):
+    agent = build_selector(SPECS, collection_name="openslice_services")
+    agent.bump_catalog_version()
+    path = str(tmp_path / "catalog.tar.gz")
+    manifest = agent.export_snapshot(path)
+    assert manifest["count"] == len(SPECS)
+    return path, agent
+
+
+def test_export_import_round_trip(archive, tmp_path, monkeypatch):
+    path, source = archive
+    manifest = read_manifest(path)
+    assert manifest["catalog_version"] == source.catalog_version
+    assert manifest["fingerprint"]["dimension"] == 64
+
+    use_node(monkeypatch, tmp_path, "node_b")
+    ingest_catalog.import_catalog(path)
+    target = ServiceSelectorAgent(embedding_function=HashEmbeddingFunction(), create_if_missing=False)
+
+    assert target.catalog_version >= manifest["catalog_version"]
+    assert read_collection_alias(settings.chroma_persist_dir, "openslice_services") == target.physical_collection
+    expected = source.collection.get(include=["embeddings", "documents", "metadatas"])
+    imported = target.collection.get(ids=expected["ids"], include=["embeddings", "documents", "metadatas"])
+    assert imported["documents"] == expected["documents"]
+    assert imported["metadatas"] == expected["metadatas"]
+    np.testing.assert_array_equal(np.asarray(imported["embeddings"]), np.asarray(expected["embeddings"]))
+    # Index dérivés reconstruits : même classement qu'à la source
+    query = ["low latency video streaming"]
+    assert [s["id"] for s in target._search_batch(query, top_k=3, min_score=0.0)[0]] == \
+        [s["id"] for s in source._search_batch(query, top_k=3, min_score=0.0)[0]]
+
+
+def test_import_refuses_another_model(archive, tmp_path, monkeypatch, capsys):
+    path, _ = archive
+    use_node(monkeypatch, tmp_path, "node_c", ShiftedHashEmbeddingFunction)
+    ingest_catalog.import_catalog(path)
+    assert "Import refusé" in capsys.readouterr().out
+    assert read_collection_alias(settings.chroma_persist_dir, "openslice_services") is None
+    probe = ServiceSelectorAgent(embedding_function=HashEmbeddingFunction())
+    assert [name for name in probe._collection_names() if name != probe.collection_name] == []
+
+    # Vérification désactivée explicitement : l'import passe
+    ingest_catalog.import_catalog(path, check_model=False)
+    assert read_collection_alias(settings.chroma_persist_dir, "openslice_services") is not None
+
+
+def test_check_fingerprint():
+    reference = model_fingerprint(HashEmbeddingFunction(), "model-a", "sentence-transformers")
+    assert check_fingerprint(reference, model_fingerprint(HashEmbeddingFunction(), "model-a", "sentence-transformers")) is None
+    assert "model" in check_fingerprint(reference, model_fingerprint(HashEmbeddingFunction(), "model-b", "sentence-transformers"))
+    assert "backend" in check_fingerprint(reference, model_fingerprint(HashEmbeddingFunction(), "model-a", "onnx-int8"))
+    shifted = model_fingerprint(ShiftedHashEmbeddingFunction(), "model-a", "sentence-transformers")
+    assert "vecteurs de référence" in check_fingerprint(reference, shifted)
+
+
+def test_load_rejects_invalid_archives(archive, tmp_path):
+    path, _ = archive
+    with tarfile.open(path, "r:*") as source:
+        members = {member.name: source.extractfile(member).read() for member in source.getmembers()}
+
+    def rewrite(name, **changes):
+        target = str(tmp_path / name)
+        with tarfile.open(target, "w") as archive_out:
+            for member, data in {**members, **changes}.items():
+                info = tarfile.TarInfo(member)
+                info.size = len(data)
+                archive_out.addfile(info, io.BytesIO(data))
+        return target
+
+    manifest = json.loads(members["manifest.json"])
+    future = rewrite("future.tar", **{"manifest.json": json.dumps({**manifest, "format": 99}).encode()})
+    with pytest.raises(ValueError, match="Format"):
+        load_snapshot(future)
+
+    truncated = rewrite("truncated.tar", **{"records.jsonl": members["records.jsonl"].splitlines(keepends=True)[0]})
+    with pytest.raises(ValueError, match="incohérent"):
+        load_snapshot(truncated)
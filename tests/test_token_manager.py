@@ -0,0 +1,130 @@
+"""
+Tests du gestionnaire de tokens Keycloak (renouvellement, single-flight, 401)
+"""
+import base64
+import json
+import threading
+import time
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from mcp.token_manager import TokenManager
+
+
+def make_jwt(n: int, lifetime: float = 300) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": time.time() + lifetime, "n": n}).encode()).decode()
+    return f"header.{payload.rstrip('=')}.signature"
+
+
+class FakeKeycloak:
+    """Endpoint token Keycloak simulé : compte les requêtes, lent si delay > 0"""
+
+    def __init__(self, delay: float = 0.0, lifetime: float = 300):
+        self.delay = delay
+        self.lifetime = lifetime
+        self.grants = []
+        self.reject_refresh = False
+        self.down = False
+        self._lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            raise httpx.ConnectError("Keycloak injoignable", request=request)
+        form = {key: values[0] for key, values in parse_qs(request.content.decode()).items()}
+        time.sleep(self.delay)
+        with self._lock:
+            self.grants.append(form["grant_type"])
+            n = len(self.grants)
+        if form["grant_type"] == "refresh_token" and self.reject_refresh:
+            return httpx.Response(400, json={"error": "invalid_grant"})
+        return httpx.Response(200, json={
+            "access_token": make_jwt(n, self.lifetime),
+            "refresh_token": f"refresh-{n}",
+            "refresh_expires_in": 1800,
+        })
+
+
+@pytest.fixture
+def keycloak():
+    return FakeKeycloak()
+
+
+@pytest.fixture
+def manager(keycloak):
+    manager = TokenManager(
+        auth_url="http://keycloak",
+        username="admin",
+        password="secret",
+        client_id="osapiWebClientId",
+        refresh_margin=60,
+        cache_file="",
+        background=False
+    )
+    manager._http = httpx.Client(transport=httpx.MockTransport(keycloak))
+    yield manager
+    manager.close()
+
+
+def _concurrently(fn, n=8):
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def run(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_callers_share_one_request(manager, keycloak):
+    keycloak.delay = 0.1
+    tokens = _concurrently(manager.get_token)
+    assert len(set(tokens)) == 1
+    assert keycloak.grants == ["password"]
+    assert manager.get_token() == tokens[0]
+    assert manager.refreshes == 1
+
+
+def test_token_renewed_with_refresh_token_before_expiry(manager, keycloak):
+    first = manager.get_token()
+    manager._state["refresh_at"] = time.time() - 1  # entrée dans la marge de renouvellement
+
+    second = manager.get_token()
+    assert second != first
+    assert keycloak.grants == ["password", "refresh_token"]
+
+
+def test_rejected_refresh_token_falls_back_to_password(manager, keycloak):
+    manager.get_token()
+    manager._state["refresh_at"] = time.time() - 1
+    keycloak.reject_refresh = True
+
+    manager.get_token()
+    assert keycloak.grants == ["password", "refresh_token", "password"]
+
+
+def test_stale_token_renewed_once_for_concurrent_401(manager, keycloak):
+    stale = manager.get_token()
+    keycloak.delay = 0.1
+
+    tokens = _concurrently(lambda: manager.get_token(stale=stale))
+    assert len(set(tokens)) == 1 and tokens[0] != stale
+    assert keycloak.grants == ["password", "refresh_token"]
+
+
+def test_valid_token_kept_when_keycloak_is_down(manager, keycloak):
+    token = manager.get_token()
+    manager._state["refresh_at"] = time.time() - 1
+    keycloak.down = True
+
+    assert manager.get_token() == token
+    manager._state["expires_at"] = time.time() - 1
+    with pytest.raises(httpx.ConnectError):
+        manager.get_token()
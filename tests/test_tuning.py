@@ -0,0 +1,53 @@
+"""
+Tests du réglage HNSW : espace de distance conservé et seuil min_score équivalent
+"""
+import numpy as np
+import pytest
+
+from retrieval import collection_hnsw_params, collection_tuning, compute_distances, distance_to_score
+from retrieval.tuning import equivalent_min_score
+from scripts import tune_index
+from tests.helpers import make_spec
+
+
+@pytest.mark.parametrize("from_space,to_space", [("l2", "cosine"), ("cosine", "l2"), ("l2", "ip")])
+def test_equivalent_min_score_keeps_the_same_services(from_space, to_space):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 16))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[:5] + 0.3 * rng.normal(size=(5, 16))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    for min_score in (0.3, 0.5, 0.8):
+        before = distance_to_score(compute_distances(queries, vectors, from_space)) >= min_score
+        threshold = equivalent_min_score(min_score, from_space, to_space)
+        after = distance_to_score(compute_distances(queries, vectors, to_space)) >= threshold - 1e-6
+        assert (before == after).all()
+
+
+def _fake_sweep(indexed, queries, spaces, **kwargs):
+    """Le cosinus est plus rapide, les deux espaces atteignent l'objectif de recall"""
+    return [
+        {"params": {"hnsw:space": space, "hnsw:M": 16, "hnsw:construction_ef": 100, "hnsw:search_ef": 10},
+         "recall": 1.0, "p50_ms": {"l2": 2.0, "cosine": 1.0}[space], "p95_ms": 3.0, "build_s": 0.1}
+        for space in spaces
+    ]
+
+
+@pytest.mark.parametrize("allow,space", [(False, "l2"), (True, "cosine")])
+def test_space_change_requires_opt_in(build_selector, monkeypatch, allow, space):
+    specs = [make_spec(f"svc-{i}", f"Service {i}", f"edge service number {i}") for i in range(20)]
+    agent = build_selector(specs, collection_name="openslice_services")
+    monkeypatch.setattr(tune_index, "ServiceSelectorAgent", lambda: agent)
+    monkeypatch.setattr(tune_index, "sweep_hnsw", _fake_sweep)
+    monkeypatch.setattr("sys.argv", ["tune_index.py", "--spaces", "l2,cosine"] + (["--allow-space-change"] if allow else []))
+
+    assert tune_index.main() == 0
+
+    assert collection_hnsw_params(agent.collection)["hnsw:space"] == space
+    space_change = collection_tuning(agent.collection)["space_change"]
+    if allow:
+        assert space_change["from"] == "l2" and space_change["to"] == "cosine"
+        assert space_change["min_score"]["0.5"] == pytest.approx(2 / 3, abs=1e-4)
+    else:
+        assert space_change is None